@@ -0,0 +1,52 @@
+"""Add sharded counters for hot campaign totals
+
+Revision ID: 3f8a2c91d4e7
+Revises: b195804e4b8f
+Create Date: 2026-10-18 18:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a2c91d4e7'
+down_revision: Union[str, Sequence[str], None] = 'b195804e4b8f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'campaigns',
+        sa.Column(
+            'counter_shards',
+            sa.Integer(),
+            server_default='0',
+            nullable=False,
+            comment='Counter shards for hot campaigns (0 = update current_amount directly)'
+        )
+    )
+    op.create_table(
+        'campaign_amount_shards',
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column(
+            'amount',
+            sa.Numeric(precision=12, scale=2),
+            nullable=False,
+            comment='Amount pending fold into campaigns.current_amount'
+        ),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+        sa.PrimaryKeyConstraint('campaign_id', 'shard')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('campaign_amount_shards')
+    op.drop_column('campaigns', 'counter_shards')
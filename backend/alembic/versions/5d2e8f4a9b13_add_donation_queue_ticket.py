@@ -0,0 +1,38 @@
+"""Add queue ticket to donations for buffered intake
+
+Revision ID: 5d2e8f4a9b13
+Revises: 9c4e1b7a2f60
+Create Date: 2026-10-18 21:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e8f4a9b13'
+down_revision: Union[str, Sequence[str], None] = '9c4e1b7a2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'donations',
+        sa.Column(
+            'queue_ticket',
+            sa.String(length=32),
+            nullable=True,
+            comment='Ticket of the queued request this donation was written from'
+        )
+    )
+    op.create_index('ix_donations_queue_ticket', 'donations', ['queue_ticket'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_donations_queue_ticket', table_name='donations')
+    op.drop_column('donations', 'queue_ticket')
@@ -0,0 +1,56 @@
+"""Add materialized giving leaderboard
+
+Revision ID: 9c4e1b7a2f60
+Revises: 3f8a2c91d4e7
+Create Date: 2026-10-18 19:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e1b7a2f60'
+down_revision: Union[str, Sequence[str], None] = '3f8a2c91d4e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'leaderboard_entries',
+        sa.Column('giver_id', sa.Integer(), nullable=False),
+        sa.Column('profile_type', sa.Enum('INDIVIDUAL', 'COMPANY', name='profiletype'), nullable=False),
+        sa.Column('username', sa.String(length=50), nullable=False),
+        sa.Column('full_name', sa.String(length=255), nullable=True),
+        sa.Column('company_name', sa.String(length=255), nullable=True),
+        sa.Column('total_donated', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('donation_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.ForeignKeyConstraint(['giver_id'], ['giver_profiles.id'], ),
+        sa.PrimaryKeyConstraint('giver_id')
+    )
+    op.create_index('ix_leaderboard_entries_total', 'leaderboard_entries', ['total_donated'], unique=False)
+    op.create_index('ix_leaderboard_entries_type_total', 'leaderboard_entries', ['profile_type', 'total_donated'], unique=False)
+
+    # Backfill from the live tables
+    op.execute(
+        """
+        INSERT INTO leaderboard_entries
+            (giver_id, profile_type, username, full_name, company_name, total_donated, donation_count)
+        SELECT gp.id, gp.profile_type, u.username, u.full_name, gp.company_name, gp.total_donated, gp.donation_count
+        FROM giver_profiles gp
+        JOIN users u ON gp.user_id = u.id
+        WHERE gp.is_public = 1 AND gp.total_donated > 0
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_leaderboard_entries_type_total', table_name='leaderboard_entries')
+    op.drop_index('ix_leaderboard_entries_total', table_name='leaderboard_entries')
+    op.drop_table('leaderboard_entries')
@@ -0,0 +1,66 @@
+"""Add a full-text search index over campaign titles and descriptions
+
+Revision ID: a4c6e2f81b37
+Revises: e7b3a19c5d48
+Create Date: 2026-10-18 23:30:00.000000
+
+MySQL gets a FULLTEXT index on campaigns (title, description). SQLite
+has no FULLTEXT indexes, so it gets an FTS5 table kept in step by
+triggers, populated from the existing campaigns here.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c6e2f81b37'
+down_revision: Union[str, Sequence[str], None] = 'e7b3a19c5d48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS campaigns_fts USING fts5("
+    "title, description, content='campaigns', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS campaigns_fts_insert AFTER INSERT ON campaigns BEGIN "
+    "INSERT INTO campaigns_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS campaigns_fts_delete AFTER DELETE ON campaigns BEGIN "
+    "INSERT INTO campaigns_fts(campaigns_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS campaigns_fts_update AFTER UPDATE OF title, description ON campaigns BEGIN "
+    "INSERT INTO campaigns_fts(campaigns_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO campaigns_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    # Index the campaigns that already exist
+    "INSERT INTO campaigns_fts(campaigns_fts) VALUES ('rebuild')",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.create_index(
+            'ix_campaigns_fulltext',
+            'campaigns',
+            ['title', 'description'],
+            unique=False,
+            mysql_prefix='FULLTEXT'
+        )
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.drop_index('ix_campaigns_fulltext', table_name='campaigns')
+    elif dialect == 'sqlite':
+        for trigger in ('campaigns_fts_insert', 'campaigns_fts_delete', 'campaigns_fts_update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS campaigns_fts")
@@ -0,0 +1,61 @@
+"""Add composite indexes for hot donation and campaign queries
+
+Revision ID: b195804e4b8f
+Revises: 667bc022c053
+Create Date: 2026-10-18 16:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b195804e4b8f'
+down_revision: Union[str, Sequence[str], None] = '667bc022c053'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_donations_campaign_status_anon_created',
+        'donations',
+        ['campaign_id', 'payment_status', 'is_anonymous', 'created_at'],
+        unique=False
+    )
+    op.create_index(
+        'ix_donations_giver_status_created',
+        'donations',
+        ['giver_id', 'payment_status', 'created_at'],
+        unique=False
+    )
+    op.create_index(
+        'ix_campaigns_status_type_created',
+        'campaigns',
+        ['status', 'campaign_type', 'created_at'],
+        unique=False
+    )
+    op.create_index(
+        'ix_campaigns_status_created',
+        'campaigns',
+        ['status', 'created_at'],
+        unique=False
+    )
+    op.create_index(
+        'ix_giver_profiles_public_total',
+        'giver_profiles',
+        ['is_public', 'total_donated'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_giver_profiles_public_total', table_name='giver_profiles')
+    op.drop_index('ix_campaigns_status_created', table_name='campaigns')
+    op.drop_index('ix_campaigns_status_type_created', table_name='campaigns')
+    op.drop_index('ix_donations_giver_status_created', table_name='donations')
+    op.drop_index('ix_donations_campaign_status_anon_created', table_name='donations')
@@ -0,0 +1,32 @@
+"""Add an index on campaigns.updated_at
+
+Revision ID: c8d1f5a3e962
+Revises: a4c6e2f81b37
+Create Date: 2026-10-19 01:00:00.000000
+
+The in-process search index (SEARCH_ENGINE=memory) looks for campaigns
+changed since its last refresh every few seconds; without an index that
+reads the whole campaigns table each time.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d1f5a3e962'
+down_revision: Union[str, Sequence[str], None] = 'a4c6e2f81b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_campaigns_updated_at', 'campaigns', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_campaigns_updated_at', table_name='campaigns')
@@ -0,0 +1,55 @@
+"""Add campaign stats rollup tables
+
+Revision ID: e7b3a19c5d48
+Revises: 5d2e8f4a9b13
+Create Date: 2026-10-18 22:30:00.000000
+
+Existing donations aren't backfilled here (bucketing created_at needs
+dialect-specific SQL and can take a while on large tables). Run
+`python manage_stats.py rebuild` after upgrading.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3a19c5d48'
+down_revision: Union[str, Sequence[str], None] = '5d2e8f4a9b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'campaign_stats_buckets',
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('period', sa.Enum('HOUR', 'DAY', name='statsperiod'), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column('donation_count', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('anonymous_count', sa.Integer(), nullable=False),
+        sa.Column('anonymous_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+        sa.PrimaryKeyConstraint('campaign_id', 'period', 'bucket_start', 'shard')
+    )
+    op.create_table(
+        'campaign_giver_totals',
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('giver_id', sa.Integer(), nullable=False),
+        sa.Column('donation_count', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+        sa.ForeignKeyConstraint(['giver_id'], ['giver_profiles.id'], ),
+        sa.PrimaryKeyConstraint('campaign_id', 'giver_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('campaign_giver_totals')
+    op.drop_table('campaign_stats_buckets')
@@ -0,0 +1,39 @@
+"""Add indexes on campaign start and end dates by status
+
+Revision ID: f2a9d7c4b158
+Revises: c8d1f5a3e962
+Create Date: 2026-10-19 02:30:00.000000
+
+The lifecycle scheduler reads the start dates of draft campaigns and
+the end dates of active ones, a time range at a time, and moves the
+campaigns that are due. These indexes let it seek to the range instead
+of reading every campaign.
+
+Existing start_date and end_date values are left as stored. Values
+written before this release with a non-UTC offset were stored in that
+offset, so they may be off by that many hours.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a9d7c4b158'
+down_revision: Union[str, Sequence[str], None] = 'c8d1f5a3e962'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_campaigns_status_start', 'campaigns', ['status', 'start_date'], unique=False)
+    op.create_index('ix_campaigns_status_end', 'campaigns', ['status', 'end_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_campaigns_status_end', table_name='campaigns')
+    op.drop_index('ix_campaigns_status_start', table_name='campaigns')
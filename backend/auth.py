@@ -2,7 +2,7 @@
 Authentication utilities for password hashing and JWT tokens.
 
 This module provides core authentication functionality:
-- Password hashing and verification using bcrypt
+- Password hashing and verification using bcrypt (in a process pool)
 - JWT token generation and validation
 - Getting the current authenticated user
 """
@@ -10,16 +10,21 @@ This module provides core authentication functionality:
 from datetime import datetime, timedelta, UTC
 from typing import Optional
 from jose import JWTError, jwt
-import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 import os
 from dotenv import load_dotenv
 
+from config import get_password_settings
 from database import get_db
 from models import User
 from schemas import TokenData
+from utils import passwords
+from utils.password_pool import password_pool
+from utils.principal_cache import principal_cache
 
 # Load environment variables
 load_dotenv()
@@ -38,6 +43,9 @@ def hash_password(password: str) -> str:
     """
     Hash a plain text password using bcrypt.
     
+    Runs in the calling thread; request handlers should use
+    hash_password_async instead.
+    
     Args:
         password: Plain text password to hash
         
@@ -47,18 +55,16 @@ def hash_password(password: str) -> str:
     Example:
         hashed = hash_password("mypassword123")
     """
-    # Convert password to bytes and hash it
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    # Return as string for database storage
-    return hashed.decode('utf-8')
+    return passwords.hash_password(password, get_password_settings().bcrypt_rounds)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain text password against a hashed password.
     
+    Runs in the calling thread; request handlers should use
+    verify_password_async instead.
+    
     Args:
         plain_password: Plain text password to verify
         hashed_password: Hashed password from database
@@ -70,10 +76,55 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         if verify_password(input_password, user.hashed_password):
             # Password is correct
     """
-    # Convert both to bytes for comparison
-    password_bytes = plain_password.encode('utf-8')
-    hashed_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+    return passwords.verify_password(plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password in the password process pool.
+    
+    Args:
+        password: Plain text password to hash
+        
+    Returns:
+        Hashed password string
+        
+    Raises:
+        PasswordPoolBusy: 503 if too many password jobs are queued
+    """
+    return await password_pool.run(
+        passwords.hash_password, password, get_password_settings().bcrypt_rounds
+    )
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password in the password process pool.
+    
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Hashed password from database
+        
+    Returns:
+        True if password matches, False otherwise
+        
+    Raises:
+        PasswordPoolBusy: 503 if too many password jobs are queued
+    """
+    return await password_pool.run(passwords.verify_password, plain_password, hashed_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check if a hash was made with a different cost than the configured one.
+    
+    Args:
+        hashed_password: Hashed password from database
+        
+    Returns:
+        True if the password should be hashed again
+    """
+    return passwords.get_rounds(hashed_password) != get_password_settings().bcrypt_rounds
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -107,7 +158,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def get_user_by_username(db: Session, username: str) -> Optional[User]:
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
     """
     Get a user by username from the database.
     
@@ -118,10 +169,10 @@ def get_user_by_username(db: Session, username: str) -> Optional[User]:
     Returns:
         User object if found, None otherwise
     """
-    return db.query(User).filter(User.username == username).first()
+    return await db.scalar(select(User).where(User.username == username))
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """
     Get a user by email from the database.
     
@@ -132,14 +183,16 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     Returns:
         User object if found, None otherwise
     """
-    return db.query(User).filter(User.email == email).first()
+    return await db.scalar(select(User).where(User.email == email))
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
     """
     Authenticate a user by username/email and password.
     
     Checks both username and email fields for flexibility.
+    Password verification runs in the password process pool so bcrypt
+    doesn't block the event loop or the shared threadpool.
     
     Args:
         db: Database session
@@ -149,28 +202,55 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     Returns:
         User object if authentication successful, None otherwise
         
+    Raises:
+        PasswordPoolBusy: 503 if too many password jobs are queued
+        
     Example:
-        user = authenticate_user(db, "johndoe", "password123")
+        user = await authenticate_user(db, "johndoe", "password123")
         if user:
             # Login successful
     """
     # Try to find user by username first
-    user = get_user_by_username(db, username)
+    user = await get_user_by_username(db, username)
     
     # If not found, try email
     if not user:
-        user = get_user_by_email(db, username)
+        user = await get_user_by_email(db, username)
     
     # If user not found or password incorrect, return None
-    if not user or not verify_password(password, user.hashed_password):
+    if not user:
+        return None
+
+    if not await verify_password_async(password, user.hashed_password):
         return None
     
     return user
 
 
+def _attach_cached_user(db: AsyncSession, snapshot: dict) -> User:
+    """
+    Rebuild a User from a cached snapshot and attach it to the session.
+    
+    The user behaves as if it had been loaded by db, so handlers can
+    modify and commit it as usual. Columns left out of the snapshot
+    (the password hash) are unloaded.
+    
+    Args:
+        db: Database session for the request
+        snapshot: Column values from the principal cache
+        
+    Returns:
+        User attached to db
+    """
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     Get the current authenticated user from the JWT token.
@@ -178,6 +258,10 @@ async def get_current_user(
     This is a FastAPI dependency that can be injected into route handlers
     to protect endpoints and get the current user.
     
+    Users are served from the principal cache when possible (see
+    utils/principal_cache.py), so most requests skip the user query.
+    The returned User is attached to db either way.
+    
     Args:
         token: JWT token from Authorization header (injected by oauth2_scheme)
         db: Database session (injected by get_db)
@@ -190,7 +274,7 @@ async def get_current_user(
         
     Example:
         @app.get("/protected")
-        def protected_route(current_user: User = Depends(get_current_user)):
+        async def protected_route(current_user: User = Depends(get_current_user)):
             return {"message": f"Hello {current_user.username}"}
     """
     # Exception to raise if authentication fails
@@ -214,12 +298,20 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    # Get user from database
-    user = get_user_by_username(db, username=token_data.username)
-    
-    # If user not found, raise exception
-    if user is None:
-        raise credentials_exception
+    # Get user from the principal cache, falling back to the database
+    snapshot = await principal_cache.get(token_data.username)
+    if snapshot is not None:
+        user = _attach_cached_user(db, snapshot)
+    else:
+        user = await get_user_by_username(db, username=token_data.username)
+        
+        # If user not found, raise exception
+        if user is None:
+            raise credentials_exception
+        
+        # Only active users are cached, so inactive ones always hit the database
+        if user.is_active:
+            await principal_cache.set(token_data.username, user)
     
     # Check if user account is active
     if not user.is_active:
@@ -248,7 +340,7 @@ async def get_current_active_user(
         
     Example:
         @app.get("/protected")
-        def protected_route(user: User = Depends(get_current_active_user)):
+        async def protected_route(user: User = Depends(get_current_active_user)):
             return {"username": user.username}
     """
     return current_user
\ No newline at end of file
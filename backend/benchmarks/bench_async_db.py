@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the database layer.
+
+Fires concurrent requests at GET /campaigns/ and
+GET /donations/campaigns/{id} against a running API and reports
+requests/sec and latency percentiles for each endpoint.
+
+To compare the async handlers with the old sync ones, run the API from
+each revision with a single worker and point the benchmark at it:
+
+    # After: this revision
+    uvicorn main:app --workers 1 --port 8000
+    python benchmarks/bench_async_db.py --seed --label async
+
+    # Before: the last revision with sync handlers
+    git worktree add /tmp/ripple-sync <sync-revision>
+    (cd /tmp/ripple-sync/backend && uvicorn main:app --workers 1 --port 8001)
+    python benchmarks/bench_async_db.py --base-url http://localhost:8001 \\
+        --campaign-id <id printed by --seed> --label sync
+
+Both servers must use the same DATABASE_URL. SQL echo should be turned
+off in both, otherwise statement logging dominates the numbers.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+import httpx
+
+# Allow running from the backend directory or from benchmarks/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def seed_data(donation_count: int) -> int:
+    """
+    Create an active campaign with completed donations to read back.
+
+    Args:
+        donation_count: Number of completed donations to insert
+
+    Returns:
+        ID of the seeded campaign
+    """
+    from sqlalchemy import insert
+    from database import SessionLocal
+    from models import (
+        User, Campaign, GiverProfile, Donation,
+        CampaignStatus, PaymentStatus
+    )
+
+    suffix = int(time.time())
+    db = SessionLocal()
+    try:
+        user = User(
+            email=f"bench{suffix}@example.com",
+            username=f"bench{suffix}",
+            hashed_password="not-a-real-hash",
+        )
+        db.add(user)
+        db.flush()
+
+        giver = GiverProfile(user_id=user.id)
+        campaign = Campaign(
+            title=f"Benchmark campaign {suffix}",
+            description="Seeded by benchmarks/bench_async_db.py",
+            status=CampaignStatus.ACTIVE,
+            creator_id=user.id,
+        )
+        db.add_all([giver, campaign])
+        db.flush()
+
+        rows = [
+            {
+                "amount": Decimal("10.00"),
+                "currency": "GBP",
+                "campaign_id": campaign.id,
+                "giver_id": giver.id,
+                "payment_status": PaymentStatus.COMPLETED,
+                "is_anonymous": False,
+            }
+            for _ in range(donation_count)
+        ]
+        if rows:
+            db.execute(insert(Donation), rows)
+
+        db.commit()
+        return campaign.id
+    finally:
+        db.close()
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient,
+    path: str,
+    total_requests: int,
+    concurrency: int
+) -> dict:
+    """
+    Issue total_requests GETs to path with a fixed number in flight.
+
+    Args:
+        client: Shared HTTP client
+        path: Endpoint path to request
+        total_requests: Total number of requests to send
+        concurrency: Maximum requests in flight at once
+
+    Returns:
+        Dictionary with throughput, latency percentiles and error count
+    """
+    latencies = []
+    errors = 0
+    remaining = total_requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests in flight")
+    parser.add_argument("--campaign-id", type=int, help="Campaign to read donations from")
+    parser.add_argument("--seed", action="store_true", help="Seed an active campaign first")
+    parser.add_argument("--donations", type=int, default=1000, help="Donations to seed")
+    parser.add_argument("--label", default="run", help="Label printed with the results")
+    args = parser.parse_args()
+
+    campaign_id = args.campaign_id
+    if args.seed:
+        campaign_id = seed_data(args.donations)
+        print(f"Seeded campaign {campaign_id} with {args.donations} donations")
+    if campaign_id is None:
+        parser.error("--campaign-id is required unless --seed is given")
+
+    paths = ["/campaigns/", f"/donations/campaigns/{campaign_id}"]
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        # Warm up connections and the server before measuring
+        await asyncio.gather(*(client.get(path) for path in paths))
+
+        print(f"\n[{args.label}] {args.requests} requests/endpoint, concurrency {args.concurrency}")
+        print(f"{'endpoint':<36} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+        for path in paths:
+            result = await run_endpoint(client, path, args.requests, args.concurrency)
+            print(
+                f"{result['path']:<36} {result['rps']:>9.1f} "
+                f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['errors']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for authenticated endpoints with and without the principal cache.
+
+Runs the app in process (httpx ASGI transport, no server needed),
+registers a user, then sends the same authenticated requests twice:
+once with the principal cache on and once with it off (TTL 0). Reports
+latency percentiles, requests/sec and user queries per request.
+
+Point DATABASE_URL at the real database (e.g. MySQL) for realistic
+numbers. On a local SQLite file the saved user query is very cheap.
+
+    DATABASE_URL=sqlite:///./bench_auth.db python benchmarks/bench_auth_cache.py
+    python benchmarks/bench_auth_cache.py --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+from sqlalchemy import event
+
+# Allow running from the backend directory or from benchmarks/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import async_engine
+from main import app
+from routers import auth as auth_router
+from utils.principal_cache import principal_cache
+
+PATHS = ["/users/me", "/givers/me", "/donations/my/donations"]
+
+
+async def login(client: httpx.AsyncClient) -> str:
+    """Register a throwaway user and get an access token for it."""
+    suffix = uuid.uuid4().hex[:12]
+    user = {
+        "email": f"authbench{suffix}@example.com",
+        "username": f"authbench{suffix}",
+        "password": "BenchPass123!",
+    }
+    response = await client.post("/auth/register", json=user)
+    response.raise_for_status()
+
+    response = await client.post(
+        "/auth/login",
+        data={"username": user["username"], "password": user["password"]}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run(client: httpx.AsyncClient, total_requests: int, concurrency: int) -> dict:
+    """
+    Send total_requests GETs across PATHS with a fixed number in flight.
+
+    Args:
+        client: Authenticated HTTP client
+        total_requests: Total number of requests to send
+        concurrency: Maximum requests in flight at once
+
+    Returns:
+        Dictionary with throughput, latency percentiles and error count
+    """
+    latencies = []
+    errors = 0
+    remaining = total_requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            path = PATHS[remaining % len(PATHS)]
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight")
+    args = parser.parse_args()
+
+    # Registration and login are rate limited
+    app.state.limiter.enabled = False
+    auth_router.limiter.enabled = False
+
+    # Count user lookups to show what the cache saves
+    user_queries = 0
+
+    def count_user_queries(conn, cursor, statement, parameters, context, executemany):
+        nonlocal user_queries
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            user_queries += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_user_queries)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        client.headers["Authorization"] = f"Bearer {await login(client)}"
+
+        cache_ttl = principal_cache.ttl or 30.0
+        print(f"{args.requests} requests over {', '.join(PATHS)}, concurrency {args.concurrency}")
+        print(f"{'principal cache':<16} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'user q/req':>11} {'errors':>7}")
+
+        for label, ttl in (("on", cache_ttl), ("off", 0)):
+            principal_cache.ttl = ttl
+            principal_cache.clear()
+
+            # Warm up (and fill the cache) before measuring
+            await asyncio.gather(*(client.get(path) for path in PATHS))
+            user_queries = 0
+
+            result = await run(client, args.requests, args.concurrency)
+            print(
+                f"{label:<16} {result['rps']:>9.1f} {result['p50_ms']:>9.2f} "
+                f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                f"{user_queries / result['requests']:>11.2f} {result['errors']:>7}"
+            )
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Latency of full-text campaign search (utils/campaign_search.py).
+
+Seeds campaigns with generated titles and descriptions (1M by default)
+and runs the GET /campaigns/search query for a mix of searches: a
+common word, a rare word, several words, a type filter and a second
+page through the cursor. For each it reports p50/p95 latency and the
+number of matches. A LIKE '%word%' scan, which is what search would be
+without the index, is timed once for comparison (LIKE also matches
+inside longer words, so it finds more).
+
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/bench_campaign_search.py
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/bench_campaign_search.py --campaigns 100000 --repeat 50
+
+Campaigns are kept and topped up on the next run, so only the first
+run against a database pays for seeding.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+# Allow running from the backend directory or from benchmarks/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import Base
+from models import Campaign, CampaignStatus, CampaignType, User
+from utils.campaign_search import encode_search_cursor, search_page, search_query
+from utils.fast_json import campaign_serializer
+
+BATCH_SIZE = 20_000
+PAGE_SIZE = 10
+
+# Words are drawn with a Zipf-like skew over a 2,000 word vocabulary, so
+# a few are in many campaigns and most are rare, like real text. The
+# searches pick words by frequency rank: WORDS[20] is in about one
+# campaign in five, WORDS[200] in one in fifty, WORDS[1500] in one in 300
+STEMS = (
+    "school", "roof", "village", "hall", "library", "garden", "rescue", "shelter", "cancer", "hospice",
+    "marathon", "community", "centre", "youth", "football", "church", "appeal", "memorial", "kitchen", "food",
+    "river", "bridge", "clinic", "orchestra", "theatre", "museum", "park", "pool", "farm", "harbour",
+    "water", "well", "bike", "trail", "choir", "scout", "guide", "nursery", "pantry", "bakery",
+    "canal", "forest", "meadow", "island", "valley", "tower", "chapel", "market", "studio", "arena",
+)
+SUFFIXES = (
+    "", "s", "er", "ing", "ed", "land", "side", "wood", "ford", "ton", "ham", "by", "field", "gate",
+    "stone", "well", "dale", "moor", "port", "bury", "worth", "wick", "mouth", "combe", "hurst",
+    "ley", "minster", "stead", "thorpe", "holme", "ness", "mere", "brook", "cliffe", "croft",
+    "haven", "lake", "bridge", "marsh", "heath",
+)
+WORDS = [stem + suffix for suffix in SUFFIXES for stem in STEMS]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+TITLE_WORDS = 6
+DESCRIPTION_WORDS = 30
+
+SEARCHES = [
+    ("common word", WORDS[20], {}),
+    ("medium word", WORDS[200], {}),
+    ("rare word", WORDS[1500], {}),
+    ("three words", " ".join(WORDS[200:203]), {}),
+    ("type filter", WORDS[200], {"campaign_type": CampaignType.EVENT}),
+    ("page 2", WORDS[200], {"page": 2}),
+]
+
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, WEIGHTS, k=words))
+
+
+def seed(db: Session, count: int) -> int:
+    """
+    Add generated active campaigns until there are count of them.
+
+    Args:
+        db: Database session
+        count: Campaigns wanted
+
+    Returns:
+        Number of campaigns added
+    """
+    existing = db.scalar(select(func.count()).select_from(Campaign))
+    if existing >= count:
+        return 0
+
+    creator_id = db.scalar(select(User.id).limit(1))
+    if creator_id is None:
+        user = User(email="search@example.com", username="searchbench", hashed_password="not-a-real-hash")
+        db.add(user)
+        db.flush()
+        creator_id = user.id
+
+    rng = random.Random(existing)
+    types = list(CampaignType)
+    for start in range(existing, count, BATCH_SIZE):
+        db.execute(insert(Campaign), [
+            {
+                "title": text(rng, TITLE_WORDS).capitalize(),
+                "description": text(rng, DESCRIPTION_WORDS),
+                "campaign_type": types[i % len(types)],
+                "status": CampaignStatus.ACTIVE,
+                "creator_id": creator_id,
+            }
+            for i in range(start, min(start + BATCH_SIZE, count))
+        ])
+        db.commit()
+    return count - existing
+
+
+def search_query_for(db: Session, q: str, options: dict):
+    """The route's query for a search, before paging."""
+    query = select(*campaign_serializer.select_columns(Campaign.id)).where(Campaign.status == CampaignStatus.ACTIVE)
+    if "campaign_type" in options:
+        query = query.where(Campaign.campaign_type == options["campaign_type"])
+    return search_query(db.bind.dialect.name, query, q)
+
+
+def run_search(db: Session, query, score, cursor=None):
+    """Fetch one page of results."""
+    return db.execute(search_page(query, score, PAGE_SIZE, cursor)).all()
+
+
+def count_matches(db: Session, query) -> int:
+    return db.scalar(select(func.count()).select_from(query.subquery()))
+
+
+def like_scan(db: Session, q: str) -> int:
+    """Search without the index: LIKE has to read every campaign to find (let alone rank) all matches."""
+    pattern = f"%{q}%"
+    return db.scalar(
+        select(func.count())
+        .where(Campaign.status == CampaignStatus.ACTIVE)
+        .where(Campaign.title.like(pattern) | Campaign.description.like(pattern))
+    )
+
+
+def percentile(timings: list, fraction: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--database-url", default="sqlite:///./bench_search.db")
+    parser.add_argument("--campaigns", type=int, default=1_000_000, help="Campaigns to seed")
+    parser.add_argument("--repeat", type=int, default=100, help="Timed runs per search")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+
+    with Session(engine) as db:
+        start = time.perf_counter()
+        added = seed(db, args.campaigns)
+        if added:
+            print(f"Seeded {added} campaigns in {time.perf_counter() - start:.1f}s")
+
+        print(f"\n{args.campaigns} campaigns on {engine.dialect.name}, {args.repeat} runs per search")
+        print(f"{'search':<13} {'q':<32} {'matches':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, q, options in SEARCHES:
+            query, score = search_query_for(db, q, options)
+            cursor = None
+            if options.get("page") == 2:
+                # Time the second page on its own
+                last = run_search(db, query, score)[PAGE_SIZE - 1]
+                cursor = encode_search_cursor(last.score, last.id)
+
+            run_search(db, query, score, cursor)  # Warm the page cache
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                run_search(db, query, score, cursor)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(
+                f"{name:<13} {q:<32} {count_matches(db, query):>8} "
+                f"{percentile(timings, 0.5):>8.2f} {percentile(timings, 0.95):>8.2f}"
+            )
+
+        q = SEARCHES[1][1]
+        start = time.perf_counter()
+        matches = like_scan(db, q)
+        print(f"{'LIKE scan':<13} {q:<32} {matches:>8} {(time.perf_counter() - start) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for direct vs buffered (queued) donation intake.
+
+Runs the app in process (httpx ASGI transport, no server needed),
+registers a user and creates an active campaign, then sends the same
+burst of donations twice: to POST /donations/ (one INSERT and commit
+per request) and to POST /donations/queued (local queue, 202). For the
+queued run it also times how long the flush worker takes to write the
+backlog to the database.
+
+Point DATABASE_URL at the real database (e.g. MySQL) for realistic
+numbers; a local SQLite file serialises every commit.
+
+    DATABASE_URL=sqlite:///./bench_intake.db python benchmarks/bench_donation_intake.py
+    python benchmarks/bench_donation_intake.py --donations 20000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+# Allow running from the backend directory or from benchmarks/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import get_intake_settings
+from database import AsyncSessionLocal, async_engine
+from main import app
+from routers import auth as auth_router
+from utils.donation_queue import donation_queue, run_flush_loop
+
+
+async def setup(client: httpx.AsyncClient) -> int:
+    """Register a throwaway user, log in and create an active campaign."""
+    suffix = uuid.uuid4().hex[:12]
+    user = {
+        "email": f"intakebench{suffix}@example.com",
+        "username": f"intakebench{suffix}",
+        "password": "BenchPass123!",
+    }
+    (await client.post("/auth/register", json=user)).raise_for_status()
+    response = await client.post(
+        "/auth/login",
+        data={"username": user["username"], "password": user["password"]}
+    )
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+    response = await client.post("/campaigns/", json={
+        "title": "Intake benchmark campaign",
+        "description": "Campaign receiving the intake benchmark's donations",
+        "campaign_type": "fundraising",
+    })
+    response.raise_for_status()
+    campaign_id = response.json()["id"]
+    (await client.put(f"/campaigns/{campaign_id}", json={"status": "active"})).raise_for_status()
+    return campaign_id
+
+
+async def burst(client: httpx.AsyncClient, path: str, campaign_id: int, total: int, concurrency: int) -> dict:
+    """
+    POST total donations to path with a fixed number in flight.
+
+    Returns:
+        Dictionary with throughput, latency percentiles and error count
+    """
+    latencies = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.post(path, json={"campaign_id": campaign_id, "amount": "5.00"})
+            latencies.append(time.perf_counter() - start)
+            if response.status_code not in (201, 202):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--donations", type=int, default=5000, help="Donations per run")
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests in flight")
+    args = parser.parse_args()
+
+    # Registration and login are rate limited
+    app.state.limiter.enabled = False
+    auth_router.limiter.enabled = False
+
+    settings = get_intake_settings()
+    with tempfile.TemporaryDirectory() as queue_dir:
+        donation_queue.path = str(Path(queue_dir) / "queue.db")
+        donation_queue.max_pending = max(donation_queue.max_pending, args.donations)
+        donation_queue.open()
+
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            campaign_id = await setup(client)
+
+            print(f"{args.donations} donations, concurrency {args.concurrency}")
+            print(f"{'intake':<8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+            for label, path in (("direct", "/donations/"), ("queued", "/donations/queued")):
+                result = await burst(client, path, campaign_id, args.donations, args.concurrency)
+                print(
+                    f"{label:<8} {result['rps']:>9.1f} {result['p50_ms']:>9.2f} "
+                    f"{result['p99_ms']:>9.2f} {result['errors']:>7}"
+                )
+
+        # Time writing the queued backlog to the database
+        started = time.perf_counter()
+        flusher = asyncio.create_task(run_flush_loop(
+            donation_queue, AsyncSessionLocal, settings.batch_size, settings.flush_interval, retention=0
+        ))
+        while donation_queue.pending:
+            await asyncio.sleep(0.05)
+        flusher.cancel()
+        elapsed = time.perf_counter() - started
+        print(
+            f"Flushed {donation_queue.created} queued donations in {elapsed:.2f}s "
+            f"({donation_queue.created / elapsed:.0f}/s, batches of {settings.batch_size})"
+        )
+        donation_queue.close()
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
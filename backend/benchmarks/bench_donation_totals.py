@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Regression benchmark for campaign donation totals.
+
+Seeds a campaign with a large number of completed donations (1M by
+default) and times the three ways of getting its total:
+
+- python: fetch every amount and sum floats in Python (the old code)
+- sql_sum: SELECT SUM(amount) in the database
+- aggregate: read the maintained Campaign.current_amount
+
+For each it reports the time, the peak Python memory while running it
+and whether the result is the exact Decimal total. The API reads the
+aggregate, so that row should stay flat as the donation count grows.
+
+    python benchmarks/bench_donation_totals.py
+    python benchmarks/bench_donation_totals.py --donations 100000 --repeat 5
+
+The seeded campaign is kept and reused on the next run with the same
+--donations; pass --reseed to seed a new one.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+# Allow running from the backend directory or from benchmarks/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import Base
+from models import (
+    User, Campaign, GiverProfile, Donation,
+    CampaignStatus, PaymentStatus
+)
+
+BATCH_SIZE = 50_000
+
+
+def donation_amount(i: int) -> Decimal:
+    """Amounts cycle through 0.01 - 99.99 so float rounding errors accumulate."""
+    return Decimal(i % 9999 + 1) / 100
+
+
+def seed_campaign(db: Session, donation_count: int) -> int:
+    """
+    Create a campaign with donation_count completed donations.
+
+    Args:
+        db: Database session
+        donation_count: Number of completed donations to insert
+
+    Returns:
+        ID of the seeded campaign
+    """
+    suffix = time.time_ns()
+    user = User(
+        email=f"totals{suffix}@example.com",
+        username=f"totals{suffix}",
+        hashed_password="not-a-real-hash",
+    )
+    db.add(user)
+    db.flush()
+
+    giver = GiverProfile(user_id=user.id)
+    campaign = Campaign(
+        title=f"Totals benchmark ({donation_count} donations)",
+        description="Seeded by benchmarks/bench_donation_totals.py",
+        status=CampaignStatus.ACTIVE,
+        creator_id=user.id,
+    )
+    db.add_all([giver, campaign])
+    db.flush()
+
+    total = Decimal("0")
+    for start in range(0, donation_count, BATCH_SIZE):
+        rows = []
+        for i in range(start, min(start + BATCH_SIZE, donation_count)):
+            amount = donation_amount(i)
+            total += amount
+            rows.append({
+                "amount": amount,
+                "currency": "GBP",
+                "campaign_id": campaign.id,
+                "giver_id": giver.id,
+                "payment_status": PaymentStatus.COMPLETED,
+                "is_anonymous": i % 10 == 0,
+            })
+        db.execute(insert(Donation), rows)
+
+    # Keep the aggregates in step, as the status endpoint would
+    campaign.current_amount = total
+    giver.total_donated = total
+    giver.donation_count = donation_count
+
+    db.commit()
+    return campaign.id
+
+
+def find_campaign(db: Session, donation_count: int):
+    """Get the ID of a campaign seeded by an earlier run, if any."""
+    return db.scalar(
+        select(Campaign.id)
+        .where(Campaign.title == f"Totals benchmark ({donation_count} donations)")
+        .order_by(Campaign.id.desc())
+        .limit(1)
+    )
+
+
+def python_total(db: Session, campaign_id: int):
+    """The old approach: load every amount and sum floats."""
+    amounts = db.scalars(select(Donation.amount).where(
+        Donation.campaign_id == campaign_id,
+        Donation.payment_status == PaymentStatus.COMPLETED
+    )).all()
+    total = sum(float(amount) for amount in amounts) if amounts else 0
+    return Decimal(str(total))
+
+
+def sql_total(db: Session, campaign_id: int):
+    """SUM in the database."""
+    return db.scalar(select(func.sum(Donation.amount)).where(
+        Donation.campaign_id == campaign_id,
+        Donation.payment_status == PaymentStatus.COMPLETED
+    ))
+
+
+def aggregate_total(db: Session, campaign_id: int):
+    """Read the maintained aggregate."""
+    return db.scalar(select(Campaign.current_amount).where(Campaign.id == campaign_id))
+
+
+def measure(engine, strategy, campaign_id: int, repeat: int) -> dict:
+    """
+    Time a total strategy and track its peak Python memory.
+
+    Args:
+        engine: Engine for the benchmark database
+        strategy: Function taking (db, campaign_id) and returning the total
+        campaign_id: Campaign to total
+        repeat: Number of timed runs (the best is reported)
+
+    Returns:
+        Dictionary with the total, best time and peak memory
+    """
+    timings = []
+    peak = 0
+    for _ in range(repeat):
+        with Session(engine) as db:
+            tracemalloc.start()
+            start = time.perf_counter()
+            total = strategy(db, campaign_id)
+            timings.append(time.perf_counter() - start)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    return {"total": total, "best_ms": min(timings) * 1000, "peak_kb": peak / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--database-url", default="sqlite:///./bench_totals.db")
+    parser.add_argument("--donations", type=int, default=1_000_000, help="Donations to seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per strategy")
+    parser.add_argument("--reseed", action="store_true", help="Seed a fresh campaign")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+
+    with Session(engine) as db:
+        campaign_id = None if args.reseed else find_campaign(db, args.donations)
+        if campaign_id is None:
+            start = time.perf_counter()
+            campaign_id = seed_campaign(db, args.donations)
+            print(f"Seeded {args.donations} donations in {time.perf_counter() - start:.1f}s")
+
+    expected = sum((donation_amount(i) for i in range(args.donations)), Decimal("0"))
+
+    strategies = {
+        "python": python_total,
+        "sql_sum": sql_total,
+        "aggregate": aggregate_total,
+    }
+
+    print(f"\n{args.donations} donations, best of {args.repeat}")
+    print(f"{'strategy':<10} {'best ms':>10} {'peak KiB':>10} {'exact':>6}  total")
+    for name, strategy in strategies.items():
+        result = measure(engine, strategy, campaign_id, args.repeat)
+        exact = isinstance(result["total"], Decimal) and result["total"] == expected
+        print(
+            f"{name:<10} {result['best_ms']:>10.2f} {result['peak_kb']:>10.0f} "
+            f"{'yes' if exact else 'NO':>6}  {result['total']}"
+        )
+
+    print(f"{'expected':<10} {'':>10} {'':>10} {'':>6}  {expected}")
+
+
+if __name__ == "__main__":
+    main()
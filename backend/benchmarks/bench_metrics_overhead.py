@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Overhead benchmark for the Prometheus metrics (utils/metrics.py).
+
+Reports three numbers:
+- The cost of one counter increment and one histogram observation
+- Per-request latency of GET / (no database work) in process (httpx
+  ASGI transport, no server needed), with MetricsMiddleware installed
+  and with it removed, so the difference is the middleware's cost
+- How long a /metrics scrape takes to render with many routes recorded
+
+    DATABASE_URL=sqlite:///./bench_metrics.db python benchmarks/bench_metrics_overhead.py
+    python benchmarks/bench_metrics_overhead.py --requests 20000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import timeit
+from pathlib import Path
+
+import httpx
+
+# Allow running from the backend directory or from benchmarks/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import async_engine
+from main import app
+from utils import metrics
+from utils.metrics import Registry
+
+
+def micro(number: int) -> dict:
+    """Nanoseconds per counter increment and histogram observation."""
+    registry = Registry()
+    counter = registry.counter("bench_total", "Bench", ("method", "route", "status"))
+    histogram = registry.histogram("bench_seconds", "Bench", ("method", "route"))
+    return {
+        "counter.inc": timeit.timeit(lambda: counter.inc("GET", "/campaigns/{campaign_id}", "200"),
+                                     number=number) / number * 1e9,
+        "histogram.observe": timeit.timeit(lambda: histogram.observe(0.012, "GET", "/campaigns/{campaign_id}"),
+                                           number=number) / number * 1e9,
+    }
+
+
+async def request_latency(total: int) -> dict:
+    """Median and mean microseconds per GET / request through the whole app."""
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(200):  # Warm up
+            await client.get("/")
+        for _ in range(total):
+            start = time.perf_counter()
+            await client.get("/")
+            latencies.append(time.perf_counter() - start)
+    return {"p50_us": statistics.median(latencies) * 1e6, "mean_us": statistics.fmean(latencies) * 1e6}
+
+
+# Installed by main.py (outermost, so first in the list)
+METRICS_MIDDLEWARE = next(m for m in app.user_middleware if m.cls is metrics.MetricsMiddleware)
+
+
+def set_metrics_middleware(enabled: bool):
+    """Add or remove MetricsMiddleware and make Starlette rebuild the stack."""
+    app.user_middleware = [m for m in app.user_middleware if m is not METRICS_MIDDLEWARE]
+    if enabled:
+        app.user_middleware.insert(0, METRICS_MIDDLEWARE)
+    app.middleware_stack = None
+
+
+def render_time(routes: int) -> float:
+    """Milliseconds to render a registry with `routes` routes x 3 status codes recorded."""
+    registry = Registry()
+    counter = registry.counter("bench_total", "Bench", ("method", "route", "status"))
+    histogram = registry.histogram("bench_seconds", "Bench", ("method", "route"))
+    for route in range(routes):
+        for status in ("200", "404", "500"):
+            counter.inc("GET", f"/route/{route}", status)
+        histogram.observe(0.01, "GET", f"/route/{route}")
+    return timeit.timeit(registry.render, number=20) / 20 * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per run")
+    args = parser.parse_args()
+
+    print(f"{'operation':<20} {'ns/op':>9}")
+    for name, ns in micro(1_000_000).items():
+        print(f"{name:<20} {ns:>9.0f}")
+
+    print(f"\n{args.requests} x GET /")
+    print(f"{'middleware':<20} {'p50 us':>9} {'mean us':>9}")
+    results = {}
+    for label, enabled in (("without", False), ("with", True), ("without", False), ("with", True)):
+        set_metrics_middleware(enabled)
+        result = await request_latency(args.requests)
+        results.setdefault(label, []).append(result["p50_us"])
+        print(f"{label:<20} {result['p50_us']:>9.1f} {result['mean_us']:>9.1f}")
+    overhead = min(results["with"]) - min(results["without"])
+    print(f"Overhead per request (best p50): {overhead:.1f} us")
+
+    print(f"\n{'routes':<20} {'render ms':>9}")
+    for routes in (50, 500):
+        print(f"{routes:<20} {render_time(routes):>9.2f}")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Latency of the in-process search index against the database's.
+
+Seeds the same campaigns as bench_campaign_search.py, builds the index
+file that SEARCH_ENGINE=memory workers map (utils/search_index.py), and
+runs each search both ways: ranked in memory and the page loaded by id,
+and through the full-text index query (utils/campaign_search.py). For
+each it reports p50/p95 latency. The build time, file size and the time
+a starting worker takes to map the file are printed first.
+
+Memory searches score on the worker's event loop, so the benchmark also
+reports how late a concurrent task (standing in for the worker's other
+requests: streams, health checks, logins) wakes up while each search
+runs back to back. With scoring handed back to the loop every
+SCORE_SLICE postings this stays at a few milliseconds, not the length
+of the search.
+
+    python benchmarks/bench_search_index.py
+    python benchmarks/bench_search_index.py --campaigns 100000 --repeat 50
+
+Pass --rebuild to time a fresh build when the index file already exists.
+Right after seeding, the worker start includes re-indexing the campaigns
+seeded in the last few seconds (the catch-up overlap).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+# Allow running from the backend directory or from benchmarks/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_campaign_search import PAGE_SIZE, SEARCHES, percentile, run_search, search_query_for, seed
+from database import Base, get_async_database_url
+from models import CampaignStatus
+from utils.campaign_search import encode_search_cursor
+from utils.fast_json import campaign_serializer
+from utils.search_index import CampaignIndex, load_hits
+
+
+async def memory_search(index: CampaignIndex, session_factory, q: str, options: dict, cursor=None):
+    """Rank in memory and load the page, like the route does."""
+    campaign_type = options.get("campaign_type")
+    hits, next_cursor = await index.search(q, campaign_type, CampaignStatus.ACTIVE, PAGE_SIZE, cursor)
+    async with session_factory() as db:
+        await load_hits(db, campaign_serializer, hits, campaign_type, CampaignStatus.ACTIVE)
+    return hits, next_cursor
+
+
+async def time_memory(index: CampaignIndex, session_factory, q: str, options: dict, repeat: int) -> list:
+    cursor = None
+    if options.get("page") == 2:
+        _, cursor = await memory_search(index, session_factory, q, options)
+    await memory_search(index, session_factory, q, options, cursor)  # Warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await memory_search(index, session_factory, q, options, cursor)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def time_sql(db: Session, q: str, options: dict, repeat: int) -> list:
+    query, score = search_query_for(db, q, options)
+    cursor = None
+    if options.get("page") == 2:
+        last = run_search(db, query, score)[PAGE_SIZE - 1]
+        cursor = encode_search_cursor(last.score, last.id)
+    run_search(db, query, score, cursor)  # Warm the page cache
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_search(db, query, score, cursor)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def time_loop_delay(index: CampaignIndex, session_factory, q: str, options: dict, repeat: int) -> list:
+    """How late a 1ms timer fires on the loop while the search runs repeat times."""
+    delays = []
+    done = False
+
+    async def ticker():
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            delays.append((time.perf_counter() - start - 0.001) * 1000)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    for _ in range(repeat):
+        await memory_search(index, session_factory, q, options)
+    done = True
+    await task
+    return delays
+
+
+async def run_memory(args) -> tuple:
+    """Build (if needed) and map the index, then time every search."""
+    async_engine = create_async_engine(get_async_database_url(args.database_url))
+    session_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    if args.rebuild and os.path.exists(args.index_path):
+        os.unlink(args.index_path)
+
+    index = CampaignIndex(args.index_path, session_factory)
+    start = time.perf_counter()
+    built = await index.open()
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(args.index_path) / 1024 / 1024
+    print(f"Index {'built and mapped' if built else 'mapped'} in {elapsed:.2f}s ({size_mb:.1f} MB)")
+
+    index.close()
+    start = time.perf_counter()
+    await index.open()
+    print(f"Worker start (map + catch up): {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    timings = {}
+    delays = {}
+    for name, q, options in SEARCHES:
+        timings[name] = await time_memory(index, session_factory, q, options, args.repeat)
+        delays[name] = await time_loop_delay(index, session_factory, q, options, args.repeat)
+    index.close()
+    await async_engine.dispose()
+    return timings, delays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--database-url", default="sqlite:///./bench_search.db")
+    parser.add_argument("--index-path", default="bench_search.idx")
+    parser.add_argument("--campaigns", type=int, default=1_000_000, help="Campaigns to seed")
+    parser.add_argument("--repeat", type=int, default=100, help="Timed runs per search")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index file even if it exists")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        start = time.perf_counter()
+        added = seed(db, args.campaigns)
+        if added:
+            print(f"Seeded {added} campaigns in {time.perf_counter() - start:.1f}s")
+    if added and os.path.exists(args.index_path):
+        os.unlink(args.index_path)  # Stale: build it again
+
+    memory, delays = asyncio.run(run_memory(args))
+
+    print(f"\n{args.campaigns} campaigns on {engine.dialect.name}, {args.repeat} runs per search")
+    print(f"{'search':<13} {'q':<32} {'memory p50':>10} {'p95':>8} {'sql p50':>10} {'p95':>8}")
+    with Session(engine) as db:
+        for name, q, options in SEARCHES:
+            sql = time_sql(db, q, options, args.repeat)
+            print(
+                f"{name:<13} {q:<32} {percentile(memory[name], 0.5):>10.2f} {percentile(memory[name], 0.95):>8.2f} "
+                f"{percentile(sql, 0.5):>10.2f} {percentile(sql, 0.95):>8.2f}"
+            )
+
+    print("\nDelay to other tasks on the worker's loop while memory searches run (ms)")
+    print(f"{'search':<13} {'p50':>8} {'p95':>8} {'max':>8}")
+    for name, _, _ in SEARCHES:
+        print(f"{name:<13} {percentile(delays[name], 0.5):>8.2f} {percentile(delays[name], 0.95):>8.2f} "
+              f"{max(delays[name], default=0):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
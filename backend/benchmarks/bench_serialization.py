@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Per-item serialization cost of list responses (utils/fast_json.py).
+
+Encodes a page of donations and a page of campaigns three ways and
+reports microseconds per item:
+- pydantic: what response_model does (model_validate with
+  from_attributes, jsonable_encoder, stdlib json)
+- fast (objects): RowSerializer.objs() on ORM objects, then dumps()
+- fast (rows): RowSerializer.rows() on row tuples, then dumps()
+
+The fast paths are measured with orjson and with the stdlib fallback.
+The objects and rows are built in memory, so the database is never
+connected to (DATABASE_URL is only needed to import the models).
+
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/bench_serialization.py
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/bench_serialization.py --items 100 --repeat 200
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Allow running from the backend directory or from benchmarks/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+
+from models import Campaign, CampaignStatus, CampaignType, Donation, PaymentStatus
+from schemas import CampaignListResponse, DonationListResponse
+from utils import fast_json
+from utils.fast_json import campaign_serializer, donation_serializer, dumps
+
+
+def make_donations(count: int) -> list:
+    now = datetime(2026, 10, 18, 12, 0, 0)
+    return [
+        Donation(
+            id=i, amount=Decimal("25.00") + i, currency="GBP", campaign_id=7, giver_id=i % 50,
+            payment_status=PaymentStatus.COMPLETED, is_anonymous=i % 5 == 0,
+            message="Good luck with the appeal!" if i % 3 else None,
+            created_at=now - timedelta(minutes=i)
+        )
+        for i in range(count)
+    ]
+
+
+def make_campaigns(count: int) -> list:
+    now = datetime(2026, 10, 18, 12, 0, 0)
+    return [
+        Campaign(
+            id=i, title=f"Campaign {i}", description="A description of the campaign. " * 20,
+            campaign_type=CampaignType.FUNDRAISING, goal_amount=Decimal("5000.00"),
+            current_amount=Decimal("1234.56"), currency="GBP", status=CampaignStatus.ACTIVE,
+            start_date=None, end_date=None, image_url=None, creator_id=1,
+            created_at=now - timedelta(hours=i), updated_at=now
+        )
+        for i in range(count)
+    ]
+
+
+def page(key: str, items: list) -> dict:
+    """List response content around a page of items."""
+    content = {key: items, "total": len(items), "page": 1, "page_size": len(items), "next_cursor": None}
+    if key == "donations":
+        content["total_amount"] = Decimal("1234.56")
+    return content
+
+
+def pydantic_body(schema, key, objs):
+    content = schema.model_validate(page(key, objs), from_attributes=True)
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_body(key, items):
+    return dumps(page(key, items))
+
+
+def per_item_us(call, items: int, repeat: int) -> float:
+    return min(timeit.repeat(call, number=repeat, repeat=3)) / repeat / items * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--items", type=int, default=100, help="Items per page")
+    parser.add_argument("--repeat", type=int, default=200, help="Pages encoded per timing")
+    args = parser.parse_args()
+
+    orjson = fast_json.orjson
+    print(f"{args.items} items per page; orjson {'installed' if orjson else 'not installed'}")
+    print(f"{'payload':<11} {'path':<22} {'us/item':>9}")
+
+    for name, schema, key, serializer, objs in (
+        ("donations", DonationListResponse, "donations", donation_serializer, make_donations(args.items)),
+        ("campaigns", CampaignListResponse, "campaigns", campaign_serializer, make_campaigns(args.items)),
+    ):
+        rows = [tuple(getattr(obj, field) for field in serializer.fields) for obj in objs]
+        assert json.loads(pydantic_body(schema, key, objs)) == json.loads(fast_body(key, serializer.rows(rows)))
+
+        results = [("pydantic", per_item_us(lambda: pydantic_body(schema, key, objs), args.items, args.repeat))]
+        for encoder in ("orjson", "json"):
+            if encoder == "orjson" and orjson is None:
+                continue
+            fast_json.orjson = orjson if encoder == "orjson" else None
+            results.append((f"fast objects ({encoder})", per_item_us(
+                lambda: fast_body(key, serializer.objs(objs)), args.items, args.repeat)))
+            results.append((f"fast rows ({encoder})", per_item_us(
+                lambda: fast_body(key, serializer.rows(rows)), args.items, args.repeat)))
+        fast_json.orjson = orjson
+
+        for path, us in results:
+            print(f"{name:<11} {path:<22} {us:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Load test for the live campaign totals stream (server-sent events).
+
+Starts one API worker (uvicorn, in a subprocess) on a free port, opens
+many concurrent GET /campaigns/{id}/stream connections (10,000 by
+default) to it as raw sockets, then completes donations to the campaign
+through the API. For each donation it measures how long after the
+status update returned every stream received the new totals, and
+reports delivery latency percentiles, how many database reads fed them
+and the worker's /health/streams statistics.
+
+Each open stream needs a file descriptor in both processes, so the soft
+RLIMIT_NOFILE is raised to the hard limit; raise the hard limit
+(ulimit -Hn) if connections fail to open.
+
+    ENVIRONMENT=test python benchmarks/bench_sse_fanout.py  # No SQL echo
+    python benchmarks/bench_sse_fanout.py --subscribers 2000 --donations 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+CONNECT_BATCH = 500
+
+
+def free_port() -> int:
+    """Pick a free local port for the worker."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def raise_fd_limit(needed: int):
+    """Raise the soft open-file limit (inherited by the worker) to the hard limit."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    if hard != resource.RLIM_INFINITY and hard < needed:
+        print(f"⚠️  Open file limit is {hard}, {needed} needed; some streams will fail to connect")
+
+
+async def setup_campaign(client: httpx.AsyncClient) -> int:
+    """Register a throwaway user and create an active campaign for it."""
+    suffix = uuid.uuid4().hex[:12]
+    user = {
+        "email": f"ssebench{suffix}@example.com",
+        "username": f"ssebench{suffix}",
+        "password": "BenchPass123!",
+    }
+    (await client.post("/auth/register", json=user)).raise_for_status()
+    response = await client.post(
+        "/auth/login",
+        data={"username": user["username"], "password": user["password"]}
+    )
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+    response = await client.post("/campaigns/", json={
+        "title": "Stream benchmark campaign",
+        "description": "Campaign watched by the SSE fan-out benchmark",
+        "campaign_type": "fundraising",
+    })
+    response.raise_for_status()
+    campaign_id = response.json()["id"]
+    (await client.put(f"/campaigns/{campaign_id}", json={"status": "active"})).raise_for_status()
+    return campaign_id
+
+
+async def wait_for_worker(client: httpx.AsyncClient, worker: subprocess.Popen):
+    """Wait until the worker answers /health."""
+    while True:
+        if worker.poll() is not None:
+            raise RuntimeError("API worker exited during startup")
+        try:
+            (await client.get("/health")).raise_for_status()
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+
+
+class Subscriber:
+    """One raw-socket SSE connection, recording when each donation count arrives."""
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.arrivals = {}  # donation_count -> perf_counter when received
+        self.changed = asyncio.Event()
+
+    async def connect(self, port: int, campaign_id: int):
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+        self.writer.write(
+            f"GET /campaigns/{campaign_id}/stream HTTP/1.1\r\n"
+            f"Host: localhost\r\nAccept: text/event-stream\r\n\r\n".encode()
+        )
+        await self.writer.drain()
+
+        # Skip the response headers
+        await self.reader.readuntil(b"\r\n\r\n")
+
+    async def listen(self):
+        # Chunked transfer framing lines are skipped along with the
+        # retry hint and keep-alives; only data lines matter here
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    return
+                if line.startswith(b"data: "):
+                    count = json.loads(line[6:])["donation_count"]
+                    self.arrivals.setdefault(count, time.perf_counter())
+                    self.changed.set()
+        except (ConnectionError, asyncio.CancelledError):
+            return
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--subscribers", type=int, default=10_000, help="Concurrent streams")
+    parser.add_argument("--donations", type=int, default=10, help="Donations to complete")
+    args = parser.parse_args()
+
+    raise_fd_limit(args.subscribers + 256)
+
+    port = free_port()
+    worker = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning", "--backlog", "4096",
+        ],
+        cwd=BACKEND_DIR,
+        env=os.environ.copy()
+    )
+
+    subscribers = []
+    listeners = []
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            await wait_for_worker(client, worker)
+            campaign_id = await setup_campaign(client)
+
+            # Open the streams in batches so the accept backlog doesn't overflow
+            started = time.perf_counter()
+            for start in range(0, args.subscribers, CONNECT_BATCH):
+                batch = [Subscriber() for _ in range(min(CONNECT_BATCH, args.subscribers - start))]
+                results = await asyncio.gather(
+                    *(subscriber.connect(port, campaign_id) for subscriber in batch),
+                    return_exceptions=True
+                )
+                for subscriber, result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        subscriber.close()
+                    else:
+                        subscribers.append(subscriber)
+                        listeners.append(asyncio.create_task(subscriber.listen()))
+            connect_seconds = time.perf_counter() - started
+            print(
+                f"{len(subscribers)}/{args.subscribers} streams open on campaign {campaign_id} "
+                f"in {connect_seconds:.1f}s"
+            )
+
+            refreshes_before = (await client.get("/health/streams")).json()["streams"]["refreshes"]
+            latencies = []
+            missed = 0
+            for count in range(1, args.donations + 1):
+                response = await client.post("/donations/", json={"campaign_id": campaign_id, "amount": "5.00"})
+                response.raise_for_status()
+                donation_id = response.json()["id"]
+
+                response = await client.patch(
+                    f"/donations/{donation_id}/status", params={"payment_status": "completed"}
+                )
+                response.raise_for_status()
+                committed = time.perf_counter()
+
+                # Wait until every stream has the new count (or give up)
+                deadline = committed + 30
+                for subscriber in subscribers:
+                    while count not in subscriber.arrivals and time.perf_counter() < deadline:
+                        subscriber.changed.clear()
+                        try:
+                            await asyncio.wait_for(subscriber.changed.wait(), deadline - time.perf_counter())
+                        except asyncio.TimeoutError:
+                            break
+                    if count in subscriber.arrivals:
+                        latencies.append(max(subscriber.arrivals[count] - committed, 0))
+                    else:
+                        missed += 1
+
+            latencies.sort()
+            print(f"{args.donations} donations, {len(latencies)} events delivered, {missed} missed")
+            if latencies:
+                print(f"{'delivery':<10} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+                print(
+                    f"{'':<10} {statistics.median(latencies) * 1000:>9.2f} "
+                    f"{latencies[int(len(latencies) * 0.99) - 1] * 1000:>9.2f} "
+                    f"{latencies[-1] * 1000:>9.2f}"
+                )
+            streams = (await client.get("/health/streams")).json()["streams"]
+            print(f"Totals reads: {streams['refreshes'] - refreshes_before} for {args.donations} donations")
+            print(f"Worker: {streams}")
+    finally:
+        for listener in listeners:
+            listener.cancel()
+        for subscriber in subscribers:
+            subscriber.close()
+        worker.terminate()
+        worker.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
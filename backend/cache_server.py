@@ -0,0 +1,42 @@
+"""
+Local Cache Server
+==================
+
+Runs a small in-memory Redis-protocol server so several API workers on
+one machine can share the principal and response caches without Redis.
+
+Usage:
+    python cache_server.py                  # Listen on 127.0.0.1:6380
+    python cache_server.py --port 6390
+
+Then start the API with CACHE_URL=redis://localhost:6380/0. Use real Redis
+in production (same CACHE_URL format).
+"""
+
+import argparse
+import asyncio
+
+from utils.resp_server import RespServer
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run a local Redis-protocol cache server")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=6380, help="Port to listen on")
+    args = parser.parse_args()
+
+    server = RespServer()
+    port = await server.start(args.host, args.port)
+    print(f"✅ Cache server listening on {args.host}:{port} (CACHE_URL=redis://{args.host}:{port}/0)")
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Cache server stopped")
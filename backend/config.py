@@ -0,0 +1,453 @@
+"""
+Application settings loaded from environment variables.
+
+Settings are built with pydantic-settings, so every field can be set
+from the environment (or the .env file loaded by database.py).
+Defaults depend on the ENVIRONMENT variable (development, test or
+production) and any explicit value overrides them.
+"""
+
+import enum
+import os
+from functools import lru_cache
+from typing import Optional
+
+from dotenv import load_dotenv
+from pydantic import Field, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+class Environment(str, enum.Enum):
+    """Deployment environment the API is running in."""
+    DEVELOPMENT = "development"
+    TEST = "test"
+    PRODUCTION = "production"
+
+
+class PrePingStrategy(str, enum.Enum):
+    """How pooled connections are checked before being handed out."""
+    ALWAYS = "always"  # Ping on every checkout (SQLAlchemy pool_pre_ping)
+    IDLE = "idle"      # Ping only connections idle longer than pre_ping_idle_seconds
+    NEVER = "never"    # Never ping, rely on pool_recycle
+
+
+class IsolationLevel(str, enum.Enum):
+    """Transaction isolation levels supported by MySQL and SQLite."""
+    READ_UNCOMMITTED = "READ UNCOMMITTED"
+    READ_COMMITTED = "READ COMMITTED"
+    REPEATABLE_READ = "REPEATABLE READ"
+    SERIALIZABLE = "SERIALIZABLE"
+    AUTOCOMMIT = "AUTOCOMMIT"
+
+
+# Per-environment defaults for settings left unset
+DATABASE_DEFAULTS = {
+    Environment.DEVELOPMENT: {
+        "echo": True,
+        "pre_ping": PrePingStrategy.ALWAYS,
+        "pool_size": 5,
+        "max_overflow": 10,
+        "raise_on_lazy_load": False,
+    },
+    Environment.TEST: {
+        "echo": False,
+        "pre_ping": PrePingStrategy.NEVER,
+        "pool_size": 5,
+        "max_overflow": 10,
+        "raise_on_lazy_load": True,
+    },
+    Environment.PRODUCTION: {
+        "echo": False,
+        "pre_ping": PrePingStrategy.IDLE,
+        "pool_size": 10,
+        "max_overflow": 20,
+        "raise_on_lazy_load": False,
+    },
+}
+
+
+class DatabaseSettings(BaseSettings):
+    """
+    Connection pool and engine settings.
+
+    Read from DB_* environment variables, e.g. DB_POOL_SIZE=20 or
+    DB_PRE_PING=idle. The environment itself comes from ENVIRONMENT.
+    """
+    environment: Environment = Field(
+        default=Environment.DEVELOPMENT,
+        validation_alias="ENVIRONMENT",
+        description="Deployment environment used to pick defaults"
+    )
+    pool_size: Optional[int] = Field(None, ge=1, description="Connections kept open in the pool")
+    max_overflow: Optional[int] = Field(None, ge=0, description="Extra connections allowed under load")
+    pool_timeout: float = Field(30.0, gt=0, description="Seconds to wait for a free connection")
+    pool_recycle: int = Field(
+        1800,
+        ge=-1,
+        description="Seconds before a connection is replaced (-1 disables)"
+    )
+    pre_ping: Optional[PrePingStrategy] = Field(None, description="Connection liveness check strategy")
+    pre_ping_idle_seconds: float = Field(
+        300.0,
+        ge=0,
+        description="Idle time after which the 'idle' strategy pings a connection"
+    )
+    echo: Optional[bool] = Field(None, description="Log every SQL statement")
+    isolation_level: Optional[IsolationLevel] = Field(None, description="Transaction isolation level")
+    raise_on_lazy_load: Optional[bool] = Field(
+        None,
+        description="Fail API queries that lazy load a relationship instead of eager loading it"
+    )
+
+    model_config = SettingsConfigDict(env_prefix="DB_", extra="ignore")
+
+    @model_validator(mode="after")
+    def apply_environment_defaults(self):
+        """Fill any unset values from the defaults for the environment."""
+        for field, value in DATABASE_DEFAULTS[self.environment].items():
+            if getattr(self, field) is None:
+                setattr(self, field, value)
+        return self
+
+
+@lru_cache
+def get_database_settings() -> DatabaseSettings:
+    """
+    Get the database settings (loaded once per process).
+
+    Returns:
+        DatabaseSettings instance
+    """
+    return DatabaseSettings()
+
+
+class CounterSettings(BaseSettings):
+    """
+    Settings for sharded donation counters.
+
+    Read from COUNTER_* environment variables, e.g. COUNTER_FOLD_INTERVAL=10.
+    """
+    fold_interval: float = Field(
+        5.0,
+        ge=0,
+        description="Seconds between folding counter shards into campaign totals (0 disables)"
+    )
+
+    model_config = SettingsConfigDict(env_prefix="COUNTER_", extra="ignore")
+
+
+@lru_cache
+def get_counter_settings() -> CounterSettings:
+    """
+    Get the counter settings (loaded once per process).
+
+    Returns:
+        CounterSettings instance
+    """
+    return CounterSettings()
+
+
+class StreamSettings(BaseSettings):
+    """
+    Settings for the live campaign totals stream (server-sent events).
+
+    Read from STREAM_* environment variables, e.g. STREAM_POLL_INTERVAL=5.
+    """
+    poll_interval: float = Field(
+        2.0,
+        ge=0,
+        description="Seconds between checks for changes made by other workers (0 disables)"
+    )
+    heartbeat_interval: float = Field(
+        15.0,
+        gt=0,
+        description="Seconds between keep-alive comments on idle streams"
+    )
+
+    model_config = SettingsConfigDict(env_prefix="STREAM_", extra="ignore")
+
+
+@lru_cache
+def get_stream_settings() -> StreamSettings:
+    """
+    Get the live stream settings (loaded once per process).
+
+    Returns:
+        StreamSettings instance
+    """
+    return StreamSettings()
+
+
+class IntakeSettings(BaseSettings):
+    """
+    Settings for buffered donation intake (write-behind queue).
+
+    Read from INTAKE_* environment variables, e.g. INTAKE_ENABLED=true.
+    """
+    enabled: bool = Field(False, description="Accept donations into the local queue (POST /donations/queued)")
+    queue_path: str = Field(
+        "donation_queue.db",
+        description="SQLite file holding queued donations (share it between workers on one host)"
+    )
+    batch_size: int = Field(500, ge=1, le=2000, description="Most donations written per INSERT")
+    flush_interval: float = Field(0.2, gt=0, description="Seconds between flushes when the queue is idle")
+    max_pending: int = Field(
+        100_000,
+        ge=1,
+        description="Queued donations allowed before new ones get a 503"
+    )
+    retention: float = Field(
+        86_400,
+        ge=0,
+        description="Seconds flushed entries are kept for status lookups"
+    )
+
+    model_config = SettingsConfigDict(env_prefix="INTAKE_", extra="ignore")
+
+
+@lru_cache
+def get_intake_settings() -> IntakeSettings:
+    """
+    Get the buffered intake settings (loaded once per process).
+
+    Returns:
+        IntakeSettings instance
+    """
+    return IntakeSettings()
+
+
+class LifecycleSettings(BaseSettings):
+    """
+    Settings for the campaign lifecycle scheduler (start_date/end_date).
+
+    Read from LIFECYCLE_* environment variables, e.g. LIFECYCLE_POLL_INTERVAL=60.
+    """
+    poll_interval: float = Field(
+        30.0,
+        ge=0,
+        description="Seconds between loading upcoming start and end dates (0 disables the scheduler)"
+    )
+    batch_size: int = Field(500, gt=0, description="Campaigns moved per UPDATE")
+
+    model_config = SettingsConfigDict(env_prefix="LIFECYCLE_", extra="ignore")
+
+
+@lru_cache
+def get_lifecycle_settings() -> LifecycleSettings:
+    """
+    Get the campaign lifecycle settings (loaded once per process).
+
+    Returns:
+        LifecycleSettings instance
+    """
+    return LifecycleSettings()
+
+
+class SearchEngine(str, enum.Enum):
+    """Engine answering GET /campaigns/search."""
+    SQL = "sql"          # MySQL FULLTEXT / SQLite FTS5 (utils/campaign_search.py)
+    MEMORY = "memory"    # In-process inverted index (utils/search_index.py)
+
+
+class SearchSettings(BaseSettings):
+    """
+    Settings for campaign search.
+
+    Read from SEARCH_* environment variables, e.g. SEARCH_ENGINE=memory.
+    """
+    engine: SearchEngine = Field(SearchEngine.SQL, description="Engine answering campaign searches")
+    index_path: str = Field(
+        "campaign_search.idx",
+        description="Index file for the memory engine (share it between workers on one host)"
+    )
+    refresh_interval: float = Field(
+        5.0,
+        ge=0,
+        description="Seconds between picking up campaign changes and index rebuilds (0 disables)"
+    )
+
+    model_config = SettingsConfigDict(env_prefix="SEARCH_", extra="ignore")
+
+
+@lru_cache
+def get_search_settings() -> SearchSettings:
+    """
+    Get the campaign search settings (loaded once per process).
+
+    Returns:
+        SearchSettings instance
+    """
+    return SearchSettings()
+
+
+class QuerySettings(BaseSettings):
+    """
+    Settings for per-request SQL statement counting and slow-query logging.
+
+    Read from QUERY_* environment variables, e.g. QUERY_SLOW_THRESHOLD_MS=50.
+    """
+    stats_enabled: bool = Field(
+        True,
+        description="Count statements per request and send them in a Server-Timing header"
+    )
+    log_requests: bool = Field(True, description="Log each request's statement count and database time")
+    slow_threshold_ms: float = Field(
+        200.0,
+        ge=0,
+        description="Log statements taking at least this many milliseconds (0 disables)"
+    )
+
+    model_config = SettingsConfigDict(env_prefix="QUERY_", extra="ignore")
+
+
+@lru_cache
+def get_query_settings() -> QuerySettings:
+    """
+    Get the query instrumentation settings (loaded once per process).
+
+    Returns:
+        QuerySettings instance
+    """
+    return QuerySettings()
+
+
+class AuthCacheSettings(BaseSettings):
+    """
+    Settings for the authenticated principal cache.
+
+    Read from AUTH_CACHE_* environment variables, e.g. AUTH_CACHE_TTL=60.
+    """
+    ttl: float = Field(
+        30.0,
+        ge=0,
+        description="Seconds a cached user is trusted without a database lookup (0 disables)"
+    )
+    max_size: int = Field(10000, ge=1, description="Most users cached per process")
+
+    model_config = SettingsConfigDict(env_prefix="AUTH_CACHE_", extra="ignore")
+
+
+@lru_cache
+def get_auth_cache_settings() -> AuthCacheSettings:
+    """
+    Get the principal cache settings (loaded once per process).
+
+    Returns:
+        AuthCacheSettings instance
+    """
+    return AuthCacheSettings()
+
+
+class ResponseCacheSettings(BaseSettings):
+    """
+    Settings for the public response cache (ETag/304 and rendered bodies).
+
+    Read from RESPONSE_CACHE_* environment variables, e.g. RESPONSE_CACHE_TTL=10.
+    """
+    ttl: float = Field(
+        5.0,
+        ge=0,
+        description="Seconds a rendered response is served from memory (0 disables)"
+    )
+    max_size: int = Field(1000, ge=1, description="Most responses cached per process")
+
+    model_config = SettingsConfigDict(env_prefix="RESPONSE_CACHE_", extra="ignore")
+
+
+@lru_cache
+def get_response_cache_settings() -> ResponseCacheSettings:
+    """
+    Get the response cache settings (loaded once per process).
+
+    Returns:
+        ResponseCacheSettings instance
+    """
+    return ResponseCacheSettings()
+
+
+class CacheSettings(BaseSettings):
+    """
+    Settings for the cache backend shared by API workers.
+
+    Read from CACHE_* environment variables, e.g. CACHE_URL=redis://localhost:6379/0.
+    """
+    url: Optional[str] = Field(
+        None,
+        description="memory:// or redis://host:port/db (unset keeps caches in each process)"
+    )
+    timeout: float = Field(0.5, gt=0, description="Seconds to wait for the cache server")
+
+    model_config = SettingsConfigDict(env_prefix="CACHE_", extra="ignore")
+
+
+@lru_cache
+def get_cache_settings() -> CacheSettings:
+    """
+    Get the shared cache settings (loaded once per process).
+
+    Returns:
+        CacheSettings instance
+    """
+    return CacheSettings()
+
+
+# Per-environment bcrypt cost factor for settings left unset
+# (tests use the minimum so registration and login stay fast)
+BCRYPT_ROUNDS_DEFAULTS = {
+    Environment.DEVELOPMENT: 12,
+    Environment.TEST: 4,
+    Environment.PRODUCTION: 12,
+}
+
+
+class PasswordSettings(BaseSettings):
+    """
+    Password hashing settings.
+
+    Read from PASSWORD_* environment variables, e.g. PASSWORD_BCRYPT_ROUNDS=13.
+    Changing the cost only affects new hashes; existing ones are rehashed
+    the next time their user logs in.
+    """
+    environment: Environment = Field(
+        default=Environment.DEVELOPMENT,
+        validation_alias="ENVIRONMENT",
+        description="Deployment environment used to pick defaults"
+    )
+    bcrypt_rounds: Optional[int] = Field(None, ge=4, le=31, description="bcrypt cost factor")
+    pool_size: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Worker processes for password hashing (default: CPU count)"
+    )
+    max_queue: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Password jobs allowed to wait before returning 503 (default: 4 per worker)"
+    )
+
+    model_config = SettingsConfigDict(env_prefix="PASSWORD_", extra="ignore")
+
+    @model_validator(mode="after")
+    def apply_defaults(self):
+        """Fill any unset values from the environment and CPU count."""
+        if self.bcrypt_rounds is None:
+            self.bcrypt_rounds = BCRYPT_ROUNDS_DEFAULTS[self.environment]
+        if self.pool_size is None:
+            self.pool_size = os.cpu_count() or 1
+        if self.max_queue is None:
+            self.max_queue = 4 * self.pool_size
+        return self
+
+
+@lru_cache
+def get_password_settings() -> PasswordSettings:
+    """
+    Get the password hashing settings (loaded once per process).
+
+    Returns:
+        PasswordSettings instance
+    """
+    return PasswordSettings()
@@ -6,12 +6,14 @@ This is the entry point for the backend API. It sets up the FastAPI app,
 includes routers, and configures middleware.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, select, func
 from dotenv import load_dotenv
 import os
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -19,8 +21,25 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 # Import database components
-from database import engine, get_db, Base, SessionLocal
+from database import (
+    engine, async_engine, get_db, get_pool_status, database_settings, Base, AsyncSessionLocal
+)
+from config import (
+    SearchEngine, get_cache_settings, get_counter_settings, get_intake_settings, get_lifecycle_settings,
+    get_search_settings, get_stream_settings
+)
 from models import User
+from utils.cache import create_backend
+from utils.counters import run_fold_loop
+from utils.donation_queue import donation_queue, run_flush_loop
+from utils.live_totals import live_totals
+from utils import metrics
+from utils.password_pool import password_pool
+from utils.principal_cache import set_shared_backend
+from utils.query_stats import QueryStatsMiddleware
+from utils.campaign_lifecycle import campaign_scheduler
+from utils.response_cache import response_cache
+from utils.search_index import campaign_index
 
 # Import routers
 from routers import auth, campaigns, givers, donations, users
@@ -53,17 +72,85 @@ async def lifespan(app: FastAPI):
     """
     # Startup: Check database connectivity
     try:
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         logger.info("✅ Database connection successful")
     except Exception as e:
         logger.error(f"❌ Database connection failed: {e}")
         raise RuntimeError("Cannot connect to database") from e
 
+    # Share cache entries with the other workers if CACHE_URL is set
+    cache_settings = get_cache_settings()
+    cache_backend = create_backend(cache_settings.url, cache_settings.timeout)
+    if cache_backend is not None:
+        set_shared_backend(cache_backend)
+        response_cache.backend = cache_backend
+        logger.info(f"Shared cache backend: {type(cache_backend).__name__}")
+
+    # Start folding hot campaigns' counter shards into their totals
+    fold_interval = get_counter_settings().fold_interval
+    fold_task = None
+    if fold_interval > 0:
+        fold_task = asyncio.create_task(run_fold_loop(AsyncSessionLocal, fold_interval))
+
+    # Pick up other workers' changes to campaigns with live streams open
+    poll_interval = get_stream_settings().poll_interval
+    poll_task = None
+    if poll_interval > 0:
+        poll_task = asyncio.create_task(live_totals.run_poll_loop(poll_interval))
+
+    # Open the buffered donation queue and write out anything left from before
+    intake_settings = get_intake_settings()
+    flush_task = None
+    if intake_settings.enabled:
+        recovered = donation_queue.open()
+        if recovered:
+            logger.info(f"Donation queue: {recovered} queued donation(s) recovered")
+        flush_task = asyncio.create_task(run_flush_loop(
+            donation_queue, AsyncSessionLocal,
+            batch_size=intake_settings.batch_size,
+            interval=intake_settings.flush_interval,
+            retention=intake_settings.retention
+        ))
+
+    # Map the in-process search index, building it if there's no file yet
+    search_settings = get_search_settings()
+    refresh_task = None
+    if search_settings.engine == SearchEngine.MEMORY:
+        if await campaign_index.open():
+            logger.info(f"Search index built: {search_settings.index_path}")
+        if search_settings.refresh_interval > 0:
+            refresh_task = asyncio.create_task(campaign_index.run_refresh_loop(search_settings.refresh_interval))
+
+    # Start and end campaigns at their dates: move any already due, then
+    # wake for the ones coming up
+    lifecycle_interval = get_lifecycle_settings().poll_interval
+    lifecycle_task = None
+    if lifecycle_interval > 0:
+        await campaign_scheduler.poll(lifecycle_interval)
+        lifecycle_task = asyncio.create_task(campaign_scheduler.run(lifecycle_interval))
+
     yield
 
-    # Shutdown: Clean up resources (if needed in the future)
+    # Shutdown: Stop the background loops and password workers, and
+    # release cache and pooled async connections
+    for task in (fold_task, poll_task, flush_task, refresh_task, lifecycle_task):
+        if task is None:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    password_pool.shutdown()
+    donation_queue.close()
+    campaign_index.close()
+    campaign_scheduler.clear()
+    if cache_backend is not None:
+        set_shared_backend(None)
+        response_cache.backend = None
+        await cache_backend.close()
+    await async_engine.dispose()
     logger.info("Application shutting down")
 
 
@@ -79,7 +166,15 @@ app = FastAPI(
 
 # Add rate limiter to app state
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    """Count the rejection, then answer with slowapi's 429."""
+    metrics.rate_limited_requests.inc(metrics.route_label(request.scope))
+    return _rate_limit_exceeded_handler(request, exc)
+
+
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
 # Configure CORS (Cross-Origin Resource Sharing)
 # This allows your React frontend to communicate with the backend
@@ -92,8 +187,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all HTTP methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["Server-Timing"],  # Let the frontend read per-request DB timings
 )
 
+# Count SQL statements per request (Server-Timing header and request log)
+app.add_middleware(QueryStatsMiddleware)
+
+# Request counts and latency by route for GET /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
 
 # Include routers
 app.include_router(auth.router)
@@ -120,7 +222,7 @@ def read_root():
 
 # Health check endpoint
 @app.get("/health")
-def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_db)):
     """
     Health check endpoint.
     
@@ -136,7 +238,7 @@ def health_check(db: Session = Depends(get_db)):
     """
     try:
         # Try to execute a simple query to verify database connection
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         return {
             "status": "healthy",
             "database": "connected"
@@ -149,9 +251,170 @@ def health_check(db: Session = Depends(get_db)):
         }
 
 
+# Connection pool health endpoint
+@app.get("/health/pool")
+async def pool_health_check():
+    """
+    Connection pool health endpoint.
+    
+    Reports how the API's connection pool is being used, so pool
+    size and overflow can be tuned against real traffic:
+    - checked_out: connections currently in use
+    - overflow: connections open beyond pool_size
+    - wait: checkout counts, timeouts and time spent waiting for a connection
+    
+    Also reports the password hashing pool's queue depth and how many
+    requests it has turned away.
+    
+    Returns:
+        Dictionary with pool configuration and live pool statistics
+    """
+    return {
+        "environment": database_settings.environment,
+        "config": {
+            "pool_size": database_settings.pool_size,
+            "max_overflow": database_settings.max_overflow,
+            "pool_timeout": database_settings.pool_timeout,
+            "pool_recycle": database_settings.pool_recycle,
+            "pre_ping": database_settings.pre_ping,
+            "isolation_level": database_settings.isolation_level,
+        },
+        "pool": get_pool_status(async_engine),
+        "password_pool": password_pool.status(),
+    }
+
+
+# Response cache health endpoint
+@app.get("/health/cache")
+async def cache_health_check():
+    """
+    Response cache health endpoint.
+    
+    Reports this process's public response cache statistics:
+    - hits / misses / hit_rate: lookups served from memory vs rendered
+    - not_modified: 304s sent to clients whose ETag was current
+    - invalidations: commits that dropped cached responses
+    
+    Returns:
+        Dictionary of response cache statistics
+    """
+    return {"response_cache": response_cache.status()}
+
+
+# Live stream health endpoint
+@app.get("/health/streams")
+async def streams_health_check():
+    """
+    Live campaign stream health endpoint.
+    
+    Reports this process's open campaign streams:
+    - topics / subscribers: campaigns being watched and open streams
+    - published / delivered: totals events published and pushed to streams
+    - refreshes: totals reads that fed them
+    
+    Returns:
+        Dictionary of stream statistics
+    """
+    return {"streams": live_totals.status()}
+
+
+# Buffered donation intake health endpoint
+@app.get("/health/intake")
+async def intake_health_check():
+    """
+    Buffered donation intake health endpoint.
+    
+    Reports this process's view of the donation queue:
+    - pending: donations queued and not yet written to the database
+    - accepted / refused: donations queued, and turned away with 503 (queue full)
+    - created / rejected: queued donations written, and failed their checks
+    
+    Returns:
+        Dictionary of queue statistics
+    """
+    return {"intake": donation_queue.status()}
+
+
+# Campaign search index health endpoint
+@app.get("/health/search")
+async def search_health_check():
+    """
+    Campaign search index health endpoint.
+    
+    Reports this process's in-process search index (SEARCH_ENGINE=memory):
+    - campaigns / words: campaigns indexed and distinct words
+    - overlay: campaigns re-indexed since the index file was built
+    - watermark: newest campaign updated_at picked up
+    - searches / updates / reloads: searches answered, campaigns
+      re-indexed and index file rebuilds mapped
+    
+    Returns:
+        Dictionary of index statistics
+    """
+    return {"engine": get_search_settings().engine, "index": campaign_index.status()}
+
+
+# Campaign lifecycle scheduler health endpoint
+@app.get("/health/lifecycle")
+async def lifecycle_health_check():
+    """
+    Campaign lifecycle scheduler health endpoint.
+    
+    Reports this process's start_date/end_date scheduler:
+    - timers / next_due: upcoming dates loaded and the earliest
+    - loaded_until: end of the interval loaded by the last poll
+    - wakeups: times a loaded date woke the scheduler between polls
+    - started / completed: campaigns this process moved
+    
+    Returns:
+        Dictionary of scheduler statistics
+    """
+    return {"lifecycle": campaign_scheduler.status()}
+
+
+def collect_pool_metrics():
+    """Copy connection pool and password pool numbers into the metrics registry."""
+    for label, target in (("sync", engine), ("async", async_engine)):
+        pool = get_pool_status(target)
+        if "size" in pool:
+            metrics.db_pool_size.set(pool["size"], label)
+            metrics.db_pool_checked_out.set(pool["checked_out"], label)
+            metrics.db_pool_overflow.set(pool["overflow"], label)
+        if "wait" in pool:
+            metrics.db_pool_checkouts.set(pool["wait"]["checkouts"], label)
+            metrics.db_pool_timeouts.set(pool["wait"]["timeouts"], label)
+            metrics.db_pool_wait.set(pool["wait"]["total_wait_ms"] / 1000, label)
+    
+    passwords = password_pool.status()
+    metrics.password_pool_in_flight.set(passwords["in_flight"])
+    metrics.password_pool_queued.set(passwords["queued"])
+    metrics.password_pool_completed.set(passwords["completed"])
+    metrics.password_pool_rejected.set(passwords["rejected"])
+
+
+metrics.registry.add_collector(collect_pool_metrics)
+
+
+# Prometheus metrics endpoint
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint():
+    """
+    Prometheus metrics endpoint (text exposition format).
+    
+    Reports this process's request counts and latency histograms by
+    route, requests in flight, connection pool and password pool use,
+    rate limiter rejections and donation status changes. See
+    utils/metrics.py for the full list.
+    
+    Returns:
+        Metrics in the Prometheus text format
+    """
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # Example endpoint to test database query
 @app.get("/users/count")
-def count_users(db: Session = Depends(get_db)):
+async def count_users(db: AsyncSession = Depends(get_db)):
     """
     Example endpoint showing database interaction.
     
@@ -163,5 +426,5 @@ def count_users(db: Session = Depends(get_db)):
     Returns:
         Dictionary with count of users
     """
-    count = db.query(User).count()
+    count = await db.scalar(select(func.count()).select_from(User))
     return {"count": count}
\ No newline at end of file
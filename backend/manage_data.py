@@ -0,0 +1,123 @@
+"""
+Bulk Data Script
+================
+
+Exports campaigns or donations to CSV, NDJSON or Parquet, and imports them
+back, a batch at a time (memory use doesn't grow with the table).
+
+Imports are resumable: progress is checkpointed to FILE.checkpoint after
+every committed batch, and running the same command again continues from
+there. Imported donations don't update campaign totals or giver profiles;
+run `python manage_leaderboard.py rebuild` (and fix totals) afterwards if
+they should count.
+
+Parquet needs pyarrow (pip install pyarrow).
+
+Usage:
+    python manage_data.py export donations -o donations.csv
+    python manage_data.py export donations -o 2026.parquet --since 2026-01-01 --status completed
+    python manage_data.py export campaigns -o - --format ndjson      # To stdout
+    python manage_data.py import donations donations.csv
+    python manage_data.py import donations donations.csv --restart  # Ignore the checkpoint
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+# Load environment variables before the database module reads them
+load_dotenv()
+
+from database import engine
+from utils.bulk_data import TABLES, BulkDataError, export_table, format_for, import_table
+
+
+def reporter(verb: str):
+    """Build a progress callback printing rows and rate to stderr."""
+    started = time.perf_counter()
+
+    def report(rows: int):
+        elapsed = time.perf_counter() - started
+        print(f"\r{verb} {rows:,} rows ({rows / max(elapsed, 1e-9):,.0f}/s)", end="", file=sys.stderr, flush=True)
+
+    return report
+
+
+def export(args) -> int:
+    """Export a table to a file."""
+    fmt = format_for(args.output, args.format)
+    with engine.connect() as conn:
+        count = export_table(
+            conn, args.table, args.output, fmt,
+            batch_size=args.batch_size,
+            progress=reporter("Exported"),
+            campaign_id=args.campaign_id,
+            status=args.status,
+            since=args.since,
+            until=args.until,
+        )
+    print(f"\n✅ Exported {count:,} {args.table} to {args.output}", file=sys.stderr)
+    return 0
+
+
+def load(args) -> int:
+    """Import a file into a table, resuming from its checkpoint."""
+    fmt = format_for(args.file, args.format)
+    checkpoint = args.checkpoint or f"{args.file}.checkpoint"
+    if args.restart:
+        try:
+            os.remove(checkpoint)
+        except FileNotFoundError:
+            pass
+
+    count = import_table(
+        engine, args.table, args.file, fmt,
+        batch_size=args.batch_size,
+        checkpoint_path=checkpoint,
+        progress=reporter("Imported"),
+    )
+    print(f"\n✅ Imported {count:,} {args.table} from {args.file}", file=sys.stderr)
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk export and import of campaigns and donations")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Write a table to a file")
+    export_parser.add_argument("table", choices=TABLES)
+    export_parser.add_argument("-o", "--output", required=True, help="Output file, or - for stdout")
+    export_parser.add_argument("--format", help="csv, ndjson or parquet (default: from the extension)")
+    export_parser.add_argument("--campaign-id", type=int, help="Only this campaign (or its donations)")
+    export_parser.add_argument("--status", help="Only this campaign status or payment status")
+    export_parser.add_argument("--since", type=datetime.fromisoformat, help="Created at or after (ISO 8601)")
+    export_parser.add_argument("--until", type=datetime.fromisoformat, help="Created before (ISO 8601)")
+    export_parser.add_argument("--batch-size", type=int, default=10_000, help="Rows fetched at a time")
+
+    import_parser = subparsers.add_parser("import", help="Insert the rows of a file into a table")
+    import_parser.add_argument("table", choices=TABLES)
+    import_parser.add_argument("file")
+    import_parser.add_argument("--format", help="csv, ndjson or parquet (default: from the extension)")
+    import_parser.add_argument("--batch-size", type=int, default=1000, help="Rows per INSERT and commit")
+    import_parser.add_argument("--checkpoint", help="Checkpoint file (default: FILE.checkpoint)")
+    import_parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start over")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "export":
+            return export(args)
+        return load(args)
+    except BulkDataError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Leaderboard Maintenance Script
+==============================
+
+Checks or rebuilds the materialized giving leaderboard (leaderboard_entries).
+
+The table is kept up to date as donations complete, but rows can drift if
+giver_profiles or users are changed outside the API (raw SQL, restores).
+
+Usage:
+    python manage_leaderboard.py check          # Report differences, exit 1 if any
+    python manage_leaderboard.py check --fix    # Rebuild if differences are found
+    python manage_leaderboard.py rebuild        # Rebuild from the live tables
+"""
+
+import argparse
+import asyncio
+import sys
+
+from dotenv import load_dotenv
+
+# Load environment variables before the database module reads them
+load_dotenv()
+
+from database import AsyncSessionLocal, async_engine
+from utils.leaderboard import check_leaderboard, rebuild_leaderboard
+
+
+async def rebuild() -> int:
+    """Rebuild the leaderboard and report its size."""
+    async with AsyncSessionLocal() as db:
+        count = await rebuild_leaderboard(db)
+    print(f"✅ Leaderboard rebuilt with {count} givers")
+    return 0
+
+
+async def check(fix: bool) -> int:
+    """Compare the leaderboard with the live tables, optionally fixing it."""
+    async with AsyncSessionLocal() as db:
+        report = await check_leaderboard(db)
+
+    print(f"Checked {report.checked} givers")
+    if report.consistent:
+        print("✅ Leaderboard is consistent")
+        return 0
+
+    print(f"❌ Missing rows:    {report.missing}")
+    print(f"❌ Extra rows:      {report.extra}")
+    print(f"❌ Mismatched rows: {report.mismatched}")
+
+    if fix:
+        return await rebuild()
+    return 1
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Check or rebuild the giving leaderboard")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="Rebuild from giver_profiles and users")
+    check_parser = subparsers.add_parser("check", help="Compare with giver_profiles and users")
+    check_parser.add_argument("--fix", action="store_true", help="Rebuild if differences are found")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "rebuild":
+            return await rebuild()
+        return await check(args.fix)
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,66 @@
+"""
+Campaign Search Index Script
+============================
+
+Builds the index file used when campaign search runs in process
+(SEARCH_ENGINE=memory, see utils/search_index.py) from the campaigns
+table.
+
+Workers build the file themselves when it is missing, and pick up
+campaign changes as they happen in a small in-memory overlay. Run this
+periodically (e.g. hourly from cron) so the overlays stay small: the
+new file replaces the old one atomically, and running workers remap it
+within SEARCH_REFRESH_INTERVAL seconds.
+
+Usage:
+    python manage_search.py build                        # Write SEARCH_INDEX_PATH
+    python manage_search.py build --path /tmp/search.idx # Somewhere else
+    python manage_search.py build --batch-size 20000     # Campaigns per round trip
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+# Load environment variables before the database module reads them
+load_dotenv()
+
+from config import get_search_settings
+from database import AsyncSessionLocal, async_engine
+from utils.search_index import BUILD_BATCH_SIZE, build_index_file
+
+
+async def build(path: str, batch_size: int) -> int:
+    """Build the index file and report its size."""
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        count = await build_index_file(db, path, batch_size)
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"✅ Indexed {count} campaigns into {path} ({size_mb:.1f} MB) in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the campaign search index file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Index every campaign into a new file")
+    build_parser.add_argument(
+        "--path", default=get_search_settings().index_path, help="Index file to write (default: SEARCH_INDEX_PATH)"
+    )
+    build_parser.add_argument(
+        "--batch-size", type=int, default=BUILD_BATCH_SIZE, help="Campaigns read per round trip"
+    )
+    args = parser.parse_args()
+
+    try:
+        return await build(args.path, args.batch_size)
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
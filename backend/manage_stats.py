@@ -0,0 +1,65 @@
+"""
+Campaign Stats Backfill Script
+==============================
+
+Rebuilds the campaign statistics rollups (campaign_stats_buckets and
+campaign_giver_totals) behind GET /campaigns/{id}/stats from the
+donations table.
+
+The rollups are kept up to date as donations complete through the API.
+Run this once after the migration that adds them, and after writing
+donations some other way (manage_data.py import, raw SQL, restores).
+Campaigns are rebuilt in batches, each in its own transaction, so it
+can be stopped and rerun.
+
+Usage:
+    python manage_stats.py rebuild                     # Every campaign
+    python manage_stats.py rebuild --campaign-id 7     # One campaign (repeatable)
+    python manage_stats.py rebuild --batch-size 500    # Campaigns per transaction
+"""
+
+import argparse
+import asyncio
+import sys
+
+from dotenv import load_dotenv
+
+# Load environment variables before the database module reads them
+load_dotenv()
+
+from database import AsyncSessionLocal, async_engine
+from utils.campaign_stats import REBUILD_BATCH_SIZE, rebuild_campaign_stats
+
+
+async def rebuild(campaign_ids, batch_size: int) -> int:
+    """Rebuild the rollups and report how many campaigns were done."""
+    def progress(done: int):
+        print(f"  {done} campaigns rebuilt", end="\r", flush=True)
+
+    async with AsyncSessionLocal() as db:
+        count = await rebuild_campaign_stats(db, campaign_ids, batch_size, progress)
+    print(f"✅ Stats rebuilt for {count} campaigns")
+    return 0
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild campaign donation statistics")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="Recompute the rollups from donations")
+    rebuild_parser.add_argument(
+        "--campaign-id", type=int, action="append", dest="campaign_ids",
+        help="Only rebuild this campaign (repeatable; default: all)"
+    )
+    rebuild_parser.add_argument(
+        "--batch-size", type=int, default=REBUILD_BATCH_SIZE, help="Campaigns per transaction"
+    )
+    args = parser.parse_args()
+
+    try:
+        return await rebuild(args.campaign_ids, args.batch_size)
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
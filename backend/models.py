@@ -7,7 +7,7 @@ database tables.
 
 from sqlalchemy import (
     Column, Integer, String, DateTime, Boolean, 
-    Text, Numeric, ForeignKey, Enum
+    Text, Numeric, ForeignKey, Enum, Index, DDL, event
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -45,6 +45,12 @@ class PaymentStatus(str, enum.Enum):
     REFUNDED = "refunded"    # Payment refunded
 
 
+class StatsPeriod(str, enum.Enum):
+    """Length of a campaign statistics bucket."""
+    HOUR = "hour"
+    DAY = "day"
+
+
 class User(Base):
     """
     User model representing registered users on the platform.
@@ -140,6 +146,7 @@ class Campaign(Base):
         campaign_type: Type of campaign (fundraising/event/adhoc_giving)
         goal_amount: Target amount to raise (nullable for adhoc)
         current_amount: Current amount raised
+        counter_shards: Number of counter shards for hot campaigns (0 = off)
         currency: Currency code (default GBP)
         status: Campaign status (draft/active/completed/cancelled)
         start_date: When campaign goes live (nullable)
@@ -180,6 +187,13 @@ class Campaign(Base):
         nullable=False,
         comment="Current amount raised"
     )
+    counter_shards = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        comment="Counter shards for hot campaigns (0 = update current_amount directly)"
+    )
     currency = Column(String(3), default="GBP", nullable=False)
     
     # Campaign status and dates
@@ -214,11 +228,52 @@ class Campaign(Base):
     creator = relationship("User", back_populates="campaigns")
     donations = relationship("Donation", back_populates="campaign")
     
+    # Composite indexes for hot queries
+    __table_args__ = (
+        # Campaign listing filtered by status and type, newest first
+        Index("ix_campaigns_status_type_created", "status", "campaign_type", "created_at"),
+        # Default campaign listing (status only), newest first
+        Index("ix_campaigns_status_created", "status", "created_at"),
+        # Upcoming start and end dates by status (lifecycle scheduler)
+        Index("ix_campaigns_status_start", "status", "start_date"),
+        Index("ix_campaigns_status_end", "status", "end_date"),
+        # Campaigns changed since a point in time (search index catch-up)
+        Index("ix_campaigns_updated_at", "updated_at"),
+        # Campaign search (MySQL; SQLite uses the campaigns_fts table below)
+        Index("ix_campaigns_fulltext", "title", "description", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+    
     def __repr__(self):
         """String representation of Campaign object for debugging."""
         return f"<Campaign(id={self.id}, title='{self.title}', type='{self.campaign_type}')>"
 
 
+# Campaign search on SQLite: an FTS5 index over the campaign table's title
+# and description (external content, so the text isn't stored twice),
+# kept in step by triggers. MySQL uses the FULLTEXT index above instead.
+CAMPAIGN_FTS_SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS campaigns_fts USING fts5("
+    "title, description, content='campaigns', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS campaigns_fts_insert AFTER INSERT ON campaigns BEGIN "
+    "INSERT INTO campaigns_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS campaigns_fts_delete AFTER DELETE ON campaigns BEGIN "
+    "INSERT INTO campaigns_fts(campaigns_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS campaigns_fts_update AFTER UPDATE OF title, description ON campaigns BEGIN "
+    "INSERT INTO campaigns_fts(campaigns_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO campaigns_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+)
+
+for statement in CAMPAIGN_FTS_SQLITE_DDL:
+    event.listen(Campaign.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+# The triggers go with the campaigns table, but the FTS table has to be dropped explicitly
+event.listen(
+    Campaign.__table__, "after_drop", DDL("DROP TABLE IF EXISTS campaigns_fts").execute_if(dialect="sqlite")
+)
+
+
 class GiverProfile(Base):
     """
     Giver profile model for tracking donation history and preferences.
@@ -308,10 +363,19 @@ class GiverProfile(Base):
     user = relationship("User", back_populates="giver_profile")
     donations = relationship("Donation", back_populates="giver")
     
+    # Composite indexes for hot queries
+    __table_args__ = (
+        # Leaderboard: public profiles ranked by total donated
+        Index("ix_giver_profiles_public_total", "is_public", "total_donated"),
+    )
+    
     def __repr__(self):
         """String representation of GiverProfile object for debugging."""
-        name = self.company_name if self.profile_type == ProfileType.COMPANY else self.user.username
-        return f"<GiverProfile(id={self.id}, type='{self.profile_type}', name='{name}')>"
+        # Columns only: reading self.user here would run a query per profile logged
+        return (
+            f"<GiverProfile(id={self.id}, user_id={self.user_id}, type='{self.profile_type}', "
+            f"company_name='{self.company_name}')>"
+        )
 
 
 class Donation(Base):
@@ -331,6 +395,7 @@ class Donation(Base):
         payment_intent_id: Stripe payment intent ID
         is_anonymous: Whether to hide donor identity
         message: Optional message from donor
+        queue_ticket: Intake ticket, for donations accepted through the queue
         created_at: When donation was made
         updated_at: When donation record was last modified
     
@@ -383,6 +448,13 @@ class Donation(Base):
     )
     message = Column(Text, nullable=True, comment="Optional message from donor")
     
+    # Buffered intake
+    queue_ticket = Column(
+        String(32),
+        nullable=True,
+        comment="Ticket of the queued request this donation was written from"
+    )
+    
     # Timestamps
     created_at = Column(
         DateTime(timezone=True),
@@ -400,6 +472,192 @@ class Donation(Base):
     campaign = relationship("Campaign", back_populates="donations")
     giver = relationship("GiverProfile", back_populates="donations")
     
+    # Composite indexes for hot queries
+    # created_at is last so the (created_at, id) ordering comes straight from
+    # the index (the primary key is implicitly appended to every index entry)
+    __table_args__ = (
+        # Campaign donation lists, newest first
+        Index(
+            "ix_donations_campaign_status_anon_created",
+            "campaign_id", "payment_status", "is_anonymous", "created_at"
+        ),
+        # Giver donation history, newest first
+        Index(
+            "ix_donations_giver_status_created",
+            "giver_id", "payment_status", "created_at"
+        ),
+        # Finding queued donations already written (each ticket is written once)
+        Index("ix_donations_queue_ticket", "queue_ticket", unique=True),
+    )
+    
     def __repr__(self):
         """String representation of Donation object for debugging."""
-        return f"<Donation(id={self.id}, amount={self.amount}, campaign_id={self.campaign_id})>"
\ No newline at end of file
+        return f"<Donation(id={self.id}, amount={self.amount}, campaign_id={self.campaign_id})>"
+
+
+class LeaderboardEntry(Base):
+    """
+    Materialized giving leaderboard row.
+    
+    One row per public giver profile with donations, copied from
+    GiverProfile and User so GET /givers/leaderboard reads the top N rows
+    straight off an index instead of joining and sorting every profile.
+    Kept up to date as donations complete (see utils/leaderboard.py).
+    
+    Attributes:
+        giver_id: Giver profile the row is for
+        profile_type: Individual or company (for filtered leaderboards)
+        username: Giver's username
+        full_name: Giver's full name
+        company_name: Company name for company profiles
+        total_donated: Lifetime total donated
+        donation_count: Number of completed donations
+        updated_at: When the row was last refreshed
+    """
+    
+    __tablename__ = "leaderboard_entries"
+    
+    # Primary key - one row per giver
+    giver_id = Column(Integer, ForeignKey("giver_profiles.id"), primary_key=True)
+    
+    # Copied from GiverProfile and User
+    profile_type = Column(Enum(ProfileType), nullable=False)
+    username = Column(String(50), nullable=False)
+    full_name = Column(String(255), nullable=True)
+    company_name = Column(String(255), nullable=True)
+    total_donated = Column(Numeric(10, 2), nullable=False)
+    donation_count = Column(Integer, nullable=False)
+    
+    # Timestamps
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
+    
+    # Ranked reads (giver_id breaks ties and comes free with the index)
+    __table_args__ = (
+        Index("ix_leaderboard_entries_total", "total_donated"),
+        Index("ix_leaderboard_entries_type_total", "profile_type", "total_donated"),
+    )
+    
+    def __repr__(self):
+        """String representation of LeaderboardEntry object for debugging."""
+        return f"<LeaderboardEntry(giver_id={self.giver_id}, total_donated={self.total_donated})>"
+
+
+class CampaignAmountShard(Base):
+    """
+    Sharded counter slot for a hot campaign's raised amount.
+    
+    Campaigns with counter_shards > 0 add completed donations to a random
+    shard row instead of Campaign.current_amount, so concurrent completions
+    don't all queue on one row lock. A background job folds the shard
+    amounts into current_amount (see utils/counters.py).
+    
+    Attributes:
+        campaign_id: Campaign the shard belongs to
+        shard: Shard number (0 to counter_shards - 1)
+        amount: Amount not yet folded into current_amount
+        updated_at: When the shard was last changed
+    """
+    
+    __tablename__ = "campaign_amount_shards"
+    
+    # Composite primary key - one row per campaign shard
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    
+    amount = Column(
+        Numeric(12, 2),
+        default=0.00,
+        nullable=False,
+        comment="Amount pending fold into campaigns.current_amount"
+    )
+    
+    # Timestamps
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
+    
+    def __repr__(self):
+        """String representation of CampaignAmountShard object for debugging."""
+        return f"<CampaignAmountShard(campaign_id={self.campaign_id}, shard={self.shard}, amount={self.amount})>"
+
+
+class CampaignStatsBucket(Base):
+    """
+    Completed donations to a campaign in one hour or day.
+    
+    Rollup behind GET /campaigns/{id}/stats, kept up to date in the same
+    transaction as Campaign.current_amount (see utils/campaign_stats.py).
+    Donations are bucketed by their created_at, in UTC. Campaigns with
+    counter_shards > 0 spread each bucket over that many shard rows, so
+    readers sum a bucket's rows.
+    
+    Attributes:
+        campaign_id: Campaign the bucket belongs to
+        period: Bucket length (hour or day)
+        bucket_start: Start of the hour or day (UTC, no time zone)
+        shard: Counter shard (0 for campaigns without counter shards)
+        donation_count: Completed donations in the bucket
+        amount: Sum of those donations
+        anonymous_count: How many of them are anonymous
+        anonymous_amount: Sum of the anonymous ones
+    """
+    
+    __tablename__ = "campaign_stats_buckets"
+    
+    # Composite primary key - one row per campaign, period, bucket and shard
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), primary_key=True)
+    period = Column(Enum(StatsPeriod), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    shard = Column(Integer, primary_key=True, default=0)
+    
+    donation_count = Column(Integer, default=0, nullable=False)
+    amount = Column(Numeric(12, 2), default=0.00, nullable=False)
+    anonymous_count = Column(Integer, default=0, nullable=False)
+    anonymous_amount = Column(Numeric(12, 2), default=0.00, nullable=False)
+    
+    def __repr__(self):
+        """String representation of CampaignStatsBucket object for debugging."""
+        return (
+            f"<CampaignStatsBucket(campaign_id={self.campaign_id}, period={self.period}, "
+            f"bucket_start={self.bucket_start}, donation_count={self.donation_count})>"
+        )
+
+
+class CampaignGiverTotal(Base):
+    """
+    Completed donations by one giver to one campaign.
+    
+    Lets GET /campaigns/{id}/stats count unique givers without a
+    COUNT(DISTINCT) over the donations table: a giver counts while their
+    donation_count is above zero.
+    
+    Attributes:
+        campaign_id: Campaign donated to
+        giver_id: Giver profile that donated
+        donation_count: Completed donations by the giver to the campaign
+        amount: Sum of those donations
+    """
+    
+    __tablename__ = "campaign_giver_totals"
+    
+    # Composite primary key - one row per campaign and giver
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), primary_key=True)
+    giver_id = Column(Integer, ForeignKey("giver_profiles.id"), primary_key=True)
+    
+    donation_count = Column(Integer, default=0, nullable=False)
+    amount = Column(Numeric(12, 2), default=0.00, nullable=False)
+    
+    def __repr__(self):
+        """String representation of CampaignGiverTotal object for debugging."""
+        return (
+            f"<CampaignGiverTotal(campaign_id={self.campaign_id}, giver_id={self.giver_id}, "
+            f"donation_count={self.donation_count})>"
+        )
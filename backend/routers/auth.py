@@ -9,7 +9,7 @@ This module contains all authentication-related endpoints:
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from slowapi import Limiter
 from slowapi.util import get_remote_address
@@ -18,7 +18,8 @@ from database import get_db
 from models import User, GiverProfile, ProfileType
 from schemas import UserCreate, UserResponse, Token
 from auth import (
-    hash_password,
+    hash_password_async,
+    password_needs_rehash,
     authenticate_user,
     create_access_token,
     get_current_active_user,
@@ -26,6 +27,7 @@ from auth import (
     get_user_by_email,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from utils.password_pool import PasswordPoolBusy
 
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
@@ -43,7 +45,7 @@ router = APIRouter(
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 @limiter.limit("5/hour")  # Limit to 5 registrations per hour per IP
-def register_user(request: Request, user_data: UserCreate, db: Session = Depends(get_db)):
+async def register_user(request: Request, user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Register a new user.
 
@@ -62,6 +64,7 @@ def register_user(request: Request, user_data: UserCreate, db: Session = Depends
     Raises:
         HTTPException 400: If username or email already exists
         HTTPException 429: If rate limit exceeded
+        HTTPException 503: If the password hashing queue is full
 
     Example request body:
         {
@@ -72,7 +75,7 @@ def register_user(request: Request, user_data: UserCreate, db: Session = Depends
         }
     """
     # Check if username already exists
-    existing_user = get_user_by_username(db, user_data.username)
+    existing_user = await get_user_by_username(db, user_data.username)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -80,18 +83,21 @@ def register_user(request: Request, user_data: UserCreate, db: Session = Depends
         )
     
     # Check if email already exists
-    existing_email = get_user_by_email(db, user_data.email)
+    existing_email = await get_user_by_email(db, user_data.email)
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
+    # Hash in the password process pool so bcrypt doesn't block the event loop
+    hashed_password = await hash_password_async(user_data.password)
+
     # Create new user with hashed password
     new_user = User(
         email=user_data.email,
         username=user_data.username,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=hashed_password,
         full_name=user_data.full_name,
         is_active=True,
         is_verified=False  # Could implement email verification later
@@ -99,7 +105,7 @@ def register_user(request: Request, user_data: UserCreate, db: Session = Depends
     
     # Add user to database and flush to get the ID
     db.add(new_user)
-    db.flush()  # Flush to get the user ID without committing
+    await db.flush()  # Flush to get the user ID without committing
     
     # Automatically create a giver profile for the new user
     giver_profile = GiverProfile(
@@ -110,18 +116,18 @@ def register_user(request: Request, user_data: UserCreate, db: Session = Depends
     db.add(giver_profile)
     
     # Commit both user and profile together
-    db.commit()
-    db.refresh(new_user)  # Refresh to get the auto-generated fields
+    await db.commit()
+    await db.refresh(new_user)  # Refresh to get the auto-generated fields
     
     return new_user
 
 
 @router.post("/login", response_model=Token)
 @limiter.limit("10/minute")  # Limit to 10 login attempts per minute per IP
-def login(
+async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     User login endpoint.
@@ -143,6 +149,7 @@ def login(
     Raises:
         HTTPException 401: If credentials are invalid
         HTTPException 429: If rate limit exceeded
+        HTTPException 503: If the password hashing queue is full
 
     Example:
         POST /auth/login
@@ -151,7 +158,7 @@ def login(
         username=user@example.com&password=securepass123
     """
     # Authenticate the user
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     
     if not user:
         raise HTTPException(
@@ -160,6 +167,15 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade the hash if the bcrypt cost has changed since it was made
+    if password_needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await hash_password_async(form_data.password)
+            await db.commit()
+        except PasswordPoolBusy:
+            # Not worth failing the login over - upgrade on a later one
+            pass
+    
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -171,7 +187,7 @@ def login(
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(
+async def get_current_user_info(
     current_user: User = Depends(get_current_active_user)
 ):
     """
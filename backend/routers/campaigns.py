@@ -4,22 +4,41 @@ Campaign routes.
 This module contains all campaign-related endpoints:
 - Create, read, update, delete campaigns
 - List campaigns with filters
+- Search campaigns
 - Get campaign donations
+- Stream live campaign totals
+- Export a campaign's donations
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from datetime import datetime
 from typing import List, Optional
 
+from config import get_stream_settings
 from database import get_db
-from models import Campaign, User, CampaignType, CampaignStatus
+from models import Campaign, Donation, User, CampaignType, CampaignStatus, PaymentStatus, StatsPeriod
 from schemas import (
     CampaignCreate,
     CampaignUpdate,
     CampaignResponse,
-    CampaignListResponse
+    CampaignListResponse,
+    CampaignSearchResponse,
+    CampaignStatsResponse
 )
 from auth import get_current_active_user
+from utils.campaign_lifecycle import campaign_scheduler
+from utils.campaign_search import encode_search_cursor, search_page, search_query
+from utils.campaign_stats import MAX_WINDOWS, default_window, get_campaign_stats
+from utils.donation_export import MEDIA_TYPES, accepts_gzip, export_columns, gzip_stream, stream_donations
+from utils.fast_json import FastJSONResponse, RowSerializer, campaign_fields, campaign_serializer
+from utils.pagination import paginate
+from utils.live_totals import live_totals
+from utils.response_cache import response_cache
+from utils.search_index import campaign_index, load_hits
 
 # Create router with prefix and tags
 router = APIRouter(
@@ -29,10 +48,10 @@ router = APIRouter(
 
 
 @router.post("/", response_model=CampaignResponse, status_code=status.HTTP_201_CREATED)
-def create_campaign(
+async def create_campaign(
     campaign_data: CampaignCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new campaign.
@@ -75,83 +94,193 @@ def create_campaign(
     )
     
     db.add(new_campaign)
-    db.commit()
-    db.refresh(new_campaign)
+    response_cache.invalidate_on_commit(db, "campaigns")
+    await db.commit()
+    await db.refresh(new_campaign)
+    campaign_index.update(new_campaign)
+    campaign_scheduler.schedule(new_campaign)
     
     return new_campaign
 
 
-@router.get("/", response_model=CampaignListResponse)
-def list_campaigns(
+@router.get("/", response_model=CampaignListResponse, response_class=FastJSONResponse)
+async def list_campaigns(
+    request: Request,
     campaign_type: Optional[CampaignType] = Query(None, description="Filter by campaign type"),
     status: Optional[CampaignStatus] = Query(None, description="Filter by status"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page (keyset pagination)"),
+    include_total: Optional[bool] = Query(None, description="Count the total (default: true for pages, false for cursors)"),
+    serializer: RowSerializer = Depends(campaign_fields),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     List all campaigns with optional filters.
     
     Returns a paginated list of campaigns. Filters can be applied for
-    campaign type and status.
+    campaign type and status. Pass next_cursor from a response as cursor
+    to fetch the following page without an OFFSET scan. Responses are
+    cached briefly and carry an ETag (see utils/response_cache.py).
     
     Args:
+        request: Incoming request (injected)
         campaign_type: Optional filter by campaign type
         status: Optional filter by status (defaults to showing ACTIVE campaigns)
-        page: Page number (starts at 1)
+        page: Page number (starts at 1, ignored when cursor is given)
         page_size: Number of items per page (max 100)
+        cursor: Cursor from a previous page (keyset pagination)
+        include_total: Whether to count the total
+        serializer: Fields to return (from the fields parameter)
         db: Database session (injected)
         
     Returns:
-        Paginated list of campaigns
+        Paginated list of campaigns (or 304 if the client's copy is current)
         
     Example:
         GET /campaigns?campaign_type=fundraising&status=active&page=1&page_size=10
+        GET /campaigns?status=active&page_size=10&cursor=<next_cursor>
+        GET /campaigns?fields=id,title,current_amount,goal_amount
     """
-    # Build query
-    query = db.query(Campaign)
+    # Build query (only the requested fields' columns, plus the sort key)
+    query = select(*serializer.select_columns(Campaign.created_at, Campaign.id))
     
     # Apply filters
     if campaign_type:
-        query = query.filter(Campaign.campaign_type == campaign_type)
+        query = query.where(Campaign.campaign_type == campaign_type)
     
     # Default to showing active campaigns if no status specified
     if status:
-        query = query.filter(Campaign.status == status)
+        query = query.where(Campaign.status == status)
     else:
-        query = query.filter(Campaign.status == CampaignStatus.ACTIVE)
+        query = query.where(Campaign.status == CampaignStatus.ACTIVE)
+    
+    async def load():
+        # Fetch the page (and total, if requested)
+        result = await paginate(
+            db, query, Campaign,
+            page_size=page_size,
+            page=page,
+            cursor=cursor,
+            include_total=include_total
+        )
+        
+        return {
+            "campaigns": serializer.rows(result.items),
+            "total": result.total,
+            "page": page if cursor is None else None,
+            "page_size": page_size,
+            "next_cursor": result.next_cursor
+        }, ["campaigns"]
+    
+    # Serve from the response cache if we can
+    return await response_cache.serve(request, load)
+
+
+@router.get("/search", response_model=CampaignSearchResponse, response_class=FastJSONResponse)
+async def search_campaigns(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search titles and descriptions for"),
+    campaign_type: Optional[CampaignType] = Query(None, description="Filter by campaign type"),
+    status: Optional[CampaignStatus] = Query(None, description="Filter by status"),
+    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    serializer: RowSerializer = Depends(campaign_fields),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Search campaign titles and descriptions.
     
-    # Get total count
-    total = query.count()
+    Returns campaigns containing any of the words in q, most relevant
+    first (title matches count for more than description matches). The
+    search runs on a full-text index, not a scan of the campaigns table:
+    the database's (see utils/campaign_search.py), or an in-process one
+    when SEARCH_ENGINE=memory (see utils/search_index.py). Pass
+    next_cursor from a response as cursor to fetch the following page.
+    Responses are cached briefly and carry an ETag like the campaign list.
     
-    # Apply pagination
-    offset = (page - 1) * page_size
-    campaigns = query.order_by(Campaign.created_at.desc()).offset(offset).limit(page_size).all()
+    Args:
+        request: Incoming request (injected)
+        q: Search text (up to 10 words are used)
+        campaign_type: Optional filter by campaign type
+        status: Optional filter by status (defaults to ACTIVE campaigns)
+        page_size: Number of items per page (max 100)
+        cursor: Cursor from a previous page
+        serializer: Fields to return (from the fields parameter)
+        db: Database session (injected)
+        
+    Returns:
+        A page of matching campaigns (or 304 if the client's copy is current)
+        
+    Raises:
+        HTTPException 400: If q has no words or the cursor is invalid
+        
+    Example:
+        GET /campaigns/search?q=community+centre&campaign_type=fundraising
+        GET /campaigns/search?q=community+centre&cursor=<next_cursor>
+    """
+    # Default to active campaigns, like the list
+    wanted_status = status or CampaignStatus.ACTIVE
+    
+    if campaign_index.is_open:
+        # In-process index (SEARCH_ENGINE=memory): rank in memory, then load the page by id
+        async def load_from_index():
+            hits, next_cursor = await campaign_index.search(q, campaign_type, wanted_status, page_size, cursor)
+            return {
+                "campaigns": await load_hits(db, serializer, hits, campaign_type, wanted_status),
+                "page_size": page_size,
+                "next_cursor": next_cursor
+            }, ["campaigns"]
+        
+        return await response_cache.serve(request, load_from_index)
     
-    return {
-        "campaigns": campaigns,
-        "total": total,
-        "page": page,
-        "page_size": page_size
-    }
+    # Build query (only the requested fields' columns, plus the tie-breaker)
+    query = select(*serializer.select_columns(Campaign.id))
+    
+    # Apply filters
+    if campaign_type:
+        query = query.where(Campaign.campaign_type == campaign_type)
+    query = query.where(Campaign.status == wanted_status)
+    
+    query, score = search_query(db.bind.dialect.name, query, q)
+    query = search_page(query, score, page_size, cursor)
+    
+    async def load():
+        rows = (await db.execute(query)).all()
+        items = rows[:page_size]
+        
+        next_cursor = None
+        if len(rows) > page_size:
+            next_cursor = encode_search_cursor(items[-1].score, items[-1].id)
+        
+        return {
+            "campaigns": serializer.rows(items),
+            "page_size": page_size,
+            "next_cursor": next_cursor
+        }, ["campaigns"]
+    
+    return await response_cache.serve(request, load)
 
 
 @router.get("/{campaign_id}", response_model=CampaignResponse)
-def get_campaign(
+async def get_campaign(
     campaign_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a specific campaign by ID.
     
-    Returns detailed information about a single campaign.
+    Returns detailed information about a single campaign. Responses are
+    cached briefly and carry an ETag (see utils/response_cache.py).
     
     Args:
         campaign_id: Campaign ID
+        request: Incoming request (injected)
         db: Database session (injected)
         
     Returns:
-        Campaign details
+        Campaign details (or 304 if the client's copy is current)
         
     Raises:
         HTTPException 404: If campaign not found
@@ -159,7 +288,126 @@ def get_campaign(
     Example:
         GET /campaigns/1
     """
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    async def load():
+        campaign = await db.scalar(select(Campaign).where(Campaign.id == campaign_id))
+        
+        if not campaign:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Campaign not found"
+            )
+        
+        return campaign_serializer.obj(campaign), [f"campaign:{campaign.id}"]
+    
+    return await response_cache.serve(request, load)
+
+
+@router.get("/{campaign_id}/stream")
+async def stream_campaign_totals(
+    campaign_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream a campaign's raised amount and donation count as they change.
+    
+    Server-sent events (text/event-stream) for live campaign pages. The
+    current totals are sent straight away, then again whenever a donation
+    to the campaign completes or is refunded. Idle streams get a comment
+    line every STREAM_HEARTBEAT_INTERVAL seconds.
+    
+    Open streams don't query the database: each change is read once and
+    pushed to every stream on the campaign, and a stream opened on a
+    campaign already being watched starts from the totals last pushed
+    (see utils/live_totals.py).
+    
+    Args:
+        campaign_id: Campaign ID
+        db: Database session (injected)
+        
+    Returns:
+        Event stream of "totals" events
+        
+    Raises:
+        HTTPException 404: If campaign not found
+        
+    Example:
+        GET /campaigns/1/stream
+        
+        retry: 3000
+        
+        event: totals
+        data: {"campaign_id":1,"current_amount":"1250.00","donation_count":17}
+    """
+    # Subscribe before reading, so a change committed in between is still sent
+    subscription = live_totals.subscribe(campaign_id)
+    try:
+        totals = await live_totals.initial_totals(db, campaign_id)
+    except Exception:
+        live_totals.unsubscribe(subscription)
+        raise
+    finally:
+        # The stream never needs the connection again, so return it to the pool
+        await db.close()
+    
+    if totals is None:
+        live_totals.unsubscribe(subscription)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Campaign not found"
+        )
+    
+    return StreamingResponse(
+        live_totals.stream(subscription, totals, get_stream_settings().heartbeat_interval),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Don't let nginx buffer events
+        }
+    )
+
+
+@router.get("/{campaign_id}/donations/export")
+async def export_campaign_donations(
+    campaign_id: int,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    payment_status: Optional[PaymentStatus] = Query(None, description="Only donations with this status"),
+    accept_encoding: str = Header("", include_in_schema=False),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Download every donation to a campaign as CSV or NDJSON.
+    
+    Only the campaign creator can export. Unlike GET
+    /donations/campaigns/{id} this isn't paginated: rows are read from a
+    server-side cursor and streamed a batch at a time, gzipped when the
+    client accepts it, so large campaigns export in one request at
+    constant memory.
+    
+    Args:
+        campaign_id: Campaign ID
+        format: csv (with a header row) or ndjson
+        payment_status: Only donations with this status (default: all)
+        accept_encoding: Accept-Encoding header (gzip is used if allowed)
+        current_user: Current authenticated user (injected)
+        db: Database session (injected, open until the download ends)
+        
+    Returns:
+        Streamed file download
+        
+    Raises:
+        HTTPException 404: If campaign not found
+        HTTPException 403: If user is not the campaign creator
+        
+    Requires:
+        Valid JWT token
+        
+    Example:
+        GET /campaigns/1/donations/export?format=csv&payment_status=completed
+    """
+    campaign = await db.scalar(
+        select(Campaign).options(load_only(Campaign.id, Campaign.creator_id)).where(Campaign.id == campaign_id)
+    )
     
     if not campaign:
         raise HTTPException(
@@ -167,15 +415,102 @@ def get_campaign(
             detail="Campaign not found"
         )
     
-    return campaign
+    if campaign.creator_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to export this campaign's donations"
+        )
+    
+    query = select(*export_columns()).where(Donation.campaign_id == campaign_id).order_by(Donation.id)
+    if payment_status is not None:
+        query = query.where(Donation.payment_status == payment_status)
+    
+    headers = {
+        "Content-Disposition": f'attachment; filename="campaign-{campaign_id}-donations.{format}"',
+        "Cache-Control": "no-store",
+        "Vary": "Accept-Encoding",
+    }
+    body = stream_donations(db, query, format)
+    if accepts_gzip(accept_encoding):
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    
+    return StreamingResponse(body, media_type=MEDIA_TYPES[format], headers=headers)
+
+
+@router.get("/{campaign_id}/stats", response_model=CampaignStatsResponse)
+async def get_campaign_donation_stats(
+    campaign_id: int,
+    period: StatsPeriod = Query(StatsPeriod.DAY, description="Bucket length: hour or day"),
+    since: Optional[datetime] = Query(None, description="Start of the first bucket (default: 48 hours or 30 days ago)"),
+    until: Optional[datetime] = Query(None, description="End of the window, exclusive (default: now)"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get completed donation counts and amounts by hour or day.
+    
+    Only the campaign creator can view the stats. They are read from
+    rollup tables kept up to date as donations complete, so the cost
+    doesn't grow with the number of donations (see
+    utils/campaign_stats.py). Times are UTC.
+    
+    Args:
+        campaign_id: Campaign ID
+        period: Bucket length (hour or day)
+        since: Start of the first bucket (naive times are UTC)
+        until: End of the window, exclusive
+        current_user: Current authenticated user (injected)
+        db: Database session (injected)
+        
+    Returns:
+        Campaign totals (count, amount, average gift, unique givers,
+        anonymous share) and the buckets in the window
+        
+    Raises:
+        HTTPException 404: If campaign not found
+        HTTPException 403: If user is not the campaign creator
+        HTTPException 400: If the window is empty or too long (31 days
+            of hours, 10 years of days)
+        
+    Requires:
+        Valid JWT token
+        
+    Example:
+        GET /campaigns/1/stats?period=hour&since=2026-10-01T00:00:00Z
+    """
+    campaign = await db.scalar(
+        select(Campaign).options(load_only(Campaign.id, Campaign.creator_id)).where(Campaign.id == campaign_id)
+    )
+    
+    if not campaign:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Campaign not found"
+        )
+    
+    if campaign.creator_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this campaign's stats"
+        )
+    
+    since, until = default_window(period, since, until)
+    if not since < until <= since + MAX_WINDOWS[period]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"since must be before until, and at most {MAX_WINDOWS[period].days} days before it"
+        )
+    
+    return await get_campaign_stats(db, campaign_id, period, since, until)
 
 
 @router.put("/{campaign_id}", response_model=CampaignResponse)
-def update_campaign(
+async def update_campaign(
     campaign_id: int,
     campaign_data: CampaignUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update an existing campaign.
@@ -207,7 +542,7 @@ def update_campaign(
         }
     """
     # Get campaign
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = await db.scalar(select(Campaign).where(Campaign.id == campaign_id))
     
     if not campaign:
         raise HTTPException(
@@ -227,17 +562,20 @@ def update_campaign(
     for field, value in update_data.items():
         setattr(campaign, field, value)
     
-    db.commit()
-    db.refresh(campaign)
+    response_cache.invalidate_on_commit(db, f"campaign:{campaign.id}", "campaigns")
+    await db.commit()
+    await db.refresh(campaign)
+    campaign_index.update(campaign)
+    campaign_scheduler.schedule(campaign)
     
     return campaign
 
 
 @router.delete("/{campaign_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_campaign(
+async def delete_campaign(
     campaign_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a campaign.
@@ -265,7 +603,7 @@ def delete_campaign(
         DELETE /campaigns/1
     """
     # Get campaign
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = await db.scalar(select(Campaign).where(Campaign.id == campaign_id))
     
     if not campaign:
         raise HTTPException(
@@ -282,17 +620,22 @@ def delete_campaign(
     
     # Soft delete - set status to cancelled
     campaign.status = CampaignStatus.CANCELLED
-    db.commit()
+    response_cache.invalidate_on_commit(db, f"campaign:{campaign.id}", "campaigns")
+    await db.commit()
+    campaign_index.update(campaign)
     
     return None
 
 
-@router.get("/my/campaigns", response_model=CampaignListResponse)
-def get_my_campaigns(
+@router.get("/my/campaigns", response_model=CampaignListResponse, response_class=FastJSONResponse)
+async def get_my_campaigns(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page (keyset pagination)"),
+    include_total: Optional[bool] = Query(None, description="Count the total (default: true for pages, false for cursors)"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    serializer: RowSerializer = Depends(campaign_fields),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get all campaigns created by the current user.
@@ -300,8 +643,11 @@ def get_my_campaigns(
     Returns a paginated list of the current user's campaigns.
     
     Args:
-        page: Page number (starts at 1)
+        page: Page number (starts at 1, ignored when cursor is given)
         page_size: Number of items per page (max 100)
+        cursor: Cursor from a previous page (keyset pagination)
+        include_total: Whether to count the total
+        serializer: Fields to return (from the fields parameter)
         current_user: Current authenticated user (injected)
         db: Database session (injected)
         
@@ -315,18 +661,21 @@ def get_my_campaigns(
         GET /campaigns/my/campaigns?page=1&page_size=10
     """
     # Get user's campaigns
-    query = db.query(Campaign).filter(Campaign.creator_id == current_user.id)
-    
-    # Get total count
-    total = query.count()
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    campaigns = query.order_by(Campaign.created_at.desc()).offset(offset).limit(page_size).all()
+    query = select(*serializer.select_columns(Campaign.created_at, Campaign.id)).where(Campaign.creator_id == current_user.id)
+    
+    # Fetch the page (and total, if requested)
+    result = await paginate(
+        db, query, Campaign,
+        page_size=page_size,
+        page=page,
+        cursor=cursor,
+        include_total=include_total
+    )
     
-    return {
-        "campaigns": campaigns,
-        "total": total,
-        "page": page,
-        "page_size": page_size
-    }
+    return FastJSONResponse({
+        "campaigns": serializer.rows(result.items),
+        "total": result.total,
+        "page": page if cursor is None else None,
+        "page_size": page_size,
+        "next_cursor": result.next_cursor
+    })
@@ -3,24 +3,43 @@ Donation routes.
 
 This module contains all donation-related endpoints:
 - Create donations
+- Queue donations for buffered intake during traffic spikes
 - List campaign donations
 - Update donation status
 - Process donation completion
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import Optional
+from collections import defaultdict
 from decimal import Decimal
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only
+from typing import Optional
 
 from database import get_db
 from models import (
     Donation, Campaign, GiverProfile, User,
     PaymentStatus, CampaignStatus
 )
-from schemas import DonationCreate, DonationResponse, DonationListResponse
+from schemas import (
+    DonationCreate, DonationResponse, DonationListResponse,
+    DonationBatchStatusUpdate, DonationBatchStatusResponse, DonationStatusResult,
+    StatusUpdateOutcome, QueuedDonationResponse
+)
 from auth import get_current_active_user
+from utils.pagination import paginate
+from utils.campaign_stats import StatsDeltas, add_to_campaign_stats, apply_stats_deltas
+from utils.counters import add_to_campaign_amount, add_to_giver_totals, get_pending_shard_amount
+from utils.donation_queue import donation_queue
+from utils.fast_json import FastJSONResponse, RowSerializer, donation_fields
+from utils.leaderboard import refresh_leaderboard_entries
+from utils.live_totals import live_totals
+from utils.metrics import donation_status_changes, donations_completed_amount
+from utils.response_cache import response_cache
+
+# Largest IN (...) list sent in one statement by the batch endpoint
+IN_CLAUSE_CHUNK_SIZE = 1000
 
 # Create router with prefix and tags
 router = APIRouter(
@@ -30,10 +49,10 @@ router = APIRouter(
 
 
 @router.post("/", response_model=DonationResponse, status_code=status.HTTP_201_CREATED)
-def create_donation(
+async def create_donation(
     donation_data: DonationCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new donation.
@@ -67,7 +86,9 @@ def create_donation(
         }
     """
     # Get the campaign
-    campaign = db.query(Campaign).filter(Campaign.id == donation_data.campaign_id).first()
+    campaign = await db.scalar(
+        select(Campaign).where(Campaign.id == donation_data.campaign_id)
+    )
     
     if not campaign:
         raise HTTPException(
@@ -83,9 +104,9 @@ def create_donation(
         )
     
     # Get user's giver profile
-    giver_profile = db.query(GiverProfile).filter(
-        GiverProfile.user_id == current_user.id
-    ).first()
+    giver_profile = await db.scalar(
+        select(GiverProfile).where(GiverProfile.user_id == current_user.id)
+    )
     
     if not giver_profile:
         raise HTTPException(
@@ -105,19 +126,108 @@ def create_donation(
     )
     
     db.add(new_donation)
-    db.commit()
-    db.refresh(new_donation)
+    await db.commit()
+    await db.refresh(new_donation)
     
     return new_donation
 
 
-@router.get("/campaigns/{campaign_id}", response_model=DonationListResponse)
-def get_campaign_donations(
+@router.post("/queued", response_model=QueuedDonationResponse, status_code=status.HTTP_202_ACCEPTED)
+async def queue_donation(
+    donation_data: DonationCreate,
+    response: Response,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Accept a donation into the buffered intake queue.
+    
+    For traffic spikes (e.g. a televised appeal). The donation is written
+    to a local durable queue and 202 is returned straight away, without
+    touching the database. A background worker writes queued donations
+    in batches, with the same checks as POST /donations/, and the
+    result can be followed at the Location returned. Enabled with
+    INTAKE_ENABLED (see utils/donation_queue.py).
+    
+    Args:
+        donation_data: Donation creation data
+        response: Outgoing response (injected)
+        current_user: Current authenticated user (injected)
+        
+    Returns:
+        The queued donation and its ticket
+        
+    Raises:
+        HTTPException 503: If buffered intake is disabled or its queue is full
+        
+    Requires:
+        Valid JWT token
+        
+    Example request:
+        POST /donations/queued
+        {
+            "campaign_id": 1,
+            "amount": 50.00
+        }
+    """
+    entry = await donation_queue.enqueue(current_user.id, donation_data)
+    
+    response.headers["Location"] = f"/donations/queued/{entry.ticket}"
+    return entry
+
+
+@router.get("/queued/{ticket}", response_model=QueuedDonationResponse)
+async def get_queued_donation(
+    ticket: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get the state of a donation accepted through the intake queue.
+    
+    status is "queued" until the donation is written, then "created"
+    (with donation_id) or "rejected" (with error, e.g. the campaign
+    isn't active).
+    
+    Args:
+        ticket: Ticket returned by POST /donations/queued
+        current_user: Current authenticated user (injected)
+        
+    Returns:
+        The queued donation's state
+        
+    Raises:
+        HTTPException 404: If the ticket is unknown or belongs to another user
+        HTTPException 503: If buffered intake is disabled
+        
+    Requires:
+        Valid JWT token
+    """
+    if not donation_queue.is_open:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Buffered donation intake is not enabled"
+        )
+    
+    entry = await donation_queue.get(ticket)
+    
+    if not entry or entry.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Queued donation not found"
+        )
+    
+    return entry
+
+
+@router.get("/campaigns/{campaign_id}", response_model=DonationListResponse, response_class=FastJSONResponse)
+async def get_campaign_donations(
     campaign_id: int,
     include_anonymous: bool = Query(False, description="Include anonymous donations"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page (keyset pagination)"),
+    include_total: Optional[bool] = Query(None, description="Count the total (default: true for pages, false for cursors)"),
+    serializer: RowSerializer = Depends(donation_fields),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get all donations for a specific campaign.
@@ -128,8 +238,11 @@ def get_campaign_donations(
     Args:
         campaign_id: Campaign ID
         include_anonymous: Whether to include anonymous donations (default: False)
-        page: Page number (starts at 1)
+        page: Page number (starts at 1, ignored when cursor is given)
         page_size: Number of items per page (max 100)
+        cursor: Cursor from a previous page (keyset pagination)
+        include_total: Whether to count the total
+        serializer: Fields to return (from the fields parameter)
         db: Database session (injected)
         
     Returns:
@@ -141,8 +254,12 @@ def get_campaign_donations(
     Example:
         GET /donations/campaigns/1?page=1&page_size=10
     """
-    # Check if campaign exists
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    # Check if campaign exists (reading only what the totals need)
+    campaign = await db.scalar(
+        select(Campaign)
+        .options(load_only(Campaign.id, Campaign.current_amount, Campaign.counter_shards))
+        .where(Campaign.id == campaign_id)
+    )
     
     if not campaign:
         raise HTTPException(
@@ -151,42 +268,45 @@ def get_campaign_donations(
         )
     
     # Build query for completed donations
-    query = db.query(Donation).filter(
+    query = select(*serializer.select_columns(Donation.created_at, Donation.id)).where(
         Donation.campaign_id == campaign_id,
         Donation.payment_status == PaymentStatus.COMPLETED
     )
     
     # Filter out anonymous donations if not requested
     if not include_anonymous:
-        query = query.filter(Donation.is_anonymous == False)
-    
-    # Get total count and amount
-    total = query.count()
+        query = query.where(Donation.is_anonymous == False)
+    
+    # Total of all completed donations (maintained on the campaign row,
+    # plus anything not yet folded in from a hot campaign's counter shards)
+    total_amount = campaign.current_amount
+    if campaign.counter_shards:
+        total_amount += await get_pending_shard_amount(db, campaign.id)
+    
+    # Fetch the page (and total count, if requested)
+    result = await paginate(
+        db, query, Donation,
+        page_size=page_size,
+        page=page,
+        cursor=cursor,
+        include_total=include_total
+    )
     
-    total_amount = db.query(Donation.amount).filter(
-        Donation.campaign_id == campaign_id,
-        Donation.payment_status == PaymentStatus.COMPLETED
-    ).all()
-    total_amount = sum(float(amount[0]) for amount in total_amount) if total_amount else 0
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    donations = query.order_by(desc(Donation.created_at)).offset(offset).limit(page_size).all()
-    
-    return {
-        "donations": donations,
-        "total": total,
-        "total_amount": Decimal(str(total_amount)),
-        "page": page,
-        "page_size": page_size
-    }
+    return FastJSONResponse({
+        "donations": serializer.rows(result.items),
+        "total": result.total,
+        "total_amount": total_amount,
+        "page": page if cursor is None else None,
+        "page_size": page_size,
+        "next_cursor": result.next_cursor
+    })
 
 
 @router.get("/{donation_id}", response_model=DonationResponse)
-def get_donation(
+async def get_donation(
     donation_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a specific donation by ID.
@@ -211,7 +331,13 @@ def get_donation(
     Example:
         GET /donations/123
     """
-    donation = db.query(Donation).filter(Donation.id == donation_id).first()
+    # The donor and campaign are needed for the authorization check, so
+    # load them in the same query (one SELECT instead of three)
+    donation = await db.scalar(
+        select(Donation)
+        .options(joinedload(Donation.giver, innerjoin=True), joinedload(Donation.campaign, innerjoin=True))
+        .where(Donation.id == donation_id)
+    )
     
     if not donation:
         raise HTTPException(
@@ -219,15 +345,9 @@ def get_donation(
             detail="Donation not found"
         )
     
-    # Check authorization - donor, campaign creator, or admin
-    giver_profile = db.query(GiverProfile).filter(
-        GiverProfile.user_id == current_user.id
-    ).first()
-    
-    campaign = db.query(Campaign).filter(Campaign.id == donation.campaign_id).first()
-    
-    is_donor = giver_profile and giver_profile.id == donation.giver_id
-    is_creator = campaign and campaign.creator_id == current_user.id
+    # Check authorization - donor or campaign creator
+    is_donor = donation.giver.user_id == current_user.id
+    is_creator = donation.campaign.creator_id == current_user.id
     
     if not (is_donor or is_creator):
         raise HTTPException(
@@ -239,12 +359,12 @@ def get_donation(
 
 
 @router.patch("/{donation_id}/status", response_model=DonationResponse)
-def update_donation_status(
+async def update_donation_status(
     donation_id: int,
     payment_status: PaymentStatus,
     payment_intent_id: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update donation payment status.
@@ -253,6 +373,9 @@ def update_donation_status(
     - Campaign current_amount
     - Giver profile total_donated and donation_count
     
+    A completed donation that is later refunded or failed is removed
+    from the same aggregates.
+    
     Args:
         donation_id: Donation ID
         payment_status: New payment status
@@ -266,6 +389,8 @@ def update_donation_status(
     Raises:
         HTTPException 404: If donation not found
         HTTPException 403: If user is not authorized
+        HTTPException 409: If the donation's status changed while this
+            update was being applied (nothing is applied; retry)
         
     Requires:
         Valid JWT token
@@ -274,7 +399,12 @@ def update_donation_status(
     Example:
         PATCH /donations/123/status?payment_status=completed
     """
-    donation = db.query(Donation).filter(Donation.id == donation_id).first()
+    # Load the donor with the donation for the authorization check
+    donation = await db.scalar(
+        select(Donation)
+        .options(joinedload(Donation.giver, innerjoin=True))
+        .where(Donation.id == donation_id)
+    )
     
     if not donation:
         raise HTTPException(
@@ -283,11 +413,7 @@ def update_donation_status(
         )
     
     # Check authorization - only the donor can update their donation
-    giver_profile = db.query(GiverProfile).filter(
-        GiverProfile.user_id == current_user.id
-    ).first()
-    
-    if not giver_profile or giver_profile.id != donation.giver_id:
+    if donation.giver.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this donation"
@@ -296,50 +422,276 @@ def update_donation_status(
     # Store old status to check if it's changing to COMPLETED
     old_status = donation.payment_status
     
-    # Update donation status
-    donation.payment_status = payment_status
+    # Update donation status, matching on the old status as well so that of
+    # two concurrent requests making the same change only one applies it
+    # (and the aggregates below are changed once)
+    if old_status != payment_status:
+        result = await db.execute(
+            update(Donation)
+            .where(Donation.id == donation.id, Donation.payment_status == old_status)
+            .values(payment_status=payment_status)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Donation status changed during the update, please retry"
+            )
     
     if payment_intent_id:
         donation.payment_intent_id = payment_intent_id
     
     # If donation just became COMPLETED, update aggregates
     if old_status != PaymentStatus.COMPLETED and payment_status == PaymentStatus.COMPLETED:
-        _update_donation_aggregates(db, donation)
+        await _update_donation_aggregates(db, donation)
+    # If a completed donation is refunded or failed, take it back out
+    elif old_status == PaymentStatus.COMPLETED and payment_status != PaymentStatus.COMPLETED:
+        await _update_donation_aggregates(db, donation, reverse=True)
     
-    db.commit()
-    db.refresh(donation)
+    await db.commit()
+    await db.refresh(donation)
+    
+    if old_status != payment_status:
+        donation_status_changes.inc(payment_status.value)
+        if payment_status == PaymentStatus.COMPLETED:
+            donations_completed_amount.inc(amount=float(donation.amount))
     
     return donation
 
 
-def _update_donation_aggregates(db: Session, donation: Donation):
+@router.patch("/status/batch", response_model=DonationBatchStatusResponse)
+async def update_donation_statuses(
+    batch: DonationBatchStatusUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Update the payment status of many donations at once.
+    
+    Batch version of PATCH /donations/{id}/status for payment
+    reconciliation. All updates are applied in one transaction with a
+    few bulk UPDATEs, and the campaign and giver aggregates are changed
+    once per campaign and giver with the summed deltas.
+    
+    Items that can't be applied (not found, another giver's donation,
+    or listed twice) are reported in the results and don't stop the
+    rest of the batch.
+    
+    Args:
+        batch: Status updates to apply (max 5000)
+        current_user: Current authenticated user (injected)
+        db: Database session (injected)
+        
+    Returns:
+        Per-item results, in request order, with updated/failed counts
+        
+    Raises:
+        HTTPException 409: If a donation's status changed while the batch
+            was being applied (nothing is applied; retry the batch)
+        
+    Requires:
+        Valid JWT token
+        User must be the donor of each donation updated
+        
+    Example request:
+        PATCH /donations/status/batch
+        {
+            "updates": [
+                {"donation_id": 1, "payment_status": "completed", "payment_intent_id": "pi_123"},
+                {"donation_id": 2, "payment_status": "failed"}
+            ]
+        }
+    """
+    # Get user's giver profile - only the donor can update their donations
+    giver_profile = await db.scalar(
+        select(GiverProfile).where(GiverProfile.user_id == current_user.id)
+    )
+    
+    # Load the current state of every requested donation
+    requested_ids = sorted({item.donation_id for item in batch.updates})
+    donations = {}
+    for chunk in _chunks(requested_ids):
+        rows = await db.execute(
+            select(
+                Donation.id, Donation.giver_id, Donation.campaign_id,
+                Donation.amount, Donation.payment_status, Donation.payment_intent_id,
+                Donation.is_anonymous, Donation.created_at
+            ).where(Donation.id.in_(chunk))
+        )
+        donations.update({row.id: row for row in rows})
+    
+    results = []
+    seen = set()
+    transitions = defaultdict(list)  # (old status, new status) -> donation IDs
+    intent_updates = []
+    campaign_deltas = defaultdict(Decimal)
+    giver_deltas = defaultdict(lambda: [Decimal("0"), 0])
+    stats_deltas = StatsDeltas()
+    
+    for item in batch.updates:
+        donation = donations.get(item.donation_id)
+        
+        if item.donation_id in seen:
+            outcome = StatusUpdateOutcome.DUPLICATE
+        elif donation is None:
+            outcome = StatusUpdateOutcome.NOT_FOUND
+        elif not giver_profile or giver_profile.id != donation.giver_id:
+            outcome = StatusUpdateOutcome.FORBIDDEN
+        else:
+            outcome = StatusUpdateOutcome.UNCHANGED
+        seen.add(item.donation_id)
+        
+        if outcome != StatusUpdateOutcome.UNCHANGED:
+            results.append(DonationStatusResult(donation_id=item.donation_id, outcome=outcome))
+            continue
+        
+        old_status = donation.payment_status
+        if old_status != item.payment_status:
+            transitions[(old_status, item.payment_status)].append(donation.id)
+            outcome = StatusUpdateOutcome.UPDATED
+        if item.payment_intent_id and item.payment_intent_id != donation.payment_intent_id:
+            intent_updates.append({"b_id": donation.id, "b_intent": item.payment_intent_id})
+            outcome = StatusUpdateOutcome.UPDATED
+        
+        # Same aggregate rules as the single update: add on completion,
+        # take back out when a completed donation is refunded or failed
+        if old_status != PaymentStatus.COMPLETED and item.payment_status == PaymentStatus.COMPLETED:
+            sign = 1
+        elif old_status == PaymentStatus.COMPLETED and item.payment_status != PaymentStatus.COMPLETED:
+            sign = -1
+        else:
+            sign = 0
+        
+        if sign:
+            campaign_deltas[donation.campaign_id] += sign * donation.amount
+            giver_deltas[donation.giver_id][0] += sign * donation.amount
+            giver_deltas[donation.giver_id][1] += sign
+            stats_deltas.add(donation, sign)
+        
+        results.append(DonationStatusResult(
+            donation_id=item.donation_id,
+            outcome=outcome,
+            payment_status=item.payment_status
+        ))
+    
+    # One UPDATE per (old, new) status pair. Matching on the old status
+    # as well means a donation changed since it was read isn't counted twice
+    for (old_status, new_status), ids in transitions.items():
+        for chunk in _chunks(ids):
+            result = await db.execute(
+                update(Donation)
+                .where(Donation.id.in_(chunk), Donation.payment_status == old_status)
+                .values(payment_status=new_status)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != len(chunk):
+                await db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Some donations changed during the batch update, please retry"
+                )
+    
+    # Payment intent IDs differ per donation, so send them as one executemany
+    if intent_updates:
+        donations_table = Donation.__table__
+        await db.execute(
+            update(donations_table)
+            .where(donations_table.c.id == bindparam("b_id"))
+            .values(payment_intent_id=bindparam("b_intent")),
+            intent_updates
+        )
+    
+    # Apply the summed aggregate deltas, in ID order so concurrent
+    # batches lock rows in the same order
+    shards = {}
+    for campaign_id in sorted(campaign_deltas):
+        if campaign_deltas[campaign_id]:
+            shards[campaign_id] = await add_to_campaign_amount(db, campaign_id, campaign_deltas[campaign_id])
+    
+    await apply_stats_deltas(db, stats_deltas, shards)
+    
+    for giver_id in sorted(giver_deltas):
+        amount, count = giver_deltas[giver_id]
+        await add_to_giver_totals(db, giver_id, amount, count)
+    
+    await refresh_leaderboard_entries(db, giver_deltas)
+    if campaign_deltas:
+        response_cache.invalidate_on_commit(
+            db, "campaigns", "leaderboard",
+            *(f"campaign:{campaign_id}" for campaign_id in campaign_deltas),
+            *(f"giver:{giver_id}" for giver_id in giver_deltas)
+        )
+        live_totals.notify_on_commit(db, *campaign_deltas)
+    
+    await db.commit()
+    
+    for (old_status, new_status), ids in transitions.items():
+        donation_status_changes.inc(new_status.value, amount=len(ids))
+        if new_status == PaymentStatus.COMPLETED:
+            donations_completed_amount.inc(amount=float(sum(donations[i].amount for i in ids)))
+    
+    updated = sum(1 for r in results if r.outcome == StatusUpdateOutcome.UPDATED)
+    failed = sum(1 for r in results if r.payment_status is None)
+    
+    return {"results": results, "updated": updated, "failed": failed}
+
+
+def _chunks(ids: list, size: int = IN_CLAUSE_CHUNK_SIZE):
+    """Split a list of IDs into IN (...) sized chunks."""
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+async def _update_donation_aggregates(db: AsyncSession, donation: Donation, reverse: bool = False):
     """
     Update campaign and giver profile aggregates when donation is completed.
     
-    Internal helper function called when a donation status changes to COMPLETED.
+    Internal helper function called when a donation status changes to or
+    from COMPLETED. The aggregates always equal the sum of completed
+    donations, so list endpoints can report totals without summing rows.
+    
+    Each aggregate is changed with a single atomic UPDATE, so concurrent
+    completions can't lose updates (see utils/counters.py).
     
     Args:
         db: Database session
         donation: The completed donation
+        reverse: Remove the donation from the aggregates instead (e.g. on refund)
     """
-    # Update campaign current_amount
-    campaign = db.query(Campaign).filter(Campaign.id == donation.campaign_id).first()
-    if campaign:
-        campaign.current_amount += donation.amount
+    amount = -donation.amount if reverse else donation.amount
+    count = -1 if reverse else 1
+    
+    # Update campaign current_amount (or one of its counter shards)
+    shard = await add_to_campaign_amount(db, donation.campaign_id, amount)
+    
+    # Update the hourly/daily campaign stats rollups
+    await add_to_campaign_stats(db, donation, count, shard)
     
     # Update giver profile statistics
-    giver_profile = db.query(GiverProfile).filter(GiverProfile.id == donation.giver_id).first()
-    if giver_profile:
-        giver_profile.total_donated += donation.amount
-        giver_profile.donation_count += 1
+    await add_to_giver_totals(db, donation.giver_id, amount, count)
+    
+    # Move the giver on the materialized leaderboard
+    await refresh_leaderboard_entries(db, [donation.giver_id])
+    
+    # Drop cached public responses showing these totals once committed
+    response_cache.invalidate_on_commit(
+        db, f"campaign:{donation.campaign_id}", "campaigns", f"giver:{donation.giver_id}", "leaderboard"
+    )
+    
+    # Push the new totals to live campaign streams once committed
+    live_totals.notify_on_commit(db, donation.campaign_id)
 
 
-@router.get("/my/donations", response_model=DonationListResponse)
-def get_my_donations(
+@router.get("/my/donations", response_model=DonationListResponse, response_class=FastJSONResponse)
+async def get_my_donations(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page (keyset pagination)"),
+    include_total: Optional[bool] = Query(None, description="Count the total (default: true for pages, false for cursors)"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    serializer: RowSerializer = Depends(donation_fields),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get all donations made by the current user.
@@ -347,8 +699,11 @@ def get_my_donations(
     Returns the authenticated user's complete donation history.
     
     Args:
-        page: Page number (starts at 1)
+        page: Page number (starts at 1, ignored when cursor is given)
         page_size: Number of items per page (max 100)
+        cursor: Cursor from a previous page (keyset pagination)
+        include_total: Whether to count the total
+        serializer: Fields to return (from the fields parameter)
         current_user: Current authenticated user (injected)
         db: Database session (injected)
         
@@ -365,9 +720,11 @@ def get_my_donations(
         GET /donations/my/donations?page=1&page_size=10
     """
     # Get user's giver profile
-    giver_profile = db.query(GiverProfile).filter(
-        GiverProfile.user_id == current_user.id
-    ).first()
+    giver_profile = await db.scalar(
+        select(GiverProfile)
+        .options(load_only(GiverProfile.id, GiverProfile.total_donated))
+        .where(GiverProfile.user_id == current_user.id)
+    )
     
     if not giver_profile:
         raise HTTPException(
@@ -376,25 +733,25 @@ def get_my_donations(
         )
     
     # Build query
-    query = db.query(Donation).filter(Donation.giver_id == giver_profile.id)
-    
-    # Get total count and amount (all statuses)
-    total = query.count()
+    query = select(*serializer.select_columns(Donation.created_at, Donation.id)).where(Donation.giver_id == giver_profile.id)
+    
+    # Total of completed donations (maintained on the giver profile)
+    total_amount = giver_profile.total_donated
+    
+    # Fetch the page (and total count across all statuses, if requested)
+    result = await paginate(
+        db, query, Donation,
+        page_size=page_size,
+        page=page,
+        cursor=cursor,
+        include_total=include_total
+    )
     
-    total_amount = db.query(Donation.amount).filter(
-        Donation.giver_id == giver_profile.id,
-        Donation.payment_status == PaymentStatus.COMPLETED
-    ).all()
-    total_amount = sum(float(amount[0]) for amount in total_amount) if total_amount else 0
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    donations = query.order_by(desc(Donation.created_at)).offset(offset).limit(page_size).all()
-    
-    return {
-        "donations": donations,
-        "total": total,
-        "total_amount": Decimal(str(total_amount)),
-        "page": page,
-        "page_size": page_size
-    }
\ No newline at end of file
+    return FastJSONResponse({
+        "donations": serializer.rows(result.items),
+        "total": result.total,
+        "total_amount": total_amount,
+        "page": page if cursor is None else None,
+        "page_size": page_size,
+        "next_cursor": result.next_cursor
+    })
\ No newline at end of file
@@ -7,10 +7,12 @@ This module contains all giver profile-related endpoints:
 - View giving statistics
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import select, func
+from sqlalchemy.orm import load_only
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+from decimal import Decimal
 
 from database import get_db
 from models import GiverProfile, User, Donation, Campaign, ProfileType, PaymentStatus
@@ -21,6 +23,10 @@ from schemas import (
     DonationListResponse
 )
 from auth import get_current_active_user
+from utils.fast_json import FastJSONResponse, RowSerializer, donation_fields, giver_profile_serializer
+from utils.pagination import paginate
+from utils.leaderboard import get_leaderboard, refresh_leaderboard_entries
+from utils.response_cache import response_cache
 
 # Create router with prefix and tags
 router = APIRouter(
@@ -30,9 +36,9 @@ router = APIRouter(
 
 
 @router.get("/me", response_model=GiverProfileResponse)
-def get_my_profile_shorthand(
+async def get_my_profile_shorthand(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get the current user's giver profile (shorthand endpoint).
@@ -56,9 +62,9 @@ def get_my_profile_shorthand(
     Example:
         GET /givers/me
     """
-    profile = db.query(GiverProfile).filter(
-        GiverProfile.user_id == current_user.id
-    ).first()
+    profile = await db.scalar(
+        select(GiverProfile).where(GiverProfile.user_id == current_user.id)
+    )
     
     if not profile:
         raise HTTPException(
@@ -70,10 +76,10 @@ def get_my_profile_shorthand(
 
 
 @router.post("/profile", response_model=GiverProfileResponse, status_code=status.HTTP_201_CREATED)
-def create_giver_profile(
+async def create_giver_profile(
     profile_data: GiverProfileCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a giver profile for the current user.
@@ -103,9 +109,9 @@ def create_giver_profile(
         }
     """
     # Check if user already has a profile
-    existing_profile = db.query(GiverProfile).filter(
-        GiverProfile.user_id == current_user.id
-    ).first()
+    existing_profile = await db.scalar(
+        select(GiverProfile).where(GiverProfile.user_id == current_user.id)
+    )
     
     if existing_profile:
         raise HTTPException(
@@ -124,32 +130,38 @@ def create_giver_profile(
     )
     
     db.add(new_profile)
-    db.commit()
-    db.refresh(new_profile)
+    await db.commit()
+    await db.refresh(new_profile)
     
     return new_profile
 
 
-@router.get("/me/donations", response_model=DonationListResponse)
-def get_my_donations_shorthand(
+@router.get("/me/donations", response_model=DonationListResponse, response_class=FastJSONResponse)
+async def get_my_donations_shorthand(
     skip: Optional[int] = Query(None, ge=0, description="Number of items to skip"),
     limit: Optional[int] = Query(None, ge=1, le=100, description="Number of items to return"),
     page: Optional[int] = Query(None, ge=1, description="Page number (alternative to skip)"),
     page_size: Optional[int] = Query(None, ge=1, le=100, description="Items per page (alternative to limit)"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page (keyset pagination)"),
+    include_total: Optional[bool] = Query(None, description="Count the total (default: true for pages, false for cursors)"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    serializer: RowSerializer = Depends(donation_fields),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get the current user's donation history (shorthand endpoint).
     
     Returns a paginated list of all donations made by the current user.
-    Supports both skip/limit and page/page_size parameter styles.
+    Supports skip/limit, page/page_size and cursor parameter styles.
     
     Args:
         skip: Number of items to skip (for offset-based pagination)
         limit: Number of items to return (for offset-based pagination)
         page: Page number (for page-based pagination, starts at 1)
         page_size: Items per page (for page-based pagination)
+        cursor: Cursor from a previous page (keyset pagination)
+        include_total: Whether to count the total
+        serializer: Fields to return (from the fields parameter)
         current_user: Current authenticated user (injected)
         db: Database session (injected)
         
@@ -162,11 +174,14 @@ def get_my_donations_shorthand(
     Examples:
         GET /givers/me/donations?skip=0&limit=10
         GET /givers/me/donations?page=1&page_size=10
+        GET /givers/me/donations?limit=10&cursor=<next_cursor>
     """
     # Get user's giver profile
-    profile = db.query(GiverProfile).filter(
-        GiverProfile.user_id == current_user.id
-    ).first()
+    profile = await db.scalar(
+        select(GiverProfile)
+        .options(load_only(GiverProfile.id, GiverProfile.total_donated))
+        .where(GiverProfile.user_id == current_user.id)
+    )
     
     if not profile:
         raise HTTPException(
@@ -187,34 +202,37 @@ def get_my_donations_shorthand(
         offset = (current_page - 1) * items_per_page
     
     # Build query for completed donations only
-    query = db.query(Donation).filter(
+    query = select(*serializer.select_columns(Donation.created_at, Donation.id)).where(
         Donation.giver_id == profile.id,
         Donation.payment_status == PaymentStatus.COMPLETED
     )
     
-    # Get total count and amount
-    total = query.count()
-    total_amount = db.query(func.sum(Donation.amount)).filter(
-        Donation.giver_id == profile.id,
-        Donation.payment_status == PaymentStatus.COMPLETED
-    ).scalar() or 0
+    # Total of completed donations (maintained on the profile)
+    total_amount = profile.total_donated
     
-    # Apply pagination
-    donations = query.order_by(desc(Donation.created_at)).offset(offset).limit(items_per_page).all()
+    # Fetch the page (and total count, if requested)
+    result = await paginate(
+        db, query, Donation,
+        page_size=items_per_page,
+        offset=offset,
+        cursor=cursor,
+        include_total=include_total
+    )
     
-    return {
-        "donations": donations,
-        "total": total,
+    return FastJSONResponse({
+        "donations": serializer.rows(result.items),
+        "total": result.total,
         "total_amount": total_amount,
-        "page": current_page,
-        "page_size": items_per_page
-    }
+        "page": current_page if cursor is None else None,
+        "page_size": items_per_page,
+        "next_cursor": result.next_cursor
+    })
 
 
 @router.get("/profile/me", response_model=GiverProfileResponse)
-def get_my_profile(
+async def get_my_profile(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get the current user's giver profile.
@@ -237,9 +255,9 @@ def get_my_profile(
     Example:
         GET /givers/profile/me
     """
-    profile = db.query(GiverProfile).filter(
-        GiverProfile.user_id == current_user.id
-    ).first()
+    profile = await db.scalar(
+        select(GiverProfile).where(GiverProfile.user_id == current_user.id)
+    )
     
     if not profile:
         raise HTTPException(
@@ -251,10 +269,10 @@ def get_my_profile(
 
 
 @router.put("/profile/me", response_model=GiverProfileResponse)
-def update_my_profile(
+async def update_my_profile(
     profile_data: GiverProfileUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update the current user's giver profile.
@@ -282,9 +300,9 @@ def update_my_profile(
         }
     """
     # Get profile
-    profile = db.query(GiverProfile).filter(
-        GiverProfile.user_id == current_user.id
-    ).first()
+    profile = await db.scalar(
+        select(GiverProfile).where(GiverProfile.user_id == current_user.id)
+    )
     
     if not profile:
         raise HTTPException(
@@ -297,28 +315,36 @@ def update_my_profile(
     for field, value in update_data.items():
         setattr(profile, field, value)
     
-    db.commit()
-    db.refresh(profile)
+    # Visibility and company name show on the leaderboard
+    await db.flush()
+    await refresh_leaderboard_entries(db, [profile.id])
+    response_cache.invalidate_on_commit(db, f"giver:{profile.id}", "leaderboard")
+    
+    await db.commit()
+    await db.refresh(profile)
     
     return profile
 
 
 @router.get("/profile/{user_id}", response_model=GiverProfileResponse)
-def get_profile_by_user_id(
+async def get_profile_by_user_id(
     user_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a public giver profile by user ID.
     
-    Only returns profiles that are marked as public.
+    Only returns profiles that are marked as public. Responses are cached
+    briefly and carry an ETag (see utils/response_cache.py).
     
     Args:
         user_id: User ID
+        request: Incoming request (injected)
         db: Database session (injected)
         
     Returns:
-        Public giver profile
+        Public giver profile (or 304 if the client's copy is current)
         
     Raises:
         HTTPException 404: If profile not found or not public
@@ -326,26 +352,32 @@ def get_profile_by_user_id(
     Example:
         GET /givers/profile/123
     """
-    profile = db.query(GiverProfile).filter(
-        GiverProfile.user_id == user_id,
-        GiverProfile.is_public == True
-    ).first()
-    
-    if not profile:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Public giver profile not found"
-        )
+    async def load():
+        profile = await db.scalar(select(GiverProfile).where(
+            GiverProfile.user_id == user_id,
+            GiverProfile.is_public == True
+        ))
+        
+        if not profile:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Public giver profile not found"
+            )
+        
+        return giver_profile_serializer.obj(profile), [f"giver:{profile.id}"]
     
-    return profile
+    return await response_cache.serve(request, load)
 
 
-@router.get("/profile/me/donations", response_model=DonationListResponse)
-def get_my_donations(
+@router.get("/profile/me/donations", response_model=DonationListResponse, response_class=FastJSONResponse)
+async def get_my_donations(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page (keyset pagination)"),
+    include_total: Optional[bool] = Query(None, description="Count the total (default: true for pages, false for cursors)"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    serializer: RowSerializer = Depends(donation_fields),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get the current user's donation history.
@@ -353,8 +385,11 @@ def get_my_donations(
     Returns a paginated list of all donations made by the current user.
     
     Args:
-        page: Page number (starts at 1)
+        page: Page number (starts at 1, ignored when cursor is given)
         page_size: Number of items per page (max 100)
+        cursor: Cursor from a previous page (keyset pagination)
+        include_total: Whether to count the total
+        serializer: Fields to return (from the fields parameter)
         current_user: Current authenticated user (injected)
         db: Database session (injected)
         
@@ -368,9 +403,11 @@ def get_my_donations(
         GET /givers/profile/me/donations?page=1&page_size=10
     """
     # Get user's giver profile
-    profile = db.query(GiverProfile).filter(
-        GiverProfile.user_id == current_user.id
-    ).first()
+    profile = await db.scalar(
+        select(GiverProfile)
+        .options(load_only(GiverProfile.id, GiverProfile.total_donated))
+        .where(GiverProfile.user_id == current_user.id)
+    )
     
     if not profile:
         raise HTTPException(
@@ -379,37 +416,42 @@ def get_my_donations(
         )
     
     # Build query for completed donations only
-    query = db.query(Donation).filter(
+    query = select(*serializer.select_columns(Donation.created_at, Donation.id)).where(
         Donation.giver_id == profile.id,
         Donation.payment_status == PaymentStatus.COMPLETED
     )
     
-    # Get total count and amount
-    total = query.count()
-    total_amount = db.query(func.sum(Donation.amount)).filter(
-        Donation.giver_id == profile.id,
-        Donation.payment_status == PaymentStatus.COMPLETED
-    ).scalar() or 0
+    # Total of completed donations (maintained on the profile)
+    total_amount = profile.total_donated
     
-    # Apply pagination
-    offset = (page - 1) * page_size
-    donations = query.order_by(desc(Donation.created_at)).offset(offset).limit(page_size).all()
+    # Fetch the page (and total count, if requested)
+    result = await paginate(
+        db, query, Donation,
+        page_size=page_size,
+        page=page,
+        cursor=cursor,
+        include_total=include_total
+    )
     
-    return {
-        "donations": donations,
-        "total": total,
+    return FastJSONResponse({
+        "donations": serializer.rows(result.items),
+        "total": result.total,
         "total_amount": total_amount,
-        "page": page,
-        "page_size": page_size
-    }
+        "page": page if cursor is None else None,
+        "page_size": page_size,
+        "next_cursor": result.next_cursor
+    })
 
 
-@router.get("/profile/{user_id}/donations", response_model=DonationListResponse)
-def get_public_donations(
+@router.get("/profile/{user_id}/donations", response_model=DonationListResponse, response_class=FastJSONResponse)
+async def get_public_donations(
     user_id: int,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page (keyset pagination)"),
+    include_total: Optional[bool] = Query(None, description="Count the total (default: true for pages, false for cursors)"),
+    serializer: RowSerializer = Depends(donation_fields),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get public donation history for a user.
@@ -418,8 +460,11 @@ def get_public_donations(
     
     Args:
         user_id: User ID
-        page: Page number (starts at 1)
+        page: Page number (starts at 1, ignored when cursor is given)
         page_size: Number of items per page (max 100)
+        cursor: Cursor from a previous page (keyset pagination)
+        include_total: Whether to count the total
+        serializer: Fields to return (from the fields parameter)
         db: Database session (injected)
         
     Returns:
@@ -432,10 +477,10 @@ def get_public_donations(
         GET /givers/profile/123/donations?page=1&page_size=10
     """
     # Get profile and check if public
-    profile = db.query(GiverProfile).filter(
+    profile = await db.scalar(select(GiverProfile).options(load_only(GiverProfile.id)).where(
         GiverProfile.user_id == user_id,
         GiverProfile.is_public == True
-    ).first()
+    ))
     
     if not profile:
         raise HTTPException(
@@ -444,89 +489,85 @@ def get_public_donations(
         )
     
     # Build query for public donations only (non-anonymous, completed)
-    query = db.query(Donation).filter(
+    query = select(*serializer.select_columns(Donation.created_at, Donation.id)).where(
         Donation.giver_id == profile.id,
         Donation.is_anonymous == False,
         Donation.payment_status == PaymentStatus.COMPLETED
     )
     
-    # Get total count and amount
-    total = query.count()
-    total_amount = db.query(func.sum(Donation.amount)).filter(
+    # Public total has no maintained aggregate, so sum in the database
+    total_amount = await db.scalar(select(func.sum(Donation.amount)).where(
         Donation.giver_id == profile.id,
         Donation.is_anonymous == False,
         Donation.payment_status == PaymentStatus.COMPLETED
-    ).scalar() or 0
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    donations = query.order_by(desc(Donation.created_at)).offset(offset).limit(page_size).all()
+    )) or Decimal("0.00")
+    
+    # Fetch the page (and total count, if requested)
+    result = await paginate(
+        db, query, Donation,
+        page_size=page_size,
+        page=page,
+        cursor=cursor,
+        include_total=include_total
+    )
     
-    return {
-        "donations": donations,
-        "total": total,
+    return FastJSONResponse({
+        "donations": serializer.rows(result.items),
+        "total": result.total,
         "total_amount": total_amount,
-        "page": page,
-        "page_size": page_size
-    }
+        "page": page if cursor is None else None,
+        "page_size": page_size,
+        "next_cursor": result.next_cursor
+    })
 
 
 @router.get("/leaderboard")
-def get_giving_leaderboard(
+async def get_giving_leaderboard(
+    request: Request,
     limit: int = Query(10, ge=1, le=100, description="Number of top givers"),
     profile_type: Optional[ProfileType] = Query(None, description="Filter by profile type"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get the top givers leaderboard.
     
     Returns a list of top donors ranked by total donated amount.
-    Only includes users with public profiles.
+    Only includes users with public profiles. Served from the
+    materialized leaderboard_entries table (see utils/leaderboard.py),
+    and cached briefly with an ETag (see utils/response_cache.py).
     
     Args:
+        request: Incoming request (injected)
         limit: Number of top givers to return (max 100)
         profile_type: Optional filter by individual or company
         db: Database session (injected)
         
     Returns:
-        List of top givers with their statistics
+        List of top givers with their statistics (or 304 if the client's copy is current)
         
     Example:
         GET /givers/leaderboard?limit=10&profile_type=individual
     """
-    # Build query
-    query = db.query(
-        GiverProfile,
-        User.username,
-        User.full_name
-    ).join(
-        User, GiverProfile.user_id == User.id
-    ).filter(
-        GiverProfile.is_public == True,
-        GiverProfile.total_donated > 0
-    )
+    async def load():
+        # Read the materialized leaderboard (kept current on each donation)
+        top_givers = await get_leaderboard(db, limit, profile_type)
+        
+        # Format response
+        leaderboard = []
+        for rank, entry in enumerate(top_givers, start=1):
+            leaderboard.append({
+                "rank": rank,
+                "username": entry.username,
+                "full_name": entry.full_name,
+                "profile_type": entry.profile_type,
+                "company_name": entry.company_name,
+                "total_donated": float(entry.total_donated),
+                "donation_count": entry.donation_count
+            })
+        
+        return {
+            "leaderboard": leaderboard,
+            "limit": limit
+        }, ["leaderboard"]
     
-    # Apply profile type filter if provided
-    if profile_type:
-        query = query.filter(GiverProfile.profile_type == profile_type)
-    
-    # Order by total donated and limit
-    top_givers = query.order_by(desc(GiverProfile.total_donated)).limit(limit).all()
-    
-    # Format response
-    leaderboard = []
-    for rank, (profile, username, full_name) in enumerate(top_givers, start=1):
-        leaderboard.append({
-            "rank": rank,
-            "username": username,
-            "full_name": full_name,
-            "profile_type": profile.profile_type,
-            "company_name": profile.company_name,
-            "total_donated": float(profile.total_donated),
-            "donation_count": profile.donation_count
-        })
-    
-    return {
-        "leaderboard": leaderboard,
-        "limit": limit
-    }
\ No newline at end of file
+    return await response_cache.serve(request, load)
\ No newline at end of file
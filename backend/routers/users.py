@@ -7,12 +7,15 @@ This module contains all user profile-related endpoints:
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from models import User, GiverProfile
 from schemas import UserResponse, UserUpdate
 from auth import get_current_active_user
+from utils.leaderboard import refresh_leaderboard_entries
+from utils.response_cache import response_cache
 
 # Create router with prefix and tags
 router = APIRouter(
@@ -22,9 +25,9 @@ router = APIRouter(
 
 
 @router.get("/me", response_model=UserResponse)
-def get_my_user_profile(
+async def get_my_user_profile(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get the current user's profile information.
@@ -49,10 +52,10 @@ def get_my_user_profile(
 
 
 @router.put("/me", response_model=UserResponse)
-def update_my_user_profile(
+async def update_my_user_profile(
     profile_data: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update the current user's profile information.
@@ -87,10 +90,10 @@ def update_my_user_profile(
     
     # Check if email is being updated to an existing email
     if 'email' in update_data and update_data['email'] != current_user.email:
-        existing_user = db.query(User).filter(
+        existing_user = await db.scalar(select(User).where(
             User.email == update_data['email'],
             User.id != current_user.id
-        ).first()
+        ))
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -101,16 +104,26 @@ def update_my_user_profile(
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    # Names are copied onto the materialized leaderboard
+    if 'full_name' in update_data:
+        await db.flush()
+        giver_id = await db.scalar(
+            select(GiverProfile.id).where(GiverProfile.user_id == current_user.id)
+        )
+        if giver_id:
+            await refresh_leaderboard_entries(db, [giver_id])
+            response_cache.invalidate_on_commit(db, "leaderboard")
+    
+    await db.commit()
+    await db.refresh(current_user)
     
     return current_user
 
 
 @router.get("/me/stats")
-def get_my_user_stats(
+async def get_my_user_stats(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get the current user's statistics.
@@ -131,9 +144,9 @@ def get_my_user_stats(
         GET /users/me/stats
     """
     # Get giver profile for donation stats
-    giver_profile = db.query(GiverProfile).filter(
-        GiverProfile.user_id == current_user.id
-    ).first()
+    giver_profile = await db.scalar(
+        select(GiverProfile).where(GiverProfile.user_id == current_user.id)
+    )
     
     if not giver_profile:
         return {
@@ -5,11 +5,12 @@ These schemas define the structure of data coming in (requests)
 and going out (responses) of the API endpoints.
 """
 
+import enum
 from pydantic import BaseModel, EmailStr, Field, field_validator, ConfigDict
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, List
 from decimal import Decimal
-from models import CampaignType, CampaignStatus, ProfileType, PaymentStatus
+from models import CampaignType, CampaignStatus, ProfileType, PaymentStatus, StatsPeriod
 
 
 # ==================== USER SCHEMAS ====================
@@ -168,6 +169,13 @@ class UserUpdate(BaseModel):
 
 # ==================== CAMPAIGN SCHEMAS ====================
 
+def utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert a datetime to naive UTC, the way campaign dates are stored (naive values are taken as UTC)."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 class CampaignCreate(BaseModel):
     """
     Schema for creating a new campaign.
@@ -190,6 +198,12 @@ class CampaignCreate(BaseModel):
     end_date: Optional[datetime] = Field(None, description="Campaign end date")
     image_url: Optional[str] = Field(None, max_length=500, description="Campaign image URL")
     
+    @field_validator('start_date', 'end_date')
+    @classmethod
+    def dates_to_utc(cls, v):
+        """Store dates as UTC (the lifecycle scheduler compares them with UTC now)."""
+        return utc_naive(v)
+    
     model_config = ConfigDict(json_schema_extra = {
             "example": {
                 "title": "Help Build a Community Centre",
@@ -217,6 +231,12 @@ class CampaignUpdate(BaseModel):
     end_date: Optional[datetime] = None
     image_url: Optional[str] = Field(None, max_length=500)
     
+    @field_validator('start_date', 'end_date')
+    @classmethod
+    def dates_to_utc(cls, v):
+        """Store dates as UTC (the lifecycle scheduler compares them with UTC now)."""
+        return utc_naive(v)
+    
     model_config = ConfigDict(json_schema_extra = {
             "example": {
                 "title": "Updated Campaign Title",
@@ -261,23 +281,82 @@ class CampaignResponse(BaseModel):
 class CampaignListResponse(BaseModel):
     """
     Schema for paginated list of campaigns.
+
+    total is None when it wasn't counted (cursor pagination by default),
+    and page is None for cursor pagination. next_cursor is None on the
+    last page.
     """
     campaigns: List[CampaignResponse]
-    total: int
-    page: int
+    total: Optional[int]
+    page: Optional[int]
     page_size: int
+    next_cursor: Optional[str] = None
     
     model_config = ConfigDict(json_schema_extra = {
             "example": {
                 "campaigns": [],
                 "total": 100,
                 "page": 1,
-                "page_size": 10
+                "page_size": 10,
+                "next_cursor": "MjAyNS0xMS0wNVQxMDozMDowMHw0Mg"
+            }
+        }
+    )
+
+
+class CampaignSearchResponse(BaseModel):
+    """
+    Schema for a page of campaign search results, best match first.
+
+    There is no total or page number: search is paged with next_cursor
+    only, which is None on the last page.
+    """
+    campaigns: List[CampaignResponse]
+    page_size: int
+    next_cursor: Optional[str] = None
+    
+    model_config = ConfigDict(json_schema_extra = {
+            "example": {
+                "campaigns": [],
+                "page_size": 10,
+                "next_cursor": "MC40MjUxMzM3fDQy"
             }
         }
     )
 
 
+class CampaignStatsBucketResponse(BaseModel):
+    """
+    Schema for one hour or day of completed donations to a campaign.
+    """
+    start: datetime = Field(..., description="Start of the hour or day (UTC)")
+    donation_count: int
+    amount: Decimal
+    anonymous_count: int
+    anonymous_amount: Decimal
+
+
+class CampaignStatsResponse(BaseModel):
+    """
+    Schema for a campaign's donation statistics.
+
+    Totals cover every completed donation to the campaign; buckets cover
+    [since, until) and skip hours or days without completed donations.
+    """
+    campaign_id: int
+    donation_count: int
+    total_amount: Decimal
+    average_gift: Decimal
+    unique_givers: int
+    anonymous_count: int
+    anonymous_amount: Decimal
+    anonymous_share: float = Field(..., description="Fraction of donations made anonymously (0 to 1)")
+    period: StatsPeriod
+    since: datetime
+    until: datetime
+    buckets: List[CampaignStatsBucketResponse]
+
+
 # ==================== GIVER PROFILE SCHEMAS ====================
 
 class GiverProfileCreate(BaseModel):
@@ -363,6 +442,10 @@ class GiverProfileResponse(BaseModel):
 
 # ==================== DONATION SCHEMAS ====================
 
+# Largest amount donations.amount (Numeric(10, 2)) can hold
+MAX_DONATION_AMOUNT = Decimal("99999999.99")
+
+
 class DonationCreate(BaseModel):
     """
     Schema for creating a donation.
@@ -370,7 +453,13 @@ class DonationCreate(BaseModel):
     Used when a donor makes a contribution to a campaign.
     """
     campaign_id: int = Field(..., description="Campaign to donate to")
-    amount: Decimal = Field(..., gt=0, description="Donation amount")
+    amount: Decimal = Field(
+        ...,
+        gt=0,
+        le=MAX_DONATION_AMOUNT,
+        decimal_places=2,
+        description="Donation amount"
+    )
     currency: str = Field(default="GBP", max_length=3, description="Currency code")
     is_anonymous: bool = Field(
         default=False,
@@ -416,12 +505,17 @@ class DonationResponse(BaseModel):
 class DonationListResponse(BaseModel):
     """
     Schema for paginated list of donations.
+
+    total is None when it wasn't counted (cursor pagination by default),
+    and page is None for cursor pagination. next_cursor is None on the
+    last page.
     """
     donations: List[DonationResponse]
-    total: int
+    total: Optional[int]
     total_amount: Decimal
-    page: int
+    page: Optional[int]
     page_size: int
+    next_cursor: Optional[str] = None
     
     model_config = ConfigDict(json_schema_extra = {
             "example": {
@@ -429,7 +523,108 @@ class DonationListResponse(BaseModel):
                 "total": 50,
                 "total_amount": 2500.00,
                 "page": 1,
-                "page_size": 10
+                "page_size": 10,
+                "next_cursor": "MjAyNS0xMS0wNVQxMDozMDowMHw0Mg"
             }
         }
-    )
\ No newline at end of file
+    )
+
+
+# Largest number of status updates accepted in one batch request
+MAX_STATUS_BATCH_SIZE = 5000
+
+
+class DonationStatusUpdate(BaseModel):
+    """
+    Schema for one status change in a batch status update.
+    """
+    donation_id: int = Field(..., description="Donation to update")
+    payment_status: PaymentStatus = Field(..., description="New payment status")
+    payment_intent_id: Optional[str] = Field(
+        None,
+        max_length=255,
+        description="Optional Stripe payment intent ID"
+    )
+
+
+class DonationBatchStatusUpdate(BaseModel):
+    """
+    Schema for a batch of donation status updates.
+    
+    Used by payment reconciliation to settle many donations in one
+    request and one transaction.
+    """
+    updates: List[DonationStatusUpdate] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_STATUS_BATCH_SIZE,
+        description=f"Status changes to apply (max {MAX_STATUS_BATCH_SIZE})"
+    )
+    
+    model_config = ConfigDict(json_schema_extra = {
+            "example": {
+                "updates": [
+                    {"donation_id": 1, "payment_status": "completed", "payment_intent_id": "pi_123"},
+                    {"donation_id": 2, "payment_status": "failed"}
+                ]
+            }
+        }
+    )
+
+
+class StatusUpdateOutcome(str, enum.Enum):
+    """Outcome of one item in a batch status update."""
+    UPDATED = "updated"        # Status (or payment intent) changed
+    UNCHANGED = "unchanged"    # Already in the requested state
+    NOT_FOUND = "not_found"    # No such donation
+    FORBIDDEN = "forbidden"    # Donation belongs to another giver
+    DUPLICATE = "duplicate"    # Donation already listed earlier in the batch
+
+
+class DonationStatusResult(BaseModel):
+    """
+    Schema for the result of one item in a batch status update.
+    
+    payment_status is the donation's status after the batch, or None for
+    items that weren't applied (not found, forbidden or duplicate).
+    """
+    donation_id: int
+    outcome: StatusUpdateOutcome
+    payment_status: Optional[PaymentStatus] = None
+
+
+class DonationBatchStatusResponse(BaseModel):
+    """
+    Schema for the response to a batch status update.
+    
+    Results are in the same order as the requested updates.
+    """
+    results: List[DonationStatusResult]
+    updated: int = Field(..., description="Number of donations changed")
+    failed: int = Field(..., description="Number of items not applied (not found, forbidden or duplicate)")
+
+
+class QueuedDonationStatus(str, enum.Enum):
+    """State of a donation accepted through the buffered intake queue."""
+    QUEUED = "queued"      # Waiting to be written to the database
+    CREATED = "created"    # Written; donation_id is set
+    REJECTED = "rejected"  # Couldn't be written (e.g. campaign not active); see error
+
+
+class QueuedDonationResponse(BaseModel):
+    """
+    Schema for a donation accepted through the buffered intake queue.
+    
+    The ticket identifies the request until the donation is written, at
+    which point donation_id is set.
+    """
+    ticket: str
+    status: QueuedDonationStatus
+    campaign_id: int
+    amount: Decimal
+    currency: str
+    queued_at: datetime
+    donation_id: Optional[int] = None
+    error: Optional[str] = None
+    
+    model_config = ConfigDict(from_attributes=True)
@@ -5,24 +5,54 @@ This file provides reusable test fixtures for database, test client,
 and authenticated sessions.
 """
 
+import os
+
+# Use test-environment engine defaults (no SQL echo, no pre-ping)
+os.environ.setdefault("ENVIRONMENT", "test")
+# Don't run the counter shard fold loop against the real database
+os.environ.setdefault("COUNTER_FOLD_INTERVAL", "0")
+# Nor the live stream poll loop
+os.environ.setdefault("STREAM_POLL_INTERVAL", "0")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
-from database import Base, get_db
+from database import Base, get_db, get_async_database_url
 from main import app
+from routers import auth as auth_router
+from utils.campaign_lifecycle import campaign_scheduler
+from utils.live_totals import live_totals
+from utils.principal_cache import principal_cache
+from utils.response_cache import response_cache
 
 # Use in-memory SQLite database for tests
 SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
 
-# Create test engine
+# Create test engine (sync - used for schema setup and direct test queries)
 engine = create_engine(
     SQLALCHEMY_TEST_DATABASE_URL,
     connect_args={"check_same_thread": False}
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on the same database, used by the app under test
+# NullPool because TestClient may run each test on a fresh event loop
+async_engine = create_async_engine(
+    get_async_database_url(SQLALCHEMY_TEST_DATABASE_URL),
+    poolclass=NullPool
+)
+# Lazy loads fail tests, so N+1 queries are caught (see database.raise_on_lazy_load)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+    info={"raise_on_lazy_load": True}
+)
+
 
 @pytest.fixture()
 def db():
@@ -54,22 +84,35 @@ def client(db):
     instead of the production database.
     Disables rate limiting for tests.
     """
-    def override_get_db():
-        try:
-            yield db
-        finally:
-            pass
+    async def override_get_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
 
     app.dependency_overrides[get_db] = override_get_db
+    # Live stream totals are read outside requests, so point them at the test database too
+    session_factory = live_totals.session_factory
+    live_totals.session_factory = TestingAsyncSessionLocal
+    # The lifecycle scheduler also reads and writes campaigns outside requests
+    scheduler_session_factory = campaign_scheduler.session_factory
+    campaign_scheduler.session_factory = TestingAsyncSessionLocal
 
     # Disable rate limiting during tests
+    # The auth router has its own limiter instance, so disable both
     app.state.limiter.enabled = False
+    auth_router.limiter.enabled = False
 
     with TestClient(app) as test_client:
         yield test_client
 
     # Clean up
+    # Cached users and responses would outlive the dropped tables (and reused IDs)
+    principal_cache.clear()
+    response_cache.clear()
+    live_totals.clear()
+    live_totals.session_factory = session_factory
+    campaign_scheduler.session_factory = scheduler_session_factory
     app.state.limiter.enabled = True
+    auth_router.limiter.enabled = True
     app.dependency_overrides.clear()
 
 
@@ -0,0 +1,221 @@
+"""
+Tests for bulk export and import (utils/bulk_data.py).
+"""
+
+import csv
+import json
+from decimal import Decimal
+
+import pytest
+
+from models import Donation, PaymentStatus
+from tests.conftest import engine
+from tests.test_donations import active_campaign, donate
+from utils import bulk_data
+from utils.bulk_data import BulkDataError, Checkpoint, export_table, import_table
+
+
+@pytest.fixture()
+def donations(authenticated_client, active_campaign):
+    """Create a mix of completed and pending donations, one with a multi-line message."""
+    donate(authenticated_client, active_campaign, "10.00", message="Good luck,\n\"team\"")
+    donate(authenticated_client, active_campaign, "20.50")
+    donate(authenticated_client, active_campaign, "5.25", status="pending")
+    return active_campaign
+
+
+def export(path, fmt, **kwargs):
+    with engine.connect() as conn:
+        return export_table(conn, "donations", str(path), fmt, **kwargs)
+
+
+def reimport(db, path, fmt, **kwargs):
+    """Delete the donations and import them back from path."""
+    before = db.query(Donation).order_by(Donation.id).all()
+    expected = [(d.id, d.amount, d.payment_status, d.message, d.created_at) for d in before]
+    db.query(Donation).delete()
+    db.commit()
+
+    count = import_table(engine, "donations", str(path), fmt, **kwargs)
+
+    db.expire_all()
+    after = [(d.id, d.amount, d.payment_status, d.message, d.created_at)
+             for d in db.query(Donation).order_by(Donation.id)]
+    return count, expected, after
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_export_import_roundtrip(donations, db, tmp_path, fmt):
+    """Test that exported donations import back unchanged."""
+    path = tmp_path / f"donations.{fmt}"
+    assert export(path, fmt) == 3
+
+    count, expected, after = reimport(db, path, fmt, batch_size=2)
+
+    assert count == 3
+    assert after == expected
+    assert after[0][3] == "Good luck,\n\"team\""
+
+
+def test_export_values_and_filters(donations, tmp_path):
+    """Test the exported value formats and the status filter."""
+    path = tmp_path / "completed.ndjson"
+    assert export(path, "ndjson", status="completed") == 2
+
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [row["amount"] for row in rows] == ["10.00", "20.50"]
+    assert {row["payment_status"] for row in rows} == {"completed"}
+    assert rows[0]["created_at"].startswith("20")
+
+    assert export(tmp_path / "other.csv", "csv", campaign_id=999) == 0
+    with open(tmp_path / "other.csv", newline="") as f:
+        assert next(csv.reader(f))[0] == "id"
+
+
+def test_export_reports_progress_per_batch(donations, tmp_path):
+    """Test that export streams in batches of batch_size."""
+    seen = []
+    export(tmp_path / "donations.csv", "csv", batch_size=2, progress=seen.append)
+    assert seen == [2, 3]
+
+
+def test_import_resumes_from_checkpoint(donations, db, tmp_path, monkeypatch):
+    """Test that an interrupted import continues after the last committed batch."""
+    path = tmp_path / "donations.csv"
+    checkpoint = str(tmp_path / "donations.csv.checkpoint")
+    export(path, "csv")
+    db.query(Donation).delete()
+    db.commit()
+
+    saved = Checkpoint.save
+
+    def save_then_fail(self, checkpoint_path):
+        saved(self, checkpoint_path)
+        if self.rows >= 2:
+            raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Checkpoint, "save", save_then_fail)
+        with pytest.raises(KeyboardInterrupt):
+            import_table(engine, "donations", str(path), "csv", batch_size=2, checkpoint_path=checkpoint)
+
+    assert db.query(Donation).count() == 2
+    assert Checkpoint.load(checkpoint).rows == 2
+
+    assert import_table(engine, "donations", str(path), "csv", batch_size=2, checkpoint_path=checkpoint) == 3
+    assert db.query(Donation).count() == 3
+    assert Checkpoint.load(checkpoint) is None
+
+
+def test_import_skips_batch_committed_before_checkpoint(donations, db, tmp_path, monkeypatch):
+    """Test that a crash between commit and checkpoint doesn't duplicate the batch."""
+    path = tmp_path / "donations.ndjson"
+    checkpoint = str(tmp_path / "donations.checkpoint")
+    export(path, "ndjson")
+    db.query(Donation).delete()
+    db.commit()
+
+    saved = Checkpoint.save
+
+    def fail_after_first(self, checkpoint_path):
+        if self.rows > 1:
+            raise KeyboardInterrupt
+        saved(self, checkpoint_path)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Checkpoint, "save", fail_after_first)
+        with pytest.raises(KeyboardInterrupt):
+            import_table(engine, "donations", str(path), "ndjson", batch_size=1, checkpoint_path=checkpoint)
+
+    # Second row committed, but the checkpoint still says one
+    assert db.query(Donation).count() == 2
+    assert import_table(engine, "donations", str(path), "ndjson", batch_size=1, checkpoint_path=checkpoint) == 3
+    assert db.query(Donation).count() == 3
+
+
+def test_import_refuses_checkpoint_for_other_file(donations, db, tmp_path, monkeypatch):
+    """Test that a checkpoint only resumes the file it was made for, wherever that file is now."""
+    path = tmp_path / "donations.csv"
+    checkpoint = str(tmp_path / "import.checkpoint")
+    export(path, "csv")
+    db.query(Donation).delete()
+    db.commit()
+    monkeypatch.setattr(bulk_data, "FINGERPRINT_BYTES", 16)
+
+    saved = Checkpoint.save
+
+    def save_then_fail(self, checkpoint_path):
+        saved(self, checkpoint_path)
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Checkpoint, "save", save_then_fail)
+        with pytest.raises(KeyboardInterrupt):
+            import_table(engine, "donations", str(path), "csv", batch_size=2, checkpoint_path=checkpoint)
+
+    # Same size and table, different contents (e.g. a fresh export to the same name)
+    other = tmp_path / "other.csv"
+    other.write_text(path.read_text().replace("10.00", "90.00"))
+    with pytest.raises(BulkDataError, match="delete it to start over"):
+        import_table(engine, "donations", str(other), "csv", checkpoint_path=checkpoint)
+    with pytest.raises(BulkDataError):
+        import_table(engine, "campaigns", str(path), "csv", checkpoint_path=checkpoint)
+
+    # The same file under another name resumes
+    moved = tmp_path / "moved.csv"
+    path.rename(moved)
+    assert import_table(engine, "donations", str(moved), "csv", batch_size=2, checkpoint_path=checkpoint) == 3
+    assert db.query(Donation).count() == 3
+
+
+def test_import_limits_parameters_per_insert(donations, db, tmp_path, monkeypatch):
+    """Test that batches are capped to stay under the parameter limit."""
+    path = tmp_path / "donations.csv"
+    export(path, "csv")
+    monkeypatch.setattr(bulk_data, "MAX_PARAMETERS", len(Donation.__table__.columns) * 2)
+
+    seen = []
+    count, expected, after = reimport(db, path, "csv", batch_size=1000, progress=seen.append)
+
+    assert seen == [2, 3]
+    assert after == expected
+
+
+def test_import_rejects_unknown_columns(db, tmp_path):
+    """Test that a file with columns the table lacks is refused before inserting."""
+    path = tmp_path / "donations.csv"
+    path.write_text("id,amount,tip\n1,5.00,1.00\n")
+
+    with pytest.raises(BulkDataError, match="tip"):
+        import_table(engine, "donations", str(path), "csv")
+
+
+def test_enum_names_are_accepted(donations, db, tmp_path):
+    """Test that enums import from their stored names as well as their values."""
+    giver_id = db.query(Donation).first().giver_id
+    db.query(Donation).delete()
+    db.commit()
+
+    path = tmp_path / "donations.ndjson"
+    rows = [
+        {"amount": "3.00", "campaign_id": donations, "giver_id": giver_id, "payment_status": "COMPLETED"},
+        {"amount": "4.00", "campaign_id": donations, "giver_id": giver_id, "payment_status": "refunded"},
+    ]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+    assert import_table(engine, "donations", str(path), "ndjson") == 2
+    imported = db.query(Donation).order_by(Donation.id).all()
+    assert [d.payment_status for d in imported] == [PaymentStatus.COMPLETED, PaymentStatus.REFUNDED]
+    assert imported[0].amount == Decimal("3.00")
+
+
+def test_parquet_roundtrip(donations, db, tmp_path):
+    """Test that Parquet exports import back unchanged."""
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "donations.parquet"
+    assert export(path, "parquet", batch_size=2) == 3
+
+    count, expected, after = reimport(db, path, "parquet", batch_size=2)
+
+    assert count == 3
+    assert after == expected
@@ -0,0 +1,277 @@
+"""
+Tests for the cache backends, the Redis-protocol stand-in and single-flight.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from sqlalchemy import event
+from starlette.requests import Request
+
+from main import app
+from models import User
+from tests.conftest import async_engine
+from tests.test_donations import active_campaign
+from utils.cache import MemoryBackend, RedisBackend, SingleFlight, create_backend
+from utils.principal_cache import PrincipalCache
+from utils.resp_server import RespServer
+from utils.response_cache import ResponseCache, response_cache
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_request(path="/campaigns/1"):
+    """Build a bare GET request for unit tests."""
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+
+async def start_server(clock=time.monotonic):
+    """Start a stand-in server on a free port."""
+    server = RespServer(clock=clock)
+    port = await server.start(port=0)
+    return server, port
+
+
+def test_memory_backend_ttl_and_tags():
+    """Test expiry, deletion and tag invalidation in process."""
+    clock = FakeClock()
+    backend = MemoryBackend(clock=clock)
+
+    async def run():
+        await backend.set("campaign:1", "a", ttl=10, tags=["campaign:1"])
+        await backend.set("campaigns?page=1", "b", ttl=10, tags=["campaigns"])
+        await backend.set("other", "c", ttl=10)
+
+        await backend.invalidate_tags("campaign:1")
+        await backend.delete("other")
+        results = [await backend.get(key) for key in ("campaign:1", "campaigns?page=1", "other")]
+
+        clock.now = 10
+        return results, await backend.get("campaigns?page=1")
+
+    results, expired = asyncio.run(run())
+
+    assert results == [None, "b", None]
+    assert expired is None
+
+
+def test_redis_backend_against_stand_in():
+    """Test get/set/delete, expiry and tags over the Redis protocol."""
+    clock = FakeClock()
+
+    async def run():
+        server, port = await start_server(clock)
+        backend = RedisBackend(port=port, db=1)
+        try:
+            await backend.set("campaign:1", "a", ttl=10, tags=["campaign:1", "campaigns"])
+            await backend.set("campaign:2", "b", ttl=10, tags=["campaign:2", "campaigns"])
+            await backend.set("plain", "c", ttl=10)
+            first = [await backend.get(key) for key in ("campaign:1", "campaign:2", "plain", "missing")]
+
+            await backend.invalidate_tags("campaign:1")
+            await backend.delete("plain")
+            second = [await backend.get(key) for key in ("campaign:1", "campaign:2", "plain")]
+
+            clock.now = 10
+            expired = await backend.get("campaign:2")
+            return first, second, expired
+        finally:
+            await backend.close()
+            await server.stop()
+
+    first, second, expired = asyncio.run(run())
+
+    assert first == ["a", "b", "c", None]
+    assert second == [None, "b", None]
+    assert expired is None
+
+
+def test_redis_backend_shared_between_workers():
+    """Test that two connections (two workers) see each other's entries and invalidations."""
+    async def run():
+        server, port = await start_server()
+        workers = [RedisBackend(port=port), RedisBackend(port=port)]
+        try:
+            await workers[0].set("campaign:1", "rendered", ttl=30, tags=["campaign:1"])
+            seen = await workers[1].get("campaign:1")
+            await workers[1].invalidate_tags("campaign:1")
+            return seen, await workers[0].get("campaign:1")
+        finally:
+            for worker in workers:
+                await worker.close()
+            await server.stop()
+
+    assert asyncio.run(run()) == ("rendered", None)
+
+
+def test_unreachable_server_is_a_miss():
+    """Test that a cache server being down doesn't fail the caller."""
+    async def run():
+        server, port = await start_server()
+        await server.stop()
+        backend = RedisBackend(port=port, timeout=0.2)
+        await backend.set("key", "value", ttl=30, tags=["tag"])
+        await backend.invalidate_tags("tag")
+        return await backend.get("key"), backend.errors
+
+    value, errors = asyncio.run(run())
+
+    assert value is None
+    assert errors == 3
+
+
+def test_create_backend_from_url():
+    """Test CACHE_URL parsing."""
+    backend = create_backend("redis://cache.internal:6390/2")
+
+    assert create_backend(None) is None
+    assert isinstance(create_backend("memory://"), MemoryBackend)
+    assert (backend.host, backend.port, backend.db) == ("cache.internal", 6390, 2)
+    with pytest.raises(ValueError):
+        create_backend("memcached://localhost")
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    """Test that concurrent loads of one key run once and share the result."""
+    flight = SingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"id": 1}
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("campaign:1", load) for _ in range(20)))
+        await flight.do("campaign:1", load)  # Not in flight any more, so loads again
+        return results
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 2
+    assert all(result == {"id": 1} for result in results)
+    assert flight.coalesced == 19
+
+
+def test_single_flight_shares_errors():
+    """Test that a failed load fails every waiter, and isn't remembered."""
+    flight = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.01)
+        raise LookupError("not found")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("campaign:1", load) for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, LookupError) for result in results)
+    assert flight._calls == {}
+
+
+def test_single_flight_survives_cancelled_leader():
+    """Test that waiters take over when the caller running the load goes away."""
+    flight = SingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "loaded"
+
+    async def run():
+        leader = asyncio.create_task(flight.do("key", load))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", load))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "loaded"
+    assert len(calls) == 2
+
+
+def test_cold_campaign_is_loaded_once(client, active_campaign):
+    """Test that a burst of requests for an uncached campaign runs one query."""
+    queries = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM campaigns" in statement:
+            queries.append(statement)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(http.get(f"/campaigns/{active_campaign}") for _ in range(20)))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        responses = asyncio.run(run())
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    assert all(response.status_code == 200 for response in responses)
+    assert len({response.content for response in responses}) == 1
+    assert len(queries) == 1
+    assert response_cache.status()["coalesced"] == 19
+
+
+def test_response_cache_shared_between_workers():
+    """Test that a response rendered by one worker is served by another."""
+    async def run():
+        server, port = await start_server()
+        backends = [RedisBackend(port=port), RedisBackend(port=port)]
+        workers = [ResponseCache(ttl=30, max_size=10, backend=backend) for backend in backends]
+        loads = []
+
+        async def load():
+            loads.append(1)
+            return {"id": 1}, ["campaign:1"]
+
+        try:
+            await workers[0].serve(make_request(), load)
+            shared = await workers[1].serve(make_request(), load)
+
+            # A write in the first worker reaches the shared backend
+            workers[0].invalidate("campaign:1")
+            await asyncio.sleep(0.05)
+            workers[1].local.clear()
+            await workers[1].serve(make_request(), load)
+            return shared.headers["X-Cache"], len(loads)
+        finally:
+            for backend in backends:
+                await backend.close()
+            await server.stop()
+
+    assert asyncio.run(run()) == ("HIT", 2)
+
+
+def test_principal_cache_over_redis_protocol():
+    """Test that principal snapshots round-trip through the stand-in server."""
+    user = User(id=7, username="alice", email="alice@example.com", hashed_password="secret", is_active=True)
+
+    async def run():
+        server, port = await start_server()
+        backend = RedisBackend(port=port)
+        try:
+            await PrincipalCache(ttl=30, max_size=10, backend=backend).set("alice", user)
+            return await PrincipalCache(ttl=30, max_size=10, backend=backend).get("alice")
+        finally:
+            await backend.close()
+            await server.stop()
+
+    snapshot = asyncio.run(run())
+
+    assert snapshot["id"] == 7
+    assert "hashed_password" not in snapshot
@@ -0,0 +1,150 @@
+"""
+Tests for the campaign lifecycle scheduler (start_date/end_date transitions).
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+
+from models import Campaign, CampaignStatus, User
+from tests.conftest import TestingAsyncSessionLocal
+from tests.test_loading import count_statements
+from utils.campaign_lifecycle import CampaignScheduler, apply_transitions, campaign_scheduler, utc_now
+
+
+@pytest.fixture()
+def make_campaign(db):
+    """Create campaigns directly in the database, returning their IDs."""
+    user = User(email="lifecycle@example.com", username="lifecycle", hashed_password="not-a-real-hash")
+    db.add(user)
+    db.commit()
+
+    def make(status, start=None, end=None):
+        campaign = Campaign(
+            title="Scheduled campaign", description="Campaign with start and end dates",
+            status=status, start_date=start, end_date=end, creator_id=user.id
+        )
+        db.add(campaign)
+        db.commit()
+        return campaign.id
+    return make
+
+
+def statuses(db, ids):
+    db.expire_all()
+    return {campaign_id: db.get(Campaign, campaign_id).status for campaign_id in ids}
+
+
+def transitions(now, batch_size=500):
+    async def run():
+        async with TestingAsyncSessionLocal() as session:
+            return await apply_transitions(session, now, batch_size)
+    return asyncio.run(run())
+
+
+def test_due_campaigns_start_and_end(db, make_campaign):
+    """Test which campaigns move, and that running again changes nothing."""
+    now = utc_now()
+    hour = timedelta(hours=1)
+    ids = {
+        "starts": make_campaign(CampaignStatus.DRAFT, start=now - hour, end=now + hour),
+        "starts_open_ended": make_campaign(CampaignStatus.DRAFT, start=now - hour),
+        "not_yet": make_campaign(CampaignStatus.DRAFT, start=now + hour),
+        "missed": make_campaign(CampaignStatus.DRAFT, start=now - 2 * hour, end=now - hour),
+        "undated_draft": make_campaign(CampaignStatus.DRAFT),
+        "ends": make_campaign(CampaignStatus.ACTIVE, end=now - hour),
+        "running": make_campaign(CampaignStatus.ACTIVE, start=now - hour, end=now + hour),
+        "cancelled": make_campaign(CampaignStatus.CANCELLED, start=now - hour, end=now - hour),
+    }
+
+    assert transitions(now) == {"started": 2, "completed": 1}
+    assert statuses(db, ids.values()) == {
+        ids["starts"]: CampaignStatus.ACTIVE,
+        ids["starts_open_ended"]: CampaignStatus.ACTIVE,
+        ids["not_yet"]: CampaignStatus.DRAFT,
+        ids["missed"]: CampaignStatus.DRAFT,
+        ids["undated_draft"]: CampaignStatus.DRAFT,
+        ids["ends"]: CampaignStatus.COMPLETED,
+        ids["running"]: CampaignStatus.ACTIVE,
+        ids["cancelled"]: CampaignStatus.CANCELLED,
+    }
+
+    # Already moved: another worker waking for the same dates is a no-op
+    assert transitions(now) == {"started": 0, "completed": 0}
+    # Later on, the running campaigns end and the next draft starts
+    assert transitions(now + 2 * hour) == {"started": 1, "completed": 2}
+
+
+def test_transitions_are_batched_and_idempotent_across_workers(db, make_campaign):
+    """Test one UPDATE per batch, and that concurrent workers move each campaign once."""
+    now = utc_now()
+    ids = [make_campaign(CampaignStatus.DRAFT, start=now - timedelta(minutes=i)) for i in range(5)]
+
+    counts, statements = count_statements(lambda: transitions(now, batch_size=2))
+    assert counts == {"started": 5, "completed": 0}
+    assert sum(statement.startswith("UPDATE campaigns") for statement in statements) == 3
+    assert set(statuses(db, ids).values()) == {CampaignStatus.ACTIVE}
+
+    ids = [make_campaign(CampaignStatus.ACTIVE, end=now - timedelta(minutes=i)) for i in range(6)]
+
+    async def two_workers():
+        async def worker():
+            async with TestingAsyncSessionLocal() as session:
+                return await apply_transitions(session, now, 2)
+        return await asyncio.gather(worker(), worker())
+
+    moved = [counts["completed"] for counts in asyncio.run(two_workers())]
+    assert sum(moved) == 6
+    assert set(statuses(db, ids).values()) == {CampaignStatus.COMPLETED}
+
+
+def test_scheduler_wakes_at_loaded_dates(db, make_campaign):
+    """Test the heap timer fires at a loaded start date, between polls."""
+    scheduler = CampaignScheduler(TestingAsyncSessionLocal)
+    soon = make_campaign(CampaignStatus.DRAFT, start=utc_now() + timedelta(seconds=0.5))
+    later = make_campaign(CampaignStatus.DRAFT, start=utc_now() + timedelta(hours=2))
+
+    async def run():
+        await scheduler.poll(60)
+        before = scheduler.status()
+        task = asyncio.create_task(scheduler.run(60))
+        await asyncio.sleep(1.5)
+        task.cancel()
+        return before
+
+    before = asyncio.run(run())
+    assert before["timers"] == 1  # Only dates within the poll interval are held
+    assert statuses(db, [soon, later]) == {soon: CampaignStatus.ACTIVE, later: CampaignStatus.DRAFT}
+    assert (scheduler.status()["wakeups"], scheduler.started, scheduler.status()["timers"]) == (1, 1, 0)
+
+
+def test_api_dates_are_scheduled(authenticated_client):
+    """Test dates set through the API are stored as UTC and acted on without waiting for a poll."""
+    assert campaign_scheduler.status()["running"]
+
+    start = utc_now() + timedelta(seconds=1)
+    response = authenticated_client.post("/campaigns/", json={
+        "title": "Starts in a moment",
+        "description": "A campaign that goes live one second after it is created",
+        # The same instant, written with a +02:00 offset
+        "start_date": (start + timedelta(hours=2)).isoformat() + "+02:00",
+    })
+    assert response.status_code == 201
+    campaign = response.json()
+    assert campaign["status"] == "draft"
+    assert campaign["start_date"].startswith(start.isoformat()[:19])
+
+    time.sleep(1.5)
+    response = authenticated_client.get(f"/campaigns/{campaign['id']}")
+    assert response.json()["status"] == "active"
+
+    # Ending it: moving end_date into the past completes it on the next wake
+    response = authenticated_client.put(f"/campaigns/{campaign['id']}", json={
+        "end_date": (utc_now() - timedelta(seconds=1)).isoformat()
+    })
+    assert response.status_code == 200
+    time.sleep(0.5)
+    assert authenticated_client.get(f"/campaigns/{campaign['id']}").json()["status"] == "completed"
+    assert authenticated_client.get("/health/lifecycle").json()["lifecycle"]["completed"] == 1
@@ -0,0 +1,116 @@
+"""
+Tests for full-text campaign search (GET /campaigns/search).
+"""
+
+import pytest
+
+from models import Campaign, CampaignStatus, CampaignType, User
+from tests.test_loading import count_statements
+from utils.campaign_search import search_terms
+
+
+@pytest.fixture()
+def campaigns(authenticated_client, db, test_user_data):
+    """Create campaigns to search, returning their IDs by key."""
+    user = db.query(User).filter(User.email == test_user_data["email"]).one()
+    specs = {
+        "title": ("New roof for the village school", "Help us keep the classrooms dry this winter", {}),
+        "description": ("Village hall appeal", "The hall is used by the school for sports days", {}),
+        "event": ("Fun run for the school", "A 5k around the park", {"campaign_type": CampaignType.EVENT}),
+        "draft": ("School library books", "Books for the school library", {"status": CampaignStatus.DRAFT}),
+        "unrelated": ("Animal shelter", "Food and blankets for the rescue dogs", {}),
+        "accents": ("Café for the community centre", "Somewhere warm to meet", {}),
+    }
+    ids = {}
+    for key, (title, description, extra) in specs.items():
+        campaign = Campaign(
+            title=title, description=description, creator_id=user.id,
+            **{"status": CampaignStatus.ACTIVE, **extra}
+        )
+        db.add(campaign)
+        db.flush()
+        ids[key] = campaign.id
+    db.commit()
+    return ids
+
+
+def search(client, q, **params):
+    response = client.get("/campaigns/search", params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_search_terms():
+    """Test that queries are split into distinct lowercase words."""
+    assert search_terms('School  "roof" OR school-roof!') == ["school", "roof", "or"]
+    assert search_terms("!!! ...") == []
+    assert len(search_terms(" ".join(f"w{i}" for i in range(50)))) == 10
+
+
+def test_search_ranks_and_filters(authenticated_client, campaigns):
+    """Test relevance order, the active default and the type/status filters."""
+    data = search(authenticated_client, "school")
+    ids = [c["id"] for c in data["campaigns"]]
+
+    # Title matches beat the description match; the draft isn't listed
+    assert set(ids) == {campaigns["title"], campaigns["description"], campaigns["event"]}
+    assert ids[-1] == campaigns["description"]
+    assert data["next_cursor"] is None
+
+    events = search(authenticated_client, "school", campaign_type="event")["campaigns"]
+    assert [c["id"] for c in events] == [campaigns["event"]]
+    drafts = search(authenticated_client, "SCHOOL", status="draft")["campaigns"]
+    assert [c["title"] for c in drafts] == ["School library books"]
+
+    # Any word matches, and accents are ignored
+    found = [c["id"] for c in search(authenticated_client, "rescue cafe")["campaigns"]]
+    assert set(found) == {campaigns["unrelated"], campaigns["accents"]}
+    assert search(authenticated_client, "spaceship")["campaigns"] == []
+
+
+def test_search_pages_with_cursor(authenticated_client, campaigns):
+    """Test that walking next_cursor returns every match once, in order."""
+    everything = [c["id"] for c in search(authenticated_client, "school village", page_size=100)["campaigns"]]
+
+    seen, cursor = [], None
+    while True:
+        params = {"page_size": 1, "fields": "id"}
+        if cursor:
+            params["cursor"] = cursor
+        data = search(authenticated_client, "school village", **params)
+        assert all(list(c) == ["id"] for c in data["campaigns"])
+        seen += [c["id"] for c in data["campaigns"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == everything
+    assert len(seen) == 3
+
+
+def test_index_follows_updates_and_deletes(authenticated_client, campaigns):
+    """Test that the search index picks up edits and deletions through the API."""
+    response = authenticated_client.put(f"/campaigns/{campaigns['unrelated']}", json={
+        "title": "Kennels for the rescue centre"
+    })
+    assert response.status_code == 200
+
+    assert search(authenticated_client, "shelter")["campaigns"] == []
+    assert [c["id"] for c in search(authenticated_client, "kennels")["campaigns"]] == [campaigns["unrelated"]]
+
+    assert authenticated_client.delete(f"/campaigns/{campaigns['unrelated']}").status_code == 204
+    assert search(authenticated_client, "kennels")["campaigns"] == []
+
+
+def test_search_uses_index_and_validates(authenticated_client, campaigns):
+    """Test that search reads the FTS index, and bad input gets a 400."""
+    response, statements = count_statements(lambda: authenticated_client.get(
+        "/campaigns/search", params={"q": "roof"}
+    ))
+    assert response.status_code == 200
+    assert any("campaigns_fts MATCH" in statement for statement in statements)
+    assert not any(" LIKE " in statement for statement in statements)
+
+    assert authenticated_client.get("/campaigns/search", params={"q": "?!"}).status_code == 400
+    assert authenticated_client.get("/campaigns/search", params={"q": "roof", "cursor": "nope"}).status_code == 400
+    assert authenticated_client.get("/campaigns/search").status_code == 422
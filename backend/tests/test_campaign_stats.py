@@ -0,0 +1,151 @@
+"""
+Tests for the campaign stats rollups and GET /campaigns/{id}/stats.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from models import Campaign, CampaignGiverTotal, CampaignStatsBucket, Donation
+from tests.conftest import TestingAsyncSessionLocal
+from tests.test_donations import active_campaign, donate
+from tests.test_loading import other_user_headers
+from utils.campaign_stats import rebuild_campaign_stats
+
+
+def rollup_rows():
+    """Every rollup row, as comparable tuples."""
+    async def read():
+        async with TestingAsyncSessionLocal() as db:
+            buckets = (await db.scalars(select(CampaignStatsBucket))).all()
+            givers = (await db.scalars(select(CampaignGiverTotal))).all()
+            return (
+                sorted(
+                    (b.campaign_id, b.period, b.bucket_start, b.donation_count, b.amount,
+                     b.anonymous_count, b.anonymous_amount)
+                    for b in buckets if b.donation_count
+                ),
+                sorted((g.campaign_id, g.giver_id, g.donation_count, g.amount) for g in givers if g.donation_count),
+            )
+    return asyncio.run(read())
+
+
+def rebuild(campaign_ids=None):
+    async def run():
+        async with TestingAsyncSessionLocal() as db:
+            return await rebuild_campaign_stats(db, campaign_ids)
+    return asyncio.run(run())
+
+
+def test_stats_follow_completions_and_refunds(authenticated_client, active_campaign):
+    """Test totals, average gift, unique givers and anonymous share."""
+    donate(authenticated_client, active_campaign, "10.00")
+    donate(authenticated_client, active_campaign, "20.00", is_anonymous=True)
+    refunded = donate(authenticated_client, active_campaign, "30.00")
+    donate(authenticated_client, active_campaign, "5.00", status="pending")
+    authenticated_client.patch(f"/donations/{refunded}/status", params={"payment_status": "refunded"})
+
+    headers = other_user_headers(authenticated_client)
+    donation_id = authenticated_client.post(
+        "/donations/", json={"campaign_id": active_campaign, "amount": "15.00", "is_anonymous": True}, headers=headers
+    ).json()["id"]
+    authenticated_client.patch(f"/donations/{donation_id}/status", params={"payment_status": "completed"}, headers=headers)
+
+    response = authenticated_client.get(f"/campaigns/{active_campaign}/stats")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["donation_count"] == 3
+    assert data["total_amount"] == "45.00"
+    assert data["average_gift"] == "15.00"
+    assert data["unique_givers"] == 2
+    assert data["anonymous_count"] == 2
+    assert data["anonymous_amount"] == "35.00"
+    assert abs(data["anonymous_share"] - 2 / 3) < 1e-9
+    assert data["period"] == "day"
+    assert len(data["buckets"]) == 1
+    assert data["buckets"][0]["donation_count"] == 3
+
+
+def test_hour_buckets_use_created_at(authenticated_client, active_campaign, db):
+    """Test that a donation lands in the hour it was made, and a refund leaves it there."""
+    yesterday = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(days=1)
+    donation_id = donate(authenticated_client, active_campaign, "8.00", status="pending")
+    db.query(Donation).filter(Donation.id == donation_id).update({"created_at": yesterday + timedelta(minutes=30)})
+    db.commit()
+    authenticated_client.patch(f"/donations/{donation_id}/status", params={"payment_status": "completed"})
+    donate(authenticated_client, active_campaign, "2.00")
+
+    data = authenticated_client.get(f"/campaigns/{active_campaign}/stats", params={"period": "hour"}).json()
+
+    assert [(b["start"][:19], b["amount"]) for b in data["buckets"]][0] == (yesterday.isoformat(), "8.00")
+    assert len(data["buckets"]) == 2
+
+    # Narrow the window to the older hour only
+    data = authenticated_client.get(f"/campaigns/{active_campaign}/stats", params={
+        "period": "hour", "since": yesterday.isoformat(), "until": (yesterday + timedelta(hours=1)).isoformat()
+    }).json()
+    assert [b["amount"] for b in data["buckets"]] == ["8.00"]
+    assert data["total_amount"] == "10.00"
+
+    authenticated_client.patch(f"/donations/{donation_id}/status", params={"payment_status": "refunded"})
+    data = authenticated_client.get(f"/campaigns/{active_campaign}/stats", params={"period": "hour"}).json()
+    assert [b["amount"] for b in data["buckets"]] == ["2.00"]
+
+
+def test_batch_updates_and_sharded_campaigns(authenticated_client, active_campaign, db):
+    """Test the batch status endpoint, with a campaign spreading writes over shards."""
+    db.query(Campaign).filter(Campaign.id == active_campaign).update({"counter_shards": 4})
+    db.commit()
+    ids = [donate(authenticated_client, active_campaign, "3.00", status="pending") for _ in range(6)]
+
+    for donation_id in ids[:3]:
+        authenticated_client.patch(f"/donations/{donation_id}/status", params={"payment_status": "completed"})
+    authenticated_client.patch("/donations/status/batch", json={"updates": [
+        *({"donation_id": i, "payment_status": "completed"} for i in ids[3:]),
+        {"donation_id": ids[0], "payment_status": "refunded"},
+    ]})
+
+    data = authenticated_client.get(f"/campaigns/{active_campaign}/stats").json()
+
+    assert data["donation_count"] == 5
+    assert data["total_amount"] == "15.00"
+    assert [b["donation_count"] for b in data["buckets"]] == [5]
+
+
+def test_rebuild_matches_incremental(authenticated_client, active_campaign):
+    """Test that the backfill job produces the rows the API maintained."""
+    donate(authenticated_client, active_campaign, "4.50")
+    donate(authenticated_client, active_campaign, "7.25", is_anonymous=True)
+    refunded = donate(authenticated_client, active_campaign, "1.00")
+    authenticated_client.patch(f"/donations/{refunded}/status", params={"payment_status": "refunded"})
+    donate(authenticated_client, active_campaign, "9.00", status="failed")
+    incremental = rollup_rows()
+
+    assert rebuild() == 1
+    assert rollup_rows() == incremental
+    assert rebuild([active_campaign]) == 1
+    assert rollup_rows() == incremental
+
+
+def test_stats_access_and_window(authenticated_client, active_campaign):
+    """Test that only the creator sees stats, and that windows are checked."""
+    headers = other_user_headers(authenticated_client)
+
+    assert authenticated_client.get(f"/campaigns/{active_campaign}/stats", headers=headers).status_code == 403
+    assert authenticated_client.get("/campaigns/9999/stats").status_code == 404
+    response = authenticated_client.get(f"/campaigns/{active_campaign}/stats", params={
+        "period": "hour", "since": "2026-01-01T00:00:00", "until": "2026-03-01T00:00:00"
+    })
+    assert response.status_code == 400
+    response = authenticated_client.get(f"/campaigns/{active_campaign}/stats", params={
+        "since": "2026-03-01T00:00:00", "until": "2026-01-01T00:00:00"
+    })
+    assert response.status_code == 400
+
+    data = authenticated_client.get(f"/campaigns/{active_campaign}/stats").json()
+    assert data["donation_count"] == 0
+    assert data["average_gift"] == "0.00"
+    assert data["anonymous_share"] == 0
+    assert data["buckets"] == []
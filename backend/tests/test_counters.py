@@ -0,0 +1,146 @@
+"""
+Concurrency tests for donation aggregate updates.
+
+Fires thousands of donation completions at once, each in its own
+session and transaction, and checks the campaign and giver totals
+come out exact.
+"""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from database import get_async_database_url
+from models import (
+    User, Campaign, GiverProfile, Donation, CampaignAmountShard,
+    CampaignStatus, PaymentStatus
+)
+from routers.donations import _update_donation_aggregates, update_donation_status
+from utils.counters import fold_counter_shards, get_pending_shard_amount
+from tests.conftest import SQLALCHEMY_TEST_DATABASE_URL
+
+COMPLETIONS = 2000
+CONCURRENCY = 50
+
+# SQLite serialises writers, so give queued transactions longer than the
+# default 5 second busy timeout to get the write lock
+async_engine = create_async_engine(
+    get_async_database_url(SQLALCHEMY_TEST_DATABASE_URL),
+    poolclass=NullPool,
+    connect_args={"timeout": 60}
+)
+SessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+
+@pytest.fixture()
+def campaign_and_giver(db):
+    """Create an active campaign and a giver to donate to it."""
+    user = User(email="counter@example.com", username="counter", hashed_password="x")
+    db.add(user)
+    db.flush()
+
+    giver = GiverProfile(user_id=user.id)
+    campaign = Campaign(
+        title="Counter campaign",
+        description="Campaign used by the counter concurrency tests",
+        status=CampaignStatus.ACTIVE,
+        creator_id=user.id
+    )
+    db.add_all([giver, campaign])
+    db.commit()
+    return campaign, giver
+
+
+def amounts():
+    """Donation amounts whose sum goes wrong quickly with floats."""
+    return [Decimal(i % 97 + 1) / 100 for i in range(COMPLETIONS)]
+
+
+def complete_in_parallel(campaign_id, giver_id, donation_amounts):
+    """Run _update_donation_aggregates once per amount, CONCURRENCY at a time."""
+    async def run():
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def complete(amount):
+            donation = Donation(amount=amount, campaign_id=campaign_id, giver_id=giver_id)
+            async with semaphore, SessionLocal() as session:
+                await _update_donation_aggregates(session, donation)
+                await session.commit()
+
+        await asyncio.gather(*(complete(amount) for amount in donation_amounts))
+
+    asyncio.run(run())
+
+
+def test_parallel_completions_are_exact(db, campaign_and_giver):
+    """Test that concurrent completions never lose an update."""
+    campaign, giver = campaign_and_giver
+
+    complete_in_parallel(campaign.id, giver.id, amounts())
+
+    db.expire_all()
+    assert db.get(Campaign, campaign.id).current_amount == sum(amounts())
+    assert db.get(GiverProfile, giver.id).total_donated == sum(amounts())
+    assert db.get(GiverProfile, giver.id).donation_count == COMPLETIONS
+
+
+def test_sharded_completions_fold_exactly(db, campaign_and_giver):
+    """Test that a hot campaign's shards hold every completion and fold into its total."""
+    campaign, giver = campaign_and_giver
+    campaign.counter_shards = 8
+    db.commit()
+
+    complete_in_parallel(campaign.id, giver.id, amounts())
+
+    async def pending_then_fold():
+        async with SessionLocal() as session:
+            pending = await get_pending_shard_amount(session, campaign.id)
+            folded = await fold_counter_shards(session)
+        return pending, folded
+
+    pending, folded = asyncio.run(pending_then_fold())
+
+    db.expire_all()
+    assert pending == sum(amounts())
+    assert folded == 1
+    assert db.get(Campaign, campaign.id).current_amount == sum(amounts())
+    assert db.scalar(select(func.sum(CampaignAmountShard.amount))) == 0
+    assert db.scalar(select(func.count()).select_from(CampaignAmountShard)) <= 8
+
+
+@pytest.mark.parametrize("first, repeated", [
+    (PaymentStatus.PENDING, PaymentStatus.COMPLETED),
+    (PaymentStatus.COMPLETED, PaymentStatus.REFUNDED),
+])
+def test_parallel_status_updates_apply_once(db, campaign_and_giver, first, repeated):
+    """Test that the same status change sent twice at once moves the totals once."""
+    campaign, giver = campaign_and_giver
+    donation = Donation(amount=Decimal("25.00"), campaign_id=campaign.id, giver_id=giver.id, payment_status=first)
+    db.add(donation)
+    db.commit()
+    if first == PaymentStatus.COMPLETED:
+        complete_in_parallel(campaign.id, giver.id, [donation.amount])
+    user = db.get(User, giver.user_id)
+
+    async def run():
+        async def patch():
+            async with SessionLocal() as session:
+                return await update_donation_status(donation.id, repeated, current_user=user, db=session)
+        return await asyncio.gather(patch(), patch(), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert not any(isinstance(r, Exception) and not isinstance(r, HTTPException) for r in results), results
+    assert all(r.status_code == 409 for r in results if isinstance(r, HTTPException))
+    assert any(not isinstance(r, Exception) for r in results)
+
+    expected = Decimal("25.00") if repeated == PaymentStatus.COMPLETED else Decimal("0")
+    db.expire_all()
+    assert db.get(Donation, donation.id).payment_status == repeated
+    assert db.get(Campaign, campaign.id).current_amount == expected
+    assert db.get(GiverProfile, giver.id).total_donated == expected
+    assert db.get(GiverProfile, giver.id).donation_count == (1 if expected else 0)
@@ -0,0 +1,117 @@
+"""
+Tests for the streaming campaign donation export.
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+
+from sqlalchemy import select
+
+from models import Donation
+from tests.conftest import TestingAsyncSessionLocal
+from tests.test_donations import active_campaign, donate
+from utils.donation_export import EXPORT_COLUMNS, accepts_gzip, export_columns, stream_donations
+
+
+def export_url(campaign_id, **params):
+    query = "&".join(f"{key}={value}" for key, value in params.items())
+    return f"/campaigns/{campaign_id}/donations/export" + (f"?{query}" if query else "")
+
+
+def test_export_csv(authenticated_client, active_campaign):
+    """Test that the creator gets every donation as CSV, in ID order."""
+    first = donate(authenticated_client, active_campaign, "10.00", message="Thanks,\nall")
+    donate(authenticated_client, active_campaign, "2.50", status="failed", is_anonymous=True)
+
+    response = authenticated_client.get(export_url(active_campaign), headers={"Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-disposition"] == \
+        f'attachment; filename="campaign-{active_campaign}-donations.csv"'
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert tuple(rows[0]) == EXPORT_COLUMNS
+    assert [row["amount"] for row in rows] == ["10.00", "2.50"]
+    assert rows[0]["id"] == str(first)
+    assert rows[0]["message"] == "Thanks,\nall"
+    assert rows[1]["payment_status"] == "failed"
+    assert rows[1]["message"] == ""
+
+
+def test_export_csv_escapes_formulas(authenticated_client, active_campaign):
+    """Test that messages a spreadsheet would run as formulas are quoted in CSV only."""
+    messages = ["=HYPERLINK(\"http://evil\")", "+1", "-2+3", "@SUM(A1)", "\tx", "\rx", "Good luck = win"]
+    for message in messages:
+        donate(authenticated_client, active_campaign, "1.00", message=message)
+
+    response = authenticated_client.get(export_url(active_campaign))
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["message"] for row in rows] == ["'" + m for m in messages[:-1]] + ["Good luck = win"]
+    assert rows[0]["amount"] == "1.00"
+
+    response = authenticated_client.get(export_url(active_campaign, format="ndjson"))
+    assert [json.loads(line)["message"] for line in response.text.splitlines()] == messages
+
+
+def test_export_ndjson_gzip_and_filter(authenticated_client, active_campaign):
+    """Test NDJSON with gzip on the fly and the payment status filter."""
+    donate(authenticated_client, active_campaign, "10.00")
+    donate(authenticated_client, active_campaign, "3.00", status="pending")
+
+    with authenticated_client.stream(
+        "GET", export_url(active_campaign, format="ndjson", payment_status="completed"),
+        headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"] == "application/x-ndjson"
+        raw = b"".join(response.iter_raw())
+
+    rows = [json.loads(line) for line in gzip.decompress(raw).decode().splitlines()]
+    assert len(rows) == 1
+    assert rows[0]["amount"] == "10.00"
+    assert rows[0]["is_anonymous"] is False
+
+
+def test_export_requires_creator(authenticated_client, active_campaign):
+    """Test that only the campaign creator can export, and unknown campaigns 404."""
+    assert authenticated_client.get(export_url(999)).status_code == 404
+    assert authenticated_client.get(export_url(active_campaign, format="xml")).status_code == 422
+
+    authenticated_client.post("/auth/register", json={
+        "email": "other@example.com", "username": "otheruser", "password": "OtherPass123!"
+    })
+    token = authenticated_client.post(
+        "/auth/login", data={"username": "otheruser", "password": "OtherPass123!"}
+    ).json()["access_token"]
+
+    response = authenticated_client.get(export_url(active_campaign), headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+
+
+def test_export_streams_one_chunk_per_batch(authenticated_client, active_campaign):
+    """Test that rows are fetched from the cursor and sent batch_size at a time."""
+    for amount in ("1.00", "2.00", "3.00"):
+        donate(authenticated_client, active_campaign, amount)
+
+    async def collect():
+        query = select(*export_columns()).where(Donation.campaign_id == active_campaign).order_by(Donation.id)
+        async with TestingAsyncSessionLocal() as db:
+            return [chunk async for chunk in stream_donations(db, query, "ndjson", batch_size=2)]
+
+    chunks = asyncio.run(collect())
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 1]
+
+
+def test_accepts_gzip():
+    """Test Accept-Encoding parsing."""
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("br;q=1.0, gzip;q=0.5")
+    assert accepts_gzip("*")
+    assert not accepts_gzip("")
+    assert not accepts_gzip("identity")
+    assert not accepts_gzip("gzip;q=0")
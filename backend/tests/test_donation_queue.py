@@ -0,0 +1,196 @@
+"""
+Tests for buffered donation intake (the write-behind queue).
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import DataError
+
+from models import Campaign, CampaignStatus, Donation
+from tests.conftest import TestingAsyncSessionLocal, async_engine
+from tests.test_donations import active_campaign
+from utils.donation_queue import DonationQueue, donation_queue, flush_queued_donations
+
+
+@pytest.fixture()
+def intake(tmp_path, monkeypatch):
+    """Open the app's donation queue on a temporary file."""
+    monkeypatch.setattr(donation_queue, "path", str(tmp_path / "queue.db"))
+    donation_queue.open()
+    yield donation_queue
+    donation_queue.close()
+    for counter in ("pending", "accepted", "created", "rejected", "refused"):
+        setattr(donation_queue, counter, 0)
+
+
+def flush(queue, batch_size=500):
+    """Run one flush against the test database."""
+    async def run():
+        async with TestingAsyncSessionLocal() as db:
+            return await flush_queued_donations(db, queue, batch_size)
+
+    return asyncio.run(run())
+
+
+def queue_donation(client, campaign_id, amount="10.00"):
+    """Queue a donation and return its ticket."""
+    response = client.post("/donations/queued", json={"campaign_id": campaign_id, "amount": amount})
+    assert response.status_code == 202
+    assert response.headers["Location"] == f"/donations/queued/{response.json()['ticket']}"
+    return response.json()["ticket"]
+
+
+def test_queued_donations_are_written_in_one_insert(authenticated_client, active_campaign, intake, db):
+    """Test that queued donations get a 202 and are written with one multi-row INSERT."""
+    tickets = [queue_donation(authenticated_client, active_campaign, f"{i}.50") for i in range(1, 6)]
+    assert db.query(Donation).count() == 0
+    assert authenticated_client.get(f"/donations/queued/{tickets[0]}").json()["status"] == "queued"
+
+    inserts = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO DONATIONS"):
+            inserts.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        assert flush(intake) == 5
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    assert len(inserts) == 1
+    entries = [authenticated_client.get(f"/donations/queued/{ticket}").json() for ticket in tickets]
+    assert {entry["status"] for entry in entries} == {"created"}
+
+    donation = authenticated_client.get(f"/donations/{entries[0]['donation_id']}").json()
+    assert donation["amount"] == "1.50"
+    assert donation["payment_status"] == "pending"
+    assert authenticated_client.get("/health/intake").json()["intake"]["pending"] == 0
+
+
+def test_invalid_donations_are_rejected_on_flush(authenticated_client, active_campaign, intake, db):
+    """Test that the campaign checks run at flush time and reject per entry."""
+    good = queue_donation(authenticated_client, active_campaign)
+    missing = queue_donation(authenticated_client, 999)
+
+    draft = Campaign(title="Draft campaign", description="Not accepting donations yet",
+                     status=CampaignStatus.DRAFT, creator_id=1)
+    db.add(draft)
+    db.commit()
+    inactive = queue_donation(authenticated_client, draft.id)
+
+    flush(intake)
+
+    results = {ticket: authenticated_client.get(f"/donations/queued/{ticket}").json()
+               for ticket in (good, missing, inactive)}
+    assert results[good]["status"] == "created"
+    assert results[missing]["status"] == "rejected"
+    assert results[missing]["error"] == "Campaign not found"
+    assert "not accepting donations" in results[inactive]["error"]
+    assert db.query(Donation).count() == 1
+
+
+def test_rows_the_database_refuses_are_rejected(authenticated_client, active_campaign, intake, db):
+    """Test that out-of-range amounts get a 422, and a row the database refuses doesn't stall the queue."""
+    for amount in ("100000000.00", "1e9", "1.005"):
+        response = authenticated_client.post(
+            "/donations/queued", json={"campaign_id": active_campaign, "amount": amount}
+        )
+        assert response.status_code == 422
+
+    good = queue_donation(authenticated_client, active_campaign, "5.00")
+    refused = queue_donation(authenticated_client, active_campaign, "7.00")
+
+    # What e.g. MySQL raises for a value out of range for the column
+    def out_of_range(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO DONATIONS") and 7 in parameters:
+            raise DataError(statement, parameters, sqlite3.DataError("Out of range value for column 'amount'"))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", out_of_range)
+    try:
+        assert flush(intake) == 2
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", out_of_range)
+
+    assert authenticated_client.get(f"/donations/queued/{good}").json()["status"] == "created"
+    entry = authenticated_client.get(f"/donations/queued/{refused}").json()
+    assert entry["status"] == "rejected"
+    assert "Out of range" in entry["error"]
+    assert intake.pending == 0
+    assert db.query(Donation).count() == 1
+
+
+def test_queue_survives_restart(authenticated_client, active_campaign, intake):
+    """Test that donations queued before a restart are written after it."""
+    tickets = [queue_donation(authenticated_client, active_campaign) for _ in range(3)]
+    intake.close()
+
+    reopened = DonationQueue(path=intake.path, max_pending=10)
+    try:
+        assert reopened.open() == 3
+        assert flush(reopened) == 3
+        assert reopened.pending == 0
+    finally:
+        reopened.close()
+
+    intake.open()
+    assert {authenticated_client.get(f"/donations/queued/{t}").json()["status"] for t in tickets} == {"created"}
+
+
+def test_flush_after_crash_does_not_duplicate(authenticated_client, active_campaign, intake, db, monkeypatch):
+    """Test that a batch written but not marked done (a crash) isn't written twice."""
+    for _ in range(3):
+        queue_donation(authenticated_client, active_campaign)
+
+    async def crash(created, rejected):
+        raise RuntimeError("worker died")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(intake, "mark", crash)
+        with pytest.raises(RuntimeError):
+            flush(intake)
+
+    assert db.query(Donation).count() == 3
+    assert flush(intake) == 3
+    assert db.query(Donation).count() == 3
+    assert intake.pending == 0
+
+
+def test_full_queue_returns_503(authenticated_client, active_campaign, intake, monkeypatch):
+    """Test that new donations are refused once max_pending are waiting."""
+    monkeypatch.setattr(intake, "max_pending", 1)
+    queue_donation(authenticated_client, active_campaign)
+
+    response = authenticated_client.post("/donations/queued", json={"campaign_id": active_campaign, "amount": "1.00"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert intake.status()["refused"] == 1
+
+
+def test_other_users_ticket_is_not_found(authenticated_client, active_campaign, intake, db):
+    """Test that a ticket only reveals its donation to the user who queued it."""
+    ticket = queue_donation(authenticated_client, active_campaign)
+
+    authenticated_client.post("/auth/register", json={
+        "email": "other@example.com", "username": "otheruser", "password": "OtherPass123!"
+    })
+    token = authenticated_client.post(
+        "/auth/login", data={"username": "otheruser", "password": "OtherPass123!"}
+    ).json()["access_token"]
+
+    response = authenticated_client.get(
+        f"/donations/queued/{ticket}", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 404
+
+
+def test_intake_disabled(authenticated_client, active_campaign):
+    """Test that the queue endpoints answer 503 unless intake is enabled."""
+    response = authenticated_client.post("/donations/queued", json={"campaign_id": active_campaign, "amount": "1.00"})
+
+    assert response.status_code == 503
+    assert authenticated_client.get("/donations/queued/abc").status_code == 503
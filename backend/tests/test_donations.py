@@ -0,0 +1,163 @@
+"""
+Tests for donation endpoints and the totals they report.
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from models import User, Campaign, GiverProfile, Donation, CampaignStatus, PaymentStatus
+
+
+@pytest.fixture()
+def active_campaign(authenticated_client, db, test_user_data):
+    """Create an active campaign owned by the authenticated user."""
+    user = db.query(User).filter(User.email == test_user_data["email"]).one()
+    campaign = Campaign(
+        title="Totals campaign",
+        description="Campaign used by the donation total tests",
+        status=CampaignStatus.ACTIVE,
+        creator_id=user.id
+    )
+    db.add(campaign)
+    db.commit()
+    return campaign.id
+
+
+def donate(client, campaign_id, amount, status="completed", **extra):
+    """Create a donation and move it to the given payment status."""
+    response = client.post(
+        "/donations/",
+        json={"campaign_id": campaign_id, "amount": amount, **extra}
+    )
+    assert response.status_code == 201
+    donation_id = response.json()["id"]
+
+    response = client.patch(
+        f"/donations/{donation_id}/status",
+        params={"payment_status": status}
+    )
+    assert response.status_code == 200
+    return donation_id
+
+
+def test_campaign_total_is_exact(authenticated_client, active_campaign):
+    """Test that totals are exact decimals (0.10 + 0.20 is 0.30, not a float sum)."""
+    donate(authenticated_client, active_campaign, "0.10")
+    donate(authenticated_client, active_campaign, "0.20", is_anonymous=True)
+    donate(authenticated_client, active_campaign, "99.99", status="pending")
+
+    data = authenticated_client.get(f"/donations/campaigns/{active_campaign}").json()
+
+    # Anonymous donations are hidden from the list but still count
+    assert len(data["donations"]) == 1
+    assert Decimal(data["total_amount"]) == Decimal("0.30")
+
+
+def test_my_donations_total(authenticated_client, active_campaign):
+    """Test that the giver's total only counts completed donations."""
+    donate(authenticated_client, active_campaign, "12.34")
+    donate(authenticated_client, active_campaign, "0.01")
+    donate(authenticated_client, active_campaign, "5.00", status="failed")
+
+    data = authenticated_client.get("/donations/my/donations").json()
+
+    assert data["total"] == 3
+    assert Decimal(data["total_amount"]) == Decimal("12.35")
+    assert Decimal(authenticated_client.get("/givers/me/donations").json()["total_amount"]) == Decimal("12.35")
+
+
+def test_refund_reverses_totals(authenticated_client, active_campaign):
+    """Test that refunding a completed donation takes it out of the totals."""
+    donate(authenticated_client, active_campaign, "25.00")
+    refunded = donate(authenticated_client, active_campaign, "10.00")
+
+    authenticated_client.patch(f"/donations/{refunded}/status", params={"payment_status": "refunded"})
+
+    campaign_total = authenticated_client.get(f"/donations/campaigns/{active_campaign}").json()["total_amount"]
+    profile = authenticated_client.get("/givers/me").json()
+
+    assert Decimal(campaign_total) == Decimal("25.00")
+    assert Decimal(profile["total_donated"]) == Decimal("25.00")
+    assert profile["donation_count"] == 1
+
+
+def create_pending(client, campaign_id, amount):
+    """Create a pending donation and return its ID."""
+    response = client.post("/donations/", json={"campaign_id": campaign_id, "amount": amount})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_batch_status_update(authenticated_client, active_campaign):
+    """Test that a batch settles many donations and reports each item."""
+    ids = [create_pending(authenticated_client, active_campaign, "1.10") for _ in range(5)]
+    refunded = donate(authenticated_client, active_campaign, "50.00")
+
+    response = authenticated_client.patch("/donations/status/batch", json={"updates": [
+        *({"donation_id": i, "payment_status": "completed", "payment_intent_id": f"pi_{i}"} for i in ids[:4]),
+        {"donation_id": ids[4], "payment_status": "failed"},
+        {"donation_id": refunded, "payment_status": "refunded"},
+        {"donation_id": ids[0], "payment_status": "failed"},
+        {"donation_id": 99999, "payment_status": "completed"},
+    ]})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["outcome"] for r in data["results"]] == [
+        "updated", "updated", "updated", "updated", "updated", "updated", "duplicate", "not_found"
+    ]
+    assert data["results"][0]["payment_status"] == "completed"
+    assert data["updated"] == 6
+    assert data["failed"] == 2
+
+    # 4 x 1.10 completed, the 50.00 refunded
+    totals = authenticated_client.get(f"/donations/campaigns/{active_campaign}").json()
+    profile = authenticated_client.get("/givers/me").json()
+    assert Decimal(totals["total_amount"]) == Decimal("4.40")
+    assert Decimal(profile["total_donated"]) == Decimal("4.40")
+    assert profile["donation_count"] == 4
+
+
+def test_batch_status_update_is_idempotent(authenticated_client, active_campaign):
+    """Test that replaying a settlement batch doesn't count donations twice."""
+    ids = [create_pending(authenticated_client, active_campaign, "2.50") for _ in range(3)]
+    batch = {"updates": [{"donation_id": i, "payment_status": "completed"} for i in ids]}
+
+    authenticated_client.patch("/donations/status/batch", json=batch)
+    replay = authenticated_client.patch("/donations/status/batch", json=batch).json()
+
+    assert {r["outcome"] for r in replay["results"]} == {"unchanged"}
+    assert replay["updated"] == 0
+    totals = authenticated_client.get(f"/donations/campaigns/{active_campaign}").json()
+    assert Decimal(totals["total_amount"]) == Decimal("7.50")
+
+
+def test_batch_status_update_other_givers_donation(authenticated_client, active_campaign, db):
+    """Test that another giver's donation is reported as forbidden and left alone."""
+    other = User(email="other@example.com", username="other", hashed_password="x")
+    db.add(other)
+    db.flush()
+    other_giver = GiverProfile(user_id=other.id)
+    db.add(other_giver)
+    db.flush()
+    donation = Donation(amount=Decimal("9.99"), campaign_id=active_campaign, giver_id=other_giver.id)
+    db.add(donation)
+    db.commit()
+
+    response = authenticated_client.patch("/donations/status/batch", json={"updates": [
+        {"donation_id": donation.id, "payment_status": "completed"}
+    ]})
+
+    assert response.json()["results"][0]["outcome"] == "forbidden"
+    db.refresh(donation)
+    assert donation.payment_status == PaymentStatus.PENDING
+
+
+def test_batch_status_update_size_limit(authenticated_client):
+    """Test that empty and oversized batches are rejected."""
+    assert authenticated_client.patch("/donations/status/batch", json={"updates": []}).status_code == 422
+
+    too_many = [{"donation_id": i, "payment_status": "completed"} for i in range(5001)]
+    response = authenticated_client.patch("/donations/status/batch", json={"updates": too_many})
+    assert response.status_code == 422
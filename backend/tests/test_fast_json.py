@@ -0,0 +1,130 @@
+"""
+Tests for the fast JSON serializers, response class and fields= (utils/fast_json.py).
+"""
+
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from models import Campaign, Donation, GiverProfile, PaymentStatus
+from schemas import CampaignListResponse, CampaignResponse, DonationListResponse, DonationResponse, GiverProfileResponse
+from tests.test_donations import active_campaign, donate
+from tests.test_loading import count_statements
+from utils import fast_json
+from utils.fast_json import campaign_serializer, donation_serializer, dumps, giver_profile_serializer
+
+
+SAMPLE = {
+    "amount": Decimal("10.50"),
+    "naive": datetime(2026, 10, 18, 9, 30, 0, 123456),
+    "utc": datetime(2026, 10, 18, 9, 30, tzinfo=timezone.utc),
+    "status": PaymentStatus.COMPLETED,
+    "text": "Café ☕",
+    "missing": None,
+}
+
+
+def pydantic_json(schema, obj):
+    """What response_model would have sent for obj."""
+    return json.loads(schema.model_validate(obj, from_attributes=True).model_dump_json())
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_matches_pydantic_encoding(use_orjson, monkeypatch):
+    """Test Decimal, datetime, enum and non-ASCII encoding, with and without orjson."""
+    if use_orjson and fast_json.orjson is None:
+        pytest.skip("orjson is not installed")
+    if not use_orjson:
+        monkeypatch.setattr(fast_json, "orjson", None)
+
+    assert dumps(SAMPLE) == (
+        '{"amount":"10.50","naive":"2026-10-18T09:30:00.123456","utc":"2026-10-18T09:30:00Z",'
+        '"status":"completed","text":"Café ☕","missing":null}'
+    ).encode("utf-8")
+
+
+def test_serializers_match_response_models(authenticated_client, active_campaign, db):
+    """Test that each serializer produces what Pydantic would, from objects and from rows."""
+    donate(authenticated_client, active_campaign, "12.34", message="Good luck")
+    donate(authenticated_client, active_campaign, "5.00", is_anonymous=True)
+
+    cases = [
+        (donation_serializer, DonationResponse, Donation),
+        (campaign_serializer, CampaignResponse, Campaign),
+        (giver_profile_serializer, GiverProfileResponse, GiverProfile),
+    ]
+    for serializer, schema, model in cases:
+        objs = db.query(model).order_by(model.id).all()
+        rows = db.execute(
+            db.query(*serializer.columns).order_by(model.id).statement
+        ).all()
+        expected = [pydantic_json(schema, obj) for obj in objs]
+
+        assert [json.loads(dumps(item)) for item in serializer.objs(objs)] == expected
+        assert [json.loads(dumps(item)) for item in serializer.rows(rows)] == expected
+
+
+def test_list_endpoints_follow_their_schemas(authenticated_client, active_campaign):
+    """Test that fast list responses validate against the documented response models."""
+    donate(authenticated_client, active_campaign, "7.00", message="Hi")
+    donate(authenticated_client, active_campaign, "3.00")
+
+    donations = authenticated_client.get(f"/donations/campaigns/{active_campaign}").json()
+    assert DonationListResponse.model_validate(donations).model_dump(mode="json") == donations
+    assert [d["amount"] for d in donations["donations"]] == ["3.00", "7.00"]
+    assert donations["donations"][1]["message"] == "Hi"
+
+    campaigns = authenticated_client.get("/campaigns/my/campaigns").json()
+    assert CampaignListResponse.model_validate(campaigns).model_dump(mode="json") == campaigns
+    assert campaigns["campaigns"][0]["current_amount"] == "10.00"
+
+
+def test_paged_cursor_listing_with_columns(authenticated_client, active_campaign):
+    """Test that column-select pagination still hands out working cursors."""
+    for amount in ("1.00", "2.00", "3.00"):
+        donate(authenticated_client, active_campaign, amount)
+
+    first = authenticated_client.get("/donations/my/donations", params={"page_size": 2}).json()
+    second = authenticated_client.get(
+        "/donations/my/donations", params={"page_size": 2, "cursor": first["next_cursor"]}
+    ).json()
+
+    assert first["total"] == 3
+    assert [d["amount"] for d in first["donations"] + second["donations"]] == ["3.00", "2.00", "1.00"]
+    assert second["next_cursor"] is None
+
+
+def test_sparse_fieldsets(authenticated_client, active_campaign):
+    """Test that fields= trims both the SELECT and the response."""
+    for amount in ("1.00", "2.00", "3.00"):
+        donate(authenticated_client, active_campaign, amount, message="Long message " * 20)
+
+    response, statements = count_statements(lambda: authenticated_client.get(
+        "/campaigns/", params={"fields": "title, current_amount", "page_size": 1}
+    ))
+    assert response.status_code == 200
+    assert response.json()["campaigns"] == [{"title": "Totals campaign", "current_amount": "6.00"}]
+    assert not any("description" in statement for statement in statements)
+
+    # Pagination still works when created_at and id aren't requested
+    first, statements = count_statements(lambda: authenticated_client.get(
+        f"/donations/campaigns/{active_campaign}", params={"fields": "amount", "page_size": 2}
+    ))
+    assert not any("message" in statement or "description" in statement for statement in statements)
+    second = authenticated_client.get(f"/donations/campaigns/{active_campaign}", params={
+        "fields": "amount", "page_size": 2, "cursor": first.json()["next_cursor"]
+    })
+    assert first.json()["donations"] + second.json()["donations"] == [
+        {"amount": "3.00"}, {"amount": "2.00"}, {"amount": "1.00"}
+    ]
+
+
+def test_unknown_fields_are_rejected(authenticated_client):
+    """Test that fields outside the response schema get a 400 naming them."""
+    response = authenticated_client.get("/donations/my/donations", params={"fields": "amount,queue_ticket"})
+    assert response.status_code == 400
+    assert "queue_ticket" in response.json()["detail"]
+
+    assert authenticated_client.get("/campaigns/", params={"fields": ","}).status_code == 400
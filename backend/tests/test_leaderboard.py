@@ -0,0 +1,156 @@
+"""
+Tests for the materialized giving leaderboard.
+"""
+
+import asyncio
+from decimal import Decimal
+
+from models import GiverProfile, LeaderboardEntry
+from tests.conftest import TestingAsyncSessionLocal
+from tests.test_donations import active_campaign, create_pending, donate
+from tests.test_loading import count_statements
+from utils.leaderboard import check_leaderboard, rebuild_leaderboard
+
+
+def leaderboard(client, **params):
+    """Get the leaderboard rows."""
+    response = client.get("/givers/leaderboard", params=params)
+    assert response.status_code == 200
+    return response.json()["leaderboard"]
+
+
+def run_check():
+    """Run the consistency checker in its own session."""
+    async def run():
+        async with TestingAsyncSessionLocal() as session:
+            return await check_leaderboard(session)
+
+    return asyncio.run(run())
+
+
+def run_rebuild():
+    """Rebuild the leaderboard in its own session."""
+    async def run():
+        async with TestingAsyncSessionLocal() as session:
+            return await rebuild_leaderboard(session)
+
+    return asyncio.run(run())
+
+
+def test_completed_donations_update_leaderboard(authenticated_client, active_campaign, test_user_data):
+    """Test that completing and refunding donations moves the giver."""
+    assert leaderboard(authenticated_client) == []
+
+    donate(authenticated_client, active_campaign, "40.00")
+    refunded = donate(authenticated_client, active_campaign, "10.00")
+
+    [entry] = leaderboard(authenticated_client)
+    assert entry["rank"] == 1
+    assert entry["username"] == test_user_data["username"]
+    assert entry["total_donated"] == 50.0
+    assert entry["donation_count"] == 2
+
+    authenticated_client.patch(f"/donations/{refunded}/status", params={"payment_status": "refunded"})
+
+    [entry] = leaderboard(authenticated_client)
+    assert entry["total_donated"] == 40.0
+    assert entry["donation_count"] == 1
+    assert run_check().consistent
+
+
+def test_refresh_upserts_and_deletes_only_stale_rows(authenticated_client, active_campaign):
+    """Test that rows are upserted, and only deleted when a giver drops off."""
+    def leaderboard_writes(call):
+        _, statements = count_statements(call)
+        return [statement.split()[0] for statement in statements if "leaderboard_entries" in statement.split("(")[0]]
+
+    def set_status(donation_id, status):
+        return lambda: authenticated_client.patch(
+            f"/donations/{donation_id}/status", params={"payment_status": status}
+        )
+
+    first = create_pending(authenticated_client, active_campaign, "5.00")
+    second = create_pending(authenticated_client, active_campaign, "7.00")
+
+    # A new giver (no row to delete: no gap lock on InnoDB), then an existing one
+    assert "DELETE" not in leaderboard_writes(set_status(first, "completed"))
+    assert leaderboard(authenticated_client)[0]["total_donated"] == 5.0
+    writes = leaderboard_writes(set_status(second, "completed"))
+    assert "DELETE" not in writes and "INSERT" in writes
+    assert leaderboard(authenticated_client)[0]["total_donated"] == 12.0
+
+    set_status(second, "refunded")()
+    assert "DELETE" in leaderboard_writes(set_status(first, "refunded"))
+    assert leaderboard(authenticated_client) == []
+    assert run_check().consistent
+
+
+def test_batch_status_update_refreshes_leaderboard(authenticated_client, active_campaign):
+    """Test that batch completions reach the leaderboard."""
+    ids = [create_pending(authenticated_client, active_campaign, "5.00") for _ in range(3)]
+
+    response = authenticated_client.patch(
+        "/donations/status/batch",
+        json={"updates": [{"donation_id": i, "payment_status": "completed"} for i in ids]}
+    )
+    assert response.status_code == 200
+
+    [entry] = leaderboard(authenticated_client)
+    assert entry["total_donated"] == 15.0
+    assert entry["donation_count"] == 3
+
+
+def test_profile_changes_refresh_leaderboard(authenticated_client, active_campaign):
+    """Test that going private or renaming updates the giver's row."""
+    donate(authenticated_client, active_campaign, "20.00")
+
+    authenticated_client.put("/users/me", json={"full_name": "Renamed Giver"})
+    assert leaderboard(authenticated_client)[0]["full_name"] == "Renamed Giver"
+
+    authenticated_client.put("/givers/profile/me", json={"is_public": False})
+    assert leaderboard(authenticated_client) == []
+    assert leaderboard(authenticated_client, profile_type="individual") == []
+
+    authenticated_client.put("/givers/profile/me", json={"is_public": True})
+    assert len(leaderboard(authenticated_client, profile_type="individual")) == 1
+    assert leaderboard(authenticated_client, profile_type="company") == []
+
+
+def test_checker_finds_drift_and_rebuild_fixes_it(authenticated_client, active_campaign, db):
+    """Test that changes made outside the API are reported and rebuilt."""
+    donate(authenticated_client, active_campaign, "30.00")
+    profile = db.query(GiverProfile).one()
+
+    # Change the live tables behind the leaderboard's back
+    profile.total_donated = Decimal("31.00")
+    db.add(LeaderboardEntry(
+        giver_id=profile.id + 1000,
+        profile_type=profile.profile_type,
+        username="ghost",
+        total_donated=Decimal("1.00"),
+        donation_count=1
+    ))
+    db.commit()
+
+    report = run_check()
+    assert not report.consistent
+    assert report.mismatched == [profile.id]
+    assert report.extra == [profile.id + 1000]
+    assert report.missing == []
+
+    assert run_rebuild() == 1
+    assert run_check().consistent
+    assert leaderboard(authenticated_client)[0]["total_donated"] == 31.0
+
+
+def test_rebuild_adds_missing_givers(authenticated_client, active_campaign, db):
+    """Test that givers with no row are put back by a rebuild."""
+    donate(authenticated_client, active_campaign, "12.50")
+    db.query(LeaderboardEntry).delete()
+    db.commit()
+
+    profile = db.query(GiverProfile).one()
+    assert run_check().missing == [profile.id]
+
+    run_rebuild()
+    assert leaderboard(authenticated_client)[0]["total_donated"] == 12.5
@@ -0,0 +1,173 @@
+"""
+Tests for the live campaign totals stream and its pub/sub hub.
+"""
+
+import asyncio
+import json
+import time
+
+from routers.campaigns import stream_campaign_totals
+from tests.conftest import TestingAsyncSessionLocal
+from tests.test_donations import active_campaign, create_pending, donate
+from tests.test_loading import count_statements
+from utils.live_totals import live_totals
+from utils.pubsub import Hub
+
+
+def wait_for_message(subscription, timeout=5.0):
+    """Wait for the app's event loop to publish to a subscription, and read it."""
+    deadline = time.monotonic() + timeout
+    while not subscription.received and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return asyncio.run(subscription.next(timeout=0))
+
+
+def event_data(message):
+    """Payload of a rendered "totals" event."""
+    lines = message.strip().splitlines()
+    assert "event: totals" in lines
+    return json.loads(lines[-1].removeprefix("data: "))
+
+
+def test_hub_fans_out_to_every_subscriber():
+    """Test that one publish reaches 10,000 subscriptions, and only on its topic."""
+    hub = Hub()
+    subscriptions = [hub.subscribe("campaign:1") for _ in range(10_000)]
+    other = hub.subscribe("campaign:2")
+
+    async def run():
+        delivered = hub.publish("campaign:1", "totals")
+        messages = await asyncio.gather(*(subscription.next(timeout=1) for subscription in subscriptions))
+        return delivered, messages
+
+    delivered, messages = asyncio.run(run())
+
+    assert delivered == 10_000
+    assert set(messages) == {"totals"}
+    assert other.received == 0
+
+    for subscription in subscriptions:
+        hub.unsubscribe(subscription)
+    assert hub.topics() == ["campaign:2"]
+
+
+def test_slow_subscriber_gets_latest_message():
+    """Test that unread messages are replaced rather than queued."""
+    hub = Hub()
+    subscription = hub.subscribe("campaign:1")
+
+    for amount in ("1.00", "2.00", "3.00"):
+        hub.publish("campaign:1", amount)
+
+    async def run():
+        return await subscription.next(timeout=1), await subscription.next(timeout=0.01)
+
+    assert asyncio.run(run()) == ("3.00", None)
+    assert subscription.dropped == 2
+
+
+def test_stream_sends_initial_totals_then_changes(client, active_campaign):
+    """Test the event stream body: retry hint, current totals, then changes."""
+    async def run():
+        async with TestingAsyncSessionLocal() as db:
+            response = await stream_campaign_totals(active_campaign, db=db)
+        body = response.body_iterator
+        try:
+            first = await anext(body)
+            live_totals.publish({active_campaign: {
+                "campaign_id": active_campaign, "current_amount": "5.00", "donation_count": 1
+            }})
+            second = await anext(body)
+            return response, first, second, live_totals.hub.subscriber_count(f"campaign:{active_campaign}")
+        finally:
+            await body.aclose()
+
+    response, first, second, subscribers = asyncio.run(run())
+
+    assert response.media_type == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert first.startswith("retry: 3000\n\n")
+    assert event_data(first) == {"campaign_id": active_campaign, "current_amount": "0.00", "donation_count": 0}
+    assert event_data(second)["current_amount"] == "5.00"
+    assert subscribers == 1
+    assert live_totals.status()["subscribers"] == 0
+
+
+def test_stream_sends_heartbeats(client):
+    """Test that an idle stream sends keep-alive comments."""
+    async def run():
+        subscription = live_totals.subscribe(1)
+        body = live_totals.stream(subscription, {"campaign_id": 1}, heartbeat_interval=0.01)
+        try:
+            await anext(body)
+            return await anext(body)
+        finally:
+            await body.aclose()
+
+    assert asyncio.run(run()) == ": keep-alive\n\n"
+
+
+def test_stream_missing_campaign(client):
+    """Test that streaming a missing campaign is a 404 and leaves no subscription."""
+    response = client.get("/campaigns/999/stream")
+
+    assert response.status_code == 404
+    assert live_totals.status()["subscribers"] == 0
+
+
+def test_donation_completion_publishes_totals(authenticated_client, active_campaign):
+    """Test that completing donations pushes the new totals to watchers."""
+    subscription = live_totals.subscribe(active_campaign)
+
+    donate(authenticated_client, active_campaign, "42.00")
+    assert event_data(wait_for_message(subscription)) == {
+        "campaign_id": active_campaign, "current_amount": "42.00", "donation_count": 1
+    }
+
+    # Batch settlements publish once for the whole batch
+    ids = [create_pending(authenticated_client, active_campaign, "1.50") for _ in range(2)]
+    subscription.received = 0
+    authenticated_client.patch("/donations/status/batch", json={
+        "updates": [{"donation_id": donation_id, "payment_status": "completed"} for donation_id in ids]
+    })
+    assert event_data(wait_for_message(subscription))["donation_count"] == 3
+    assert subscription.received == 1
+
+
+def test_unchanged_totals_are_not_republished(client, active_campaign):
+    """Test that polling only publishes when a campaign's totals change."""
+    subscription = live_totals.subscribe(active_campaign)
+
+    async def run():
+        return await live_totals.refresh([active_campaign]), await live_totals.refresh([active_campaign])
+
+    assert asyncio.run(run()) == (1, 0)
+    assert subscription.received == 1
+
+
+def test_watched_campaign_streams_start_without_a_read(authenticated_client, active_campaign):
+    """Test that new streams reuse the last published totals, and reads don't count donations."""
+    donate(authenticated_client, active_campaign, "8.00")
+
+    async def run():
+        bodies = []
+        try:
+            for _ in range(4):
+                async with TestingAsyncSessionLocal() as db:
+                    bodies.append((await stream_campaign_totals(active_campaign, db=db)).body_iterator)
+            return [await anext(body) for body in bodies]
+        finally:
+            for body in bodies:
+                await body.aclose()
+
+    messages, statements = count_statements(lambda: asyncio.run(run()))
+
+    assert [event_data(message) for message in messages] == [
+        {"campaign_id": active_campaign, "current_amount": "8.00", "donation_count": 1}
+    ] * 4
+    # Only the first stream read the campaign
+    assert sum(statement.lstrip().startswith("SELECT campaigns.id") for statement in statements) == 1
+    assert not any("FROM donations" in statement for statement in statements)
+    assert live_totals.status()["shared_initial"] == 3
+    assert live_totals.status()["subscribers"] == 0
+    assert live_totals._last == {}
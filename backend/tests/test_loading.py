@@ -0,0 +1,109 @@
+"""
+Tests for relationship loading: the lazy load guard and eager-loaded endpoints.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import event, select
+
+from database import LazyLoadError
+from models import Donation, GiverProfile
+from tests.conftest import TestingAsyncSessionLocal, async_engine
+from tests.test_donations import active_campaign, donate
+
+
+def other_user_headers(client):
+    """Register and log in a second user."""
+    client.post("/auth/register", json={
+        "email": "other@example.com", "username": "otheruser", "password": "OtherPass123!"
+    })
+    token = client.post(
+        "/auth/login", data={"username": "otheruser", "password": "OtherPass123!"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def count_statements(call):
+    """Run call() and return (its result, SQL statements it ran)."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        return call(), statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+def test_lazy_load_raises_in_guarded_session(authenticated_client, active_campaign):
+    """Test that reading a relationship that wasn't eager loaded fails, naming it."""
+    donate(authenticated_client, active_campaign, "5.00")
+
+    async def read_campaign_donations():
+        async with TestingAsyncSessionLocal() as db:
+            profile = await db.scalar(select(GiverProfile))
+            return profile.donations
+
+    with pytest.raises(LazyLoadError, match="GiverProfile.donations"):
+        asyncio.run(read_campaign_donations())
+
+
+def test_identity_map_hits_are_allowed(authenticated_client, active_campaign):
+    """Test that a many-to-one already loaded in the session doesn't count as a lazy load."""
+    donate(authenticated_client, active_campaign, "5.00")
+
+    async def read_giver():
+        async with TestingAsyncSessionLocal() as db:
+            profile = await db.scalar(select(GiverProfile))
+            donation = await db.scalar(select(Donation))
+            return donation.giver is profile
+
+    assert asyncio.run(read_giver())
+
+
+def test_unguarded_sessions_still_lazy_load(authenticated_client, active_campaign, db):
+    """Test that scripts' sync sessions (no guard) keep lazy loading."""
+    donate(authenticated_client, active_campaign, "5.00")
+
+    profile = db.query(GiverProfile).one()
+    assert len(profile.donations) == 1
+    assert profile.user.username == "testuser"
+
+
+def test_giver_profile_repr_does_not_query(authenticated_client, active_campaign):
+    """Test that logging a profile doesn't lazy load its user."""
+    donate(authenticated_client, active_campaign, "5.00")
+
+    async def describe():
+        async with TestingAsyncSessionLocal() as db:
+            return repr(await db.scalar(select(GiverProfile)))
+
+    assert "user_id=" in asyncio.run(describe())
+
+
+def test_donation_detail_is_one_query(authenticated_client, active_campaign):
+    """Test that GET /donations/{id} loads the donor and campaign with the donation."""
+    donation_id = donate(authenticated_client, active_campaign, "5.00")
+    authenticated_client.get("/users/me")  # Warm the principal cache
+
+    response, statements = count_statements(lambda: authenticated_client.get(f"/donations/{donation_id}"))
+
+    assert response.status_code == 200
+    assert len(statements) == 1
+    assert "JOIN giver_profiles" in statements[0] and "JOIN campaigns" in statements[0]
+
+
+def test_eager_loaded_authorization(authenticated_client, active_campaign):
+    """Test that other users still can't view or update a donation."""
+    donation_id = donate(authenticated_client, active_campaign, "5.00", status="pending")
+    headers = other_user_headers(authenticated_client)
+
+    assert authenticated_client.get(f"/donations/{donation_id}", headers=headers).status_code == 403
+    response = authenticated_client.patch(
+        f"/donations/{donation_id}/status", params={"payment_status": "completed"}, headers=headers
+    )
+    assert response.status_code == 403
+    assert authenticated_client.get(f"/donations/{donation_id}").json()["payment_status"] == "pending"
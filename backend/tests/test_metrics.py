@@ -0,0 +1,96 @@
+"""
+Tests for the Prometheus metrics registry and GET /metrics.
+"""
+
+import re
+
+from routers import auth as auth_router
+from tests.test_donations import active_campaign, donate
+from utils import metrics
+from utils.metrics import Registry
+
+
+def sample(text, name, **labels):
+    """Find one sample's value in a /metrics response (None if absent)."""
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = "^" + re.escape(name + (f"{{{label_text}}}" if labels else "")) + r" (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test histogram rendering: cumulative buckets, +Inf, sum and count."""
+    registry = Registry()
+    histogram = registry.histogram("job_seconds", "Job time", ("queue",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "default")
+
+    text = registry.render()
+
+    assert "# TYPE job_seconds histogram" in text
+    assert sample(text, "job_seconds_bucket", queue="default", le="0.1") == 2
+    assert sample(text, "job_seconds_bucket", queue="default", le="1") == 3
+    assert sample(text, "job_seconds_bucket", queue="default", le="+Inf") == 4
+    assert sample(text, "job_seconds_count", queue="default") == 4
+    assert sample(text, "job_seconds_sum", queue="default") == 3.65
+
+
+def test_label_values_are_escaped():
+    """Test that quotes, backslashes and newlines in label values are escaped."""
+    registry = Registry()
+    registry.counter("things_total", "Things", ("name",)).inc('say "hi"\\\n')
+
+    assert 'things_total{name="say \\"hi\\"\\\\\\n"} 1' in registry.render()
+
+
+def test_requests_are_counted_by_route(client):
+    """Test that requests are labelled with the route template, not the raw path."""
+    before = metrics.http_requests.value("GET", "/campaigns/{campaign_id}", "404")
+
+    client.get("/campaigns/12345")
+    client.get("/campaigns/67890")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert sample(text, "http_requests_total", method="GET", route="/campaigns/{campaign_id}", status="404") == before + 2
+    assert "/campaigns/12345" not in text
+    assert sample(text, "http_request_duration_seconds_count", method="GET", route="/campaigns/{campaign_id}") >= 2
+    # The scrape itself is in flight while rendering
+    assert sample(text, "http_requests_in_flight") == 1
+
+
+def test_pool_and_password_metrics(client):
+    """Test that the collectors report connection pool and password pool numbers."""
+    text = client.get("/metrics").text
+
+    assert sample(text, "db_pool_size", engine="async") is not None
+    assert sample(text, "db_pool_checkouts_total", engine="async") >= 1
+    assert sample(text, "password_pool_queued") == 0
+    assert sample(text, "password_pool_rejected_total") is not None
+
+
+def test_donation_and_password_counters(authenticated_client, active_campaign):
+    """Test donation completions and bcrypt job timings (registration and login hash passwords)."""
+    completed = metrics.donation_status_changes.value("completed")
+    amount = metrics.donations_completed_amount.value()
+
+    donate(authenticated_client, active_campaign, "12.50")
+    donate(authenticated_client, active_campaign, "1.00", status="failed")
+
+    assert metrics.donation_status_changes.value("completed") == completed + 1
+    assert metrics.donations_completed_amount.value() == amount + 12.5
+    assert metrics.password_job_duration.count() >= 2
+
+
+def test_rate_limit_rejections_are_counted(client, monkeypatch):
+    """Test that 429s from the rate limiter are counted by route."""
+    monkeypatch.setattr(auth_router.limiter, "enabled", True)
+    before = metrics.rate_limited_requests.value("/auth/login")
+
+    for _ in range(12):
+        response = client.post("/auth/login", data={"username": "nobody", "password": "WrongPass123!"})
+
+    assert response.status_code == 429
+    assert metrics.rate_limited_requests.value("/auth/login") > before
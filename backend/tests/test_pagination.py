@@ -0,0 +1,140 @@
+"""
+Tests for page-based and cursor-based pagination of list endpoints.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from models import (
+    User, Campaign, GiverProfile, Donation,
+    CampaignStatus, PaymentStatus
+)
+from utils.pagination import decode_cursor, encode_cursor
+
+
+@pytest.fixture()
+def campaign_with_donations(db):
+    """Create an active campaign with 7 completed donations."""
+    user = User(email="creator@example.com", username="creator", hashed_password="x")
+    db.add(user)
+    db.flush()
+
+    giver = GiverProfile(user_id=user.id)
+    campaign = Campaign(
+        title="Pagination campaign",
+        description="Campaign used by the pagination tests",
+        status=CampaignStatus.ACTIVE,
+        creator_id=user.id
+    )
+    db.add_all([giver, campaign])
+    db.flush()
+
+    # Inserted in the same statement batch, so most share a created_at
+    # second and the id tie-breaker decides the order
+    db.add_all([
+        Donation(
+            amount=Decimal("5.00") * (i + 1),
+            campaign_id=campaign.id,
+            giver_id=giver.id,
+            payment_status=PaymentStatus.COMPLETED
+        )
+        for i in range(7)
+    ])
+    db.commit()
+    return campaign.id
+
+
+def test_cursor_round_trip():
+    """Test that cursors decode to the values they were built from."""
+    created_at = datetime(2025, 11, 5, 10, 30, 0, 123456)
+
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_invalid_cursor():
+    """Test that a malformed cursor is rejected."""
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_page_pagination_keeps_contract(client, campaign_with_donations):
+    """Test that page/page_size still returns the total and page number."""
+    response = client.get(
+        f"/donations/campaigns/{campaign_with_donations}",
+        params={"page": 2, "page_size": 3}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 7
+    assert data["page"] == 2
+    assert len(data["donations"]) == 3
+    assert data["next_cursor"] is not None
+
+
+def test_page_past_the_end(client, campaign_with_donations):
+    """Test that an empty page past the end still reports the total."""
+    response = client.get(
+        f"/donations/campaigns/{campaign_with_donations}",
+        params={"page": 5, "page_size": 3}
+    )
+
+    data = response.json()
+    assert data["donations"] == []
+    assert data["total"] == 7
+    assert data["next_cursor"] is None
+
+
+def test_cursor_pagination_walks_every_row(client, campaign_with_donations):
+    """Test that following next_cursor visits each row once, newest first."""
+    url = f"/donations/campaigns/{campaign_with_donations}"
+    expected = [d["id"] for d in client.get(url, params={"page_size": 100}).json()["donations"]]
+
+    seen = []
+    params = {"page_size": 3}
+    while True:
+        data = client.get(url, params=params).json()
+        seen.extend(d["id"] for d in data["donations"])
+        if data["next_cursor"] is None:
+            break
+        params = {"page_size": 3, "cursor": data["next_cursor"]}
+
+    assert seen == expected
+    assert len(seen) == 7
+
+
+def test_cursor_pagination_optional_total(client, campaign_with_donations):
+    """Test that cursor pages only count the total when asked."""
+    url = f"/donations/campaigns/{campaign_with_donations}"
+    first = client.get(url, params={"page_size": 3}).json()
+
+    without_total = client.get(url, params={"page_size": 3, "cursor": first["next_cursor"]}).json()
+    with_total = client.get(
+        url,
+        params={"page_size": 3, "cursor": first["next_cursor"], "include_total": True}
+    ).json()
+
+    assert without_total["total"] is None
+    assert without_total["page"] is None
+    assert with_total["total"] == 7
+
+
+def test_invalid_cursor_returns_400(client, campaign_with_donations):
+    """Test that a tampered cursor is a client error."""
+    response = client.get(
+        f"/donations/campaigns/{campaign_with_donations}",
+        params={"cursor": "garbage!"}
+    )
+
+    assert response.status_code == 400
+
+
+def test_campaign_list_cursor(client, campaign_with_donations):
+    """Test that campaign listing supports cursors too."""
+    data = client.get("/campaigns/", params={"page_size": 1}).json()
+
+    assert data["total"] == 1
+    assert len(data["campaigns"]) == 1
+    assert data["next_cursor"] is None
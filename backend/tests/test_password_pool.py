@@ -0,0 +1,118 @@
+"""
+Tests for the bcrypt password pool, backpressure and rehash on login.
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from auth import hash_password_async, verify_password_async
+from config import get_password_settings
+from models import User
+from utils import passwords
+from utils.password_pool import PasswordPool, PasswordPoolBusy, password_pool
+
+
+def test_hash_and_verify_in_pool():
+    """Test that hashing in worker processes uses the configured cost."""
+    async def run():
+        hashed = await hash_password_async("PoolPass123!")
+        return hashed, await verify_password_async("PoolPass123!", hashed)
+
+    hashed, matches = asyncio.run(run())
+
+    assert matches
+    assert passwords.get_rounds(hashed) == get_password_settings().bcrypt_rounds
+
+
+def test_full_queue_is_rejected():
+    """Test that work beyond workers + max_queue is turned away, not queued."""
+    pool = PasswordPool(workers=1, max_queue=1)
+
+    async def run():
+        return await asyncio.gather(
+            *(pool.run(time.sleep, 0.5) for _ in range(3)),
+            return_exceptions=True
+        )
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert sum(isinstance(r, PasswordPoolBusy) for r in results) == 1
+    assert pool.status()["rejected"] == 1
+    assert pool.status()["completed"] == 2
+    assert pool.in_flight == 0
+
+
+def test_workers_are_not_forked():
+    """Test that worker processes don't inherit the server's threads' locks via fork."""
+    pool = PasswordPool(workers=1, max_queue=0)
+    try:
+        assert pool._get_executor()._mp_context.get_start_method() in ("forkserver", "spawn")
+        assert asyncio.run(pool.run(passwords.get_rounds, "$2b$04$" + "a" * 53)) == 4
+    finally:
+        pool.shutdown()
+
+
+def test_broken_pool_is_replaced():
+    """Test that a dead worker gives PasswordPoolBusy and the broken pool is shut down and replaced."""
+    pool = PasswordPool(workers=1, max_queue=1)
+
+    async def run():
+        with pytest.raises(PasswordPoolBusy):
+            await pool.run(os._exit, 1)
+        return await pool.run(passwords.get_rounds, "$2b$04$" + "a" * 53)
+
+    try:
+        broken = pool._get_executor()
+        shutdowns = []
+        shutdown = broken.shutdown
+        broken.shutdown = lambda **kwargs: shutdowns.append(kwargs) or shutdown(**kwargs)
+
+        assert asyncio.run(run()) == 4
+        assert pool._executor is not broken
+        assert shutdowns == [{"wait": False, "cancel_futures": True}]
+    finally:
+        pool.shutdown()
+
+
+def test_login_returns_503_when_busy(authenticated_client, test_user_data, monkeypatch):
+    """Test that a login storm gets 503 with Retry-After instead of waiting."""
+    monkeypatch.setattr(password_pool, "in_flight", password_pool.workers + password_pool.max_queue)
+
+    response = authenticated_client.post(
+        "/auth/login",
+        data={"username": test_user_data["email"], "password": test_user_data["password"]}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_rehashes_on_cost_change(client, db):
+    """Test that a hash made with an old cost is upgraded on login."""
+    old_rounds = get_password_settings().bcrypt_rounds + 1
+    user = User(
+        email="rehash@example.com",
+        username="rehash",
+        hashed_password=passwords.hash_password("RehashPass123!", old_rounds)
+    )
+    db.add(user)
+    db.commit()
+
+    response = client.post("/auth/login", data={"username": "rehash", "password": "RehashPass123!"})
+    assert response.status_code == 200
+
+    db.refresh(user)
+    assert passwords.get_rounds(user.hashed_password) == get_password_settings().bcrypt_rounds
+    assert passwords.verify_password("RehashPass123!", user.hashed_password)
+
+
+def test_get_rounds_rejects_non_bcrypt():
+    """Test that a non-bcrypt hash is reported as such."""
+    with pytest.raises(ValueError):
+        passwords.get_rounds("plaintext")
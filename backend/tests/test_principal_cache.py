@@ -0,0 +1,140 @@
+"""
+Tests for the authenticated principal cache.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from models import User
+from tests.conftest import async_engine
+from utils.principal_cache import PrincipalCache, TTLCache, principal_cache
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class DictBackend:
+    """Shared backend stand-in backed by a dict (ignores TTLs)."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture()
+def user_queries():
+    """Record the SELECTs on the users table made by the app."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+def test_ttl_cache_expires_entries():
+    """Test that entries expire after the TTL."""
+    clock = FakeClock()
+    cache = TTLCache(max_size=10, ttl=30, clock=clock)
+    cache.set("alice", 1)
+
+    clock.now = 29
+    assert cache.get("alice") == 1
+    clock.now = 30
+    assert cache.get("alice") is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test that the cache stays within max_size, dropping the oldest use."""
+    cache = TTLCache(max_size=2, ttl=30)
+    cache.set("alice", 1)
+    cache.set("bob", 2)
+    cache.get("alice")
+    cache.set("carol", 3)
+
+    assert len(cache) == 2
+    assert cache.get("bob") is None
+    assert cache.get("alice") == 1
+
+
+def test_authenticated_requests_skip_user_query(authenticated_client, user_queries):
+    """Test that repeat requests with the same token don't load the user again."""
+    authenticated_client.get("/users/me")
+    queries_after_first = len(user_queries)
+
+    for _ in range(3):
+        assert authenticated_client.get("/users/me").status_code == 200
+
+    assert len(user_queries) == queries_after_first
+
+
+def test_profile_update_invalidates(authenticated_client):
+    """Test that a profile change is visible on the next request."""
+    authenticated_client.get("/users/me")
+
+    response = authenticated_client.put("/users/me", json={"full_name": "Renamed User"})
+    assert response.status_code == 200
+
+    assert authenticated_client.get("/users/me").json()["full_name"] == "Renamed User"
+
+
+def test_deactivation_invalidates(authenticated_client, db, test_user_data):
+    """Test that flipping is_active locks the user out straight away."""
+    assert authenticated_client.get("/users/me").status_code == 200
+
+    user = db.query(User).filter(User.username == test_user_data["username"]).one()
+    user.is_active = False
+    db.commit()
+
+    assert authenticated_client.get("/users/me").status_code == 403
+
+
+def test_shared_backend_between_processes():
+    """Test that a second cache (another process) reads and invalidates shared entries."""
+    backend = DictBackend()
+    first = PrincipalCache(ttl=30, max_size=10, backend=backend)
+    second = PrincipalCache(ttl=30, max_size=10, backend=backend)
+    user = User(id=7, username="alice", email="alice@example.com", hashed_password="secret", is_active=True)
+
+    async def run():
+        await first.set("alice", user)
+        cached = await second.get("alice")
+        await second.invalidate("alice")
+        return cached, await first.backend.get("principal:alice")
+
+    cached, after_invalidate = asyncio.run(run())
+
+    assert cached["id"] == 7
+    assert "hashed_password" not in cached
+    assert after_invalidate is None
+
+
+def test_disabled_cache_always_queries(authenticated_client, user_queries, monkeypatch):
+    """Test that a TTL of 0 turns the cache off."""
+    monkeypatch.setattr(principal_cache, "ttl", 0)
+
+    authenticated_client.get("/users/me")
+    queries_after_first = len(user_queries)
+    authenticated_client.get("/users/me")
+
+    assert len(user_queries) > queries_after_first
@@ -0,0 +1,175 @@
+"""
+Query plan tests for the hot list and leaderboard queries.
+
+Runs EXPLAIN QUERY PLAN on SQLite and fails if a hot query stops using
+its composite index, falls back to a full table scan, or has to sort
+rows that the index should already return in order.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import and_, desc, func, literal, or_, select, text
+
+from models import (
+    Campaign, Donation, GiverProfile,
+    CampaignStatus, CampaignType, PaymentStatus, ProfileType
+)
+from utils.campaign_lifecycle import ending, starting, upcoming_dates
+from utils.campaign_search import search_page, search_query
+from utils.leaderboard import leaderboard_query, leaderboard_source
+
+
+def explain(db, query):
+    """Get the EXPLAIN QUERY PLAN detail lines for a query."""
+    sql = query.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    return [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def assert_uses_index(plan, table, index, ordered=True):
+    """
+    Assert a plan searches table through index.
+
+    Args:
+        plan: Plan detail lines from explain()
+        table: Table the query reads
+        index: Index the query must use
+        ordered: Whether the index must also provide the ORDER BY
+    """
+    assert not any(line.startswith(f"SCAN {table}") for line in plan), plan
+    assert any(
+        line.startswith(f"SEARCH {table}") and index in line for line in plan
+    ), plan
+    if ordered:
+        assert not any("TEMP B-TREE" in line for line in plan), plan
+
+
+def campaign_donations_query():
+    """Public donation list for a campaign, as get_campaign_donations builds it."""
+    return select(Donation).where(
+        Donation.campaign_id == 1,
+        Donation.payment_status == PaymentStatus.COMPLETED,
+        Donation.is_anonymous == False
+    )
+
+
+NEWEST_DONATIONS = (Donation.created_at.desc(), Donation.id.desc())
+NEWEST_CAMPAIGNS = (Campaign.created_at.desc(), Campaign.id.desc())
+
+
+def test_campaign_donations_page(db):
+    """Test the campaign donation page is read in index order."""
+    query = campaign_donations_query().order_by(*NEWEST_DONATIONS).limit(10)
+
+    assert_uses_index(explain(db, query), "donations", "ix_donations_campaign_status_anon_created")
+
+
+def test_campaign_donations_cursor_page(db):
+    """Test the keyset page seeks the same index."""
+    anchor = func.coalesce(
+        select(Donation.created_at).where(Donation.id == 50).scalar_subquery(),
+        literal("2025-01-01 00:00:00")
+    )
+    query = campaign_donations_query().where(or_(
+        Donation.created_at < anchor,
+        and_(Donation.created_at == anchor, Donation.id < 50)
+    )).order_by(*NEWEST_DONATIONS).limit(11)
+
+    assert_uses_index(explain(db, query), "donations", "ix_donations_campaign_status_anon_created")
+
+
+def test_campaign_donations_windowed_count(db):
+    """Test the page-with-total query still searches the index (the window sorts)."""
+    query = campaign_donations_query().add_columns(
+        func.count().over()
+    ).order_by(*NEWEST_DONATIONS).offset(10).limit(10)
+
+    assert_uses_index(
+        explain(db, query), "donations", "ix_donations_campaign_status_anon_created",
+        ordered=False
+    )
+
+
+def test_giver_donations_page(db):
+    """Test a giver's completed donation history is read in index order."""
+    query = select(Donation).where(
+        Donation.giver_id == 1,
+        Donation.payment_status == PaymentStatus.COMPLETED
+    ).order_by(*NEWEST_DONATIONS).limit(10)
+
+    assert_uses_index(explain(db, query), "donations", "ix_donations_giver_status_created")
+
+
+def test_campaign_list_by_status_and_type(db):
+    """Test campaign listing filtered by status and type."""
+    query = select(Campaign).where(
+        Campaign.status == CampaignStatus.ACTIVE,
+        Campaign.campaign_type == CampaignType.EVENT
+    ).order_by(*NEWEST_CAMPAIGNS).limit(10)
+
+    assert_uses_index(explain(db, query), "campaigns", "ix_campaigns_status_type_created")
+
+
+def test_campaign_list_by_status(db):
+    """Test the default campaign listing (status only)."""
+    query = select(Campaign).where(
+        Campaign.status == CampaignStatus.ACTIVE
+    ).order_by(*NEWEST_CAMPAIGNS).limit(10)
+
+    assert_uses_index(explain(db, query), "campaigns", "ix_campaigns_status_created")
+
+
+def test_campaign_search(db):
+    """Test search reads matches from the FTS index and campaigns by primary key."""
+    query, score = search_query("sqlite", select(Campaign.id, Campaign.title).where(
+        Campaign.status == CampaignStatus.ACTIVE,
+        Campaign.campaign_type == CampaignType.EVENT
+    ), "village school")
+    plan = explain(db, search_page(query, score, 10, None))
+
+    assert any(line.startswith("SCAN campaigns_fts VIRTUAL TABLE INDEX") for line in plan), plan
+    assert any(line.startswith("SEARCH campaigns USING INTEGER PRIMARY KEY") for line in plan), plan
+    assert not any(line.startswith("SCAN campaigns ") for line in plan), plan
+
+
+def test_campaign_lifecycle_due(db):
+    """Test the scheduler finds due campaigns through the status/date indexes, in date order."""
+    now = datetime(2026, 1, 1, 12, 0)
+    query = select(Campaign.id).where(*starting(now)).order_by(Campaign.start_date).limit(500)
+    assert_uses_index(explain(db, query), "campaigns", "ix_campaigns_status_start")
+
+    query = select(Campaign.id).where(*ending(now)).order_by(Campaign.end_date).limit(500)
+    assert_uses_index(explain(db, query), "campaigns", "ix_campaigns_status_end")
+
+
+def test_campaign_lifecycle_upcoming(db):
+    """Test the scheduler loads upcoming dates with an index range, not a scan."""
+    starts, ends = upcoming_dates(datetime(2026, 1, 1, 12, 0), datetime(2026, 1, 1, 12, 1))
+
+    assert_uses_index(explain(db, starts), "campaigns", "ix_campaigns_status_start")
+    # Two statuses: each is a range of the index, merged with a small sort
+    assert_uses_index(explain(db, ends), "campaigns", "ix_campaigns_status_end", ordered=False)
+
+
+def test_leaderboard(db):
+    """Test the leaderboard reads the top entries in index order."""
+    plan = explain(db, leaderboard_query(10))
+
+    assert any(
+        line.startswith("SCAN leaderboard_entries USING INDEX ix_leaderboard_entries_total")
+        for line in plan
+    ), plan
+    assert not any("TEMP B-TREE" in line for line in plan), plan
+
+
+def test_leaderboard_by_profile_type(db):
+    """Test the filtered leaderboard searches its composite index in order."""
+    query = leaderboard_query(10, ProfileType.COMPANY)
+
+    assert_uses_index(explain(db, query), "leaderboard_entries", "ix_leaderboard_entries_type_total")
+
+
+def test_leaderboard_rebuild_source(db):
+    """Test the leaderboard rebuild finds public givers through the index."""
+    query = leaderboard_source().order_by(desc(GiverProfile.total_donated))
+
+    assert_uses_index(explain(db, query), "giver_profiles", "ix_giver_profiles_public_total")
@@ -0,0 +1,102 @@
+"""
+Tests for per-request query counting (Server-Timing) and slow-query logging.
+"""
+
+import logging
+import re
+
+from sqlalchemy import event, text
+
+from config import get_query_settings
+from tests.conftest import async_engine, engine
+from tests.test_donations import active_campaign, donate
+from utils.query_stats import RequestQueryStats
+
+
+def parse_server_timing(header):
+    """Parse a Server-Timing header into {name: (duration_ms, description)}."""
+    metrics = {}
+    for metric in header.split(","):
+        name, *params = [part.strip() for part in metric.split(";")]
+        values = dict(param.split("=", 1) for param in params)
+        metrics[name] = (float(values["dur"]), values.get("desc", "").strip('"'))
+    return metrics
+
+
+def test_server_timing_counts_statements(authenticated_client, active_campaign):
+    """Test that the header reports exactly the statements the request ran."""
+    donation_id = donate(authenticated_client, active_campaign, "10.00")
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = authenticated_client.get(f"/donations/{donation_id}")
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    metrics = parse_server_timing(response.headers["Server-Timing"])
+    assert metrics["db"][1] == f"{len(statements)} {'query' if len(statements) == 1 else 'queries'}"
+    assert metrics["db"][0] >= metrics["db-slowest"][0] > 0
+    assert metrics["app"][0] >= metrics["db"][0]
+
+
+def test_requests_without_queries(client):
+    """Test that requests that don't touch the database report zero."""
+    response = client.get("/")
+    metrics = parse_server_timing(response.headers["Server-Timing"])
+    assert metrics["db"] == (0.0, "0 queries")
+
+
+def test_request_log_fields(client, caplog):
+    """Test that each request is logged with its statement count and timings."""
+    with caplog.at_level(logging.INFO, logger="utils.query_stats"):
+        client.get("/health")
+
+    record = next(r for r in caplog.records if r.name == "utils.query_stats")
+    assert record.request == "GET /health"
+    assert record.status_code == 200
+    assert record.db_queries >= 1
+    assert "db_queries=" in record.getMessage()
+
+
+def test_slow_queries_are_logged(client, caplog, monkeypatch):
+    """Test that statements over the threshold are logged, with the request that ran them."""
+    monkeypatch.setattr(get_query_settings(), "slow_threshold_ms", 0.000001)
+
+    with caplog.at_level(logging.WARNING, logger="sql.slow"):
+        client.get("/health")
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 42"))
+
+    records = [r for r in caplog.records if r.name == "sql.slow"]
+    assert any(r.request == "GET /health" and "SELECT 1" in r.statement for r in records)
+    assert any(r.request is None and r.statement == "SELECT 42" for r in records)
+
+
+def test_slow_query_log_disabled(client, caplog, monkeypatch):
+    """Test that a threshold of 0 turns slow-query logging off."""
+    monkeypatch.setattr(get_query_settings(), "slow_threshold_ms", 0)
+
+    with caplog.at_level(logging.WARNING, logger="sql.slow"):
+        client.get("/health")
+
+    assert not [r for r in caplog.records if r.name == "sql.slow"]
+
+
+def test_stats_keep_the_slowest_statement():
+    """Test RequestQueryStats bookkeeping and header rendering."""
+    stats = RequestQueryStats()
+    stats.record("SELECT 1", 0.002)
+    stats.record("SELECT 2", 0.005)
+    stats.record("SELECT 3", 0.001)
+
+    assert stats.count == 3
+    assert stats.slowest_statement == "SELECT 2"
+    assert re.fullmatch(
+        r'db;dur=8\.00;desc="3 queries", db-slowest;dur=5\.00, app;dur=10\.00',
+        stats.server_timing(0.010)
+    )
@@ -0,0 +1,222 @@
+"""
+Tests for the public response cache and ETag revalidation.
+"""
+
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from models import Campaign
+from tests.test_donations import active_campaign, donate
+from utils.cache import MemoryBackend
+from utils.response_cache import ResponseCache, etag_matches, response_cache
+
+
+def make_request(path="/campaigns/1", query=b""):
+    """Build a bare GET request for unit tests."""
+    return Request({
+        "type": "http", "method": "GET", "path": path,
+        "query_string": query, "headers": [],
+    })
+
+
+def test_repeat_reads_hit_cache_with_same_etag(authenticated_client, active_campaign):
+    """Test that the second read is served from memory with the same ETag."""
+    first = authenticated_client.get(f"/campaigns/{active_campaign}")
+    second = authenticated_client.get(f"/campaigns/{active_campaign}")
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert first.content == second.content
+
+
+def test_cached_body_matches_uncached(authenticated_client, active_campaign, monkeypatch):
+    """Test that cached bodies are rendered exactly as the route would."""
+    cached = authenticated_client.get("/campaigns/", params={"page_size": 5}).json()
+
+    monkeypatch.setattr(response_cache, "ttl", 0)
+    uncached = authenticated_client.get("/campaigns/", params={"page_size": 5}).json()
+
+    assert cached == uncached
+    assert cached["campaigns"][0]["id"] == active_campaign
+
+
+def test_if_none_match_returns_304(authenticated_client, active_campaign):
+    """Test that a current ETag gets a bodiless 304, before and after caching."""
+    etag = authenticated_client.get(f"/campaigns/{active_campaign}").headers["ETag"]
+
+    response = authenticated_client.get(f"/campaigns/{active_campaign}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    response_cache.clear()
+    response = authenticated_client.get(f"/campaigns/{active_campaign}", headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+
+
+def test_campaign_update_invalidates(authenticated_client, active_campaign):
+    """Test that updating or deleting a campaign changes what is served."""
+    etag = authenticated_client.get(f"/campaigns/{active_campaign}").headers["ETag"]
+    authenticated_client.get("/campaigns/")
+
+    authenticated_client.put(f"/campaigns/{active_campaign}", json={"title": "Renamed campaign"})
+
+    response = authenticated_client.get(f"/campaigns/{active_campaign}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed campaign"
+    assert authenticated_client.get("/campaigns/").json()["campaigns"][0]["title"] == "Renamed campaign"
+
+    authenticated_client.delete(f"/campaigns/{active_campaign}")
+    assert authenticated_client.get("/campaigns/").json()["campaigns"] == []
+
+
+def test_donation_completion_invalidates(authenticated_client, active_campaign):
+    """Test that a completed donation shows up in cached totals straight away."""
+    authenticated_client.get(f"/campaigns/{active_campaign}")
+    authenticated_client.get("/givers/leaderboard")
+    user_id = authenticated_client.get("/users/me").json()["id"]
+    authenticated_client.get(f"/givers/profile/{user_id}")
+
+    donate(authenticated_client, active_campaign, "42.00")
+
+    assert authenticated_client.get(f"/campaigns/{active_campaign}").json()["current_amount"] == "42.00"
+    assert authenticated_client.get("/givers/leaderboard").json()["leaderboard"][0]["total_donated"] == 42.0
+    assert authenticated_client.get(f"/givers/profile/{user_id}").json()["total_donated"] == "42.00"
+
+
+def test_private_profile_is_not_served_from_cache(authenticated_client, active_campaign):
+    """Test that hiding a profile takes it out of the cache."""
+    user_id = authenticated_client.get("/users/me").json()["id"]
+    assert authenticated_client.get(f"/givers/profile/{user_id}").status_code == 200
+
+    authenticated_client.put("/givers/profile/me", json={"is_public": False})
+
+    assert authenticated_client.get(f"/givers/profile/{user_id}").status_code == 404
+
+
+def test_rollback_does_not_invalidate(db, client, active_campaign):
+    """Test that only committed changes invalidate."""
+    before = response_cache.invalidations
+
+    campaign = db.get(Campaign, active_campaign)
+    campaign.title = "Never committed"
+    response_cache.invalidate_on_commit(db, f"campaign:{active_campaign}")
+    db.rollback()
+
+    assert response_cache.invalidations == before
+
+
+def test_stale_read_is_not_stored():
+    """Test that data read before an invalidation isn't cached after it."""
+    cache = ResponseCache(ttl=30, max_size=10)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        cache.invalidate("campaign:1")  # A write commits while the handler reads
+        return {"title": "old"}, ["campaign:1"]
+
+    async def run():
+        await cache.serve(make_request(), load)
+        await cache.serve(make_request(), load)
+
+    asyncio.run(run())
+
+    assert len(loads) == 2
+
+
+def test_invalidated_tags_are_bounded():
+    """Test that forgetting old invalidations can't resurrect a stale entry."""
+    cache = ResponseCache(ttl=30, max_size=10, max_tags=2)
+
+    async def load(campaign_id):
+        return {"id": campaign_id}, [f"campaign:{campaign_id}"]
+
+    async def serve(campaign_id):
+        response = await cache.serve(make_request(f"/campaigns/{campaign_id}"), lambda: load(campaign_id))
+        return response.headers["X-Cache"]
+
+    async def run():
+        await serve(1)
+        cache.invalidate("campaign:1")
+        # Read between the invalidations of campaign:1 and campaign:2
+        await serve(2)
+        cache.invalidate("campaign:2")
+        await serve(3)
+        for campaign_id in range(100, 110):
+            cache.invalidate(f"campaign:{campaign_id}")
+        return [await serve(campaign_id) for campaign_id in (2, 3, 3)]
+
+    # campaign:2's invalidation was forgotten, so its stale entry is dropped,
+    # and so is the untouched campaign 3, which was read before the floor
+    assert asyncio.run(run()) == ["MISS", "MISS", "HIT"]
+    assert cache.status()["invalidated_tags"] == 2
+
+
+def test_stale_shared_entry_is_not_served_before_backend_is_cleared():
+    """Test that a shared entry read before a local invalidation is ignored while the backend still has it."""
+    backend = MemoryBackend()
+    cache = ResponseCache(ttl=30, max_size=10, backend=backend)
+    title = "old"
+
+    async def load():
+        return {"title": title}, ["campaign:1"]
+
+    async def serve():
+        response = await cache.serve(make_request(), load)
+        return response.headers["X-Cache"], response.body
+
+    asyncio.run(serve())
+    # Outside a running loop no backend invalidation task is scheduled, as if it hadn't run yet
+    cache.invalidate("campaign:1")
+    assert asyncio.run(backend.get("response:/campaigns/1?")) is not None
+
+    title = "new"
+    assert asyncio.run(serve()) == ("MISS", b'{"title":"new"}')
+    # The fresh copy written back to the backend is used by other processes
+    other = ResponseCache(ttl=30, max_size=10, backend=backend)
+    response = asyncio.run(other.serve(make_request(), load))
+    assert response.headers["X-Cache"] == "HIT"
+
+
+def test_query_order_shares_entry():
+    """Test that the same query parameters in another order hit the same entry."""
+    cache = ResponseCache(ttl=30, max_size=10)
+
+    async def load():
+        return {"campaigns": []}, ["campaigns"]
+
+    async def run():
+        await cache.serve(make_request("/campaigns/", b"page=1&page_size=5"), load)
+        return await cache.serve(make_request("/campaigns/", b"page_size=5&page=1"), load)
+
+    assert asyncio.run(run()).headers["X-Cache"] == "HIT"
+    assert cache.status()["hit_rate"] == 0.5
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ("*", True),
+    ('"xyz"', False),
+])
+def test_etag_matches(header, expected):
+    """Test If-None-Match parsing."""
+    assert etag_matches(header, '"abc"') is expected
+
+
+def test_cache_health_reports_hit_rate(authenticated_client, active_campaign):
+    """Test that /health/cache reports hits and misses."""
+    for _ in range(4):
+        authenticated_client.get(f"/campaigns/{active_campaign}")
+
+    stats = authenticated_client.get("/health/cache").json()["response_cache"]
+
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.75
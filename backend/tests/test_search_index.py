@@ -0,0 +1,192 @@
+"""
+Tests for the in-process campaign search index (SEARCH_ENGINE=memory).
+"""
+
+import asyncio
+
+import pytest
+
+from models import Campaign, CampaignStatus, CampaignType
+from tests.conftest import TestingAsyncSessionLocal
+from tests.test_campaign_search import campaigns, search  # noqa: F401 (fixture)
+from tests.test_loading import count_statements
+from utils import search_index
+from utils.response_cache import response_cache
+from utils.search_index import IndexBuilder, _Segment, build_index_file, campaign_index, fold, term_counts
+
+
+@pytest.fixture()
+def memory_index(campaigns, tmp_path, monkeypatch):
+    """Open the app's search index on a file built from the test campaigns."""
+    monkeypatch.setattr(campaign_index, "path", str(tmp_path / "search.idx"))
+    monkeypatch.setattr(campaign_index, "session_factory", TestingAsyncSessionLocal)
+    assert asyncio.run(campaign_index.open()) is True
+    yield campaign_index
+    campaign_index.close()
+
+
+def test_fold_and_term_counts():
+    """Test that text is folded like FTS5 and title words weigh more."""
+    assert fold("Café ÉTÉ") == "cafe ete"
+    counts, length = term_counts("School roof", "The school roof leaks")
+    assert counts == {"school": 4, "roof": 4, "the": 1, "leaks": 1}
+    assert length == 10
+
+
+def test_builder_round_trip(tmp_path):
+    """Test that a written file maps back to the same postings."""
+    builder = IndexBuilder()
+    builder.add(2, "Village school", "A new roof", CampaignStatus.ACTIVE, CampaignType.FUNDRAISING)
+    builder.add(5, "Fun run", "Round the school", CampaignStatus.DRAFT, CampaignType.EVENT)
+    builder.write(str(tmp_path / "a.idx"))
+
+    segment = _Segment(str(tmp_path / "a.idx"))
+    try:
+        assert segment.doc_count == 2
+        index = segment.words["school"]
+        start, end = segment.starts[index], segment.starts[index + 1]
+        assert list(segment.docs[start:end]) == [2, 5]
+        assert list(segment.counts[start:end]) == [3, 1]
+        assert (segment.length(2), segment.length(3), segment.length(99)) == (9, 0, 0)
+        assert segment.statuses[5] != segment.statuses[2]
+    finally:
+        segment.close()
+
+    # An empty database still gives a file that maps
+    IndexBuilder().write(str(tmp_path / "empty.idx"))
+    segment = _Segment(str(tmp_path / "empty.idx"))
+    assert (segment.doc_count, segment.words, len(segment.docs)) == (0, {}, 0)
+    segment.close()
+
+
+def test_memory_search_matches_sql(authenticated_client, campaigns, memory_index):
+    """Test ranking and filters, and that only the page is read from the database."""
+    response, statements = count_statements(lambda: authenticated_client.get(
+        "/campaigns/search", params={"q": "school"}
+    ))
+    ids = [c["id"] for c in response.json()["campaigns"]]
+    assert set(ids) == {campaigns["title"], campaigns["description"], campaigns["event"]}
+    assert ids[-1] == campaigns["description"]
+    assert not any("campaigns_fts" in statement for statement in statements)
+
+    events = search(authenticated_client, "school", campaign_type="event")["campaigns"]
+    assert [c["id"] for c in events] == [campaigns["event"]]
+    drafts = search(authenticated_client, "SCHOOL", status="draft")["campaigns"]
+    assert [c["title"] for c in drafts] == ["School library books"]
+    found = [c["id"] for c in search(authenticated_client, "rescue cafe")["campaigns"]]
+    assert set(found) == {campaigns["unrelated"], campaigns["accents"]}
+    assert search(authenticated_client, "spaceship")["campaigns"] == []
+
+    assert authenticated_client.get("/campaigns/search", params={"q": "?!"}).status_code == 400
+    assert authenticated_client.get("/campaigns/search", params={"q": "roof", "cursor": "nope"}).status_code == 400
+    assert memory_index.status()["searches"] > 0
+
+
+def test_memory_search_pages_with_cursor(authenticated_client, memory_index):
+    """Test that walking next_cursor returns every match once, in order."""
+    everything = [c["id"] for c in search(authenticated_client, "school village", page_size=100)["campaigns"]]
+
+    seen, cursor = [], None
+    while True:
+        params = {"page_size": 1, "fields": "id"}
+        if cursor:
+            params["cursor"] = cursor
+        data = search(authenticated_client, "school village", **params)
+        assert all(list(c) == ["id"] for c in data["campaigns"])
+        seen += [c["id"] for c in data["campaigns"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == everything
+    assert len(seen) == 3
+
+
+def test_memory_index_follows_api_changes(authenticated_client, campaigns, memory_index):
+    """Test that creates, edits and deletes through the API are searchable straight away."""
+    response = authenticated_client.put(f"/campaigns/{campaigns['unrelated']}", json={
+        "title": "Kennels for the rescue centre"
+    })
+    assert response.status_code == 200
+    assert search(authenticated_client, "shelter")["campaigns"] == []
+    assert [c["id"] for c in search(authenticated_client, "kennels")["campaigns"]] == [campaigns["unrelated"]]
+
+    assert authenticated_client.delete(f"/campaigns/{campaigns['unrelated']}").status_code == 204
+    assert search(authenticated_client, "kennels")["campaigns"] == []
+
+    response = authenticated_client.post("/campaigns/", json={
+        "title": "Kennels for the village",
+        "description": "Somewhere warm for the rescue dogs to sleep",
+        "goal_amount": "1000.00",
+        "campaign_type": "fundraising"
+    })
+    assert response.status_code == 201
+    new_id = response.json()["id"]
+    assert search(authenticated_client, "kennels", status="draft")["campaigns"][0]["id"] == new_id
+    assert memory_index.status()["campaigns"] == len(campaigns) + 1
+
+
+def test_memory_index_catches_up_and_remaps(authenticated_client, db, campaigns, memory_index):
+    """Test that refresh() picks up other writers' changes and rebuilt files."""
+    # A change made without this worker (another worker, a script)
+    campaign = db.get(Campaign, campaigns["unrelated"])
+    campaign.title = "Kennels appeal"
+    db.get(Campaign, campaigns["event"]).status = CampaignStatus.COMPLETED
+    db.commit()
+    assert search(authenticated_client, "kennels")["campaigns"] == []
+    # Until then, campaigns the index still has under the old status are left out of results
+    found = [c["id"] for c in search(authenticated_client, "school", fields="id")["campaigns"]]
+    assert found == [campaigns["title"], campaigns["description"]]
+
+    assert asyncio.run(memory_index.refresh()) is False
+    response_cache.clear()  # Other workers' changes reach this worker's cache by expiry
+    assert [c["id"] for c in search(authenticated_client, "kennels")["campaigns"]] == [campaigns["unrelated"]]
+
+    # manage_search.py build: the new file is mapped and the overlay starts over
+    async def rebuild():
+        async with TestingAsyncSessionLocal() as session:
+            return await build_index_file(session, memory_index.path)
+
+    assert asyncio.run(rebuild()) == len(campaigns)
+    assert asyncio.run(memory_index.refresh()) is True
+    response_cache.clear()
+    status = memory_index.status()
+    assert (status["reloads"], status["campaigns"]) == (1, len(campaigns))
+    assert [c["id"] for c in search(authenticated_client, "kennels")["campaigns"]] == [campaigns["unrelated"]]
+
+
+def test_search_yields_to_the_event_loop(campaigns, memory_index, monkeypatch):
+    """Test that scoring hands the loop back between slices, and survives a remap meanwhile."""
+    monkeypatch.setattr(search_index, "SCORE_SLICE", 1)
+    expected = asyncio.run(memory_index.search("school", None, CampaignStatus.ACTIVE, 10))
+
+    async def rebuild():
+        async with TestingAsyncSessionLocal() as session:
+            await build_index_file(session, memory_index.path)
+
+    asyncio.run(rebuild())
+
+    async def run():
+        ticks = 0
+
+        async def other_request():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(other_request())
+        search = asyncio.create_task(memory_index.search("school", None, CampaignStatus.ACTIVE, 10))
+        await asyncio.sleep(0)
+        # The rebuilt file is mapped while the search is still reading the old one
+        memory_index._map()
+        retired = len(memory_index._retired)
+        result = await search
+        task.cancel()
+        return result, ticks, retired
+
+    result, ticks, retired = asyncio.run(run())
+    assert result == expected
+    assert ticks > 2
+    assert retired == 1
+    assert memory_index._retired == []
@@ -0,0 +1,490 @@
+"""
+Streaming bulk export and import of campaigns and donations.
+
+Used by manage_data.py for data migrations and finance reports. Both
+directions work in fixed-size batches, so memory use doesn't grow with
+the table: tens of millions of donations export and import the same way
+as a hundred.
+
+Export runs one SELECT with a server-side cursor (yield_per; an
+unbuffered SSCursor on MySQL) and writes each batch as it arrives, as
+CSV, NDJSON or Parquet.
+
+Import reads the file a batch at a time and writes each batch with one
+multi-row INSERT (insert().values()) in its own transaction. After each
+commit a checkpoint file records how far the import got, so an
+interrupted import resumes after the last committed batch instead of
+starting over.
+
+Values are written in their API form: decimals as strings, datetimes in
+ISO 8601, enums by value (e.g. "completed"). Import accepts the same,
+plus enum names as stored in the database.
+
+Parquet needs pyarrow, which is optional (pip install pyarrow).
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum as PyEnum
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Boolean, DateTime, Enum, Integer, Numeric, Table, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+from models import Campaign, Donation
+
+# Tables that can be exported and imported, by CLI name
+TABLES: Dict[str, Table] = {
+    "campaigns": Campaign.__table__,
+    "donations": Donation.__table__,
+}
+
+FORMATS = ("csv", "ndjson", "parquet")
+
+# Stay under SQLite's bound parameter limit (32766) in one INSERT
+MAX_PARAMETERS = 30_000
+
+# Bytes hashed from each end of an import file to recognise it on resume
+FINGERPRINT_BYTES = 1024 * 1024
+
+# Called with the number of rows done so far
+Progress = Callable[[int], None]
+
+
+class BulkDataError(Exception):
+    """Raised for files or options that can't be exported or imported."""
+
+
+def format_for(path: str, fmt: Optional[str] = None) -> str:
+    """
+    Pick the file format from an explicit option or the file extension.
+
+    Args:
+        path: File path
+        fmt: Explicit format, if given
+
+    Returns:
+        One of FORMATS
+
+    Raises:
+        BulkDataError: If the format is unknown or can't be inferred
+    """
+    if fmt is None:
+        extension = os.path.splitext(path)[1].lstrip(".").lower()
+        fmt = {"jsonl": "ndjson", "json": "ndjson", "pq": "parquet"}.get(extension, extension)
+    if fmt not in FORMATS:
+        raise BulkDataError(f"Unknown format '{fmt}' (use one of: {', '.join(FORMATS)})")
+    return fmt
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise BulkDataError("Parquet needs pyarrow: pip install pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+# ==================== EXPORT ====================
+
+def to_plain(value):
+    """Convert a column value to its JSON form."""
+    if isinstance(value, PyEnum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class _CsvWriter:
+    def __init__(self, stream, columns: List[str]):
+        self._writer = csv.writer(stream)
+        self._writer.writerow(columns)
+
+    def write(self, rows):
+        self._writer.writerows(
+            ["" if value is None else to_plain(value) for value in row] for row in rows
+        )
+
+    def close(self):
+        pass
+
+
+class _NdjsonWriter:
+    def __init__(self, stream, columns: List[str]):
+        self._stream = stream
+        self._columns = columns
+
+    def write(self, rows):
+        self._stream.writelines(
+            json.dumps(dict(zip(self._columns, map(to_plain, row))), separators=(",", ":")) + "\n"
+            for row in rows
+        )
+
+    def close(self):
+        pass
+
+
+def _arrow_type(pa, column):
+    if isinstance(column.type, Enum):
+        return pa.string()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Numeric):
+        return pa.decimal128(column.type.precision, column.type.scale)
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+    return pa.string()
+
+
+class _ParquetWriter:
+    def __init__(self, path: str, table: Table):
+        pa, pq = _require_pyarrow()
+        self._pa = pa
+        self._schema = pa.schema([(column.name, _arrow_type(pa, column)) for column in table.columns])
+        self._enum_columns = {
+            index for index, column in enumerate(table.columns) if isinstance(column.type, Enum)
+        }
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        arrays = [
+            self._pa.array(
+                [to_plain(value) for value in values] if index in self._enum_columns else values,
+                type=field.type
+            )
+            for index, (field, values) in enumerate(zip(self._schema, columns))
+        ]
+        self._writer.write_batch(self._pa.RecordBatch.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def export_query(table_name: str, campaign_id: Optional[int] = None, status: Optional[str] = None,
+                 since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """
+    Build the SELECT for an export.
+
+    Args:
+        table_name: Key of TABLES
+        campaign_id: Only donations to (or the campaign with) this ID
+        status: Only rows with this status (payment status for donations)
+        since: Only rows created at or after this time
+        until: Only rows created before this time
+
+    Returns:
+        Select over every column of the table, in ID order
+    """
+    table = TABLES[table_name]
+    query = select(table).order_by(table.c.id)
+
+    if campaign_id is not None:
+        query = query.where((table.c.campaign_id if table_name == "donations" else table.c.id) == campaign_id)
+    if status is not None:
+        column = table.c.payment_status if table_name == "donations" else table.c.status
+        enum_class = column.type.enum_class
+        query = query.where(column == _parse_enum(enum_class, status))
+    if since is not None:
+        query = query.where(table.c.created_at >= since)
+    if until is not None:
+        query = query.where(table.c.created_at < until)
+    return query
+
+
+def export_table(
+    conn: Connection,
+    table_name: str,
+    path: str,
+    fmt: str,
+    batch_size: int = 10_000,
+    progress: Optional[Progress] = None,
+    **filters
+) -> int:
+    """
+    Stream a table (or filtered part of it) to a file.
+
+    Args:
+        conn: Database connection
+        table_name: Key of TABLES
+        path: Output file ("-" for stdout, CSV and NDJSON only)
+        fmt: One of FORMATS
+        batch_size: Rows fetched from the cursor and written at a time
+        progress: Called after each batch with the rows written so far
+        **filters: Passed to export_query()
+
+    Returns:
+        Number of rows written
+    """
+    table = TABLES[table_name]
+    columns = [column.name for column in table.columns]
+    result = conn.execution_options(yield_per=batch_size).execute(export_query(table_name, **filters))
+
+    if fmt == "parquet":
+        if path == "-":
+            raise BulkDataError("Parquet can't be written to stdout")
+        stream = None
+        writer = _ParquetWriter(path, table)
+    else:
+        stream = sys.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+        writer = (_CsvWriter if fmt == "csv" else _NdjsonWriter)(stream, columns)
+
+    count = 0
+    try:
+        for rows in result.partitions():
+            writer.write(rows)
+            count += len(rows)
+            if progress:
+                progress(count)
+    finally:
+        writer.close()
+        if stream is not None and stream is not sys.stdout:
+            stream.close()
+        result.close()
+    return count
+
+
+# ==================== IMPORT ====================
+
+def _parse_enum(enum_class, value):
+    if isinstance(value, enum_class):
+        return value
+    try:
+        return enum_class(value)
+    except ValueError:
+        return enum_class[value]
+
+
+def _converter(column) -> Callable:
+    """Build a function turning a file value into a value for column."""
+    column_type = column.type
+
+    if isinstance(column_type, Enum) and column_type.enum_class is not None:
+        convert = lambda value: _parse_enum(column_type.enum_class, value)
+    elif isinstance(column_type, Numeric) and not isinstance(column_type, Integer):
+        convert = lambda value: value if isinstance(value, Decimal) else Decimal(str(value))
+    elif isinstance(column_type, Integer):
+        convert = int
+    elif isinstance(column_type, Boolean):
+        convert = lambda value: value if isinstance(value, bool) else str(value).lower() in ("1", "true", "t", "yes")
+    elif isinstance(column_type, DateTime):
+        convert = lambda value: value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    else:
+        convert = lambda value: value
+
+    # CSV has no null: empty means NULL for nullable columns
+    def convert_value(value):
+        if value is None or (value == "" and column.nullable):
+            return None
+        return convert(value)
+
+    return convert_value
+
+
+def _read_text_lines(path: str, offset: int) -> Iterator[Tuple[str, int]]:
+    """Yield the lines of a file from a byte offset, with the offset after each."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            yield line.decode("utf-8"), offset
+
+
+def _read_csv(path: str, offset: int) -> Iterator[Tuple[dict, Optional[int]]]:
+    with open(path, "rb") as f:
+        header_line = f.readline()
+    header = next(csv.reader([header_line.decode("utf-8")]))
+    start = max(offset, len(header_line))
+    position = start
+
+    def lines():
+        nonlocal position
+        for line, end in _read_text_lines(path, start):
+            position = end
+            yield line
+
+    # csv.reader pulls only the lines of the record it returns, so the
+    # offset after each record is where the next one starts
+    for record in csv.reader(lines()):
+        yield dict(zip(header, record)), position
+
+
+def _read_ndjson(path: str, offset: int) -> Iterator[Tuple[dict, Optional[int]]]:
+    for line, end in _read_text_lines(path, offset):
+        if line.strip():
+            yield json.loads(line), end
+
+
+def _read_parquet(path: str, skip: int, batch_size: int) -> Iterator[Tuple[dict, Optional[int]]]:
+    _, pq = _require_pyarrow()
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+        if skip >= batch.num_rows:
+            skip -= batch.num_rows
+            continue
+        for row in batch.slice(skip).to_pylist():
+            yield row, None
+        skip = 0
+
+
+def fingerprint(path: str) -> str:
+    """
+    Identify a file's contents without reading all of it.
+
+    Hashes the size and the first and last FINGERPRINT_BYTES, so a file
+    that is replaced, regenerated or appended to doesn't match, while the
+    same file moved or copied elsewhere does.
+    """
+    digest = hashlib.sha256()
+    size = os.path.getsize(path)
+    digest.update(str(size).encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_BYTES))
+        if size > FINGERPRINT_BYTES:
+            f.seek(max(size - FINGERPRINT_BYTES, FINGERPRINT_BYTES))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+@dataclass
+class Checkpoint:
+    """How far an import got: rows committed, and the file offset after them."""
+    table: str
+    path: str
+    size: int
+    fingerprint: str = ""
+    rows: int = 0
+    offset: int = 0
+
+    @classmethod
+    def load(cls, checkpoint_path: str) -> Optional["Checkpoint"]:
+        """Read a checkpoint file, or None if there isn't one."""
+        try:
+            with open(checkpoint_path, encoding="utf-8") as f:
+                return cls(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def save(self, checkpoint_path: str):
+        """Write the checkpoint atomically (a crash leaves the old one intact)."""
+        temporary = checkpoint_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, checkpoint_path)
+
+
+def _batches(rows: Iterator[Tuple[dict, Optional[int]]], size: int) -> Iterator[Tuple[List[dict], Optional[int]]]:
+    batch = []
+    offset = None
+    for row, offset in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch, offset
+            batch = []
+    if batch:
+        yield batch, offset
+
+
+def import_table(
+    engine: Engine,
+    table_name: str,
+    path: str,
+    fmt: str,
+    batch_size: int = 1000,
+    checkpoint_path: Optional[str] = None,
+    progress: Optional[Progress] = None
+) -> int:
+    """
+    Insert the rows of a file into a table, resuming from a checkpoint.
+
+    Rows are written as they are in the file (including IDs, if present).
+    Each batch is one INSERT in its own transaction, followed by a
+    checkpoint update. If a run stops between a commit and its
+    checkpoint, the resumed run skips rows whose IDs are already in the
+    table. The checkpoint is deleted once the whole file is imported.
+
+    Args:
+        engine: Database engine
+        table_name: Key of TABLES
+        path: Input file
+        fmt: One of FORMATS
+        batch_size: Rows per INSERT
+        checkpoint_path: Where to record progress (None disables resuming)
+        progress: Called after each batch with the rows imported so far
+
+    Returns:
+        Number of rows in the file imported (including any by earlier runs)
+
+    Raises:
+        BulkDataError: If the file has columns the table doesn't, or the
+            checkpoint is for a different file
+    """
+    table = TABLES[table_name]
+    size = os.path.getsize(path)
+
+    checkpoint = Checkpoint.load(checkpoint_path) if checkpoint_path else None
+    if checkpoint is None:
+        checkpoint = Checkpoint(
+            table=table_name, path=os.path.abspath(path), size=size,
+            fingerprint=fingerprint(path) if checkpoint_path else ""
+        )
+    elif (checkpoint.table, checkpoint.size, checkpoint.fingerprint) != (table_name, size, fingerprint(path)):
+        raise BulkDataError(
+            f"Checkpoint {checkpoint_path} is for another file or table ({checkpoint.table} from "
+            f"{checkpoint.path}); delete it to start over"
+        )
+    resumed = checkpoint.rows > 0
+
+    if fmt == "csv":
+        rows = _read_csv(path, checkpoint.offset)
+    elif fmt == "ndjson":
+        rows = _read_ndjson(path, checkpoint.offset)
+    else:
+        rows = _read_parquet(path, checkpoint.rows, batch_size)
+
+    # Keep each INSERT under the driver's parameter limit
+    batch_size = max(1, min(batch_size, MAX_PARAMETERS // len(table.columns)))
+    converters = {column.name: _converter(column) for column in table.columns}
+
+    for batch, offset in _batches(rows, batch_size):
+        unknown = set(batch[0]) - set(converters)
+        if unknown:
+            raise BulkDataError(f"Columns not in {table_name}: {', '.join(sorted(unknown))}")
+
+        values = [{name: converters[name](value) for name, value in row.items()} for row in batch]
+
+        with engine.begin() as conn:
+            if resumed and "id" in values[0]:
+                # The batch after a checkpoint may have been committed
+                # before the checkpoint was saved
+                existing = set(conn.scalars(
+                    select(table.c.id).where(table.c.id.in_([row["id"] for row in values]))
+                ))
+                values = [row for row in values if row["id"] not in existing]
+            if values:
+                conn.execute(insert(table).values(values))
+        resumed = False
+
+        checkpoint.rows += len(batch)
+        checkpoint.offset = offset or 0
+        if checkpoint_path:
+            checkpoint.save(checkpoint_path)
+        if progress:
+            progress(checkpoint.rows)
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return checkpoint.rows
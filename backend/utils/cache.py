@@ -0,0 +1,398 @@
+"""
+Cache backends shared by the API's caches.
+
+The principal cache (utils/principal_cache.py) and the response cache
+(utils/response_cache.py) keep a small in-process LRU (TTLCache) and can
+put a shared backend behind it so several uvicorn workers share entries
+and invalidations. Backends all speak the same small API:
+
+    await backend.get(key)
+    await backend.set(key, value, ttl, tags=("campaign:42",))
+    await backend.delete(key)
+    await backend.invalidate_tags("campaign:42")
+
+MemoryBackend keeps everything in this process (single worker, tests).
+RedisBackend talks the Redis protocol (RESP) over TCP to Redis itself or
+to the local stand-in in utils/resp_server.py (python cache_server.py).
+create_backend() picks one from CACHE_URL.
+
+A cache must never take the API down, so RedisBackend treats a server
+it can't reach as a miss and logs the error.
+
+SingleFlight makes concurrent loads of the same key share one call, so a
+cold popular entry doesn't send N identical queries to the database.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Protocol, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Bounded in-process cache with per-entry expiry.
+
+    Least recently used entries are evicted once max_size is reached.
+    Not thread-safe; it is only used from the event loop.
+    """
+
+    def __init__(self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a value (for ttl seconds, default self.ttl), evicting the least recently used if full."""
+        self._entries[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: str):
+        """Remove a value if present."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every value."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheBackend(Protocol):
+    """Interface for a cache backend shared by several caches or processes."""
+
+    async def get(self, key: str) -> Optional[str]:
+        """Get a value, or None if missing or expired."""
+
+    async def set(self, key: str, value: str, ttl: float, tags: Iterable[str] = ()) -> None:
+        """Store a value that expires after ttl seconds, tagged for invalidation."""
+
+    async def delete(self, *keys: str) -> None:
+        """Remove values."""
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        """Remove every value stored with any of tags."""
+
+    async def close(self) -> None:
+        """Release connections."""
+
+
+class MemoryBackend:
+    """
+    CacheBackend kept in this process.
+
+    Tags are versioned: invalidating a tag bumps its version, and values
+    stored under an older version are treated as missing.
+
+    Args:
+        max_size: Most values kept
+        clock: Time source (for tests)
+    """
+
+    def __init__(self, max_size: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.store = TTLCache(max_size=max_size, ttl=0, clock=clock)
+        self._tag_versions: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+
+        value, tag_versions = entry
+        if any(self._tag_versions.get(tag, 0) != version for tag, version in tag_versions):
+            self.store.discard(key)
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: float, tags: Iterable[str] = ()):
+        tag_versions = tuple((tag, self._tag_versions.get(tag, 0)) for tag in tags)
+        self.store.set(key, (value, tag_versions), ttl)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.store.discard(key)
+
+    async def invalidate_tags(self, *tags: str):
+        for tag in tags:
+            self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+
+    async def close(self):
+        self.store.clear()
+
+
+class CacheError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+def encode_command(*args) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    """
+    Read one RESP value.
+
+    Returns:
+        str for simple strings, int for integers, bytes (or None) for bulk
+        strings and a list (or None) for arrays
+
+    Raises:
+        CacheError: For error replies
+    """
+    line = await reader.readuntil(b"\r\n")
+    kind, rest = line[:1], line[1:-2]
+
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise CacheError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(rest)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise CacheError(f"Unexpected reply type {kind!r}")
+
+
+class RedisBackend:
+    """
+    CacheBackend on a Redis-protocol server.
+
+    Uses one connection per process, with commands pipelined where an
+    operation needs several. Tags are Redis sets of the keys stored
+    under them.
+
+    Args:
+        host: Server host
+        port: Server port
+        db: Database number
+        timeout: Seconds to wait for the server before treating it as down
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0, timeout: float = 0.5):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._lock = None
+        self.errors = 0
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.db:
+            self._writer.write(encode_command("SELECT", self.db))
+            await read_reply(self._reader)
+
+    async def _disconnect(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def execute(self, *commands: Tuple) -> list:
+        """
+        Send commands in one round trip and read their replies.
+
+        Args:
+            commands: Commands, each a tuple like ("GET", key)
+
+        Returns:
+            Replies, in order
+
+        Raises:
+            ConnectionError: If the server can't be reached in time
+            CacheError: If the server rejected a command
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async def read_replies():
+            # Read every reply (even after an error) so the connection stays in step
+            replies = []
+            for _ in commands:
+                try:
+                    replies.append(await read_reply(self._reader))
+                except CacheError as e:
+                    replies.append(e)
+            return replies
+
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    await asyncio.wait_for(self._connect(), self.timeout)
+                self._writer.write(b"".join(encode_command(*command) for command in commands))
+                await self._writer.drain()
+                replies = await asyncio.wait_for(read_replies(), self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                await self._disconnect()
+                self.errors += 1
+                raise ConnectionError(f"Cache server {self.host}:{self.port} unavailable: {e!r}") from e
+
+        for reply in replies:
+            if isinstance(reply, CacheError):
+                self.errors += 1
+                raise reply
+        return replies
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            [value] = await self.execute(("GET", key))
+        except (ConnectionError, CacheError) as e:
+            logger.warning("Cache get failed, treating as a miss: %s", e)
+            return None
+        return value.decode() if value is not None else None
+
+    async def set(self, key: str, value: str, ttl: float, tags: Iterable[str] = ()):
+        ttl_ms = max(int(ttl * 1000), 1)
+        commands = [("SET", key, value, "PX", ttl_ms)]
+        for tag in tags:
+            # The tag set lives as long as its newest key
+            commands.append(("SADD", f"tag:{tag}", key))
+            commands.append(("PEXPIRE", f"tag:{tag}", ttl_ms))
+        try:
+            await self.execute(*commands)
+        except (ConnectionError, CacheError) as e:
+            logger.warning("Cache set failed: %s", e)
+
+    async def delete(self, *keys: str):
+        if not keys:
+            return
+        try:
+            await self.execute(("DEL", *keys))
+        except (ConnectionError, CacheError) as e:
+            logger.warning("Cache delete failed: %s", e)
+
+    async def invalidate_tags(self, *tags: str):
+        if not tags:
+            return
+        try:
+            members = await self.execute(*(("SMEMBERS", f"tag:{tag}") for tag in tags))
+            keys = {key for tag_keys in members for key in tag_keys}
+            await self.execute(("DEL", *keys, *(f"tag:{tag}" for tag in tags)))
+        except (ConnectionError, CacheError) as e:
+            # Entries stay until their TTL runs out
+            logger.error("Cache tag invalidation failed for %s: %s", tags, e)
+
+    async def close(self):
+        await self._disconnect()
+
+
+def create_backend(url: Optional[str], timeout: float = 0.5) -> Optional[CacheBackend]:
+    """
+    Create the shared cache backend for a CACHE_URL.
+
+    Args:
+        url: memory:// or redis://host:port/db, or None for no shared backend
+        timeout: Seconds to wait for a networked backend
+
+    Returns:
+        Backend, or None if url is empty
+
+    Raises:
+        ValueError: If the URL scheme isn't supported
+    """
+    if not url:
+        return None
+
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return MemoryBackend()
+    if parsed.scheme == "redis":
+        return RedisBackend(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(parsed.path.lstrip("/") or 0),
+            timeout=timeout
+        )
+    raise ValueError(f"Unsupported cache URL scheme: {parsed.scheme!r}")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one.
+
+    The first caller for a key runs the function; callers arriving
+    while it runs wait for and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn for key, or wait for the run already in progress.
+
+        Args:
+            key: What is being loaded
+            fn: Coroutine function doing the load
+
+        Returns:
+            fn's result
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                # Shielded, so a waiter going away doesn't cancel the shared call
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled() and not asyncio.current_task().cancelling():
+                    # The caller running it went away; run it ourselves
+                    return await self.do(key, fn)
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.calls += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
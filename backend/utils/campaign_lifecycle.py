@@ -0,0 +1,279 @@
+"""
+Campaign lifecycle scheduler: start_date and end_date transitions.
+
+A draft campaign with a start_date goes ACTIVE when that time comes
+(unless its end_date has already passed), and an active campaign with
+an end_date goes COMPLETED when it passes. Campaigns without dates are
+left alone, so publishing and closing them stays manual.
+
+Each worker keeps a heap of the start and end dates coming up in the
+next poll interval, read through ix_campaigns_status_start and
+ix_campaigns_status_end rather than by scanning campaigns, and sleeps
+until the earliest one. When it wakes, due campaigns are moved in
+batches: one SELECT of ids and one UPDATE per batch. The UPDATE repeats
+the status and date conditions, so when several workers wake for the
+same date the first moves the campaigns and the rest change nothing.
+
+Dates set through the API on this worker are added to its heap
+straight away. Dates set elsewhere (other workers, scripts) are picked
+up by the next poll, which also moves anything that came due in
+between, e.g. while no worker was running.
+"""
+
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import get_lifecycle_settings
+from database import AsyncSessionLocal
+from models import Campaign, CampaignStatus
+from schemas import utc_naive
+from utils.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+# Upcoming dates held per worker (later ones are loaded by a later poll)
+MAX_TIMERS = 10_000
+
+
+def utc_now() -> datetime:
+    """The current time as naive UTC, the way campaign dates are stored."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def starting(now: datetime) -> list:
+    """Conditions for a draft campaign due to go ACTIVE at now."""
+    return [
+        Campaign.status == CampaignStatus.DRAFT,
+        Campaign.start_date <= now,
+        or_(Campaign.end_date.is_(None), Campaign.end_date > now),
+    ]
+
+
+def ending(now: datetime) -> list:
+    """Conditions for an active campaign due to be COMPLETED at now."""
+    return [Campaign.status == CampaignStatus.ACTIVE, Campaign.end_date <= now]
+
+
+def upcoming_dates(now: datetime, until: datetime) -> tuple:
+    """
+    Queries for the start and end dates after now and up to until.
+
+    Args:
+        now: Start of the interval (exclusive)
+        until: End of the interval (inclusive)
+
+    Returns:
+        Tuple of (start dates query, end dates query), each in date order
+        and limited to MAX_TIMERS
+    """
+    starts = select(Campaign.start_date).where(
+        Campaign.status == CampaignStatus.DRAFT,
+        Campaign.start_date > now,
+        Campaign.start_date <= until
+    ).order_by(Campaign.start_date).limit(MAX_TIMERS)
+    # Drafts' end dates too, for campaigns that will have started by then
+    ends = select(Campaign.end_date).where(
+        Campaign.status.in_([CampaignStatus.DRAFT, CampaignStatus.ACTIVE]),
+        Campaign.end_date > now,
+        Campaign.end_date <= until
+    ).order_by(Campaign.end_date).limit(MAX_TIMERS)
+    return starts, ends
+
+
+async def apply_transitions(db: AsyncSession, now: datetime, batch_size: int) -> dict:
+    """
+    Move every campaign that is due at now.
+
+    Args:
+        db: Database session (committed once per batch)
+        now: Time to apply transitions up to (naive UTC)
+        batch_size: Campaigns moved per UPDATE
+
+    Returns:
+        Dictionary of campaigns "started" and "completed"
+    """
+    counts = {}
+    for name, conditions, date, new_status in (
+        ("completed", ending(now), Campaign.end_date, CampaignStatus.COMPLETED),
+        ("started", starting(now), Campaign.start_date, CampaignStatus.ACTIVE),
+    ):
+        moved = 0
+        while True:
+            campaign_ids = (await db.execute(
+                select(Campaign.id).where(*conditions).order_by(date).limit(batch_size)
+            )).scalars().all()
+            if not campaign_ids:
+                break
+            # Conditional UPDATE: rows another worker moved since the SELECT are skipped
+            result = await db.execute(
+                update(Campaign)
+                .where(Campaign.id.in_(campaign_ids), *conditions)
+                .values(status=new_status)
+                .execution_options(synchronize_session=False)
+            )
+            response_cache.invalidate_on_commit(
+                db, "campaigns", *(f"campaign:{campaign_id}" for campaign_id in campaign_ids)
+            )
+            await db.commit()
+            moved += result.rowcount
+            if len(campaign_ids) < batch_size:
+                break
+        counts[name] = moved
+    return counts
+
+
+class CampaignScheduler:
+    """
+    Moves campaigns between statuses at their start and end dates.
+
+    Args:
+        session_factory: Factory for the sessions dates are read and updated in
+        batch_size: Campaigns moved per UPDATE
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, batch_size: int = 500):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.loaded_until: Optional[datetime] = None
+        self.started = 0
+        self.completed = 0
+        self.wakeups = 0
+        self._timers: List[datetime] = []
+        self._wake: Optional[asyncio.Event] = None
+
+    def clear(self):
+        """Stop scheduling (schedule() becomes a no-op) and reset the statistics."""
+        self._timers.clear()
+        self.loaded_until = None
+        self._wake = None
+        self.started = self.completed = self.wakeups = 0
+
+    def schedule(self, campaign: Campaign):
+        """
+        Add a campaign's dates, just committed by this worker, to the timers.
+
+        Dates beyond the loaded interval are left for the next poll.
+        No-op unless the scheduler is running.
+
+        Args:
+            campaign: Campaign created or updated
+        """
+        if self.loaded_until is None or campaign.status not in (CampaignStatus.DRAFT, CampaignStatus.ACTIVE):
+            return
+        for date in (campaign.start_date, campaign.end_date):
+            if date is not None and utc_naive(date) <= self.loaded_until:
+                heapq.heappush(self._timers, utc_naive(date))
+                if self._wake is not None:
+                    self._wake.set()
+
+    async def load(self, now: datetime, until: datetime):
+        """
+        Replace the timers with the start and end dates between now and until.
+
+        Args:
+            now: Current time (naive UTC)
+            until: End of the interval to load
+        """
+        starts_query, ends_query = upcoming_dates(now, until)
+        async with self.session_factory() as db:
+            starts = (await db.execute(starts_query)).scalars().all()
+            ends = (await db.execute(ends_query)).scalars().all()
+
+        timers = [utc_naive(date) for date in (*starts, *ends)]
+        cut_offs = [utc_naive(dates[-1]) for dates in (starts, ends) if len(dates) == MAX_TIMERS]
+        if cut_offs:
+            # Too many to hold: stop at the earlier cut-off so no date before it is missed
+            until = min(cut_offs)
+            timers = [date for date in timers if date <= until]
+        heapq.heapify(timers)
+        self._timers = timers
+        self.loaded_until = until
+
+    async def run_due(self, now: datetime) -> dict:
+        """
+        Move the campaigns due at now and drop the timers that have fired.
+
+        Args:
+            now: Current time (naive UTC)
+
+        Returns:
+            Dictionary of campaigns "started" and "completed"
+        """
+        while self._timers and self._timers[0] <= now:
+            heapq.heappop(self._timers)
+        async with self.session_factory() as db:
+            counts = await apply_transitions(db, now, self.batch_size)
+        self.started += counts["started"]
+        self.completed += counts["completed"]
+        if counts["started"] or counts["completed"]:
+            logger.info(f"Campaign lifecycle: {counts['started']} started, {counts['completed']} completed")
+        return counts
+
+    async def poll(self, interval: float):
+        """
+        Move campaigns already due, then load the dates in the next interval.
+
+        Args:
+            interval: Seconds ahead to load
+        """
+        now = utc_now()
+        await self.run_due(now)
+        await self.load(now, now + timedelta(seconds=interval))
+
+    async def run(self, interval: float):
+        """
+        Wake at each loaded date and poll every interval seconds until cancelled.
+
+        Started as a background task by the application lifespan, after
+        its first poll(). Errors are logged and retried on the next wake.
+
+        Args:
+            interval: Seconds between polls
+        """
+        self._wake = asyncio.Event()
+        next_poll = self.loaded_until or utc_now()
+        while True:
+            wake_at = min(next_poll, self._timers[0]) if self._timers else next_poll
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max((wake_at - utc_now()).total_seconds(), 0))
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                if utc_now() >= next_poll:
+                    await self.poll(interval)
+                    next_poll = self.loaded_until
+                elif self._timers and self._timers[0] <= utc_now():
+                    self.wakeups += 1
+                    await self.run_due(utc_now())
+            except Exception as e:
+                next_poll = utc_now() + timedelta(seconds=interval)
+                logger.error(f"Campaign lifecycle run failed: {e}")
+
+    def status(self) -> dict:
+        """
+        Report scheduler activity.
+
+        Returns:
+            Dictionary of scheduler statistics
+        """
+        return {
+            "running": self.loaded_until is not None,
+            "timers": len(self._timers),
+            "next_due": self._timers[0].isoformat() if self._timers else None,
+            "loaded_until": self.loaded_until.isoformat() if self.loaded_until else None,
+            "wakeups": self.wakeups,
+            "started": self.started,
+            "completed": self.completed,
+        }
+
+
+# Per-worker scheduler, started by the application lifespan
+campaign_scheduler = CampaignScheduler(AsyncSessionLocal, get_lifecycle_settings().batch_size)
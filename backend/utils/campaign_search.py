@@ -0,0 +1,174 @@
+"""
+Full-text campaign search for GET /campaigns/search.
+
+Campaign titles and descriptions are searched through a full-text
+index rather than LIKE '%word%', which can't use an index and reads
+every campaign:
+
+- MySQL: the FULLTEXT index ix_campaigns_fulltext, queried with
+  MATCH ... AGAINST in natural language mode
+- SQLite (tests, local development): the FTS5 table campaigns_fts,
+  kept in step with the campaigns table by triggers (see models.py)
+
+Both return campaigns containing any of the search words, best match
+first. The relevance score is the database's own (InnoDB's TF-IDF on
+MySQL, BM25 with title matches weighted above description matches on
+SQLite), so the same query can rank slightly differently on the two.
+
+Results are paged with a keyset cursor on (score, id) like the other
+list endpoints, so later pages seek past the last result instead of
+using OFFSET. Scores depend on the whole index, so a campaign created
+or edited between two pages can shift results by a place.
+"""
+
+import base64
+import re
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Float, and_, column, func, literal_column, or_, select, table, type_coerce
+from sqlalchemy.dialects import mysql
+from sqlalchemy.sql import Select
+
+from models import Campaign
+
+# Words from the query that are searched for (the rest are ignored)
+MAX_SEARCH_TERMS = 10
+
+# SQLite BM25 weights for the title and description columns
+SQLITE_COLUMN_WEIGHTS = (10.0, 1.0)
+
+# Word characters, the way both full-text parsers split text
+_TERM = re.compile(r"\w+")
+
+# The FTS5 table; not part of the models' metadata, so create_all leaves it to models.py
+campaigns_fts = table("campaigns_fts", column("rowid"), column("campaigns_fts"))
+
+
+def search_terms(q: str) -> List[str]:
+    """
+    Split a search query into the words to look for.
+
+    Args:
+        q: Search text as typed
+
+    Returns:
+        Up to MAX_SEARCH_TERMS distinct lowercase words, in order
+    """
+    terms = []
+    for term in _TERM.findall(q.lower()):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_SEARCH_TERMS]
+
+
+def encode_search_cursor(score: float, row_id: int) -> str:
+    """
+    Encode the relevance and id of the last result on a page as a cursor.
+
+    Args:
+        score: Relevance score of the last result
+        row_id: id of the last result
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{score!r}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    Decode a cursor produced by encode_search_cursor.
+
+    Args:
+        cursor: Cursor string from a previous response
+
+    Returns:
+        Tuple of (score, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, row_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return float(score), int(row_id)
+    except ValueError as e:
+        raise ValueError("Invalid search cursor") from e
+
+
+def search_query(dialect_name: str, query: Select, q: str) -> Tuple[Select, object]:
+    """
+    Restrict a select() of campaign columns to campaigns matching a search.
+
+    Args:
+        dialect_name: Database dialect ("mysql" or "sqlite")
+        query: select() of Campaign columns, possibly filtered
+        q: Search text as typed
+
+    Returns:
+        Tuple of (query limited to matching campaigns, relevance score
+        expression where higher is better)
+
+    Raises:
+        HTTPException 400: If the search text has no words in it
+        ValueError: If the dialect has no full-text search support here
+    """
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search text must contain at least one word"
+        )
+
+    if dialect_name == "mysql":
+        match = mysql.match(Campaign.title, Campaign.description, against=" ".join(terms)).in_natural_language_mode()
+        # A bare MATCH in WHERE is what lets MySQL read the FULLTEXT index. match()
+        # is typed as a boolean, so read its relevance as a float for ranking
+        return query.where(match), type_coerce(match, Float)
+
+    if dialect_name == "sqlite":
+        # Quote each word so FTS5 doesn't read it as an operator (OR, NEAR, ...),
+        # and match any of them like MySQL's natural language mode does
+        match = " OR ".join(f'"{term}"' for term in terms)
+        # Score the matches in a materialized CTE, so SQLite always reads them
+        # from the FTS index and then looks campaigns up by id (rather than
+        # probing the FTS table once per campaign passing the filters)
+        matches = select(
+            campaigns_fts.c.rowid.label("id"),
+            (-func.bm25(literal_column("campaigns_fts"), *SQLITE_COLUMN_WEIGHTS)).label("score")
+        ).where(campaigns_fts.c.campaigns_fts.match(match)).cte("matches").prefix_with("MATERIALIZED")
+        query = query.join_from(Campaign, matches, matches.c.id == Campaign.id)
+        return query, matches.c.score
+
+    raise ValueError(f"Full-text search is not supported on '{dialect_name}'")
+
+
+def search_page(query: Select, score, page_size: int, cursor: Optional[str]) -> Select:
+    """
+    Order matching campaigns best first and seek past a cursor.
+
+    Args:
+        query: Query from search_query()
+        score: Relevance expression from search_query()
+        page_size: Results per page (one extra row is fetched to spot the last page)
+        cursor: Cursor from a previous page, if any
+
+    Returns:
+        Query selecting the columns plus a trailing "score" column
+
+    Raises:
+        HTTPException 400: If the cursor is invalid
+    """
+    if cursor is not None:
+        try:
+            last_score, last_id = decode_search_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid search cursor"
+            )
+        query = query.where(or_(score < last_score, and_(score == last_score, Campaign.id < last_id)))
+
+    return query.add_columns(score.label("score")).order_by(score.desc(), Campaign.id.desc()).limit(page_size + 1)
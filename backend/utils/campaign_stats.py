@@ -0,0 +1,407 @@
+"""
+Precomputed donation statistics for campaign creators.
+
+GET /campaigns/{id}/stats reports completed donations by hour or day,
+the average gift, unique givers and the anonymous share. Grouping the
+donations table for that on every call gets slower as a campaign
+grows, so the numbers are kept in two rollup tables instead:
+
+- campaign_stats_buckets: count and amount (and the anonymous part of
+  each) per campaign and hour, and per campaign and day
+- campaign_giver_totals: count and amount per campaign and giver, so
+  unique givers are the rows with a count above zero
+
+Both are changed with upserts in the same transaction as the campaign
+total (see _update_donation_aggregates in routers/donations.py).
+Donations are bucketed by created_at in UTC, not by when they
+completed, so a refund takes a donation back out of the bucket it was
+added to. Campaigns with counter_shards > 0 write to the same shard as
+their amount, so hot campaigns don't queue on the current hour's row.
+
+Donations written outside the API (manage_data.py import, raw SQL) and
+donations completed before these tables existed are picked up by
+rebuild_campaign_stats() (see manage_stats.py).
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, literal, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import (
+    Campaign, CampaignGiverTotal, CampaignStatsBucket, Donation, PaymentStatus, StatsPeriod
+)
+
+# Rows per upsert statement (SQLite allows 32766 bound parameters)
+UPSERT_CHUNK_SIZE = 1000
+
+# Campaigns rebuilt per transaction by rebuild_campaign_stats()
+REBUILD_BATCH_SIZE = 100
+
+# Default and longest windows of buckets returned by GET /campaigns/{id}/stats
+DEFAULT_WINDOWS = {StatsPeriod.HOUR: timedelta(hours=48), StatsPeriod.DAY: timedelta(days=30)}
+MAX_WINDOWS = {StatsPeriod.HOUR: timedelta(days=31), StatsPeriod.DAY: timedelta(days=3660)}
+
+# SQL format strings truncating created_at to a bucket start, per dialect.
+# SQLite stores DateTime columns as text, so match SQLAlchemy's format
+SQL_BUCKET_FORMATS = {
+    "sqlite": {StatsPeriod.HOUR: "%Y-%m-%d %H:00:00.000000", StatsPeriod.DAY: "%Y-%m-%d 00:00:00.000000"},
+    "mysql": {StatsPeriod.HOUR: "%Y-%m-%d %H:00:00", StatsPeriod.DAY: "%Y-%m-%d 00:00:00"},
+}
+
+BUCKET_COLUMNS = ["donation_count", "amount", "anonymous_count", "anonymous_amount"]
+GIVER_COLUMNS = ["donation_count", "amount"]
+
+
+def utc_naive(value: datetime) -> datetime:
+    """Convert a datetime to naive UTC (naive values are assumed to be UTC already)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def bucket_start(created_at: datetime, period: StatsPeriod) -> datetime:
+    """
+    Start of the hour or day a donation falls in.
+
+    Args:
+        created_at: When the donation was made
+        period: Bucket length
+
+    Returns:
+        Naive UTC datetime at the start of the bucket
+    """
+    start = utc_naive(created_at).replace(minute=0, second=0, microsecond=0)
+    if period == StatsPeriod.DAY:
+        start = start.replace(hour=0)
+    return start
+
+
+class StatsDeltas:
+    """
+    Summed rollup changes for some donations being completed or reversed.
+
+    The batch status endpoint adds every donation it changes and applies
+    the result once, so each bucket and giver row is written once.
+    """
+
+    def __init__(self):
+        # (campaign_id, period, bucket_start) -> [count, amount, anonymous count, anonymous amount]
+        self.buckets = defaultdict(lambda: [0, Decimal("0"), 0, Decimal("0")])
+        # (campaign_id, giver_id) -> [count, amount]
+        self.givers = defaultdict(lambda: [0, Decimal("0")])
+
+    def add(self, donation, sign: int):
+        """
+        Add (sign 1) or take back out (sign -1) one donation.
+
+        Args:
+            donation: Donation, or a row with campaign_id, giver_id,
+                amount, is_anonymous and created_at
+            sign: 1 when the donation completes, -1 when it's reversed
+        """
+        amount = sign * donation.amount
+        # Donations not flushed yet have no created_at; they are being made now
+        created_at = donation.created_at or datetime.now(timezone.utc)
+        for period in StatsPeriod:
+            bucket = self.buckets[(donation.campaign_id, period, bucket_start(created_at, period))]
+            bucket[0] += sign
+            bucket[1] += amount
+            if donation.is_anonymous:
+                bucket[2] += sign
+                bucket[3] += amount
+
+        giver = self.givers[(donation.campaign_id, donation.giver_id)]
+        giver[0] += sign
+        giver[1] += amount
+
+    def __bool__(self):
+        return bool(self.buckets)
+
+
+def _increment_upsert(dialect_name: str, model, rows: List[dict], key_columns: List[str], columns: List[str]):
+    """
+    Build an INSERT that adds each row's values to an existing row, creating it if needed.
+
+    Args:
+        dialect_name: Database dialect ("mysql" or "sqlite")
+        model: Rollup model to write to
+        rows: Rows to insert, keyed by column name
+        key_columns: Primary key columns
+        columns: Counter columns to add to
+
+    Returns:
+        Insert statement with the dialect's upsert clause
+
+    Raises:
+        ValueError: If the dialect has no supported upsert
+    """
+    if dialect_name == "mysql":
+        stmt = mysql.insert(model).values(rows)
+        return stmt.on_duplicate_key_update(
+            {column: getattr(model, column) + stmt.inserted[column] for column in columns}
+        )
+
+    if dialect_name == "sqlite":
+        stmt = sqlite.insert(model).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={column: getattr(model, column) + stmt.excluded[column] for column in columns}
+        )
+
+    raise ValueError(f"Campaign stats rollups are not supported on '{dialect_name}'")
+
+
+def _chunks(rows: list, size: int = UPSERT_CHUNK_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def apply_stats_deltas(db: AsyncSession, deltas: StatsDeltas, shards: Optional[Mapping[int, int]] = None):
+    """
+    Add summed changes to the rollup tables.
+
+    Rows are written in primary key order, so concurrent transactions
+    lock them in the same order.
+
+    Args:
+        db: Database session
+        deltas: Changes to apply
+        shards: Counter shard per campaign ID, as returned by
+            add_to_campaign_amount() (default: shard 0)
+    """
+    shards = shards or {}
+    dialect_name = db.bind.dialect.name
+
+    bucket_rows = [
+        {
+            "campaign_id": campaign_id, "period": period, "bucket_start": start,
+            "shard": shards.get(campaign_id) or 0,
+            **dict(zip(BUCKET_COLUMNS, values)),
+        }
+        for (campaign_id, period, start), values in sorted(deltas.buckets.items())
+        if any(values)
+    ]
+    giver_rows = [
+        {"campaign_id": campaign_id, "giver_id": giver_id, **dict(zip(GIVER_COLUMNS, values))}
+        for (campaign_id, giver_id), values in sorted(deltas.givers.items())
+        if any(values)
+    ]
+
+    for chunk in _chunks(bucket_rows):
+        await db.execute(_increment_upsert(
+            dialect_name, CampaignStatsBucket, chunk,
+            ["campaign_id", "period", "bucket_start", "shard"], BUCKET_COLUMNS
+        ))
+    for chunk in _chunks(giver_rows):
+        await db.execute(_increment_upsert(
+            dialect_name, CampaignGiverTotal, chunk, ["campaign_id", "giver_id"], GIVER_COLUMNS
+        ))
+
+
+async def add_to_campaign_stats(db: AsyncSession, donation: Donation, sign: int, shard: Optional[int] = None):
+    """
+    Add one completed donation to the rollups, or take a reversed one out.
+
+    Args:
+        db: Database session
+        donation: The donation
+        sign: 1 when the donation completes, -1 when it's reversed
+        shard: Counter shard its amount went to (see add_to_campaign_amount())
+    """
+    deltas = StatsDeltas()
+    deltas.add(donation, sign)
+    await apply_stats_deltas(db, deltas, {donation.campaign_id: shard})
+
+
+def _sum_columns(model, columns: List[str]):
+    return [func.coalesce(func.sum(getattr(model, column)), 0).label(column) for column in columns]
+
+
+async def get_campaign_stats(
+    db: AsyncSession,
+    campaign_id: int,
+    period: StatsPeriod,
+    since: datetime,
+    until: datetime
+) -> dict:
+    """
+    Read a campaign's totals and buckets from the rollups.
+
+    Totals cover the whole campaign; buckets cover [since, until) and
+    leave out hours or days without completed donations.
+
+    Args:
+        db: Database session
+        campaign_id: Campaign to report on
+        period: Bucket length
+        since: Start of the first bucket to return
+        until: End of the window (exclusive)
+
+    Returns:
+        Dict in the shape of CampaignStatsResponse
+    """
+    since, until = utc_naive(since), utc_naive(until)
+
+    # Whole-campaign totals from the day buckets (at most a few thousand rows)
+    totals = (await db.execute(
+        select(*_sum_columns(CampaignStatsBucket, BUCKET_COLUMNS)).where(
+            CampaignStatsBucket.campaign_id == campaign_id,
+            CampaignStatsBucket.period == StatsPeriod.DAY
+        )
+    )).one()
+    unique_givers = await db.scalar(
+        select(func.count()).select_from(CampaignGiverTotal).where(
+            CampaignGiverTotal.campaign_id == campaign_id,
+            CampaignGiverTotal.donation_count > 0
+        )
+    )
+
+    # Shard rows of a bucket are summed together
+    rows = await db.execute(
+        select(CampaignStatsBucket.bucket_start, *_sum_columns(CampaignStatsBucket, BUCKET_COLUMNS))
+        .where(
+            CampaignStatsBucket.campaign_id == campaign_id,
+            CampaignStatsBucket.period == period,
+            CampaignStatsBucket.bucket_start >= since,
+            CampaignStatsBucket.bucket_start < until
+        )
+        .group_by(CampaignStatsBucket.bucket_start)
+        .having(func.sum(CampaignStatsBucket.donation_count) != 0)
+        .order_by(CampaignStatsBucket.bucket_start)
+    )
+
+    count, amount = totals.donation_count, Decimal(totals.amount)
+    return {
+        "campaign_id": campaign_id,
+        "donation_count": count,
+        "total_amount": amount,
+        "average_gift": (amount / count).quantize(Decimal("0.01")) if count else Decimal("0.00"),
+        "unique_givers": unique_givers,
+        "anonymous_count": totals.anonymous_count,
+        "anonymous_amount": Decimal(totals.anonymous_amount),
+        "anonymous_share": totals.anonymous_count / count if count else 0.0,
+        "period": period,
+        "since": since,
+        "until": until,
+        "buckets": [
+            {
+                "start": row.bucket_start,
+                "donation_count": row.donation_count,
+                "amount": Decimal(row.amount),
+                "anonymous_count": row.anonymous_count,
+                "anonymous_amount": Decimal(row.anonymous_amount),
+            }
+            for row in rows
+        ],
+    }
+
+
+def _bucket_source(dialect_name: str, period: StatsPeriod, campaign_ids: List[int]):
+    """Select campaign_stats_buckets rows for some campaigns from the donations table."""
+    if dialect_name not in SQL_BUCKET_FORMATS:
+        raise ValueError(f"Campaign stats rollups are not supported on '{dialect_name}'")
+
+    fmt = SQL_BUCKET_FORMATS[dialect_name][period]
+    if dialect_name == "sqlite":
+        start = func.strftime(fmt, Donation.created_at)
+    else:
+        start = func.date_format(Donation.created_at, fmt)
+    anonymous = Donation.is_anonymous == True
+    return select(
+        Donation.campaign_id,
+        literal(period, CampaignStatsBucket.period.type),
+        start,
+        literal(0),
+        func.count(),
+        func.sum(Donation.amount),
+        func.sum(case((anonymous, 1), else_=0)),
+        func.sum(case((anonymous, Donation.amount), else_=0)),
+    ).where(
+        Donation.campaign_id.in_(campaign_ids),
+        Donation.payment_status == PaymentStatus.COMPLETED
+    ).group_by(Donation.campaign_id, start)
+
+
+def _giver_source(campaign_ids: List[int]):
+    """Select campaign_giver_totals rows for some campaigns from the donations table."""
+    return select(
+        Donation.campaign_id, Donation.giver_id, func.count(), func.sum(Donation.amount)
+    ).where(
+        Donation.campaign_id.in_(campaign_ids),
+        Donation.payment_status == PaymentStatus.COMPLETED
+    ).group_by(Donation.campaign_id, Donation.giver_id)
+
+
+async def rebuild_campaign_stats(
+    db: AsyncSession,
+    campaign_ids: Optional[Iterable[int]] = None,
+    batch_size: int = REBUILD_BATCH_SIZE,
+    progress: Optional[Callable[[int], None]] = None
+) -> int:
+    """
+    Recompute campaigns' rollup rows from the donations table.
+
+    Each batch of campaigns is deleted and re-inserted with INSERT ...
+    SELECT in its own transaction, so a backfill of a large table never
+    holds one long transaction and can be stopped and rerun safely.
+    Donations completed while a batch runs wait for it (MySQL locks the
+    rows INSERT ... SELECT reads; SQLite has one writer).
+
+    Args:
+        db: Database session
+        campaign_ids: Campaigns to rebuild (default: every campaign)
+        batch_size: Campaigns per transaction
+        progress: Called with the number of campaigns rebuilt so far
+
+    Returns:
+        Number of campaigns rebuilt
+    """
+    if campaign_ids is None:
+        campaign_ids = (await db.scalars(select(Campaign.id).order_by(Campaign.id))).all()
+        await db.commit()
+    campaign_ids = sorted(set(campaign_ids))
+    dialect_name = db.bind.dialect.name
+
+    done = 0
+    for batch in _chunks(campaign_ids, batch_size):
+        for model in (CampaignStatsBucket, CampaignGiverTotal):
+            await db.execute(
+                delete(model).where(model.campaign_id.in_(batch)).execution_options(synchronize_session=False)
+            )
+        for period in StatsPeriod:
+            await db.execute(insert(CampaignStatsBucket).from_select(
+                ["campaign_id", "period", "bucket_start", "shard", *BUCKET_COLUMNS],
+                _bucket_source(dialect_name, period, batch)
+            ))
+        await db.execute(insert(CampaignGiverTotal).from_select(
+            ["campaign_id", "giver_id", *GIVER_COLUMNS], _giver_source(batch)
+        ))
+        await db.commit()
+
+        done += len(batch)
+        if progress:
+            progress(done)
+
+    return done
+
+
+def default_window(period: StatsPeriod, since: Optional[datetime], until: Optional[datetime]) -> Tuple[datetime, datetime]:
+    """
+    Fill in a missing start or end of a stats window.
+
+    Args:
+        period: Bucket length
+        since: Requested start (default: DEFAULT_WINDOWS[period] before until)
+        until: Requested end (default: now)
+
+    Returns:
+        (since, until) as naive UTC datetimes
+    """
+    until = utc_naive(until) if until else datetime.now(timezone.utc).replace(tzinfo=None)
+    since = utc_naive(since) if since else bucket_start(until - DEFAULT_WINDOWS[period], period)
+    return since, until
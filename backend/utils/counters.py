@@ -0,0 +1,212 @@
+"""
+Atomic counter updates for donation aggregates.
+
+Campaign.current_amount and the GiverProfile totals are changed with a
+single UPDATE ... SET col = col + :delta statement, so concurrent
+completions never lose an update and the row lock is held only for
+that statement (not across a read in Python).
+
+Very hot campaigns can still queue on their one campaign row. Setting
+Campaign.counter_shards > 0 spreads their increments over that many
+campaign_amount_shards rows, picked at random, and fold_counter_shards()
+later moves the shard amounts into current_amount. Between folds the
+exact amount is current_amount plus get_pending_shard_amount().
+"""
+
+import asyncio
+import logging
+import random
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from models import Campaign, CampaignAmountShard, GiverProfile
+from utils.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _shard_upsert(dialect_name: str, campaign_id: int, shard: int, amount: Decimal):
+    """
+    Build an INSERT that adds amount to a shard row, creating it if needed.
+
+    Args:
+        dialect_name: Database dialect ("mysql" or "sqlite")
+        campaign_id: Campaign the shard belongs to
+        shard: Shard number
+        amount: Amount to add (negative to subtract)
+
+    Returns:
+        Insert statement with the dialect's upsert clause
+
+    Raises:
+        ValueError: If the dialect has no supported upsert
+    """
+    values = {"campaign_id": campaign_id, "shard": shard, "amount": amount}
+
+    if dialect_name == "mysql":
+        stmt = mysql.insert(CampaignAmountShard).values(**values)
+        return stmt.on_duplicate_key_update(
+            amount=CampaignAmountShard.amount + stmt.inserted.amount
+        )
+
+    if dialect_name == "sqlite":
+        stmt = sqlite.insert(CampaignAmountShard).values(**values)
+        return stmt.on_conflict_do_update(
+            index_elements=["campaign_id", "shard"],
+            set_={"amount": CampaignAmountShard.amount + stmt.excluded.amount}
+        )
+
+    raise ValueError(f"Sharded counters are not supported on '{dialect_name}'")
+
+
+async def add_to_campaign_amount(db: AsyncSession, campaign_id: int, amount: Decimal) -> int:
+    """
+    Add amount to a campaign's raised total.
+
+    Updates current_amount in place for normal campaigns. For campaigns
+    with counter_shards set, adds to a random shard row instead.
+
+    Args:
+        db: Database session
+        campaign_id: Campaign to update
+        amount: Amount to add (negative to subtract)
+
+    Returns:
+        Shard the amount was added to (0 for campaigns without shards)
+    """
+    # Common case: one statement that only matches unsharded campaigns
+    result = await db.execute(
+        update(Campaign)
+        .where(Campaign.id == campaign_id, Campaign.counter_shards == 0)
+        .values(current_amount=Campaign.current_amount + amount)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        return 0
+
+    shards = await db.scalar(select(Campaign.counter_shards).where(Campaign.id == campaign_id))
+    if not shards:
+        # Campaign doesn't exist
+        return 0
+
+    shard = random.randrange(shards)
+    await db.execute(_shard_upsert(db.bind.dialect.name, campaign_id, shard, amount))
+    return shard
+
+
+async def add_to_giver_totals(db: AsyncSession, giver_id: int, amount: Decimal, count: int):
+    """
+    Add to a giver profile's total_donated and donation_count.
+
+    Args:
+        db: Database session
+        giver_id: Giver profile to update
+        amount: Amount to add (negative to subtract)
+        count: Number of donations to add (negative to subtract)
+    """
+    await db.execute(
+        update(GiverProfile)
+        .where(GiverProfile.id == giver_id)
+        .values(
+            total_donated=GiverProfile.total_donated + amount,
+            donation_count=GiverProfile.donation_count + count
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def get_pending_shard_amount(db: AsyncSession, campaign_id: int) -> Decimal:
+    """
+    Get the amount sitting in a campaign's shards, not yet folded.
+
+    Args:
+        db: Database session
+        campaign_id: Campaign to check
+
+    Returns:
+        Sum of the campaign's shard amounts
+    """
+    pending = await db.scalar(
+        select(func.sum(CampaignAmountShard.amount))
+        .where(CampaignAmountShard.campaign_id == campaign_id)
+    )
+    return pending or Decimal("0.00")
+
+
+async def fold_counter_shards(db: AsyncSession) -> int:
+    """
+    Move pending shard amounts into Campaign.current_amount.
+
+    Each shard is reduced by exactly the amount that was read from it,
+    so increments that land while the fold runs are kept for the next
+    fold. Everything happens in one transaction, so current_amount plus
+    the shards is the same before and after.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of campaigns folded
+    """
+    shards = (await db.execute(
+        select(
+            CampaignAmountShard.campaign_id,
+            CampaignAmountShard.shard,
+            CampaignAmountShard.amount
+        ).where(CampaignAmountShard.amount != 0)
+    )).all()
+
+    totals = defaultdict(Decimal)
+    for campaign_id, shard, amount in shards:
+        await db.execute(
+            update(CampaignAmountShard)
+            .where(
+                CampaignAmountShard.campaign_id == campaign_id,
+                CampaignAmountShard.shard == shard
+            )
+            .values(amount=CampaignAmountShard.amount - amount)
+            .execution_options(synchronize_session=False)
+        )
+        totals[campaign_id] += amount
+
+    for campaign_id, amount in totals.items():
+        await db.execute(
+            update(Campaign)
+            .where(Campaign.id == campaign_id)
+            .values(current_amount=Campaign.current_amount + amount)
+            .execution_options(synchronize_session=False)
+        )
+
+    if totals:
+        response_cache.invalidate_on_commit(
+            db, "campaigns", *(f"campaign:{campaign_id}" for campaign_id in totals)
+        )
+
+    await db.commit()
+    return len(totals)
+
+
+async def run_fold_loop(session_factory: async_sessionmaker, interval: float):
+    """
+    Fold counter shards every interval seconds until cancelled.
+
+    Started as a background task by the application lifespan. Errors are
+    logged and retried on the next tick.
+
+    Args:
+        session_factory: Factory for the sessions each fold runs in
+        interval: Seconds between folds
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as db:
+                folded = await fold_counter_shards(db)
+            if folded:
+                logger.info(f"Folded counter shards for {folded} campaign(s)")
+        except Exception as e:
+            logger.error(f"Counter shard fold failed: {e}")
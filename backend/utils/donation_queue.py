@@ -0,0 +1,515 @@
+"""
+Write-behind queue for donation intake during traffic spikes.
+
+POST /donations/ looks up the campaign and giver profile, INSERTs and
+commits for every request, so during a televised appeal requests queue
+up on the database. With INTAKE_ENABLED=true, POST /donations/queued
+instead appends the validated donation to a local SQLite file (WAL mode,
+fsync on commit) and answers 202 with a ticket straight away. No database
+connection is used for the request.
+
+A background task (run_flush_loop) takes queued donations in arrival
+order and writes them to the database with one multi-row INSERT per
+batch. Campaign and giver checks happen there, once per batch; donations
+that fail them are marked rejected. Clients follow the ticket with
+GET /donations/queued/{ticket}.
+
+Crash recovery: queued entries are on disk before the 202 is sent, so
+after a restart the flush loop carries on from where it stopped. Each
+donation row stores its ticket (donations.queue_ticket, unique), so a
+batch that was written but not yet marked done in the queue is found
+and marked rather than written twice. Workers on one host can share a
+queue file for the same reason.
+
+Concurrent enqueues are committed to the queue file together (group
+commit), so one fsync covers every request that arrived while the
+previous one was running.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import get_intake_settings
+from models import Campaign, CampaignStatus, Donation, GiverProfile, PaymentStatus
+from schemas import DonationCreate, QueuedDonationStatus
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queued_donations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket TEXT NOT NULL UNIQUE,
+    user_id INTEGER NOT NULL,
+    campaign_id INTEGER NOT NULL,
+    amount TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    is_anonymous INTEGER NOT NULL,
+    message TEXT,
+    queued_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    donation_id INTEGER,
+    error TEXT,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_queued_donations_status_seq ON queued_donations (status, seq);
+"""
+
+_COLUMNS = (
+    "ticket, user_id, campaign_id, amount, currency, is_anonymous, message, "
+    "queued_at, status, donation_id, error"
+)
+
+
+class IntakeBusy(HTTPException):
+    """Raised (as a 503) when buffered intake is off or its queue is full."""
+
+    def __init__(self, detail: str = "Server is busy, please try again shortly"):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": "1"}
+        )
+
+
+@dataclass
+class QueuedDonation:
+    """A donation request held in the intake queue."""
+    ticket: str
+    user_id: int
+    campaign_id: int
+    amount: Decimal
+    currency: str
+    is_anonymous: bool
+    message: Optional[str]
+    queued_at: datetime
+    status: QueuedDonationStatus = QueuedDonationStatus.QUEUED
+    donation_id: Optional[int] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "QueuedDonation":
+        """Build from a row selected with _COLUMNS."""
+        ticket, user_id, campaign_id, amount, currency, is_anonymous, message, \
+            queued_at, state, donation_id, error = row
+        return cls(
+            ticket=ticket,
+            user_id=user_id,
+            campaign_id=campaign_id,
+            amount=Decimal(amount),
+            currency=currency,
+            is_anonymous=bool(is_anonymous),
+            message=message,
+            queued_at=datetime.fromtimestamp(queued_at, tz=timezone.utc),
+            status=QueuedDonationStatus(state),
+            donation_id=donation_id,
+            error=error
+        )
+
+
+class DonationQueue:
+    """
+    Durable FIFO of donation requests in a local SQLite file.
+
+    All file access runs on one dedicated thread, so the event loop never
+    waits on disk.
+
+    Args:
+        path: SQLite file to keep the queue in
+        max_pending: Queued entries allowed before enqueue() refuses more
+    """
+
+    def __init__(self, path: str, max_pending: int):
+        self.path = path
+        self.max_pending = max_pending
+        self.pending = 0
+        self.accepted = 0
+        self.created = 0
+        self.rejected = 0
+        self.refused = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._incoming = []
+        self._writer = None
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the queue is accepting donations."""
+        return self._conn is not None
+
+    def open(self) -> int:
+        """
+        Open (or create) the queue file.
+
+        Returns:
+            Number of entries still queued from before (recovered after a restart)
+        """
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.executescript(_SCHEMA)
+        self._conn = conn
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="donation-queue")
+        self.pending = self._count_pending()
+        return self.pending
+
+    def close(self):
+        """Close the queue file. Entries not yet flushed stay queued on disk."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _count_pending(self) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM queued_donations WHERE status = ?", (QueuedDonationStatus.QUEUED.value,)
+        ).fetchone()[0]
+
+    async def enqueue(self, user_id: int, donation: DonationCreate) -> QueuedDonation:
+        """
+        Durably queue a donation request.
+
+        Returns once the entry is committed to the queue file.
+
+        Args:
+            user_id: User making the donation
+            donation: Validated donation request
+
+        Returns:
+            The queued entry, with its ticket
+
+        Raises:
+            IntakeBusy: If the queue isn't open or is full
+        """
+        if not self.is_open:
+            raise IntakeBusy("Buffered donation intake is not enabled")
+        if self.pending + len(self._incoming) >= self.max_pending:
+            self.refused += 1
+            raise IntakeBusy()
+
+        entry = QueuedDonation(
+            ticket=uuid.uuid4().hex,
+            user_id=user_id,
+            campaign_id=donation.campaign_id,
+            amount=donation.amount,
+            currency=donation.currency,
+            is_anonymous=donation.is_anonymous,
+            message=donation.message,
+            queued_at=datetime.now(timezone.utc)
+        )
+        written = asyncio.get_running_loop().create_future()
+        self._incoming.append((entry, written))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_incoming())
+
+        await written
+        return entry
+
+    async def _write_incoming(self):
+        # Everything that arrived while the last commit ran goes in the next one
+        while self._incoming:
+            batch, self._incoming = self._incoming, []
+            try:
+                await self._run(self._insert, [entry for entry, _ in batch])
+            except Exception as e:
+                logger.error(f"Donation queue write failed: {e}")
+                for _, written in batch:
+                    if not written.done():
+                        written.set_exception(IntakeBusy())
+                continue
+
+            self.pending += len(batch)
+            self.accepted += len(batch)
+            for _, written in batch:
+                if not written.done():
+                    written.set_result(None)
+
+    def _insert(self, entries: List[QueuedDonation]):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO queued_donations "
+                "(ticket, user_id, campaign_id, amount, currency, is_anonymous, message, queued_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        entry.ticket, entry.user_id, entry.campaign_id, str(entry.amount),
+                        entry.currency, int(entry.is_anonymous), entry.message,
+                        entry.queued_at.timestamp()
+                    )
+                    for entry in entries
+                ]
+            )
+
+    async def get(self, ticket: str) -> Optional[QueuedDonation]:
+        """
+        Look up an entry by ticket.
+
+        Args:
+            ticket: Ticket returned by enqueue()
+
+        Returns:
+            The entry, or None if unknown (or pruned)
+        """
+        def select_entry():
+            return self._conn.execute(
+                f"SELECT {_COLUMNS} FROM queued_donations WHERE ticket = ?", (ticket,)
+            ).fetchone()
+
+        row = await self._run(select_entry)
+        return QueuedDonation.from_row(row) if row else None
+
+    async def peek(self, limit: int) -> List[QueuedDonation]:
+        """
+        Get the oldest queued entries, without removing them.
+
+        Args:
+            limit: Most entries to return
+
+        Returns:
+            Queued entries in arrival order
+        """
+        def select_queued():
+            return self._conn.execute(
+                f"SELECT {_COLUMNS} FROM queued_donations WHERE status = ? ORDER BY seq LIMIT ?",
+                (QueuedDonationStatus.QUEUED.value, limit)
+            ).fetchall()
+
+        return [QueuedDonation.from_row(row) for row in await self._run(select_queued)]
+
+    async def mark(self, created: Dict[str, int], rejected: Dict[str, str]):
+        """
+        Record the outcome of flushed entries.
+
+        Args:
+            created: Ticket -> ID of the donation written for it
+            rejected: Ticket -> reason it couldn't be written
+        """
+        def update_entries():
+            now = time.time()
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE queued_donations SET status = ?, donation_id = ?, finished_at = ? WHERE ticket = ?",
+                    [(QueuedDonationStatus.CREATED.value, donation_id, now, ticket)
+                     for ticket, donation_id in created.items()]
+                )
+                self._conn.executemany(
+                    "UPDATE queued_donations SET status = ?, error = ?, finished_at = ? WHERE ticket = ?",
+                    [(QueuedDonationStatus.REJECTED.value, error, now, ticket)
+                     for ticket, error in rejected.items()]
+                )
+            # Other workers sharing the file change the depth too
+            return self._count_pending()
+
+        self.pending = await self._run(update_entries)
+        self.created += len(created)
+        self.rejected += len(rejected)
+
+    async def prune(self, older_than: float) -> int:
+        """
+        Delete entries that finished more than older_than seconds ago.
+
+        Args:
+            older_than: Age in seconds
+
+        Returns:
+            Number of entries deleted
+        """
+        def delete_finished():
+            with self._conn:
+                return self._conn.execute(
+                    "DELETE FROM queued_donations WHERE status != ? AND finished_at < ?",
+                    (QueuedDonationStatus.QUEUED.value, time.time() - older_than)
+                ).rowcount
+
+        return await self._run(delete_finished)
+
+    def status(self) -> dict:
+        """
+        Report queue depth and counters.
+
+        Returns:
+            Dictionary of queue statistics
+        """
+        return {
+            "enabled": self.is_open,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "accepted": self.accepted,
+            "created": self.created,
+            "rejected": self.rejected,
+            "refused": self.refused,
+        }
+
+
+async def _write_rows(db: AsyncSession, rows: List[dict]) -> Dict[str, str]:
+    """
+    Insert donation rows, falling back to one at a time if the batch fails.
+
+    Args:
+        db: Database session
+        rows: Donation column values, each with a queue_ticket
+
+    Returns:
+        Ticket -> error for rows that couldn't be inserted
+    """
+    try:
+        await db.execute(insert(Donation).values(rows))
+        await db.commit()
+        return {}
+    except DBAPIError as e:
+        await db.rollback()
+        if _is_transient(e):
+            raise
+
+    # The database refused something in the batch (e.g. its campaign was
+    # deleted, another worker wrote the same ticket, or a value is out of
+    # range for the column): find which
+    failed = {}
+    for row in rows:
+        try:
+            await db.execute(insert(Donation).values(row))
+            await db.commit()
+        except DBAPIError as e:
+            await db.rollback()
+            if _is_transient(e):
+                raise
+            failed[row["queue_ticket"]] = f"Could not be saved: {e.orig}"
+    return failed
+
+
+def _is_transient(error: DBAPIError) -> bool:
+    """Whether an error is the connection's rather than the row's (the flush is retried)."""
+    return error.connection_invalidated or isinstance(error, (OperationalError, InterfaceError))
+
+
+async def flush_queued_donations(db: AsyncSession, queue: DonationQueue, batch_size: int) -> int:
+    """
+    Write the oldest queued donations to the database.
+
+    Campaigns and giver profiles are checked for the whole batch at once,
+    with the same rules as POST /donations/. Entries whose ticket is
+    already on a donation (written before a crash) are just marked done.
+
+    Args:
+        db: Database session
+        queue: Queue to flush
+        batch_size: Most entries to write
+
+    Returns:
+        Number of queue entries handled
+    """
+    entries = await queue.peek(batch_size)
+    if not entries:
+        return 0
+
+    tickets = [entry.ticket for entry in entries]
+    written = dict((await db.execute(
+        select(Donation.queue_ticket, Donation.id).where(Donation.queue_ticket.in_(tickets))
+    )).all())
+
+    campaigns = dict((await db.execute(
+        select(Campaign.id, Campaign.status)
+        .where(Campaign.id.in_({entry.campaign_id for entry in entries}))
+    )).all())
+    givers = dict((await db.execute(
+        select(GiverProfile.user_id, GiverProfile.id)
+        .where(GiverProfile.user_id.in_({entry.user_id for entry in entries}))
+    )).all())
+
+    rows = []
+    rejected = {}
+    for entry in entries:
+        if entry.ticket in written:
+            continue
+        if entry.campaign_id not in campaigns:
+            rejected[entry.ticket] = "Campaign not found"
+        elif campaigns[entry.campaign_id] != CampaignStatus.ACTIVE:
+            rejected[entry.ticket] = "Campaign is not accepting donations (status must be ACTIVE)"
+        elif entry.user_id not in givers:
+            rejected[entry.ticket] = "Giver profile not found"
+        else:
+            rows.append({
+                "amount": entry.amount,
+                "currency": entry.currency,
+                "campaign_id": entry.campaign_id,
+                "giver_id": givers[entry.user_id],
+                "payment_status": PaymentStatus.PENDING,
+                "is_anonymous": entry.is_anonymous,
+                "message": entry.message,
+                "queue_ticket": entry.ticket,
+                "created_at": entry.queued_at,
+            })
+
+    if rows:
+        failed = await _write_rows(db, rows)
+        written.update((await db.execute(
+            select(Donation.queue_ticket, Donation.id)
+            .where(Donation.queue_ticket.in_([row["queue_ticket"] for row in rows]))
+        )).all())
+        rejected.update((ticket, error) for ticket, error in failed.items() if ticket not in written)
+
+    await queue.mark(created=written, rejected=rejected)
+    return len(entries)
+
+
+async def run_flush_loop(
+    queue: DonationQueue,
+    session_factory: async_sessionmaker,
+    batch_size: int,
+    interval: float,
+    retention: float
+):
+    """
+    Flush the queue until cancelled.
+
+    Started as a background task by the application lifespan. Flushes
+    back to back while there is a backlog, otherwise every interval
+    seconds. Errors are logged and retried on the next tick.
+
+    Args:
+        queue: Queue to flush
+        session_factory: Factory for the sessions each flush runs in
+        batch_size: Most donations per INSERT
+        interval: Seconds between flushes when the queue is idle
+        retention: Seconds finished entries are kept (0 keeps them)
+    """
+    pruned_at = time.monotonic()
+    while True:
+        flushed = 0
+        try:
+            async with session_factory() as db:
+                flushed = await flush_queued_donations(db, queue, batch_size)
+        except Exception as e:
+            logger.error(f"Donation queue flush failed: {e}")
+
+        if retention and time.monotonic() - pruned_at > 60:
+            pruned_at = time.monotonic()
+            try:
+                await queue.prune(retention)
+            except Exception as e:
+                logger.error(f"Donation queue prune failed: {e}")
+
+        if flushed < batch_size:
+            await asyncio.sleep(interval)
+
+
+# Process-wide queue used by POST /donations/queued (opened by the lifespan when enabled)
+_settings = get_intake_settings()
+donation_queue = DonationQueue(path=_settings.queue_path, max_pending=_settings.max_pending)
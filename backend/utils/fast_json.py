@@ -0,0 +1,198 @@
+"""
+Fast JSON responses for list endpoints.
+
+With response_model, FastAPI validates every returned ORM object
+against the schema (from_attributes), converts the result with
+jsonable_encoder and encodes it with the stdlib json module. On a
+100-item page that is most of the request's CPU time, and none of it
+checks anything: the values come straight from typed database columns.
+
+This module skips that work for routes that opt in:
+
+- RowSerializer is built once per response schema. It knows the
+  schema's field names and the model columns behind them, so list
+  queries select exactly those columns and each row becomes a dict with
+  one zip(), without validation
+- FastJSONResponse encodes with orjson when it is installed (stdlib
+  json otherwise), turning Decimal into strings and datetimes into
+  ISO 8601 like Pydantic does, so the JSON is the same either way
+
+Routes keep response_model for the OpenAPI schema and return a
+FastJSONResponse (which FastAPI sends as is):
+
+    @router.get("/", response_model=DonationListResponse, response_class=FastJSONResponse)
+    async def list_donations(...):
+        query = select(*donation_serializer.columns).where(...)
+        result = await paginate(db, query, Donation, ...)
+        return FastJSONResponse({"donations": donation_serializer.rows(result.items), ...})
+
+A serializer's fields must be plain model columns; schemas with
+computed or nested fields need the Pydantic path.
+
+List endpoints also take a sparse fieldset (fields=id,amount) through
+the sparse_fields() dependency, which hands the route a serializer for
+just those fields, so neither the unrequested columns (e.g. a campaign's
+description) nor their JSON are read or sent.
+"""
+
+import enum
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from operator import attrgetter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Type
+
+from fastapi import HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from models import Campaign, Donation, GiverProfile
+from schemas import CampaignResponse, DonationResponse, GiverProfileResponse
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(value: Any):
+    """Encode the types json/orjson don't handle, the way Pydantic does in JSON mode."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        text = value.isoformat()
+        if isinstance(value, datetime) and value.utcoffset() is not None and not value.utcoffset():
+            text = text.replace("+00:00", "Z")
+        return text
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode content as compact UTF-8 JSON.
+
+    Args:
+        content: JSON-compatible data, plus Decimal, datetime and enums
+
+    Returns:
+        Encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with dumps() (orjson when available)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RowSerializer:
+    """
+    Turns rows or ORM objects into response dicts without Pydantic validation.
+
+    Attributes:
+        schema: Response schema the dicts follow
+        model: Model the columns belong to
+        fields: Field names to output (all of the schema's by default), in schema order
+        columns: Model columns for the fields, to select() in the same order
+    """
+
+    def __init__(self, schema: Type[BaseModel], model, fields: Optional[Iterable[str]] = None):
+        self.schema = schema
+        self.model = model
+        wanted = None if fields is None else set(fields)
+        self.fields = tuple(name for name in schema.model_fields if wanted is None or name in wanted)
+        self.columns = [getattr(model, name) for name in self.fields]
+        # attrgetter returns a bare value, not a tuple, for a single name
+        getter = attrgetter(*self.fields)
+        self._getter = getter if len(self.fields) > 1 else lambda obj: (getter(obj),)
+        self._subsets: Dict[FrozenSet[str], "RowSerializer"] = {}
+
+    def subset(self, fields: Iterable[str]) -> "RowSerializer":
+        """Serializer for some of these fields (built once per distinct set)."""
+        key = frozenset(fields)
+        if key not in self._subsets:
+            self._subsets[key] = RowSerializer(self.schema, self.model, key)
+        return self._subsets[key]
+
+    def select_columns(self, *required) -> list:
+        """
+        Columns to select: these fields, then any required columns not among them.
+
+        Args:
+            *required: Columns the query needs even if not output
+                (e.g. created_at and id for pagination)
+
+        Returns:
+            Columns with the fields first, so rows() can read them positionally
+        """
+        return self.columns + [column for column in required if column.key not in self.fields]
+
+    def row(self, row) -> dict:
+        """Dict for a row of `columns` (extra trailing columns are ignored)."""
+        return dict(zip(self.fields, row))
+
+    def rows(self, rows: Iterable) -> List[dict]:
+        """Dicts for rows of `columns`."""
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows]
+
+    def obj(self, obj) -> dict:
+        """Dict for an ORM object (or anything with the fields as attributes)."""
+        return dict(zip(self.fields, self._getter(obj)))
+
+    def objs(self, objs: Iterable) -> List[dict]:
+        """Dicts for ORM objects."""
+        fields, getter = self.fields, self._getter
+        return [dict(zip(fields, getter(obj))) for obj in objs]
+
+
+donation_serializer = RowSerializer(DonationResponse, Donation)
+campaign_serializer = RowSerializer(CampaignResponse, Campaign)
+giver_profile_serializer = RowSerializer(GiverProfileResponse, GiverProfile)
+
+
+def sparse_fields(serializer: RowSerializer) -> Callable[..., RowSerializer]:
+    """
+    Build a dependency reading a fields= query parameter for a serializer.
+
+    Args:
+        serializer: Serializer for the full schema
+
+    Returns:
+        Dependency returning the serializer, or a subset of it when the
+        request names fields (comma-separated)
+
+    Raises:
+        HTTPException 400: (from the dependency) If a field isn't in the schema
+    """
+    allowed = ", ".join(serializer.fields)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma-separated fields to return (default: all of {allowed})")
+    ) -> RowSerializer:
+        if fields is None:
+            return serializer
+
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested - set(serializer.fields))
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Choose from: {allowed}" if unknown
+                else f"No fields given. Choose from: {allowed}"
+            )
+        return serializer.subset(requested)
+
+    return dependency
+
+
+donation_fields = sparse_fields(donation_serializer)
+campaign_fields = sparse_fields(campaign_serializer)
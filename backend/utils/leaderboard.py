@@ -0,0 +1,226 @@
+"""
+Materialized giving leaderboard.
+
+GET /givers/leaderboard used to join every giver profile to its user
+and sort by total_donated on each call. The ranking now lives in the
+leaderboard_entries table, one row per public giver with donations, so
+the endpoint reads the top N rows straight off an index.
+
+Rows are refreshed in the same transaction as the change that affects
+them: donation aggregate updates, giver profile edits and user name
+changes. rebuild_leaderboard() recreates the whole table from the live
+tables, and check_leaderboard() reports any rows that have drifted
+(see manage_leaderboard.py).
+"""
+
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import GiverProfile, LeaderboardEntry, ProfileType, User
+from utils.response_cache import response_cache
+
+# leaderboard_entries columns, in the order leaderboard_source() selects them
+ENTRY_COLUMNS = [
+    "giver_id", "profile_type", "username", "full_name",
+    "company_name", "total_donated", "donation_count",
+]
+
+
+def leaderboard_source():
+    """
+    Select what leaderboard_entries should contain from the live tables.
+
+    Returns:
+        Select of one row per public giver with donations, in ENTRY_COLUMNS order
+    """
+    return select(
+        GiverProfile.id,
+        GiverProfile.profile_type,
+        User.username,
+        User.full_name,
+        GiverProfile.company_name,
+        GiverProfile.total_donated,
+        GiverProfile.donation_count
+    ).join(
+        User, GiverProfile.user_id == User.id
+    ).where(
+        GiverProfile.is_public == True,
+        GiverProfile.total_donated > 0
+    )
+
+
+def _entry_upsert(dialect_name: str, source):
+    """
+    Build an INSERT ... SELECT that overwrites existing leaderboard rows.
+
+    Args:
+        dialect_name: Database dialect ("mysql" or "sqlite")
+        source: Select of rows in ENTRY_COLUMNS order
+
+    Returns:
+        Insert statement with the dialect's upsert clause
+
+    Raises:
+        ValueError: If the dialect has no supported upsert
+    """
+    columns = ENTRY_COLUMNS[1:]
+
+    if dialect_name == "mysql":
+        stmt = mysql.insert(LeaderboardEntry).from_select(ENTRY_COLUMNS, source)
+        return stmt.on_duplicate_key_update(
+            {**{column: stmt.inserted[column] for column in columns}, "updated_at": func.now()}
+        )
+
+    if dialect_name == "sqlite":
+        stmt = sqlite.insert(LeaderboardEntry).from_select(ENTRY_COLUMNS, source)
+        return stmt.on_conflict_do_update(
+            index_elements=["giver_id"],
+            set_={**{column: stmt.excluded[column] for column in columns}, "updated_at": func.now()}
+        )
+
+    raise ValueError(f"Leaderboard refresh is not supported on '{dialect_name}'")
+
+
+async def refresh_leaderboard_entries(db: AsyncSession, giver_ids: Iterable[int]):
+    """
+    Recompute the leaderboard rows of some givers.
+
+    Call after changing a giver's totals, visibility or name, in the same
+    transaction (flush ORM changes first). Eligible givers' rows are
+    upserted; rows of givers that are no longer eligible are deleted.
+    Nothing is deleted by a key that isn't there, which on InnoDB would
+    take a gap lock that concurrent refreshes for new givers deadlock on.
+
+    Args:
+        db: Database session
+        giver_ids: Giver profiles to refresh
+    """
+    giver_ids = sorted(set(giver_ids))
+    if not giver_ids:
+        return
+
+    source = leaderboard_source().where(GiverProfile.id.in_(giver_ids))
+    stale_ids = (await db.scalars(
+        select(LeaderboardEntry.giver_id).where(
+            LeaderboardEntry.giver_id.in_(giver_ids),
+            LeaderboardEntry.giver_id.not_in(source.with_only_columns(GiverProfile.id))
+        )
+    )).all()
+    if stale_ids:
+        await db.execute(
+            delete(LeaderboardEntry)
+            .where(LeaderboardEntry.giver_id.in_(stale_ids))
+            .execution_options(synchronize_session=False)
+        )
+    await db.execute(_entry_upsert(db.bind.dialect.name, source))
+
+
+def leaderboard_query(limit: int, profile_type: Optional[ProfileType] = None):
+    """
+    Select the top leaderboard entries, highest total first.
+
+    Ties are broken by giver_id, which the total_donated indexes
+    already carry (it is the primary key), so no sort is needed.
+
+    Args:
+        limit: Number of givers to return
+        profile_type: Optional filter by individual or company
+
+    Returns:
+        Select of LeaderboardEntry rows
+    """
+    query = select(LeaderboardEntry)
+    if profile_type:
+        query = query.where(LeaderboardEntry.profile_type == profile_type)
+
+    return query.order_by(
+        LeaderboardEntry.total_donated.desc(),
+        LeaderboardEntry.giver_id.desc()
+    ).limit(limit)
+
+
+async def get_leaderboard(
+    db: AsyncSession,
+    limit: int,
+    profile_type: Optional[ProfileType] = None
+) -> List[LeaderboardEntry]:
+    """
+    Get the top givers from the materialized leaderboard.
+
+    Args:
+        db: Database session
+        limit: Number of givers to return
+        profile_type: Optional filter by individual or company
+
+    Returns:
+        Leaderboard entries, highest total first
+    """
+    return list((await db.scalars(leaderboard_query(limit, profile_type))).all())
+
+
+async def rebuild_leaderboard(db: AsyncSession) -> int:
+    """
+    Recreate every leaderboard row from the live tables, in one transaction.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of rows on the rebuilt leaderboard
+    """
+    await db.execute(delete(LeaderboardEntry).execution_options(synchronize_session=False))
+    await db.execute(insert(LeaderboardEntry).from_select(ENTRY_COLUMNS, leaderboard_source()))
+    count = await db.scalar(select(func.count()).select_from(LeaderboardEntry))
+    response_cache.invalidate_on_commit(db, "leaderboard")
+    await db.commit()
+    return count
+
+
+@dataclass
+class LeaderboardReport:
+    """Differences between leaderboard_entries and the live tables."""
+    checked: int = 0
+    missing: List[int] = field(default_factory=list)     # Eligible givers with no row
+    extra: List[int] = field(default_factory=list)       # Rows for givers no longer eligible
+    mismatched: List[int] = field(default_factory=list)  # Rows with stale values
+
+    @property
+    def consistent(self) -> bool:
+        """Whether the leaderboard matches the live tables."""
+        return not (self.missing or self.extra or self.mismatched)
+
+
+async def check_leaderboard(db: AsyncSession) -> LeaderboardReport:
+    """
+    Compare leaderboard_entries with what the live tables say it should be.
+
+    Both sides are read in one transaction. Run it somewhere donations
+    aren't being completed (or repeat it) to rule out in-flight changes.
+
+    Args:
+        db: Database session
+
+    Returns:
+        LeaderboardReport listing the giver IDs that differ
+    """
+    expected = {row[0]: tuple(row[1:]) for row in await db.execute(leaderboard_source())}
+    actual = {
+        row[0]: tuple(row[1:])
+        for row in await db.execute(
+            select(*(getattr(LeaderboardEntry, column) for column in ENTRY_COLUMNS))
+        )
+    }
+
+    return LeaderboardReport(
+        checked=len(expected.keys() | actual.keys()),
+        missing=sorted(expected.keys() - actual.keys()),
+        extra=sorted(actual.keys() - expected.keys()),
+        mismatched=sorted(
+            giver_id for giver_id in expected.keys() & actual.keys()
+            if expected[giver_id] != actual[giver_id]
+        ),
+    )
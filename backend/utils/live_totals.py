@@ -0,0 +1,346 @@
+"""
+Live campaign totals for the server-sent events stream.
+
+Clients watching a campaign page open GET /campaigns/{id}/stream and
+get a "totals" event whenever its raised amount or donation count
+changes. Streams don't query the database: each worker has one Hub,
+and the totals for a campaign are read once per change and published
+to every stream open on it.
+
+Changes are picked up two ways:
+
+* Donation status changes call notify_on_commit(); once the transaction
+  commits the campaign's totals are re-read and published. Several
+  commits in quick succession are coalesced into one read.
+* run_poll_loop() re-reads the totals of campaigns that have streams
+  open every STREAM_POLL_INTERVAL seconds, which catches changes made by
+  other workers. It is one query per interval for all watched campaigns,
+  however many clients are connected.
+
+An event is only published when the totals actually differ from the
+last ones published for that campaign. Those last totals also answer
+the first event of a new stream on a campaign that is already watched,
+so a crowd joining a popular campaign doesn't read it once per client.
+
+The donation count is the sum of the campaign's daily rows in
+campaign_stats_buckets (see utils/campaign_stats.py), which are kept in
+the same transaction as current_amount, rather than a COUNT over its
+donations.
+"""
+
+import asyncio
+import json
+import logging
+from decimal import Decimal
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from database import AsyncSessionLocal
+from models import Campaign, CampaignAmountShard, CampaignStatsBucket, StatsPeriod
+from utils.pubsub import Hub, Subscription
+
+logger = logging.getLogger(__name__)
+
+CENTS = Decimal("0.01")
+
+# How long browsers wait before reconnecting a dropped stream
+RECONNECT_DELAY_MS = 3000
+
+
+def format_event(event_name: str, data: dict) -> str:
+    """
+    Render a server-sent event.
+
+    Args:
+        event_name: Event type (the client's addEventListener name)
+        data: JSON-serialisable payload
+
+    Returns:
+        Event text, ending with the blank line that terminates it
+    """
+    return f"event: {event_name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def load_totals(db: AsyncSession, campaign_ids: Iterable[int]) -> Dict[int, dict]:
+    """
+    Read the current totals of some campaigns.
+
+    The raised amount includes counter shards not yet folded into
+    current_amount, so it is exact between folds. The donation count is
+    summed from the campaign's daily stats buckets (one row per day and
+    shard), not counted from its donations.
+
+    Args:
+        db: Database session
+        campaign_ids: Campaigns to read
+
+    Returns:
+        Mapping of campaign ID to {"campaign_id", "current_amount",
+        "donation_count"}, for the campaigns that exist
+    """
+    campaign_ids = sorted(set(campaign_ids))
+    if not campaign_ids:
+        return {}
+
+    amounts = dict((await db.execute(
+        select(Campaign.id, Campaign.current_amount).where(Campaign.id.in_(campaign_ids))
+    )).all())
+
+    pending = dict((await db.execute(
+        select(CampaignAmountShard.campaign_id, func.sum(CampaignAmountShard.amount))
+        .where(CampaignAmountShard.campaign_id.in_(amounts))
+        .group_by(CampaignAmountShard.campaign_id)
+    )).all())
+
+    counts = dict((await db.execute(
+        select(CampaignStatsBucket.campaign_id, func.sum(CampaignStatsBucket.donation_count))
+        .where(
+            CampaignStatsBucket.campaign_id.in_(amounts),
+            CampaignStatsBucket.period == StatsPeriod.DAY
+        )
+        .group_by(CampaignStatsBucket.campaign_id)
+    )).all())
+
+    return {
+        campaign_id: {
+            "campaign_id": campaign_id,
+            "current_amount": str((amount + (pending.get(campaign_id) or 0)).quantize(CENTS)),
+            "donation_count": int(counts.get(campaign_id) or 0),
+        }
+        for campaign_id, amount in amounts.items()
+    }
+
+
+class LiveTotals:
+    """
+    Publishes campaign totals to the streams watching them.
+
+    Args:
+        hub: Hub the streams subscribe to
+        session_factory: Factory for the sessions totals are read in
+    """
+
+    def __init__(self, hub: Hub, session_factory: async_sessionmaker):
+        self.hub = hub
+        self.session_factory = session_factory
+        self._last: Dict[int, dict] = {}  # Campaign ID -> last totals published
+        self._pending = set()
+        self._task = None
+        self.refreshes = 0
+        self.shared_initial = 0  # Streams opened without a read
+
+    @staticmethod
+    def topic(campaign_id: int) -> str:
+        """Hub topic for a campaign's totals."""
+        return f"campaign:{campaign_id}"
+
+    def subscribe(self, campaign_id: int) -> Subscription:
+        """Start receiving a campaign's totals events."""
+        return self.hub.subscribe(self.topic(campaign_id))
+
+    def unsubscribe(self, subscription: Subscription):
+        """Stop a stream's subscription."""
+        self.hub.unsubscribe(subscription)
+        if not self.hub.subscriber_count(subscription.topic):
+            # Nothing keeps the last totals current once nobody is watching
+            self._last.pop(int(subscription.topic.split(":", 1)[1]), None)
+
+    async def initial_totals(self, db: AsyncSession, campaign_id: int) -> Optional[dict]:
+        """
+        Totals for a new stream's first event.
+
+        Call after subscribe(). If the campaign is already being watched,
+        these are the last totals published to its streams; otherwise
+        they are read (and remembered for the next stream).
+
+        Args:
+            db: Database session to read in if needed
+            campaign_id: Campaign the stream is for
+
+        Returns:
+            The campaign's totals, or None if it doesn't exist
+        """
+        if campaign_id in self._last:
+            self.shared_initial += 1
+            return self._last[campaign_id]
+
+        totals = (await load_totals(db, [campaign_id])).get(campaign_id)
+        if totals is not None and self.hub.subscriber_count(self.topic(campaign_id)):
+            # Unless a publish got there first with newer totals
+            self._last.setdefault(campaign_id, totals)
+        return totals
+
+    def watched(self) -> list:
+        """IDs of campaigns with at least one stream open."""
+        return [int(topic.split(":", 1)[1]) for topic in self.hub.topics()]
+
+    def notify_on_commit(self, db, *campaign_ids: int):
+        """
+        Publish the campaigns' totals once the session's transaction commits.
+
+        Args:
+            db: Session (sync or async) making the change
+            campaign_ids: Campaigns whose totals changed
+        """
+        db.info.setdefault("live_totals_campaigns", set()).update(campaign_ids)
+
+    def notify(self, campaign_ids: Iterable[int]):
+        """
+        Schedule a refresh of the campaigns' totals.
+
+        Campaigns nobody is watching are skipped. Does nothing outside a
+        running event loop (e.g. in scripts).
+
+        Args:
+            campaign_ids: Campaigns whose totals may have changed
+        """
+        self._pending.update(
+            campaign_id for campaign_id in campaign_ids
+            if self.hub.subscriber_count(self.topic(campaign_id))
+        )
+        if not self._pending:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._pending.clear()
+            return
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._drain())
+
+    async def _drain(self):
+        # Notifications that arrive while a read is running are picked up
+        # by the next pass, so a burst of commits costs one or two reads
+        while self._pending:
+            campaign_ids, self._pending = self._pending, set()
+            try:
+                await self.refresh(campaign_ids)
+            except Exception as e:
+                logger.error(f"Live totals refresh failed: {e}")
+
+    async def refresh(self, campaign_ids: Iterable[int]) -> int:
+        """
+        Read campaigns' totals and publish the ones that changed.
+
+        Args:
+            campaign_ids: Campaigns to refresh
+
+        Returns:
+            Number of campaigns whose totals were published
+        """
+        async with self.session_factory() as db:
+            totals = await load_totals(db, campaign_ids)
+        self.refreshes += 1
+        return self.publish(totals)
+
+    def publish(self, totals: Dict[int, dict]) -> int:
+        """
+        Publish totals that differ from the last ones published.
+
+        Args:
+            totals: Output of load_totals()
+
+        Returns:
+            Number of campaigns whose totals were published
+        """
+        published = 0
+        for campaign_id, data in totals.items():
+            if self._last.get(campaign_id) == data:
+                continue
+            self._last[campaign_id] = data
+            self.hub.publish(self.topic(campaign_id), format_event("totals", data))
+            published += 1
+
+        # Forget campaigns nobody is watching any more
+        watched = set(self.watched())
+        for campaign_id in [campaign_id for campaign_id in self._last if campaign_id not in watched]:
+            del self._last[campaign_id]
+        return published
+
+    async def stream(self, subscription: Subscription, initial: dict, heartbeat_interval: float) -> AsyncIterator[str]:
+        """
+        Body of a campaign's event stream.
+
+        Sends the initial totals, then each change published to the
+        subscription, with a comment line whenever the stream has been idle
+        for heartbeat_interval seconds (so proxies keep it open and a gone
+        client is noticed). Unsubscribes when the client disconnects.
+
+        Args:
+            subscription: The stream's subscription (from subscribe())
+            initial: The campaign's totals when the stream opened
+            heartbeat_interval: Seconds of silence before a keep-alive
+
+        Yields:
+            Server-sent event text
+        """
+        try:
+            last = format_event("totals", initial)
+            yield f"retry: {RECONNECT_DELAY_MS}\n\n" + last
+
+            while True:
+                message = await subscription.next(timeout=heartbeat_interval)
+                if message is None:
+                    yield ": keep-alive\n\n"
+                elif message != last:
+                    last = message
+                    yield message
+        finally:
+            self.unsubscribe(subscription)
+
+    async def run_poll_loop(self, interval: float):
+        """
+        Refresh every watched campaign every interval seconds until cancelled.
+
+        Started as a background task by the application lifespan. Errors
+        are logged and retried on the next tick.
+
+        Args:
+            interval: Seconds between refreshes
+        """
+        while True:
+            await asyncio.sleep(interval)
+            campaign_ids = self.watched()
+            if not campaign_ids:
+                continue
+            try:
+                await self.refresh(campaign_ids)
+            except Exception as e:
+                logger.error(f"Live totals poll failed: {e}")
+
+    def clear(self):
+        """Drop every subscription and pending refresh."""
+        self.hub.clear()
+        self._last.clear()
+        self._pending.clear()
+        self.refreshes = self.shared_initial = 0
+
+    def status(self) -> dict:
+        """
+        Report stream counts.
+
+        Returns:
+            Dictionary of hub and refresh statistics
+        """
+        return {**self.hub.status(), "refreshes": self.refreshes, "shared_initial": self.shared_initial}
+
+
+# Per-worker totals publisher used by the campaign stream endpoint
+live_totals = LiveTotals(Hub(), AsyncSessionLocal)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_committed_campaigns(session):
+    """Publish totals of campaigns changed by a committed transaction."""
+    campaign_ids = session.info.pop("live_totals_campaigns", None)
+    if campaign_ids:
+        live_totals.notify(campaign_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_campaigns(session):
+    """Nothing was committed, so nothing changed."""
+    session.info.pop("live_totals_campaigns", None)
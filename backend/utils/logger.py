@@ -7,6 +7,7 @@ Provides configured loggers for different parts of the application.
 import logging
 import sys
 from pathlib import Path
+from typing import Optional
 
 # Create logs directory
 LOGS_DIR = Path(__file__).parent.parent / "logs"
@@ -51,4 +52,33 @@ def get_logger(name: str) -> logging.Logger:
     logger.addHandler(console_handler)
     logger.addHandler(file_handler)
     
-    return logger
\ No newline at end of file
+    return logger
+
+# Statements slower than QUERY_SLOW_THRESHOLD_MS (see utils/query_stats.py)
+slow_query_logger = logging.getLogger("sql.slow")
+
+
+def log_slow_query(statement: str, duration_ms: float, threshold_ms: float, request: Optional[str] = None):
+    """
+    Log a statement that took at least the slow-query threshold.
+    
+    The numbers are also attached as record attributes (duration_ms,
+    threshold_ms, request, statement) for structured log handlers.
+    
+    Args:
+        statement: SQL text (truncated to 1000 characters)
+        duration_ms: Time the statement took
+        threshold_ms: Configured threshold it crossed
+        request: "METHOD /path" of the request that ran it, if any
+    """
+    statement = " ".join(statement.split())[:1000]
+    slow_query_logger.warning(
+        "Slow query: duration_ms=%.1f threshold_ms=%.0f request=%s statement=%s",
+        duration_ms, threshold_ms, request or "-", statement,
+        extra={
+            "duration_ms": round(duration_ms, 3),
+            "threshold_ms": threshold_ms,
+            "request": request,
+            "statement": statement,
+        }
+    )
@@ -0,0 +1,264 @@
+"""
+Prometheus metrics for the API (GET /metrics).
+
+A small in-process registry that renders the Prometheus text format
+(version 0.0.4), so no client library is needed:
+
+- Counter, Gauge and Histogram keep plain numbers per label set
+- Collectors are functions called at scrape time, for numbers that are
+  already tracked elsewhere (connection pools, password pool)
+- MetricsMiddleware times every request by route template
+
+Metrics are only updated from the event loop thread (middleware, async
+routes, exception handlers), so the hot path takes no locks: an update
+is a dict lookup and an addition. Numbers kept by other threads (pool
+checkouts) are read by collectors instead.
+
+Each API process has its own registry, so scrape every worker (or run
+one worker per container).
+"""
+
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Request latency buckets in seconds (Prometheus client defaults, plus 30s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# A collected sample: (name, labels, value)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Value that only goes up (e.g. requests served)."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        """Add amount to the series with these label values."""
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set(self, value: float, *labels: str):
+        """Set the series with these label values (for collectors copying a total kept elsewhere)."""
+        self._values[labels] = value
+
+    def value(self, *labels: str) -> float:
+        """Current value of a series (0 if never incremented)."""
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        for labels, value in list(self._values.items()):
+            yield self.name, dict(zip(self.labelnames, labels)), value
+
+
+class Gauge(Counter):
+    """Value that goes up and down (e.g. requests in flight)."""
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        """Subtract amount from the series with these label values."""
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (e.g. request latency) in cumulative buckets."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last is +Inf)..., sum]
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        """Record one observation in the series with these label values."""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        """Observations recorded in a series."""
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        for labels, series in list(self._series.items()):
+            base = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), series):
+                cumulative += count
+                yield f"{self.name}_bucket", {**base, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", base, series[-1]
+            yield f"{self.name}_count", base, cumulative
+
+
+class Registry:
+    """Metrics and scrape-time collectors rendered together by GET /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric; names must be unique."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collect: Callable[[], None]):
+        """
+        Call collect() before every scrape.
+
+        Collectors set gauges (or counters) from numbers tracked elsewhere,
+        e.g. a connection pool's checked-out count.
+        """
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        for collect in self._collectors:
+            collect()
+
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(
+                f"{name}{_format_labels(labels)} {_format_value(value)}"
+                for name, labels, value in metric.samples()
+            )
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry rendered by GET /metrics
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests served", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Time to serve HTTP requests (until the response starts)", ("method", "route")
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests being served"
+)
+rate_limited_requests = registry.counter(
+    "rate_limited_requests_total", "Requests rejected by the rate limiter", ("route",)
+)
+donation_status_changes = registry.counter(
+    "donation_status_changes_total", "Donations moved to a payment status", ("status",)
+)
+donations_completed_amount = registry.counter(
+    "donations_completed_amount_total", "Sum of donations completed (refunds and failures not subtracted)"
+)
+
+# Filled in at scrape time by the collectors registered in main.py
+db_pool_size = registry.gauge("db_pool_size", "Connections kept in the pool", ("engine",))
+db_pool_checked_out = registry.gauge("db_pool_checked_out", "Pooled connections in use", ("engine",))
+db_pool_overflow = registry.gauge("db_pool_overflow", "Connections open beyond the pool size", ("engine",))
+db_pool_checkouts = registry.counter("db_pool_checkouts_total", "Connections handed out by the pool", ("engine",))
+db_pool_timeouts = registry.counter("db_pool_timeouts_total", "Checkouts that timed out waiting", ("engine",))
+db_pool_wait = registry.counter(
+    "db_pool_wait_seconds_total", "Time spent waiting to check out connections", ("engine",)
+)
+
+password_pool_in_flight = registry.gauge("password_pool_in_flight", "bcrypt jobs running or queued")
+password_pool_queued = registry.gauge("password_pool_queued", "bcrypt jobs waiting for a worker")
+password_pool_completed = registry.counter("password_pool_completed_total", "bcrypt jobs finished")
+password_pool_rejected = registry.counter("password_pool_rejected_total", "bcrypt jobs refused with a 503")
+password_job_duration = registry.histogram(
+    "password_pool_job_duration_seconds", "Time bcrypt jobs spent in the password pool, queueing included",
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+)
+
+
+def route_label(scope: dict) -> str:
+    """Route template of a request (e.g. /donations/{donation_id}), to keep label values few."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        duration: Optional[float] = None
+
+        async def send_and_time(message):
+            nonlocal status_code, duration
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                duration = time.perf_counter() - started
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_and_time)
+        finally:
+            http_requests_in_flight.dec()
+            if duration is None:
+                duration = time.perf_counter() - started
+            route = route_label(scope)
+            http_requests.inc(scope["method"], route, str(status_code))
+            http_request_duration.observe(duration, scope["method"], route)
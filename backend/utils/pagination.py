@@ -0,0 +1,193 @@
+"""
+Pagination utilities for list endpoints.
+
+All list endpoints are ordered newest first by (created_at, id) and
+support two pagination styles over that ordering:
+- Page-based: page/page_size with OFFSET. The total is counted in the
+  same query with a COUNT(*) OVER () window function instead of a
+  separate COUNT query.
+- Cursor-based (keyset): pass next_cursor from the previous response.
+  The query seeks straight past the last row seen instead of scanning
+  and discarding OFFSET rows, so deep pages cost the same as page 1.
+  The total is optional because counting defeats the point of a seek.
+
+Queries can select the model (items are ORM objects) or some of its
+columns (items are Rows, e.g. for utils/fast_json.py serializers).
+"""
+
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+
+@dataclass
+class Page:
+    """A page of results from paginate()."""
+    items: List[Any]
+    total: Optional[int]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor.
+
+    Args:
+        created_at: created_at of the last row
+        row_id: id of the last row
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from a previous response
+
+    Returns:
+        Tuple of (created_at, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+async def count_rows(db: AsyncSession, query: Select) -> int:
+    """
+    Count the rows a query would return.
+
+    Args:
+        db: Database session
+        query: Query to count
+
+    Returns:
+        Number of matching rows
+    """
+    return await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    model,
+    page_size: int,
+    page: int = 1,
+    offset: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = None
+) -> Page:
+    """
+    Fetch one page of a query ordered newest first by (created_at, id).
+
+    Args:
+        db: Database session
+        query: Filtered select() of the model, or of some of its columns
+            including created_at and id (without ordering)
+        model: Model class being listed (needs created_at and id columns)
+        page_size: Number of items per page
+        page: Page number for page-based pagination (starts at 1)
+        offset: Explicit offset, overrides page (for skip/limit endpoints)
+        cursor: Cursor from a previous page; switches to keyset pagination
+        include_total: Whether to count the total. Defaults to True for
+            page-based and False for cursor-based pagination
+
+    Returns:
+        Page with the items, the total (or None) and the next cursor
+        (None on the last page). Items are ORM objects when the model is
+        selected, otherwise Rows (which may carry an extra total_count
+        column at the end)
+
+    Raises:
+        HTTPException 400: If the cursor is invalid
+    """
+    ordering = (model.created_at.desc(), model.id.desc())
+    entities = query.column_descriptions[0]["expr"] is model
+
+    if cursor is not None:
+        try:
+            created_at, row_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+
+        total = await count_rows(db, query) if include_total else None
+
+        # Seek from the stored created_at of the anchor row so the comparison
+        # matches the ORDER BY exactly (SQLite stores timestamps as text and a
+        # re-bound datetime may not compare equal), falling back to the
+        # cursor's timestamp if the row is gone
+        anchor = func.coalesce(
+            select(model.created_at).where(model.id == row_id).scalar_subquery(),
+            literal(created_at, model.created_at.type)
+        )
+        query = query.where(or_(
+            model.created_at < anchor,
+            and_(model.created_at == anchor, model.id < row_id)
+        ))
+
+        rows = await _fetch(db, query.order_by(*ordering).limit(page_size + 1), entities)
+        items = list(rows[:page_size])
+        has_more = len(rows) > page_size
+
+    else:
+        if offset is None:
+            offset = (page - 1) * page_size
+
+        if include_total is False:
+            rows = await _fetch(
+                db, query.order_by(*ordering).offset(offset).limit(page_size + 1), entities
+            )
+            items = list(rows[:page_size])
+            has_more = len(rows) > page_size
+            total = None
+        else:
+            # Count every matching row alongside the page in one round trip
+            windowed = query.add_columns(func.count().over().label("total_count"))
+            rows = (await db.execute(
+                windowed.order_by(*ordering).offset(offset).limit(page_size)
+            )).all()
+            items = [row[0] for row in rows] if entities else rows
+
+            if rows:
+                total = rows[0].total_count
+            elif offset:
+                # Past the last page, so no row carried the count
+                total = await count_rows(db, query)
+            else:
+                total = 0
+
+            has_more = offset + len(items) < total
+
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return Page(items=items, total=total, next_cursor=next_cursor)
+
+
+async def _fetch(db: AsyncSession, query: Select, entities: bool) -> list:
+    """Run a query, returning ORM objects for model selects and Rows otherwise."""
+    if entities:
+        return (await db.scalars(query)).all()
+    return (await db.execute(query)).all()
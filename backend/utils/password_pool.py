@@ -0,0 +1,130 @@
+"""
+Bounded process pool for bcrypt password work.
+
+bcrypt is deliberately slow (about 250ms per hash at cost 12) and holds
+a CPU the whole time. Running it on the shared threadpool let a burst
+of logins starve every other endpoint. Password work now runs in a
+dedicated pool of worker processes (PASSWORD_POOL_SIZE). At most
+PASSWORD_POOL_MAX_QUEUE further jobs may wait. Beyond that, requests get
+a 503 with Retry-After straight away instead of piling up.
+
+Workers are started from a fork server (spawned where there isn't one),
+not forked from the running API process: a fork copies locks that other
+threads (the database drivers, logging) may hold at that moment, and a
+worker that inherits one held can hang for good.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from config import get_password_settings
+from utils.metrics import password_job_duration
+
+# How worker processes are started (never "fork", see above)
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class PasswordPoolBusy(HTTPException):
+    """Raised (as a 503) when the password pool's queue is full."""
+
+    def __init__(self, detail: str = "Server is busy, please try again shortly"):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": "1"}
+        )
+
+
+class PasswordPool:
+    """
+    Process pool that rejects work once too much is waiting.
+
+    Args:
+        workers: Number of worker processes
+        max_queue: Jobs allowed to wait for a free worker
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the worker processes on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(START_METHOD)
+            )
+        return self._executor
+
+    async def run(self, fn, *args):
+        """
+        Run fn(*args) in a worker process.
+
+        fn must be importable by the workers (a module-level function in a
+        light module such as utils.passwords).
+
+        Args:
+            fn: Function to run
+            *args: Arguments for fn
+
+        Returns:
+            fn's return value
+
+        Raises:
+            PasswordPoolBusy: If the queue is full or the pool broke
+        """
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordPoolBusy()
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        executor = self._get_executor()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died; reap the broken pool (unless another request
+            # already replaced it) and start a fresh one for the next request
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise PasswordPoolBusy()
+        finally:
+            self.in_flight -= 1
+            password_job_duration.observe(time.perf_counter() - started)
+
+        self.completed += 1
+        return result
+
+    def status(self) -> dict:
+        """Get the pool's size, queue depth and counters."""
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": max(self.in_flight - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        """Stop the worker processes, dropping any queued jobs."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Process-wide pool used by auth.py
+_settings = get_password_settings()
+password_pool = PasswordPool(workers=_settings.pool_size, max_queue=_settings.max_queue)
@@ -0,0 +1,56 @@
+"""
+bcrypt password hashing primitives.
+
+Kept free of application imports so password pool worker processes can
+import this module cheaply (see utils/password_pool.py).
+"""
+
+import bcrypt
+
+
+def hash_password(password: str, rounds: int) -> str:
+    """
+    Hash a plain text password using bcrypt.
+
+    Args:
+        password: Plain text password to hash
+        rounds: bcrypt cost factor (log2 of the number of rounds)
+
+    Returns:
+        Hashed password string
+    """
+    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds))
+    return hashed.decode('utf-8')
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a plain text password against a bcrypt hash.
+
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Hashed password from database
+
+    Returns:
+        True if password matches, False otherwise
+    """
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+def get_rounds(hashed_password: str) -> int:
+    """
+    Get the cost factor a bcrypt hash was made with.
+
+    Args:
+        hashed_password: bcrypt hash, e.g. $2b$12$...
+
+    Returns:
+        Cost factor, e.g. 12
+
+    Raises:
+        ValueError: If the hash isn't a bcrypt hash
+    """
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError) as e:
+        raise ValueError("Not a bcrypt hash") from e
@@ -0,0 +1,190 @@
+"""
+Cache of authenticated principals (users) keyed by JWT subject.
+
+get_current_user used to load the user from the database on every
+authenticated request. With this cache it decodes the token and, on a
+hit, rebuilds the User from a cached snapshot of its columns without a
+query.
+
+Entries live in a bounded in-process LRU cache with a TTL. A shared
+backend (e.g. Redis) can be plugged in with set_shared_backend() so
+several API processes share entries and invalidations. Each process's
+local entries still expire after the TTL, which bounds how stale a
+user can be after a change made elsewhere. main.py plugs in the
+backend configured by CACHE_URL (see utils/cache.py).
+
+Committed changes to a User through the ORM (profile updates, is_active
+flips) invalidate that user's entry automatically. Bulk UPDATE
+statements and raw SQL bypass the ORM, so call invalidate() after them.
+
+The password hash is never cached. Load the user from the database if
+you need it.
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, event, inspect
+from sqlalchemy.orm import Session
+
+from config import get_auth_cache_settings
+from models import User
+from utils.cache import CacheBackend, TTLCache
+
+# Columns left out of cached snapshots
+UNCACHED_COLUMNS = {"hashed_password"}
+
+
+def _encode(snapshot: dict) -> str:
+    """Serialise a user snapshot for a shared backend."""
+    return json.dumps({
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in snapshot.items()
+    })
+
+
+def _decode(data: str) -> dict:
+    """Deserialise a user snapshot from a shared backend."""
+    snapshot = json.loads(data)
+    for column in User.__table__.columns:
+        if isinstance(column.type, DateTime) and snapshot.get(column.key):
+            snapshot[column.key] = datetime.fromisoformat(snapshot[column.key])
+    return snapshot
+
+
+class PrincipalCache:
+    """
+    Two-level cache of user snapshots keyed by token subject (username).
+
+    Args:
+        ttl: Seconds an entry is valid for (0 disables the cache)
+        max_size: Most entries kept in process
+        backend: Optional shared backend
+    """
+
+    def __init__(self, ttl: float, max_size: int, backend: Optional[CacheBackend] = None):
+        self.ttl = ttl
+        self.local = TTLCache(max_size=max_size, ttl=ttl)
+        self.backend = backend
+
+    @property
+    def enabled(self) -> bool:
+        """Whether lookups are cached at all."""
+        return self.ttl > 0
+
+    @staticmethod
+    def _key(subject: str) -> str:
+        return f"principal:{subject}"
+
+    async def get(self, subject: str) -> Optional[dict]:
+        """
+        Get the cached snapshot for a token subject.
+
+        Args:
+            subject: Token subject (username)
+
+        Returns:
+            Column values of the user, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        snapshot = self.local.get(subject)
+        if snapshot is None and self.backend is not None:
+            data = await self.backend.get(self._key(subject))
+            if data is not None:
+                snapshot = _decode(data)
+                self.local.set(subject, snapshot)
+        return snapshot
+
+    async def set(self, subject: str, user: User):
+        """
+        Cache a user loaded for a token subject.
+
+        Args:
+            subject: Token subject (username)
+            user: User loaded from the database
+        """
+        if not self.enabled:
+            return
+
+        snapshot = {
+            attr.key: getattr(user, attr.key)
+            for attr in inspect(User).column_attrs
+            if attr.key not in UNCACHED_COLUMNS
+        }
+        self.local.set(subject, snapshot)
+        if self.backend is not None:
+            await self.backend.set(self._key(subject), _encode(snapshot), self.ttl)
+
+    async def invalidate(self, subject: str):
+        """
+        Drop a subject's entry here and in the shared backend.
+
+        Args:
+            subject: Token subject (username)
+        """
+        self.local.discard(subject)
+        if self.backend is not None:
+            await self.backend.delete(self._key(subject))
+
+    def invalidate_soon(self, subject: str):
+        """
+        Drop a subject's entry from sync code.
+
+        The local entry goes immediately. The shared backend is cleared by
+        a task on the running event loop, if there is one.
+        """
+        self.local.discard(subject)
+        if self.backend is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.create_task(self.backend.delete(self._key(subject)))
+
+    def clear(self):
+        """Drop every local entry."""
+        self.local.clear()
+
+
+# Process-wide principal cache used by auth.get_current_user
+_settings = get_auth_cache_settings()
+principal_cache = PrincipalCache(ttl=_settings.ttl, max_size=_settings.max_size)
+
+
+def set_shared_backend(backend: Optional[CacheBackend]):
+    """
+    Share principal cache entries through a backend such as Redis.
+
+    Args:
+        backend: Backend to use, or None to go back to in-process only
+    """
+    principal_cache.backend = backend
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    """Remember the usernames of users changed in this transaction."""
+    changed = session.info.setdefault("changed_principals", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            # Include the old username if it was changed
+            history = inspect(obj).attrs.username.history
+            changed.update(name for name in (*history.deleted, obj.username) if name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    """Invalidate changed users once their changes are committed."""
+    for username in session.info.pop("changed_principals", ()):
+        principal_cache.invalidate_soon(username)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    """Nothing was committed, so nothing needs invalidating."""
+    session.info.pop("changed_principals", None)
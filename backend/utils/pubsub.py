@@ -0,0 +1,147 @@
+"""
+In-process publish/subscribe hub.
+
+Each API worker has one Hub. Publishers hand it a message for a topic
+(e.g. "campaign:42") and it is pushed to every subscription to that
+topic without any I/O, so one change fans out to thousands of open
+streams for the cost of a loop over them.
+
+Subscriptions keep only the latest message. A slow client that hasn't
+read the previous message yet just gets the newer one, so memory per
+subscriber is bounded and a stalled connection can't hold up the
+publisher. That suits state snapshots like campaign totals, where only
+the current value matters.
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set
+
+
+class Subscription:
+    """
+    A subscriber's mailbox holding the latest message published to it.
+
+    Args:
+        topic: Topic subscribed to
+    """
+
+    __slots__ = ("topic", "_message", "_event", "received", "dropped")
+
+    def __init__(self, topic: str):
+        self.topic = topic
+        self._message = None
+        self._event = asyncio.Event()
+        self.received = 0
+        self.dropped = 0  # Messages replaced before they were read
+
+    def push(self, message: Any):
+        """Replace the pending message and wake the reader."""
+        if self._event.is_set():
+            self.dropped += 1
+        self._message = message
+        self.received += 1
+        self._event.set()
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Wait for the next message.
+
+        Args:
+            timeout: Seconds to wait (None waits forever)
+
+        Returns:
+            The latest message, or None if the timeout passed first
+        """
+        if not self._event.is_set():
+            # asyncio.timeout rather than wait_for, which (before Python
+            # 3.12) starts a task per call, for every stream on every wake-up
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._event.wait()
+            except TimeoutError:
+                return None
+
+        message, self._message = self._message, None
+        self._event.clear()
+        return message
+
+
+class Hub:
+    """Topic-based fan-out to in-process subscriptions."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, topic: str) -> Subscription:
+        """
+        Start receiving messages published to topic.
+
+        Args:
+            topic: Topic to subscribe to
+
+        Returns:
+            Subscription to read messages from; pass it to unsubscribe()
+        """
+        subscription = Subscription(topic)
+        self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Stop delivering to a subscription (safe to call twice)."""
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.topic]
+
+    def publish(self, topic: str, message: Any) -> int:
+        """
+        Push a message to every subscription to topic.
+
+        Args:
+            topic: Topic to publish to
+            message: Message to deliver (shared, not copied)
+
+        Returns:
+            Number of subscriptions it was delivered to
+        """
+        subscribers = self._subscribers.get(topic)
+        self.published += 1
+        if not subscribers:
+            return 0
+
+        for subscription in subscribers:
+            subscription.push(message)
+        self.delivered += len(subscribers)
+        return len(subscribers)
+
+    def subscriber_count(self, topic: str) -> int:
+        """Number of subscriptions to topic."""
+        return len(self._subscribers.get(topic, ()))
+
+    def topics(self) -> List[str]:
+        """Topics with at least one subscription."""
+        return list(self._subscribers)
+
+    def clear(self):
+        """Drop every subscription and reset the statistics."""
+        self._subscribers.clear()
+        self.published = self.delivered = 0
+
+    def status(self) -> dict:
+        """
+        Report subscription counts.
+
+        Returns:
+            Dictionary of hub statistics
+        """
+        return {
+            "topics": len(self._subscribers),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+        }
@@ -0,0 +1,147 @@
+"""
+Per-request SQL statement counting and slow-query logging.
+
+Cursor execute events on every Engine (sync and async) are timed. While a
+request is being handled, QueryStatsMiddleware keeps a RequestQueryStats
+in a context variable, and each statement adds to it: how many ran,
+their total time and the slowest one. The totals are sent back in a
+Server-Timing header (visible in the browser's network panel) and logged
+when the request finishes:
+
+    Server-Timing: db;dur=4.21;desc="3 queries", db-slowest;dur=2.10, app;dur=9.80
+
+Statements taking at least QUERY_SLOW_THRESHOLD_MS are logged on their
+own (utils/logger.py), inside a request or not.
+
+Statements run after the headers are sent (e.g. by a streaming download)
+are counted in the log line but can't be in the header.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import get_query_settings
+from utils.logger import log_slow_query
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestQueryStats:
+    """Statements run while handling one request."""
+    request: str = ""
+    count: int = 0
+    total_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, duration: float):
+        """Add one statement."""
+        self.count += 1
+        self.total_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+    def server_timing(self, elapsed: float) -> str:
+        """Render the Server-Timing header value (durations in milliseconds)."""
+        noun = "query" if self.count == 1 else "queries"
+        return (
+            f'db;dur={self.total_time * 1000:.2f};desc="{self.count} {noun}", '
+            f"db-slowest;dur={self.slowest_time * 1000:.2f}, "
+            f"app;dur={elapsed * 1000:.2f}"
+        )
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    """Stats of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started_at"].pop()
+    duration = time.perf_counter() - started
+
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    threshold_ms = get_query_settings().slow_threshold_ms
+    if threshold_ms and duration * 1000 >= threshold_ms:
+        log_slow_query(statement, duration * 1000, threshold_ms, stats.request if stats else None)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_timer(context):
+    # Failed statements never reach after_cursor_execute
+    started = context.connection.info.get("query_started_at") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware adding each request's statement count and database
+    time to a Server-Timing header and the log.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so streaming responses
+    aren't buffered and the log line is written when the body finishes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        settings = get_query_settings()
+        if scope["type"] != "http" or not settings.stats_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(request=f"{scope['method']} {scope['path']}")
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing(time.perf_counter() - started).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if settings.log_requests:
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    "%s status=%s db_queries=%d db_time_ms=%.2f db_slowest_ms=%.2f duration_ms=%.2f",
+                    stats.request, status_code, stats.count, stats.total_time * 1000,
+                    stats.slowest_time * 1000, elapsed * 1000,
+                    extra={
+                        "request": stats.request,
+                        "status_code": status_code,
+                        "db_queries": stats.count,
+                        "db_time_ms": round(stats.total_time * 1000, 3),
+                        "db_slowest_ms": round(stats.slowest_time * 1000, 3),
+                        "duration_ms": round(elapsed * 1000, 3),
+                    }
+                )
@@ -0,0 +1,166 @@
+"""
+Minimal Redis-protocol (RESP) server for local development and tests.
+
+Implements just the commands RedisBackend uses (strings with expiry and
+sets for tags), in memory, so several uvicorn workers on one machine can
+share a cache without installing Redis. Run it with:
+
+    python cache_server.py --port 6380
+
+and set CACHE_URL=redis://localhost:6380/0. Use real Redis in production;
+this server has no persistence, eviction limit or authentication.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from utils.cache import CacheError, read_reply
+
+logger = logging.getLogger(__name__)
+
+
+def encode_reply(value) -> bytes:
+    """Encode a reply value in RESP."""
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, CacheError):
+        return b"-ERR %s\r\n" % str(value).encode()
+    if isinstance(value, bool):
+        return b":%d\r\n" % int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, (list, set)):
+        return b"*%d\r\n" % len(value) + b"".join(encode_reply(item) for item in value)
+    raise TypeError(f"Can't encode {type(value).__name__}")
+
+
+class RespServer:
+    """
+    In-memory key space served over RESP.
+
+    Args:
+        clock: Time source (for tests)
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._data: Dict[bytes, Tuple[object, Optional[float]]] = {}  # key -> (value, expires_at)
+        self._server = None
+
+    def _get(self, key: bytes):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._data[key]
+            return None
+        return value
+
+    def _expire(self, key: bytes, seconds: float) -> int:
+        value = self._get(key)
+        if value is None:
+            return 0
+        self._data[key] = (value, self._clock() + seconds)
+        return 1
+
+    def execute(self, command: list):
+        """
+        Run one command.
+
+        Args:
+            command: Command name and arguments as bytes
+
+        Returns:
+            Reply value (a CacheError for errors)
+        """
+        name, args = command[0].upper(), command[1:]
+
+        if name == b"PING":
+            return "PONG"
+        if name == b"SELECT" or name == b"FLUSHDB":
+            if name == b"FLUSHDB":
+                self._data.clear()
+            return "OK"
+        if name == b"GET":
+            value = self._get(args[0])
+            if isinstance(value, set):
+                return CacheError("WRONGTYPE Operation against a key holding the wrong kind of value")
+            return value
+        if name == b"SET":
+            key, value, options = args[0], args[1], [arg.upper() for arg in args[2:]]
+            expires_at = None
+            if b"PX" in options:
+                expires_at = self._clock() + int(args[2 + options.index(b"PX") + 1]) / 1000
+            elif b"EX" in options:
+                expires_at = self._clock() + int(args[2 + options.index(b"EX") + 1])
+            if b"NX" in options and self._get(key) is not None:
+                return None
+            self._data[key] = (value, expires_at)
+            return "OK"
+        if name == b"DEL":
+            return sum(self._data.pop(key, None) is not None for key in args)
+        if name == b"EXISTS":
+            return sum(self._get(key) is not None for key in args)
+        if name == b"SADD":
+            members = self._get(args[0])
+            if members is None:
+                members = set()
+                self._data[args[0]] = (members, None)
+            before = len(members)
+            members.update(args[1:])
+            return len(members) - before
+        if name == b"SMEMBERS":
+            return sorted(self._get(args[0]) or ())
+        if name == b"PEXPIRE":
+            return self._expire(args[0], int(args[1]) / 1000)
+        if name == b"EXPIRE":
+            return self._expire(args[0], int(args[1]))
+        if name == b"DBSIZE":
+            return sum(self._get(key) is not None for key in list(self._data))
+        return CacheError(f"unknown command '{name.decode()}'")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                command = await read_reply(reader)
+                if not isinstance(command, list) or not command:
+                    writer.write(encode_reply(CacheError("Protocol error: expected an array")))
+                    break
+                try:
+                    reply = self.execute(command)
+                except (IndexError, ValueError):
+                    reply = CacheError(f"wrong number or type of arguments for '{command[0].decode()}'")
+                writer.write(encode_reply(reply))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Client went away
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 6380) -> int:
+        """
+        Start listening.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+
+        Returns:
+            Port the server is listening on
+        """
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop listening and close the server."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
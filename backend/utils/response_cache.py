@@ -0,0 +1,326 @@
+"""
+Cache of rendered public responses, with ETag/304 revalidation.
+
+The unauthenticated read endpoints (campaign list and detail, public
+giver profiles, the leaderboard) used to query the database and
+serialise through Pydantic on every request. With this cache the
+rendered JSON body is kept in process for a short TTL, and each
+response carries a strong ETag (a hash of the body), so clients that
+send If-None-Match get a bodiless 304.
+
+Entries are tagged with what they depend on (e.g. "campaign:42").
+Writes call invalidate_on_commit() with the same tags, and the entries
+are dropped once the transaction commits. Concurrent misses for the
+same URL share one load (single-flight), so a cold popular campaign
+costs one query rather than one per request.
+
+With a shared backend (CACHE_URL, see utils/cache.py) rendered entries
+and invalidations are shared between API processes. Each process's
+local copies still expire after the TTL, which bounds how long another
+process can serve a response after a change. Shared entries carry the
+wall-clock time their data was read, and one read before a tag it
+depends on was invalidated in this process is ignored, even if the
+backend hasn't been cleared yet.
+
+Usage in a handler:
+
+    async def load():
+        campaign = await db.scalar(...)  # Raise HTTPException for errors
+        return campaign, [f"campaign:{campaign.id}"]
+
+    return await response_cache.serve(request, load, CampaignResponse)
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple, Type
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import get_response_cache_settings
+from utils.cache import CacheBackend, SingleFlight, TTLCache
+from utils.fast_json import dumps
+
+# Invalidated tags remembered before the oldest are forgotten
+MAX_TAG_EPOCHS = 100_000
+
+# Loads the content of a response and the tags it depends on
+Loader = Callable[[], Awaitable[Tuple[Any, Iterable[str]]]]
+
+
+@dataclass
+class CachedResponse:
+    """A rendered response body and what it depends on."""
+    body: bytes
+    etag: str
+    tags: Tuple[str, ...]
+    epoch: int  # Invalidation epoch when the data was read
+    read_at: float  # Wall-clock time the data was read (compared across processes)
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in (value.removeprefix("W/") for value in candidates)
+
+
+def _encode(entry: CachedResponse) -> str:
+    """Serialise an entry for a shared backend."""
+    return json.dumps({
+        "body": entry.body.decode(), "etag": entry.etag, "tags": entry.tags, "read_at": entry.read_at
+    })
+
+
+def _decode(data: str, epoch: int) -> CachedResponse:
+    """Deserialise an entry from a shared backend, as read at epoch locally."""
+    fields = json.loads(data)
+    return CachedResponse(
+        body=fields["body"].encode(),
+        etag=fields["etag"],
+        tags=tuple(fields["tags"]),
+        epoch=epoch,
+        read_at=fields.get("read_at", 0.0)
+    )
+
+
+class ResponseCache:
+    """
+    Two-level cache of rendered JSON responses with tag invalidation.
+
+    Invalidation bumps an epoch counter and records it, and the time,
+    against each tag. An entry is only served while none of its tags has
+    been invalidated since its data was read, so a request that raced a
+    write can't put the old data back. Entries from the shared backend
+    are checked by the time they were read instead, as epochs are per
+    process.
+
+    Only the max_tags most recently invalidated tags are remembered.
+    Forgetting one raises a floor epoch and time instead: entries read
+    before it are treated as invalidated, since a tag they depend on
+    might have been.
+
+    Args:
+        ttl: Seconds a response is served from memory (0 disables)
+        max_size: Most responses kept in process
+        backend: Optional shared backend
+        max_tags: Most invalidated tags remembered
+    """
+
+    def __init__(self, ttl: float, max_size: int, backend: Optional[CacheBackend] = None,
+                 max_tags: int = MAX_TAG_EPOCHS):
+        self.ttl = ttl
+        self.local = TTLCache(max_size=max_size, ttl=ttl)
+        self.backend = backend
+        self.epoch = 0
+        self.max_tags = max_tags
+        self._tag_epochs = OrderedDict()  # Tag -> (epoch, time) invalidated, oldest first
+        self._forgotten = (0, 0.0)
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether responses are cached at all."""
+        return self.ttl > 0
+
+    @staticmethod
+    def key_for(request: Request) -> str:
+        """Cache key for a request: its path and sorted query string."""
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    def _is_current(self, entry: CachedResponse) -> bool:
+        return entry.epoch >= self._forgotten[0] and all(
+            self._tag_epochs.get(tag, (0, 0.0))[0] <= entry.epoch for tag in entry.tags
+        )
+
+    def _read_after_invalidation(self, entry: CachedResponse) -> bool:
+        # For shared entries: read after this process last invalidated any of their tags
+        return entry.read_at > self._forgotten[1] and all(
+            self._tag_epochs.get(tag, (0, 0.0))[1] < entry.read_at for tag in entry.tags
+        )
+
+    async def serve(self, request: Request, load: Loader, model: Optional[Type[BaseModel]] = None) -> Response:
+        """
+        Answer a request from the cache, loading and rendering it on a miss.
+
+        Args:
+            request: Incoming request
+            load: Coroutine function returning (content, tags). Exceptions
+                (e.g. a 404 HTTPException) propagate and nothing is cached.
+            model: Response model to validate content with (the route's response_model;
+                leave out when content is already plain, e.g. from utils/fast_json.py)
+
+        Returns:
+            200 response, or 304 if the client already has this body
+        """
+        if not self.enabled:
+            content, tags = await load()
+            return self._respond(request, self._render(content, tags, model, self.epoch, time.time()), "MISS")
+
+        key = self.key_for(request)
+        entry = await self._lookup(key)
+        if entry is not None:
+            self.hits += 1
+            return self._respond(request, entry, "HIT")
+
+        self.misses += 1
+        entry = await self._flight.do(key, lambda: self._load(key, load, model))
+        return self._respond(request, entry, "MISS")
+
+    async def _lookup(self, key: str) -> Optional[CachedResponse]:
+        entry = self.local.get(key)
+        if entry is not None and not self._is_current(entry):
+            self.local.discard(key)
+            entry = None
+
+        if entry is None and self.backend is not None:
+            data = await self.backend.get(f"response:{key}")
+            if data is not None:
+                entry = _decode(data, self.epoch)
+                if self._read_after_invalidation(entry):
+                    self.local.set(key, entry)
+                else:
+                    # Not yet cleared by this process's invalidate() task
+                    entry = None
+        return entry
+
+    async def _load(self, key: str, load: Loader, model: Optional[Type[BaseModel]]) -> CachedResponse:
+        # Note the epoch before reading, so a write committed meanwhile wins
+        epoch, read_at = self.epoch, time.time()
+        content, tags = await load()
+        entry = self._render(content, tags, model, epoch, read_at)
+
+        if self._is_current(entry):
+            self.local.set(key, entry)
+            if self.backend is not None:
+                await self.backend.set(f"response:{key}", _encode(entry), self.ttl, entry.tags)
+        return entry
+
+    @staticmethod
+    def _render(content, tags: Iterable[str], model: Optional[Type[BaseModel]],
+                epoch: int, read_at: float) -> CachedResponse:
+        if model is not None:
+            content = model.model_validate(content, from_attributes=True).model_dump(mode="json")
+
+        body = dumps(content)
+        return CachedResponse(body=body, etag=make_etag(body), tags=tuple(tags), epoch=epoch, read_at=read_at)
+
+    def _respond(self, request: Request, entry: CachedResponse, cache_status: str) -> Response:
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": "no-cache",  # Clients may store it but must revalidate
+            "X-Cache": cache_status,
+        }
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def invalidate(self, *tags: str):
+        """
+        Stop serving every entry tagged with any of tags.
+
+        Local entries go immediately. The shared backend is cleared by a
+        task on the running event loop, if there is one.
+
+        Args:
+            tags: Tags to invalidate
+        """
+        self.epoch += 1
+        now = time.time()
+        for tag in tags:
+            self._tag_epochs[tag] = (self.epoch, now)
+            self._tag_epochs.move_to_end(tag)
+        while len(self._tag_epochs) > self.max_tags:
+            _, self._forgotten = self._tag_epochs.popitem(last=False)
+        self.invalidations += 1
+
+        if self.backend is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.create_task(self.backend.invalidate_tags(*tags))
+
+    def invalidate_on_commit(self, db, *tags: str):
+        """
+        Invalidate tags once the session's transaction commits.
+
+        Args:
+            db: Session (sync or async) making the change
+            tags: Tags to invalidate
+        """
+        db.info.setdefault("response_cache_tags", set()).update(tags)
+
+    def clear(self):
+        """Drop every entry and reset the statistics."""
+        self.local.clear()
+        self._tag_epochs.clear()
+        self._forgotten = (0, 0.0)
+        self.hits = self.misses = self.not_modified = self.invalidations = 0
+
+    def status(self) -> dict:
+        """
+        Report hit rate and size.
+
+        Returns:
+            Dictionary of cache statistics
+        """
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "ttl": self.ttl,
+            "entries": len(self.local),
+            "max_size": self.local.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+            "invalidated_tags": len(self._tag_epochs),
+            "coalesced": self._flight.coalesced,
+            "shared_backend": type(self.backend).__name__ if self.backend is not None else None,
+        }
+
+
+# Process-wide response cache used by the public read endpoints
+_settings = get_response_cache_settings()
+response_cache = ResponseCache(ttl=_settings.ttl, max_size=_settings.max_size)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_tags(session):
+    """Invalidate the tags of changes once they are committed."""
+    tags = session.info.pop("response_cache_tags", None)
+    if tags:
+        response_cache.invalidate(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_tags(session):
+    """Nothing was committed, so nothing needs invalidating."""
+    session.info.pop("response_cache_tags", None)
@@ -0,0 +1,656 @@
+"""
+In-process inverted index for campaign search (SEARCH_ENGINE=memory).
+
+An alternative to the database's full-text index (utils/campaign_search.py)
+for deployments without MySQL FULLTEXT, or where keeping it up to date
+is too slow. Each worker answers GET /campaigns/search from memory and
+only goes to the database for the page of campaigns it returns:
+
+- Postings: for each word, the campaigns containing it and how often, in
+  flat arrays (4 bytes per campaign id, 2 per count) rather than Python
+  objects
+- Scoring: BM25 over title and description, with a title word counted
+  TITLE_WEIGHT times
+- Filters: each campaign's status and type are kept in the index, so
+  filtered searches are answered without the database too
+- Scoring runs on the event loop, so search() hands it back every
+  SCORE_SLICE postings (and results ranked): a common word's long
+  posting list doesn't stall the worker's other requests for the whole
+  search
+
+The index is a file that workers memory-map (SEARCH_INDEX_PATH). The
+postings stay in the OS page cache, shared by every worker on the host,
+and a starting worker maps the file instead of reading every campaign;
+only the word list is loaded into a dict.
+
+Changes go into a small per-worker overlay on top of the mapped file:
+
+- create_campaign, update_campaign and delete_campaign re-index the
+  campaign as soon as they commit, so the worker making a change sees it
+- run_refresh_loop() re-indexes campaigns whose updated_at moved since
+  the last look (other workers' changes, bulk updates) and remaps the
+  file when it has been rebuilt
+
+`python manage_search.py build` rebuilds the file from the database. Run
+it periodically so overlays stay small. Document frequencies (BM25's
+idf) count the file plus the overlay, so scores drift slightly from a
+fresh build as campaigns are edited.
+"""
+
+import array
+import asyncio
+import heapq
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from itertools import chain, islice
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import get_search_settings
+from database import AsyncSessionLocal
+from models import Campaign, CampaignStatus, CampaignType
+from utils.campaign_search import decode_search_cursor, encode_search_cursor, search_terms
+from utils.fast_json import RowSerializer
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+# A title word counts as this many description words
+TITLE_WEIGHT = 3
+
+# Postings scored (or results ranked) between returns to the event loop,
+# a few milliseconds of work
+SCORE_SLICE = 4096
+
+# Campaigns read per batch when building the index
+BUILD_BATCH_SIZE = 5000
+
+# How far before the newest updated_at seen each refresh looks again, for
+# transactions that commit a little after setting it
+CATCH_UP_OVERLAP = timedelta(seconds=5)
+
+# File layout: header, then word list, posting starts per word, posting
+# campaign ids, posting counts, and length, status and type per campaign id
+# (each section aligned to 8 bytes)
+MAGIC = b"CSIDX001"
+HEADER = struct.Struct("<8sIIIQQqQ")
+
+# Status and type codes stored per campaign (0 = not in the index)
+STATUS_CODES = {value: code for code, value in enumerate(CampaignStatus, start=1)}
+TYPE_CODES = {value: code for code, value in enumerate(CampaignType, start=1)}
+
+EPOCH = datetime(1970, 1, 1)
+
+INDEX_COLUMNS = (
+    Campaign.id, Campaign.title, Campaign.description,
+    Campaign.status, Campaign.campaign_type, Campaign.updated_at
+)
+
+_WORD = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents (like FTS5's remove_diacritics), so "Café" matches "cafe"."""
+    text = text.lower()
+    if text.isascii():
+        return text
+    return "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+
+
+def term_counts(title: str, description: str) -> Tuple[Dict[str, int], int]:
+    """
+    Weighted word counts for a campaign.
+
+    Args:
+        title: Campaign title
+        description: Campaign description
+
+    Returns:
+        Tuple of (count per word, document length), with title words
+        counted TITLE_WEIGHT times
+    """
+    counts = Counter(_WORD.findall(fold(description)))
+    length = sum(counts.values())
+    for word in _WORD.findall(fold(title)):
+        counts[word] += TITLE_WEIGHT
+        length += TITLE_WEIGHT
+    return {word: min(count, 0xFFFF) for word, count in counts.items()}, length
+
+
+def query_terms(q: str) -> List[str]:
+    """
+    Words to look up for a search, folded like the indexed text.
+
+    Raises:
+        HTTPException 400: If the search text has no words in it
+    """
+    terms = list(dict.fromkeys(fold(term) for term in search_terms(q)))
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search text must contain at least one word"
+        )
+    return terms
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _file_id(stat: os.stat_result) -> tuple:
+    return (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class IndexBuilder:
+    """
+    Collects campaigns in id order and writes an index file.
+
+    Attributes:
+        doc_count: Campaigns added
+        watermark: Newest updated_at among them (None if unknown)
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Tuple[array.array, array.array]] = {}
+        self.lengths = array.array("I")
+        self.statuses = array.array("B")
+        self.types = array.array("B")
+        self.doc_count = 0
+        self.total_length = 0
+        self.watermark: Optional[datetime] = None
+
+    def add(self, campaign_id: int, title: str, description: str, status, campaign_type, updated_at=None):
+        """Add a campaign (ids must come in ascending order)."""
+        counts, length = term_counts(title, description)
+        missing = campaign_id + 1 - len(self.lengths)
+        self.lengths.frombytes(bytes(4 * missing))
+        self.statuses.frombytes(bytes(missing))
+        self.types.frombytes(bytes(missing))
+        self.lengths[campaign_id] = length
+        self.statuses[campaign_id] = STATUS_CODES[status]
+        self.types[campaign_id] = TYPE_CODES[campaign_type]
+        self.doc_count += 1
+        self.total_length += length
+
+        postings = self.postings
+        for word, count in counts.items():
+            entry = postings.get(word)
+            if entry is None:
+                entry = postings[word] = (array.array("I"), array.array("H"))
+            entry[0].append(campaign_id)
+            entry[1].append(count)
+
+        updated_at = _naive(updated_at)
+        if updated_at is not None and (self.watermark is None or updated_at > self.watermark):
+            self.watermark = updated_at
+
+    def write(self, path: str):
+        """
+        Write the index to path, atomically replacing any existing file.
+
+        Workers with the old file mapped keep reading it until they remap.
+        """
+        words = list(self.postings)
+        blob = "\n".join(words).encode("utf-8")
+        starts = array.array("Q", [0])
+        docs = array.array("I")
+        counts = array.array("H")
+        for word in words:
+            word_docs, word_counts = self.postings[word]
+            docs.extend(word_docs)
+            counts.extend(word_counts)
+            starts.append(len(docs))
+
+        watermark = -1 if self.watermark is None else (self.watermark - EPOCH) // timedelta(microseconds=1)
+        header = HEADER.pack(
+            MAGIC, len(self.lengths), self.doc_count, len(words), len(docs),
+            self.total_length, watermark, len(blob)
+        )
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".search-index-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for part in (header, blob, starts, docs, counts, self.lengths, self.statuses, self.types):
+                    data = part if isinstance(part, bytes) else part.tobytes()
+                    f.write(data)
+                    f.write(bytes(_aligned(len(data)) - len(data)))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+async def build_index_file(db: AsyncSession, path: str, batch_size: int = BUILD_BATCH_SIZE) -> int:
+    """
+    Build the index file from every campaign in the database.
+
+    Args:
+        db: Database session
+        path: File to write (replaced atomically)
+        batch_size: Campaigns read per round trip
+
+    Returns:
+        Number of campaigns indexed
+    """
+    builder = IndexBuilder()
+    result = await db.stream(
+        select(*INDEX_COLUMNS).order_by(Campaign.id).execution_options(yield_per=batch_size)
+    )
+    async for row in result:
+        builder.add(*row)
+    builder.write(path)
+    return builder.doc_count
+
+
+class _Segment:
+    """An index file, memory-mapped read-only."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.file_id = _file_id(os.fstat(f.fileno()))
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, doc_slots, self.doc_count, word_count, posting_count,
+         self.total_length, watermark, blob_size) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a campaign search index")
+        self.watermark = None if watermark < 0 else EPOCH + timedelta(microseconds=watermark)
+
+        self._views = [memoryview(self._mmap)]
+        offset = _aligned(HEADER.size)
+
+        def section(size: int, fmt: str) -> memoryview:
+            nonlocal offset
+            view = self._views[0][offset:offset + size].cast(fmt)
+            self._views.append(view)
+            offset = _aligned(offset + size)
+            return view
+
+        blob = section(blob_size, "B")
+        self.words = {word: i for i, word in enumerate(bytes(blob).decode("utf-8").split("\n"))} if word_count else {}
+        self.starts = section(8 * (word_count + 1), "Q")
+        self.docs = section(4 * posting_count, "I")
+        self.counts = section(2 * posting_count, "H")
+        self.lengths = section(4 * doc_slots, "I")
+        self.statuses = section(doc_slots, "B")
+        self.types = section(doc_slots, "B")
+
+    def length(self, campaign_id: int) -> int:
+        """Indexed length of a campaign (0 if it isn't in the file)."""
+        return self.lengths[campaign_id] if campaign_id < len(self.lengths) else 0
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._mmap.close()
+
+
+@dataclass
+class _Doc:
+    """A campaign indexed since the file was built."""
+    counts: Dict[str, int]
+    length: int
+    status: int
+    campaign_type: int
+
+
+class CampaignIndex:
+    """
+    Campaign search index: the mapped file plus this worker's changes since.
+
+    Args:
+        path: Index file (built by open() when missing, or manage_search.py)
+        session_factory: Sessions for building and catching up
+    """
+
+    def __init__(self, path: str, session_factory: async_sessionmaker):
+        self.path = path
+        self.session_factory = session_factory
+        self.watermark: Optional[datetime] = None
+        self.searches = 0
+        self.updates = 0
+        self.reloads = 0
+        self._segment: Optional[_Segment] = None
+        self._retired: List[_Segment] = []  # Replaced while searches were reading them
+        self._searching = 0
+        self._overlay: Dict[int, _Doc] = {}
+        self._overlay_postings: Dict[str, Dict[int, int]] = {}
+        self._doc_count = 0
+        self._total_length = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Whether searches are answered from this index."""
+        return self._segment is not None
+
+    async def open(self) -> bool:
+        """
+        Map the index file, building it first if there is none, and catch up.
+
+        Returns:
+            True if the file had to be built
+        """
+        built = not os.path.exists(self.path)
+        if built:
+            async with self.session_factory() as db:
+                await build_index_file(db, self.path)
+        self._map()
+        await self.catch_up()
+        return built
+
+    def close(self):
+        """Unmap the index file and drop the overlay."""
+        if self._segment is not None:
+            self._retired.append(self._segment)
+            self._segment = None
+        self._close_retired()
+        self._overlay = {}
+        self._overlay_postings = {}
+
+    def _map(self):
+        segment = _Segment(self.path)
+        old, self._segment = self._segment, segment
+        self._overlay = {}
+        self._overlay_postings = {}
+        self._doc_count = segment.doc_count
+        self._total_length = segment.total_length
+        self.watermark = segment.watermark
+        if old is not None:
+            self._retired.append(old)
+            self._close_retired()
+
+    def _close_retired(self):
+        # A search in progress may still be reading a replaced file
+        if not self._searching:
+            while self._retired:
+                self._retired.pop().close()
+
+    def add(self, campaign_id: int, title: str, description: str, status, campaign_type, updated_at=None):
+        """
+        Index a campaign as it is now, replacing what the index had for it.
+
+        Args:
+            campaign_id: Campaign ID
+            title: Current title
+            description: Current description
+            status: Current status
+            campaign_type: Campaign type
+            updated_at: Its updated_at, if known (moves the catch-up watermark)
+        """
+        self._remove(campaign_id)
+        counts, length = term_counts(title, description)
+        self._overlay[campaign_id] = _Doc(counts, length, STATUS_CODES[status], TYPE_CODES[campaign_type])
+        for word, count in counts.items():
+            self._overlay_postings.setdefault(word, {})[campaign_id] = count
+        self._doc_count += 1
+        self._total_length += length
+        self.updates += 1
+
+        updated_at = _naive(updated_at)
+        if updated_at is not None and (self.watermark is None or updated_at > self.watermark):
+            self.watermark = updated_at
+
+    def _remove(self, campaign_id: int):
+        doc = self._overlay.pop(campaign_id, None)
+        if doc is not None:
+            for word in doc.counts:
+                postings = self._overlay_postings[word]
+                del postings[campaign_id]
+                if not postings:
+                    del self._overlay_postings[word]
+            length = doc.length
+        else:
+            # The file's entry is hidden from now on (overlay ids are skipped)
+            length = self._segment.length(campaign_id)
+        if length:
+            self._doc_count -= 1
+            self._total_length -= length
+
+    def update(self, campaign: Campaign):
+        """Re-index a campaign just committed by this worker (no-op unless open)."""
+        if self.is_open:
+            self.add(campaign.id, campaign.title, campaign.description, campaign.status, campaign.campaign_type)
+
+    async def catch_up(self) -> int:
+        """
+        Re-index campaigns changed since the newest updated_at seen.
+
+        Returns:
+            Number of campaigns re-indexed
+        """
+        query = select(*INDEX_COLUMNS)
+        if self.watermark is not None:
+            query = query.where(Campaign.updated_at >= self.watermark - CATCH_UP_OVERLAP)
+        async with self.session_factory() as db:
+            rows = (await db.execute(query)).all()
+        for row in rows:
+            self.add(*row)
+        return len(rows)
+
+    async def refresh(self) -> bool:
+        """
+        Remap the file if it has been rebuilt, then catch up.
+
+        Returns:
+            True if the file was remapped
+        """
+        try:
+            file_id = _file_id(os.stat(self.path))
+        except FileNotFoundError:
+            file_id = None
+        reloaded = file_id is not None and file_id != self._segment.file_id
+        if reloaded:
+            self._map()
+            self.reloads += 1
+        await self.catch_up()
+        return reloaded
+
+    async def run_refresh_loop(self, interval: float):
+        """
+        Refresh every interval seconds until cancelled.
+
+        Started as a background task by the application lifespan. Errors
+        are logged and retried on the next tick.
+
+        Args:
+            interval: Seconds between refreshes
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Search index refresh failed: {e}")
+
+    async def search(
+        self,
+        q: str,
+        campaign_type: Optional[CampaignType],
+        campaign_status: CampaignStatus,
+        page_size: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Tuple[int, float]], Optional[str]]:
+        """
+        Rank campaigns for a search.
+
+        Yields to the event loop every SCORE_SLICE postings scored and
+        results ranked. Changes
+        made meanwhile may or may not be reflected, as with a search
+        that started a moment later.
+
+        Args:
+            q: Search text as typed
+            campaign_type: Only campaigns of this type (None for any)
+            campaign_status: Only campaigns with this status
+            page_size: Results wanted
+            cursor: next_cursor from a previous page, if any
+
+        Returns:
+            Tuple of ([(campaign id, score)] best first, next cursor or None)
+
+        Raises:
+            HTTPException 400: If q has no words or the cursor is invalid
+        """
+        terms = query_terms(q)
+        after = None
+        if cursor is not None:
+            try:
+                after = decode_search_cursor(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid search cursor"
+                )
+        self.searches += 1
+        self._searching += 1
+        try:
+            scores = await self._score(terms, campaign_type, campaign_status)
+        finally:
+            self._searching -= 1
+            self._close_retired()
+
+        ranked = ((score, doc) for doc, score in scores.items())
+        if after is not None:
+            ranked = (hit for hit in ranked if hit < after)
+        top = []
+        while True:
+            chunk = list(islice(ranked, SCORE_SLICE))
+            top = heapq.nlargest(page_size + 1, chain(top, chunk))
+            if len(chunk) < SCORE_SLICE:
+                break
+            await asyncio.sleep(0)
+
+        next_cursor = encode_search_cursor(*top[page_size - 1]) if len(top) > page_size else None
+        return [(doc, score) for score, doc in top[:page_size]], next_cursor
+
+    async def _score(
+        self,
+        terms: List[str],
+        campaign_type: Optional[CampaignType],
+        campaign_status: CampaignStatus
+    ) -> Dict[int, float]:
+        # What the postings are read from, as of now: a remap while the
+        # scoring is handed back to the loop replaces these rather than
+        # changing them (the overlay's postings are copied, as add() does)
+        segment, overlay = self._segment, self._overlay
+        overlay_postings = {word: list(self._overlay_postings.get(word, {}).items()) for word in terms}
+        lengths, statuses, types = segment.lengths, segment.statuses, segment.types
+        doc_count = max(self._doc_count, 1)
+        # BM25's length normalisation, k1 * (1 - b + b * length / average length), as a + c * length
+        norm_base = K1 * (1 - B)
+        norm_per_word = K1 * B * doc_count / max(self._total_length, 1)
+        want_status = STATUS_CODES[campaign_status]
+        want_type = TYPE_CODES[campaign_type] if campaign_type else 0
+
+        scores: Dict[int, float] = {}
+        get = scores.get
+        for word in terms:
+            index = segment.words.get(word)
+            start, end = (segment.starts[index], segment.starts[index + 1]) if index is not None else (0, 0)
+            extra = overlay_postings[word]
+            df = end - start + len(extra)
+            if not df:
+                continue
+            weight = math.log(1 + (max(doc_count - df, 0) + 0.5) / (df + 0.5)) * (K1 + 1)
+
+            for slice_start in range(start, end, SCORE_SLICE):
+                slice_end = min(slice_start + SCORE_SLICE, end)
+                for doc, count in zip(segment.docs[slice_start:slice_end], segment.counts[slice_start:slice_end]):
+                    if statuses[doc] != want_status or (want_type and types[doc] != want_type) or doc in overlay:
+                        continue
+                    scores[doc] = get(doc, 0.0) + weight * count / (count + norm_base + norm_per_word * lengths[doc])
+                if slice_end - slice_start == SCORE_SLICE:
+                    await asyncio.sleep(0)
+
+            for doc, count in extra:
+                entry = overlay[doc]
+                if entry.status != want_status or (want_type and entry.campaign_type != want_type):
+                    continue
+                scores[doc] = get(doc, 0.0) + weight * count / (count + norm_base + norm_per_word * entry.length)
+        return scores
+
+    def status(self) -> dict:
+        """
+        Report index size and activity.
+
+        Returns:
+            Dictionary of index statistics
+        """
+        segment = self._segment
+        return {
+            "open": self.is_open,
+            "campaigns": self._doc_count,
+            "words": len(segment.words) if segment else 0,
+            "overlay": len(self._overlay),
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "searches": self.searches,
+            "updates": self.updates,
+            "reloads": self.reloads,
+        }
+
+
+async def load_hits(
+    db: AsyncSession,
+    serializer: RowSerializer,
+    hits: List[Tuple[int, float]],
+    campaign_type: Optional[CampaignType],
+    campaign_status: CampaignStatus
+) -> List[dict]:
+    """
+    Load the campaigns for a page of index hits, in rank order.
+
+    The filters are checked again, so a campaign changed by another
+    worker since the last refresh is left out rather than shown stale.
+
+    Args:
+        db: Database session
+        serializer: Fields to return
+        hits: (campaign id, score) from CampaignIndex.search()
+        campaign_type: Type filter used for the search
+        campaign_status: Status filter used for the search
+
+    Returns:
+        Response dicts for the campaigns
+    """
+    if not hits:
+        return []
+    # Filter here rather than in SQL: given "status = ?" as well, SQLite
+    # reads every campaign with that status through ix_campaigns_status_created
+    # instead of looking the ids up by primary key
+    query = select(*serializer.select_columns(Campaign.id, Campaign.status, Campaign.campaign_type)).where(
+        Campaign.id.in_([doc for doc, _ in hits])
+    )
+    rows = {
+        row.id: row for row in (await db.execute(query)).all()
+        if row.status == campaign_status and (not campaign_type or row.campaign_type == campaign_type)
+    }
+    return serializer.rows(rows[doc] for doc, _ in hits if doc in rows)
+
+
+# Per-worker index, opened by the application lifespan when SEARCH_ENGINE=memory
+campaign_index = CampaignIndex(get_search_settings().index_path, AsyncSessionLocal)